@@ -3,6 +3,13 @@ MedLink AI Module
 Face Recognition for Team Authentication
 """
 
-from .face_auth_manager import FaceAuthManager
+__all__ = ['FaceAuthManager']
 
-__all__ = ['FaceAuthManager']
\ No newline at end of file
+
+def __getattr__(name):
+    # FaceAuthManager needs OpenCV; import it on first use so the
+    # numpy-only modules (face_embedding_store, face_engine) load without it
+    if name == 'FaceAuthManager':
+        from .face_auth_manager import FaceAuthManager
+        return FaceAuthManager
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
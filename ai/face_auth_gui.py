@@ -11,6 +11,9 @@ import threading
 import time
 import os
 from face_auth_manager import FaceAuthManager
+from face_capture import FaceCaptureLoop
+from face_engine import face_engine, STATE_READY, STATE_FAILED
+from face_worker import configured_address
 
 
 class FaceRegistrationDialog(ctk.CTkToplevel):
@@ -482,9 +485,15 @@ class FaceLoginDialog(ctk.CTkToplevel):
         self.cap = None
         self.is_scanning = False
         self.preview_running = False
+        self.camera_ok = True
+        self.capture_loop = None  # Capture thread + face gate (ai/face_capture.py)
+        self.manual_scan = False
         
         self._create_widgets()
         
+        # Scan stays disabled until the resident model has warmed up
+        self._watch_model()
+        
         # Center window
         self.update_idletasks()
         x = (self.winfo_screenwidth() // 2) - (720 // 2)
@@ -562,7 +571,7 @@ class FaceLoginDialog(ctk.CTkToplevel):
         
         self.details_label = ctk.CTkLabel(
             status_text_frame,
-            text="Press 'Scan Face' to begin",
+            text="Look at the camera to log in",
             font=("Arial", 13),
             text_color="gray",
             anchor="w"
@@ -608,11 +617,21 @@ class FaceLoginDialog(ctk.CTkToplevel):
                     font=("Arial", 16, "bold"),
                     text_color="red"
                 )
+                self.camera_ok = False
                 self.scan_btn.configure(state="disabled")
                 self.status_label.configure(text="Camera Error", text_color="red")
                 self.details_label.configure(text="Cannot access webcam")
                 return
             
+            # Camera reads, overlays and face detection run off the Tk thread;
+            # recognition starts by itself once a steady face is in view
+            self.capture_loop = FaceCaptureLoop(
+                self.cap,
+                recognize=self.face_manager.recognize_frame,
+                is_ready=lambda: self.face_manager.engine.is_ready,
+            )
+            self.capture_loop.start()
+            
             self.preview_running = True
             self.update_preview()
             
@@ -622,126 +641,82 @@ class FaceLoginDialog(ctk.CTkToplevel):
                 font=("Arial", 14),
                 text_color="red"
             )
+            self.camera_ok = False
+            self.scan_btn.configure(state="disabled")
+    
+    def _watch_model(self):
+        """Show the warm-up indicator until the face model is loaded"""
+        if not self.winfo_exists() or self.is_scanning:
+            return
+        
+        engine = self.face_manager.engine
+        if engine.state == STATE_READY:
+            if self.camera_ok:
+                self.scan_btn.configure(state="normal", text="📷 Scan Face")
+                self.status_label.configure(text="Ready to scan", text_color="gray")
+                self.details_label.configure(text="Look at the camera to log in", text_color="gray")
+            return
+        
+        if engine.state == STATE_FAILED:
             self.scan_btn.configure(state="disabled")
+            self.status_label.configure(text="Face Model Error", text_color="red")
+            self.details_label.configure(text=str(engine.error), text_color="red")
+            return
+        
+        self.scan_btn.configure(state="disabled", text="⏳ Loading face model...")
+        self.status_label.configure(text="Warming up", text_color="yellow")
+        self.details_label.configure(text="Loading face recognition model...", text_color="yellow")
+        self.after(200, self._watch_model)
     
     def update_preview(self):
-        """Update camera preview continuously"""
-        if not self.preview_running or self.cap is None:
+        """Show the newest preview frame and pick up recognition results (Tk thread)"""
+        if not self.preview_running or self.capture_loop is None:
             return
         
+        started = time.perf_counter()
         try:
-            ret, frame = self.cap.read()
-            
-            if ret:
-                # Convert BGR to RGB
-                frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                
-                # Resize to fit preview
-                frame_resized = cv2.resize(frame_rgb, (640, 480))
-                
-                # Draw overlay based on state
-                if self.is_scanning:
-                    # SCANNING mode - yellow overlay
-                    overlay = frame_resized.copy()
-                    
-                    # Draw pulsing border
-                    border_thickness = 15
-                    cv2.rectangle(
-                        overlay, 
-                        (border_thickness, border_thickness), 
-                        (640-border_thickness, 480-border_thickness), 
-                        (0, 255, 255),  # Yellow
-                        border_thickness
-                    )
-                    
-                    # Blend
-                    frame_resized = cv2.addWeighted(frame_resized, 0.7, overlay, 0.3, 0)
-                    
-                    # Add scanning text with background
-                    text = "SCANNING..."
-                    font = cv2.FONT_HERSHEY_BOLD
-                    text_size = cv2.getTextSize(text, font, 1.5, 3)[0]
-                    text_x = (640 - text_size[0]) // 2
-                    text_y = 50
-                    
-                    # Background rectangle for text
-                    cv2.rectangle(
-                        frame_resized,
-                        (text_x - 10, text_y - text_size[1] - 10),
-                        (text_x + text_size[0] + 10, text_y + 10),
-                        (0, 0, 0),
-                        -1
-                    )
-                    
-                    # Text
-                    cv2.putText(
-                        frame_resized,
-                        text,
-                        (text_x, text_y),
-                        font,
-                        1.5,
-                        (0, 255, 255),
-                        3
-                    )
-                else:
-                    # READY mode - subtle green corners
-                    h, w = frame_resized.shape[:2]
-                    corner_len = 50
-                    thickness = 4
-                    color = (0, 255, 0)  # Green
-                    
-                    # Top-left
-                    cv2.line(frame_resized, (20, 20), (20+corner_len, 20), color, thickness)
-                    cv2.line(frame_resized, (20, 20), (20, 20+corner_len), color, thickness)
-                    
-                    # Top-right
-                    cv2.line(frame_resized, (w-20, 20), (w-20-corner_len, 20), color, thickness)
-                    cv2.line(frame_resized, (w-20, 20), (w-20, 20+corner_len), color, thickness)
-                    
-                    # Bottom-left
-                    cv2.line(frame_resized, (20, h-20), (20+corner_len, h-20), color, thickness)
-                    cv2.line(frame_resized, (20, h-20), (20, h-20-corner_len), color, thickness)
-                    
-                    # Bottom-right
-                    cv2.line(frame_resized, (w-20, h-20), (w-20-corner_len, h-20), color, thickness)
-                    cv2.line(frame_resized, (w-20, h-20), (w-20, h-20-corner_len), color, thickness)
-                
-                # Convert to PhotoImage
-                img = Image.fromarray(frame_resized)
-                photo = ImageTk.PhotoImage(img)
-                
-                # Update label
+            # Capture, overlays and resizing happen on the capture thread
+            image = self.capture_loop.take_preview()
+            if image is not None:
+                photo = ImageTk.PhotoImage(image)
                 self.preview_label.configure(image=photo, text="")
                 self.preview_label.image = photo
             
-            # Continue updating
-            if self.preview_running:
-                self.after(30, self.update_preview)  # ~33 FPS
-                
+            if self.capture_loop.scanning and not self.is_scanning:
+                # Hands-free: a stable face triggered recognition
+                self._show_scanning()
+            
+            result = self.capture_loop.take_result()
+            if result is not None:
+                self._handle_result(result)
+            
+            if self.capture_loop.error:
+                self.preview_label.configure(image=None, text=f"❌ {self.capture_loop.error}",
+                                             text_color="red")
         except Exception as e:
             print(f"Preview error: {e}")
+        
+        self.capture_loop.record_ui_frame(time.perf_counter() - started)
+        
+        # Continue updating
+        if self.preview_running:
+            self.after(15, self.update_preview)  # ~60 FPS poll, frames at camera rate
     
-    def scan_face(self):
-        """Scan face and recognize"""
-        # Update UI
+    def _show_scanning(self):
+        """Switch the status area to 'searching'"""
         self.is_scanning = True
         self.status_icon.configure(text="🔍", text_color="yellow")
         self.status_label.configure(text="Searching...", text_color="yellow")
         self.details_label.configure(text="Analyzing face features...", text_color="yellow")
         self.scan_btn.configure(state="disabled", text="⏳ Processing...")
-        self.update()
-        
-        # Run recognition in thread
-        def recognize():
-            time.sleep(1.5)  # Give time to see "searching" message
-            
-            result = self.face_manager.recognize_from_webcam()
-            
-            # Update UI in main thread
-            self.after(0, lambda: self._handle_result(result))
-        
-        thread = threading.Thread(target=recognize, daemon=True)
-        thread.start()
+    
+    def scan_face(self):
+        """Scan face and recognize (manual trigger; login is otherwise hands-free)"""
+        if self.capture_loop is None:
+            return
+        self.manual_scan = True
+        self._show_scanning()
+        self.capture_loop.request_scan()
     
     def _handle_result(self, result):
         """Handle recognition result"""
@@ -790,8 +765,11 @@ class FaceLoginDialog(ctk.CTkToplevel):
                 text_color="red"
             )
             
-            # Shake animation
-            self._error_animation()
+            # Shake only for a manual scan - hands-free retries would keep shaking
+            if self.manual_scan:
+                self._error_animation()
+        
+        self.manual_scan = False
     
     def _success_animation(self):
         """Success flash animation"""
@@ -829,6 +807,9 @@ class FaceLoginDialog(ctk.CTkToplevel):
         """Clean up when closing"""
         self.preview_running = False
         
+        if self.capture_loop is not None:
+            self.capture_loop.stop()
+        
         if self.cap is not None:
             self.cap.release()
         
@@ -837,6 +818,11 @@ class FaceLoginDialog(ctk.CTkToplevel):
 
 # Test application
 if __name__ == "__main__":
+    # Load the face model in the background while the UI starts
+    # (unless a shared face worker process hosts it)
+    if configured_address() is None:
+        face_engine.warm_up()
+    
     # Set appearance
     ctk.set_appearance_mode("dark")
     ctk.set_default_color_theme("blue")
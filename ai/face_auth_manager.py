@@ -3,7 +3,6 @@ MedLink Face Authentication Manager
 Uses DeepFace for team member recognition
 """
 
-from deepface import DeepFace
 import cv2
 import os
 import json
@@ -11,6 +10,19 @@ from datetime import datetime
 from pathlib import Path
 import shutil
 
+try:
+    from ai.face_embedding_store import FaceEmbeddingStore
+    from ai.face_engine import MODEL_NAME
+    from ai.face_worker import get_face_engine
+except ImportError:
+    # Running from inside ai/ (face_auth_gui.py)
+    from face_embedding_store import FaceEmbeddingStore
+    from face_engine import MODEL_NAME
+    from face_worker import get_face_engine
+
+DISTANCE_METRIC = "cosine"
+MATCH_THRESHOLD = 0.6  # Good match threshold (cosine distance)
+
 class FaceAuthManager:
     def __init__(self, base_path="data"):
         self.base_path = Path(base_path)
@@ -25,6 +37,15 @@ class FaceAuthManager:
         # Load configuration
         self.config = self._load_config()
         
+        # Precomputed embeddings (memory-mapped matrix per model)
+        self.embeddings = FaceEmbeddingStore(self.base_path / "face_embeddings", MODEL_NAME)
+        self._embeddings_rebuilt = False
+        
+        # Resident model - the shared worker process if MEDLINK_FACE_WORKER
+        # is set, else in-process; loads in the background while the UI comes up
+        self.engine = get_face_engine()
+        self.engine.warm_up()
+        
     def _load_config(self):
         """Load face recognition configuration"""
         if self.config_file.exists():
@@ -40,6 +61,27 @@ class FaceAuthManager:
         with open(self.config_file, 'w', encoding='utf-8') as f:
             json.dump(self.config, f, indent=4, ensure_ascii=False)
     
+    def _represent(self, img):
+        """Face embedding of the most prominent face (path or BGR frame)"""
+        return self.engine.embed(img)
+    
+    def _index_photo(self, username, photo_path):
+        """Embed one stored photo and add it to the embedding store"""
+        embedding = self._represent(str(photo_path))
+        if embedding is not None:
+            self.embeddings.add(username, Path(photo_path).name, embedding)
+    
+    def rebuild_embeddings(self):
+        """Recompute the embedding store from every photo in team_faces"""
+        entries = []
+        for username in self.config:
+            for photo in sorted((self.faces_db / username).glob("*.jpg")):
+                embedding = self._represent(str(photo))
+                if embedding is not None:
+                    entries.append((username, photo.name, embedding))
+        self.embeddings.replace_all(entries)
+        return len(entries)
+    
     def register_team_member(self, username, full_name, role, photo_path):
         """
         Register a new team member with their face
@@ -60,11 +102,7 @@ class FaceAuthManager:
             
             # Verify face exists in photo
             try:
-                faces = DeepFace.extract_faces(
-                    img_path=photo_path,
-                    enforce_detection=True,
-                    detector_backend='opencv'
-                )
+                faces = self.engine.extract_faces(photo_path, enforce_detection=True)
                 
                 if not faces:
                     return {
@@ -81,6 +119,7 @@ class FaceAuthManager:
             photo_name = f"{username}_main.jpg"
             destination = user_folder / photo_name
             shutil.copy(photo_path, destination)
+            self._index_photo(username, destination)
             
             # Save user config
             self.config[username] = {
@@ -119,6 +158,7 @@ class FaceAuthManager:
             photo_name = f"{username}_{photo_count + 1}.jpg"
             destination = user_folder / photo_name
             shutil.copy(photo_path, destination)
+            self._index_photo(username, destination)
             
             # Update config
             self.config[username]["photo_count"] = photo_count + 1
@@ -145,8 +185,6 @@ class FaceAuthManager:
         Returns:
             dict: Recognition result with username and confidence
         """
-        temp_photo = self.base_path / "temp_face.jpg"
-        
         try:
             # Check if database is empty
             if not self.config:
@@ -174,37 +212,55 @@ class FaceAuthManager:
                     "message": "❌ Could not capture frame!"
                 }
             
-            # Save temporary frame
-            cv2.imwrite(str(temp_photo), frame)
+        except Exception as e:
+            return {
+                "success": False,
+                "message": f"❌ Error: {str(e)}"
+            }
+        
+        return self.recognize_frame(frame)
+    
+    def recognize_frame(self, frame):
+        """
+        Recognize team member from an in-memory frame
+        
+        Args:
+            frame: BGR image (np.ndarray, e.g. from cv2.VideoCapture.read)
+        
+        Returns:
+            dict: Recognition result with username and confidence
+        """
+        try:
+            # Check if database is empty
+            if not self.config:
+                return {
+                    "success": False,
+                    "message": "❌ No team members registered yet!"
+                }
+            
+            # Embed the frame directly (no temp file, resident model)
+            embedding = self._represent(frame)
             
-            # Find matching face
-            result = DeepFace.find(
-                img_path=str(temp_photo),
-                db_path=str(self.faces_db),
-                model_name="Facenet512",
-                enforce_detection=False,
-                silent=True
-            )
+            # Registered before the embedding store existed (migrate once)
+            if not len(self.embeddings) and not self._embeddings_rebuilt:
+                self._embeddings_rebuilt = True
+                self.rebuild_embeddings()
             
-            # Clean up temp file
-            if temp_photo.exists():
-                temp_photo.unlink()
+            # Vectorized search over every stored photo (best photo per user)
+            matches = self.embeddings.match(embedding, DISTANCE_METRIC) if embedding is not None else []
             
             # Check if any matches found
-            if len(result) > 0 and len(result[0]) > 0:
-                # Get best match
-                best_match = result[0].iloc[0]
-                matched_path = Path(best_match['identity'])
-                username = matched_path.parent.name
+            if matches:
+                username, distance = matches[0]
                 
                 # Get user info
                 user_info = self.config.get(username, {})
                 
                 # Distance < 0.4 is considered a good match for Facenet512
-                confidence = 1 - (best_match['distance'] / 1.5)
+                confidence = 1 - (distance / 1.5)
                 confidence = max(0, min(1, confidence)) * 100  # Convert to percentage
                 
-                if best_match['distance'] < 0.6:  # Good match threshold
+                if distance < MATCH_THRESHOLD:
                     return {
                         "success": True,
                         "username": username,
@@ -225,10 +281,6 @@ class FaceAuthManager:
                 }
                 
         except Exception as e:
-            # Clean up temp file if exists
-            if temp_photo.exists():
-                temp_photo.unlink()
-            
             return {
                 "success": False,
                 "message": f"❌ Error: {str(e)}"
@@ -255,6 +307,8 @@ class FaceAuthManager:
             if user_folder.exists():
                 shutil.rmtree(user_folder)
             
+            self.embeddings.remove_user(username)
+            
             if username in self.config:
                 del self.config[username]
                 self._save_config()
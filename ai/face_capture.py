@@ -0,0 +1,409 @@
+"""
+MedLink Face Capture Loop
+Camera capture, face gating and hands-free recognition off the Tk thread
+
+- A capture thread reads the webcam, publishes raw frames and a
+  ready-to-show preview image through double buffers; the Tk thread
+  only wraps the latest preview in a PhotoImage
+- A cheap Haar cascade runs on a downscaled gray frame a few times per
+  second; embedding only starts once the same face has been seen in
+  several consecutive detections (stable, large enough, not moving)
+- Under load work is skipped instead of queued: previews are not
+  rendered until the UI took the last one, detection backs off when it
+  gets slow, and no detection runs while a recognition is in flight
+"""
+
+import os
+import queue
+import threading
+import time
+from collections import deque
+
+import cv2
+import numpy as np
+from PIL import Image
+
+
+PREVIEW_SIZE = (640, 480)
+
+DETECT_WIDTH = 320           # Haar input width (px)
+DETECT_INTERVAL = 0.2        # seconds between detections (5 Hz)
+DETECT_BUDGET = 0.25         # detection may use this share of the capture thread
+STABLE_DETECTIONS = 3        # consecutive detections of the same face
+MAX_FACE_SHIFT = 0.15        # centre movement between detections / face width
+MIN_FACE_FRACTION = 0.15     # face width / frame width
+RETRY_COOLDOWN = 2.0         # seconds after a failed hands-free attempt
+MAX_READ_FAILURES = 30
+
+TIMING_SAMPLES = 200
+
+
+# ==================== BUFFERS ====================
+
+class FrameBuffer:
+    """
+    Double buffer between one producer and any number of readers
+
+    The producer fills the back slot and swaps it to the front; readers
+    always get the newest complete item plus its sequence number.
+    Published items are never modified afterwards.
+    """
+
+    def __init__(self):
+        self._slots = [None, None]
+        self._front = 0
+        self._seq = 0
+        self._lock = threading.Lock()
+
+    def publish(self, item):
+        back = 1 - self._front
+        self._slots[back] = item
+        with self._lock:
+            self._front = back
+            self._seq += 1
+            return self._seq
+
+    def latest(self):
+        """(sequence, item) of the newest publication (0, None before the first)"""
+        with self._lock:
+            return self._seq, self._slots[self._front]
+
+
+# ==================== FACE GATE ====================
+
+class HaarFaceDetector:
+    """OpenCV Haar cascade on a downscaled gray frame (a few ms per call)"""
+
+    def __init__(self, detect_width=DETECT_WIDTH, cascade_path=None):
+        self.detect_width = detect_width
+        cascade_path = cascade_path or os.path.join(
+            cv2.data.haarcascades, "haarcascade_frontalface_default.xml"
+        )
+        self.cascade = cv2.CascadeClassifier(cascade_path)
+        if self.cascade.empty():
+            raise RuntimeError(f"Could not load face cascade: {cascade_path}")
+
+    def __call__(self, frame):
+        """
+        Args:
+            frame: BGR np.ndarray
+
+        Returns:
+            list: (x, y, w, h) boxes in frame coordinates
+        """
+        width = frame.shape[1]
+        scale = min(1.0, self.detect_width / width)
+        small = cv2.resize(frame, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA) \
+            if scale < 1.0 else frame
+        gray = cv2.equalizeHist(cv2.cvtColor(small, cv2.COLOR_BGR2GRAY))
+        min_side = max(24, int(small.shape[1] * MIN_FACE_FRACTION))
+        boxes = self.cascade.detectMultiScale(
+            gray, scaleFactor=1.15, minNeighbors=5, minSize=(min_side, min_side)
+        )
+        return [tuple(int(v / scale) for v in box) for box in boxes]
+
+
+class FaceStabilityGate:
+    """Decides when a detected face is steady enough to be worth embedding"""
+
+    def __init__(self, stable_detections=STABLE_DETECTIONS, max_shift=MAX_FACE_SHIFT,
+                 min_face_fraction=MIN_FACE_FRACTION):
+        self.stable_detections = stable_detections
+        self.max_shift = max_shift
+        self.min_face_fraction = min_face_fraction
+        self.box = None
+        self.streak = 0
+
+    def reset(self):
+        self.box = None
+        self.streak = 0
+
+    @property
+    def stable(self):
+        return self.streak >= self.stable_detections
+
+    def update(self, boxes, frame_width):
+        """
+        Feed one detection result
+
+        Args:
+            boxes: (x, y, w, h) boxes from the detector
+            frame_width: Width of the detected frame
+
+        Returns:
+            tuple: Tracked face box or None
+        """
+        candidates = [b for b in boxes if b[2] >= frame_width * self.min_face_fraction]
+        if not candidates:
+            self.reset()
+            return None
+
+        box = max(candidates, key=lambda b: b[2] * b[3])
+        if self.box is not None:
+            (x, y, w, h), (px, py, pw, ph) = box, self.box
+            shift = np.hypot((x + w / 2) - (px + pw / 2), (y + h / 2) - (py + ph / 2)) / pw
+            self.streak = self.streak + 1 if shift <= self.max_shift else 1
+        else:
+            self.streak = 1
+        self.box = box
+        return box
+
+
+# ==================== PREVIEW ====================
+
+def render_preview(frame, scanning=False, face_box=None, size=PREVIEW_SIZE):
+    """
+    Preview image with the login overlays (runs on the capture thread)
+
+    Args:
+        frame: BGR np.ndarray from the camera
+        scanning: Draw the yellow SCANNING overlay
+        face_box: Tracked face (frame coordinates) to outline
+        size: Preview (width, height)
+
+    Returns:
+        PIL.Image: RGB image ready for ImageTk.PhotoImage
+    """
+    w, h = size
+    frame_resized = cv2.cvtColor(cv2.resize(frame, size), cv2.COLOR_BGR2RGB)
+
+    if scanning:
+        # SCANNING mode - yellow border blended in + label
+        overlay = frame_resized.copy()
+        border_thickness = 15
+        cv2.rectangle(overlay, (border_thickness, border_thickness),
+                      (w - border_thickness, h - border_thickness), (0, 255, 255), border_thickness)
+        frame_resized = cv2.addWeighted(frame_resized, 0.7, overlay, 0.3, 0)
+
+        text = "SCANNING..."
+        font = cv2.FONT_HERSHEY_DUPLEX
+        text_size = cv2.getTextSize(text, font, 1.5, 3)[0]
+        text_x = (w - text_size[0]) // 2
+        text_y = 50
+        cv2.rectangle(frame_resized, (text_x - 10, text_y - text_size[1] - 10),
+                      (text_x + text_size[0] + 10, text_y + 10), (0, 0, 0), -1)
+        cv2.putText(frame_resized, text, (text_x, text_y), font, 1.5, (0, 255, 255), 3)
+    else:
+        # READY mode - subtle green corners
+        corner_len = 50
+        thickness = 4
+        color = (0, 255, 0)
+        for cx, cy, dx, dy in ((20, 20, 1, 1), (w - 20, 20, -1, 1),
+                               (20, h - 20, 1, -1), (w - 20, h - 20, -1, -1)):
+            cv2.line(frame_resized, (cx, cy), (cx + dx * corner_len, cy), color, thickness)
+            cv2.line(frame_resized, (cx, cy), (cx, cy + dy * corner_len), color, thickness)
+
+    if face_box is not None:
+        sx, sy = w / frame.shape[1], h / frame.shape[0]
+        x, y, bw, bh = face_box
+        cv2.rectangle(frame_resized, (int(x * sx), int(y * sy)),
+                      (int((x + bw) * sx), int((y + bh) * sy)), (0, 255, 0), 2)
+
+    return Image.fromarray(frame_resized)
+
+
+# ==================== CAPTURE LOOP ====================
+
+class FaceCaptureLoop:
+    """Capture thread + detection gate + background recognition"""
+
+    def __init__(self, capture, recognize, detector=None, is_ready=lambda: True,
+                 hands_free=True, detect_interval=DETECT_INTERVAL,
+                 stable_detections=STABLE_DETECTIONS, retry_cooldown=RETRY_COOLDOWN,
+                 render=render_preview):
+        """
+        Args:
+            capture: Opened cv2.VideoCapture (anything with read())
+            recognize: Called with a BGR frame, returns the recognition result dict
+            detector: Frame -> face boxes (defaults to HaarFaceDetector)
+            is_ready: True once the face model can embed
+            hands_free: Recognize automatically when a stable face is present
+            detect_interval: Base seconds between face detections
+            stable_detections: Consecutive detections required before embedding
+            retry_cooldown: Pause after a failed hands-free attempt
+            render: Frame -> preview image (see render_preview)
+        """
+        self.capture = capture
+        self.recognize = recognize
+        self.detector = detector or HaarFaceDetector()
+        self.is_ready = is_ready
+        self.hands_free = hands_free
+        self.base_interval = detect_interval
+        self.detect_interval = detect_interval
+        self.retry_cooldown = retry_cooldown
+        self.render = render
+
+        self.gate = FaceStabilityGate(stable_detections)
+        self.frames = FrameBuffer()    # raw BGR frames
+        self.previews = FrameBuffer()  # rendered preview images
+        self.results = queue.Queue()
+
+        self.error = None
+        self._scanning = False
+        self._scan_requested = False
+        self._finished = False
+        self._next_detect = 0.0
+        self._retry_at = 0.0
+        self._consumed_preview = 0
+
+        self._thread = None
+        self._stopping = threading.Event()
+        self._detect_times = deque(maxlen=TIMING_SAMPLES)
+        self._ui_frame_times = deque(maxlen=TIMING_SAMPLES)
+        self._counters = {
+            "captured": 0,
+            "rendered": 0,
+            "render_skipped": 0,
+            "detections": 0,
+            "recognitions": 0,
+        }
+
+    # ==================== LIFECYCLE ====================
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name="face-capture", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stopping.set()
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+            self._thread = None
+
+    @property
+    def scanning(self):
+        """True while a recognition is in flight"""
+        return self._scanning
+
+    def request_scan(self):
+        """Recognize the next frame regardless of the gate (Scan button)"""
+        self._scan_requested = True
+
+    def resume(self):
+        """Re-enable hands-free recognition (e.g. after a successful login was undone)"""
+        self._finished = False
+        self.gate.reset()
+
+    # ==================== TK SIDE ====================
+
+    def take_preview(self):
+        """
+        Newest preview not yet shown
+
+        Returns:
+            PIL.Image or None
+        """
+        seq, image = self.previews.latest()
+        if seq <= self._consumed_preview:
+            return None
+        self._consumed_preview = seq
+        return image
+
+    def take_result(self):
+        """Next finished recognition result (dict) or None"""
+        try:
+            return self.results.get_nowait()
+        except queue.Empty:
+            return None
+
+    # ==================== CAPTURE THREAD ====================
+
+    def _run(self):
+        failures = 0
+        while not self._stopping.is_set():
+            ok, frame = self.capture.read()
+            if not ok or frame is None:
+                failures += 1
+                if failures >= MAX_READ_FAILURES:
+                    self.error = "Camera stopped delivering frames"
+                    return
+                self._stopping.wait(0.03)
+                continue
+            failures = 0
+            self.step(frame)
+
+    def step(self, frame, now=None):
+        """
+        Process one captured frame (the thread body; callable directly in tests)
+
+        Args:
+            frame: BGR np.ndarray
+            now: perf_counter timestamp of the capture
+        """
+        now = time.perf_counter() if now is None else now
+        self._counters["captured"] += 1
+        self.frames.publish(frame)
+
+        # No detection while the model is busy - it would only be discarded
+        if not self._scanning and now >= self._next_detect:
+            self._detect(frame, now)
+
+        if self._should_recognize(now):
+            self._start_recognition(frame)
+
+        # Only render when the UI took the previous preview (drop, don't queue)
+        if self.previews.latest()[0] <= self._consumed_preview:
+            self.previews.publish(self.render(frame, self._scanning, self.gate.box))
+            self._counters["rendered"] += 1
+        else:
+            self._counters["render_skipped"] += 1
+
+    def _detect(self, frame, now):
+        started = time.perf_counter()
+        boxes = self.detector(frame)
+        cost = time.perf_counter() - started
+        self.gate.update(boxes, frame.shape[1])
+
+        # Back off when detection gets expensive (slow CPU, busy host)
+        self.detect_interval = max(self.base_interval, cost / DETECT_BUDGET)
+        self._next_detect = now + self.detect_interval
+        self._detect_times.append(cost)
+        self._counters["detections"] += 1
+
+    def _should_recognize(self, now):
+        if self._scanning or not self.is_ready():
+            return False
+        if self._scan_requested:
+            return True
+        return (self.hands_free and not self._finished and self.gate.stable
+                and now >= self._retry_at)
+
+    def _start_recognition(self, frame):
+        self._scanning = True
+        self._scan_requested = False
+        self._counters["recognitions"] += 1
+        threading.Thread(target=self._recognize, args=(frame,),
+                         name="face-recognize", daemon=True).start()
+
+    def _recognize(self, frame):
+        try:
+            result = self.recognize(frame)
+        except Exception as e:
+            result = {"success": False, "message": f"❌ Error: {str(e)}"}
+
+        if result.get("success"):
+            self._finished = True
+        else:
+            # Same face again right away would most likely fail the same way
+            self._retry_at = time.perf_counter() + self.retry_cooldown
+            self.gate.reset()
+        self._scanning = False
+        self.results.put(result)
+
+    def record_ui_frame(self, seconds):
+        """Time the UI thread spent showing one preview frame (reported by stats())"""
+        self._ui_frame_times.append(seconds)
+
+    def stats(self):
+        """Counters plus detection and UI frame cost and the current detection interval"""
+        stats = dict(self._counters)
+        ordered = sorted(self._detect_times)
+        stats["detect_p50_ms"] = ordered[len(ordered) // 2] * 1000 if ordered else None
+        stats["detect_interval_ms"] = self.detect_interval * 1000
+        ordered = sorted(self._ui_frame_times)
+        stats["ui_frame_p50_ms"] = ordered[len(ordered) // 2] * 1000 if ordered else None
+        stats["ui_frame_p99_ms"] = ordered[int(len(ordered) * 0.99)] * 1000 if ordered else None
+        return stats
@@ -0,0 +1,310 @@
+"""
+MedLink Face Embedding Store
+Persistent per-model matrix of face embeddings for team recognition
+
+Replaces DeepFace.find (folder rescan + representations pickle + pandas
+distance search on every login) with:
+- <model>.npy          float32 matrix, one L2-normalized row per photo
+- <model>_users.npy    username of every row
+- <model>_photos.npy   photo file name of every row
+- <model>_delta.jsonl  adds/removals since the last compaction
+The matrix is memory-mapped on load; rows are kept grouped by user so a
+login is one matrix-vector product plus a per-user best-of-N reduction.
+
+Registering or removing a photo appends one line to the delta log instead
+of rewriting the .npy files. The log is folded into the matrix once it
+holds more than max(COMPACT_MIN_OPS, COMPACT_RATIO * rows) operations, so
+the cost of a rewrite is spread over many updates. Replaying the log is
+idempotent, which makes a crash between the rewrite and the log removal
+harmless.
+"""
+
+import json
+import os
+import threading
+from pathlib import Path
+
+import numpy as np
+
+
+METRICS = ('cosine', 'euclidean_l2')
+
+# Compaction: fold the delta log once it exceeds both limits
+COMPACT_MIN_OPS = 64
+COMPACT_RATIO = 0.1
+
+
+def normalize(vectors):
+    """L2-normalize a vector or each row of a matrix"""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+class FaceEmbeddingStore:
+    def __init__(self, directory, model_name="Facenet512"):
+        self.directory = Path(directory)
+        self.model_name = model_name
+        self.matrix_path = self.directory / f"{model_name}.npy"
+        self.users_path = self.directory / f"{model_name}_users.npy"
+        self.photos_path = self.directory / f"{model_name}_photos.npy"
+        self.delta_path = self.directory / f"{model_name}_delta.jsonl"
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.RLock()
+        self._load()
+
+    # ==================== PERSISTENCE ====================
+
+    def _load(self, replay=True):
+        """Memory-map the matrix, load the id arrays and replay the delta log"""
+        self._set(None, np.empty(0, dtype=str), np.empty(0, dtype=str))
+        if self.matrix_path.exists() and self.users_path.exists() and self.photos_path.exists():
+            try:
+                matrix = np.load(self.matrix_path, mmap_mode='r')
+                users = np.load(self.users_path)
+                photos = np.load(self.photos_path)
+            except (OSError, ValueError):
+                matrix = None
+            # A mismatch means an interrupted write - caller rebuilds from the photo folders
+            if matrix is not None and matrix.ndim == 2 and len(matrix) == len(users) == len(photos):
+                self._set(matrix, users, photos)
+        if replay:
+            self._replay_delta()
+
+    def _set(self, matrix, users, photos):
+        """Install base arrays, precompute the per-user row groups, reset the delta"""
+        self._matrix = matrix
+        self._users = users
+        self._photos = photos
+        # Base rows still current (None = all) and rows added since compaction
+        self._alive = None
+        self._delta_rows = []
+        self._delta_ids = []
+        self._delta_ops = 0
+        if len(users):
+            # Rows are grouped by user: group starts feed np.minimum.reduceat
+            starts = np.flatnonzero(np.r_[True, users[1:] != users[:-1]])
+            self._group_starts = starts
+            self._group_users = users[starts]
+        else:
+            self._group_starts = np.empty(0, dtype=np.intp)
+            self._group_users = np.empty(0, dtype=str)
+
+    def _write(self, matrix, users, photos):
+        """
+        Atomically replace the files (rows grouped by user), then remap
+
+        The caller removes the delta log afterwards: the new files already
+        contain it, and a leftover log would only be replayed idempotently.
+        """
+        order = np.argsort(users, kind='stable')
+        matrix = np.ascontiguousarray(matrix[order], dtype=np.float32)
+        users, photos = users[order], photos[order]
+
+        # Drop our own mapping first - Windows cannot replace a mapped file
+        self._set(None, users[:0], photos[:0])
+        for path, array in ((self.users_path, users), (self.photos_path, photos),
+                            (self.matrix_path, matrix)):
+            temp = path.with_suffix('.tmp')
+            with open(temp, 'wb') as f:
+                np.save(f, array)
+            os.replace(temp, path)
+        self._load(replay=False)
+
+    def _arrays(self):
+        """Current rows (base plus delta) as in-memory arrays"""
+        matrices, users, photos = [], [self._users[:0]], [self._photos[:0]]
+        if self._matrix is not None:
+            alive = slice(None) if self._alive is None else self._alive
+            matrices.append(np.array(self._matrix[alive]))
+            users.append(self._users[alive])
+            photos.append(self._photos[alive])
+        if self._delta_rows:
+            matrices.append(np.vstack(self._delta_rows))
+            users.append(np.array([u for u, _ in self._delta_ids]))
+            photos.append(np.array([p for _, p in self._delta_ids]))
+        if not matrices:
+            return None, self._users[:0], self._photos[:0]
+        return np.vstack(matrices), np.concatenate(users), np.concatenate(photos)
+
+    def compact(self):
+        """Fold the delta log into the .npy files"""
+        with self._lock:
+            if not self._delta_ops:
+                return
+            matrix, users, photos = self._arrays()
+            if matrix is None or not len(matrix):
+                self.clear()
+                return
+            self._write(matrix, users, photos)
+            self.delta_path.unlink(missing_ok=True)
+
+    # ==================== DELTA LOG ====================
+
+    def _apply(self, op):
+        """Apply one delta operation to the in-memory state"""
+        username = op['user']
+        photo_name = op.get('photo')
+        if self._matrix is not None:
+            match = self._users == username
+            if photo_name is not None:
+                match &= self._photos == photo_name
+            if match.any():
+                alive = np.ones(len(self._users), dtype=bool) if self._alive is None else self._alive
+                self._alive = alive & ~match
+        keep = [i for i, (u, p) in enumerate(self._delta_ids)
+                if u != username or (photo_name is not None and p != photo_name)]
+        if len(keep) != len(self._delta_ids):
+            self._delta_rows = [self._delta_rows[i] for i in keep]
+            self._delta_ids = [self._delta_ids[i] for i in keep]
+        if op['op'] == 'add':
+            self._delta_rows.append(np.asarray(op['embedding'], dtype=np.float32).reshape(1, -1))
+            self._delta_ids.append((username, photo_name))
+        self._delta_ops += 1
+
+    def _replay_delta(self):
+        if not self.delta_path.exists():
+            return
+        with open(self.delta_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    op = json.loads(line)
+                except ValueError:
+                    break  # torn last line of an interrupted append
+                self._apply(op)
+
+    def _log(self, op):
+        """Append one operation to the delta log, then apply it"""
+        with open(self.delta_path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(op) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+        self._apply(op)
+        if self._delta_ops > max(COMPACT_MIN_OPS, COMPACT_RATIO * len(self._users)):
+            self.compact()
+
+    def _contains(self, username):
+        if self._matrix is not None:
+            alive = self._users == username
+            if self._alive is not None:
+                alive &= self._alive
+            if alive.any():
+                return True
+        return any(u == username for u, _ in self._delta_ids)
+
+    # ==================== UPDATES ====================
+
+    def add(self, username, photo_name, embedding):
+        """Add (or replace) the embedding of one photo"""
+        row = normalize(embedding).reshape(-1)
+        with self._lock:
+            self._log({'op': 'add', 'user': username, 'photo': photo_name,
+                       'embedding': row.tolist()})
+
+    def remove_user(self, username):
+        """Drop every embedding of a user"""
+        with self._lock:
+            if self._contains(username):
+                self._log({'op': 'remove', 'user': username})
+
+    def replace_all(self, entries):
+        """
+        Rebuild the store from (username, photo_name, embedding) entries
+
+        Args:
+            entries: Iterable of tuples
+        """
+        entries = list(entries)
+        with self._lock:
+            if not entries:
+                self.clear()
+                return
+            users = np.array([e[0] for e in entries])
+            photos = np.array([e[1] for e in entries])
+            matrix = normalize(np.vstack([np.asarray(e[2], dtype=np.float32) for e in entries]))
+            # The old log must not be replayed onto the new files
+            self.delta_path.unlink(missing_ok=True)
+            self._write(matrix, users, photos)
+
+    def clear(self):
+        """Remove all embeddings of this model"""
+        with self._lock:
+            self._set(None, self._users[:0], self._photos[:0])
+            for path in (self.matrix_path, self.users_path, self.photos_path, self.delta_path):
+                if path.exists():
+                    path.unlink()
+
+    # ==================== QUERIES ====================
+
+    def __len__(self):
+        base = len(self._users) if self._alive is None else int(self._alive.sum())
+        return base + len(self._delta_ids)
+
+    def users(self):
+        """Usernames that have at least one embedding"""
+        if self._alive is None and not self._delta_ids:
+            return list(self._group_users)
+        _, users, _ = self._arrays()
+        return [str(u) for u in np.unique(users)]
+
+    def match(self, embedding, metric='cosine', top_k=1):
+        """
+        Find the closest users to a face embedding
+
+        Every photo is scored with one matrix-vector product, then each
+        user keeps its best photo (best-of-N).
+
+        Args:
+            embedding: Query face embedding
+            metric: 'cosine' or 'euclidean_l2' (DeepFace definitions)
+            top_k: Number of users to return
+
+        Returns:
+            list: [(username, distance)] closest first (empty if store is empty)
+        """
+        if metric not in METRICS:
+            raise ValueError(f"Unsupported metric: {metric}")
+
+        with self._lock:
+            matrix, starts, group_users = self._matrix, self._group_starts, self._group_users
+            alive = self._alive
+            delta = np.vstack(self._delta_rows) if self._delta_rows else None
+            delta_users = np.array([u for u, _ in self._delta_ids])
+        query = normalize(embedding)
+
+        def distance(rows):
+            similarity = rows @ query
+            if metric == 'cosine':
+                return 1.0 - similarity
+            return np.sqrt(np.maximum(2.0 - 2.0 * similarity, 0.0))
+
+        if matrix is not None and len(matrix):
+            distances = distance(matrix)
+            if alive is not None:
+                distances[~alive] = np.inf
+            best = np.minimum.reduceat(distances, starts)
+        else:
+            best, group_users = np.empty(0, dtype=np.float32), group_users[:0]
+
+        if delta is not None or alive is not None:
+            # Merge per-user bests of the base and the delta rows
+            if delta is not None:
+                best = np.concatenate([best, distance(delta)])
+                group_users = np.concatenate([group_users, delta_users])
+            group_users, inverse = np.unique(group_users, return_inverse=True)
+            merged = np.full(len(group_users), np.inf)
+            np.minimum.at(merged, inverse, best)
+            found = np.isfinite(merged)
+            best, group_users = merged[found], group_users[found]
+        if not len(best):
+            return []
+
+        if top_k == 1:
+            ranked = [int(np.argmin(best))]
+        else:
+            top_k = min(top_k, len(best))
+            candidates = np.argpartition(best, top_k - 1)[:top_k]
+            ranked = candidates[np.argsort(best[candidates])]
+        return [(str(group_users[i]), float(best[i])) for i in ranked]
@@ -0,0 +1,199 @@
+"""
+MedLink Face Recognition Engine
+Keeps the DeepFace model resident for the whole session
+
+- warm_up() imports DeepFace and builds Facenet512 + the face detector
+  on a background thread (runs one dummy inference so the first login
+  does not pay for graph tracing)
+- state / is_ready let the GUI show a warm-up indicator instead of
+  freezing on the first scan
+- embed() / extract_faces() take in-memory BGR frames (np.ndarray from
+  cv2.VideoCapture) as well as file paths - no temp files
+"""
+
+import threading
+import time
+
+import numpy as np
+
+
+MODEL_NAME = "Facenet512"
+DETECTOR_BACKEND = "opencv"
+
+STATE_COLD = "cold"
+STATE_LOADING = "loading"
+STATE_READY = "ready"
+STATE_FAILED = "failed"
+
+
+def _load_deepface():
+    from deepface import DeepFace
+    return DeepFace
+
+
+def _face_area(face):
+    area = face.get('facial_area') or {}
+    return area.get('w', 0) * area.get('h', 0)
+
+
+def _largest_embedding(faces):
+    """Embedding of the most prominent face in a represent() result"""
+    if not faces:
+        return None
+    return np.asarray(max(faces, key=_face_area)['embedding'], dtype=np.float32)
+
+
+class FaceRecognitionEngine:
+    def __init__(self, model_name=MODEL_NAME, detector_backend=DETECTOR_BACKEND,
+                 loader=_load_deepface):
+        self.model_name = model_name
+        self.detector_backend = detector_backend
+        self.loader = loader
+
+        self.state = STATE_COLD
+        self.error = None
+        self.load_seconds = None
+
+        self._deepface = None
+        self._ready = threading.Event()
+        self._lock = threading.Lock()
+        # Keras models are not safe for concurrent predict() calls
+        self._inference_lock = threading.Lock()
+
+    # ==================== WARM-UP ====================
+
+    def warm_up(self):
+        """Start loading the model in the background (idempotent)"""
+        with self._lock:
+            if self.state in (STATE_LOADING, STATE_READY):
+                return
+            self.state = STATE_LOADING
+            self.error = None
+            self._ready.clear()
+        threading.Thread(target=self._load, name="face-model-warmup", daemon=True).start()
+
+    def _load(self):
+        started = time.perf_counter()
+        try:
+            deepface = self.loader()
+            deepface.build_model(self.model_name)
+            # Dummy inference: builds the detector and traces the model graph
+            deepface.represent(
+                img_path=np.zeros((224, 224, 3), dtype=np.uint8),
+                model_name=self.model_name,
+                detector_backend=self.detector_backend,
+                enforce_detection=False
+            )
+            self._deepface = deepface
+            self.state = STATE_READY
+        except Exception as e:
+            self.error = str(e)
+            self.state = STATE_FAILED
+            print(f"❌ Face model failed to load: {e}")
+        finally:
+            self.load_seconds = time.perf_counter() - started
+            self._ready.set()
+
+    @property
+    def is_ready(self):
+        return self.state == STATE_READY
+
+    def wait_until_ready(self, timeout=None):
+        """
+        Block until warm-up finished (starts it if needed)
+
+        Returns:
+            bool: True if the model is ready
+        """
+        self.warm_up()
+        self._ready.wait(timeout)
+        return self.is_ready
+
+    def _require(self):
+        if not self.wait_until_ready():
+            raise RuntimeError(f"Face model not available: {self.error}")
+        return self._deepface
+
+    # ==================== INFERENCE ====================
+
+    def extract_faces(self, img, enforce_detection=True):
+        """
+        Detect faces in a frame or image file
+
+        Args:
+            img: BGR np.ndarray or image path
+            enforce_detection: Raise if no face is found
+
+        Returns:
+            list: DeepFace face dicts
+        """
+        deepface = self._require()
+        with self._inference_lock:
+            return deepface.extract_faces(
+                img_path=img,
+                detector_backend=self.detector_backend,
+                enforce_detection=enforce_detection
+            )
+
+    def embed(self, img):
+        """
+        Embedding of the most prominent face
+
+        Args:
+            img: BGR np.ndarray or image path
+
+        Returns:
+            np.ndarray: Face embedding, or None if no face was found
+        """
+        deepface = self._require()
+        with self._inference_lock:
+            faces = deepface.represent(
+                img_path=img,
+                model_name=self.model_name,
+                detector_backend=self.detector_backend,
+                enforce_detection=False
+            )
+        return _largest_embedding(faces)
+
+    def embed_batch(self, images):
+        """
+        Embeddings for several frames in one model pass when DeepFace
+        supports batched represent(), otherwise frame by frame under a
+        single lock acquisition
+
+        Args:
+            images: List of BGR np.ndarray frames or image paths
+
+        Returns:
+            list: Embedding (or None) per input, in order
+        """
+        deepface = self._require()
+        images = list(images)
+        with self._inference_lock:
+            if len(images) > 1:
+                try:
+                    results = deepface.represent(
+                        img_path=images,
+                        model_name=self.model_name,
+                        detector_backend=self.detector_backend,
+                        enforce_detection=False
+                    )
+                    # Batched form: one list of faces per input image
+                    if len(results) == len(images) and all(isinstance(r, list) for r in results):
+                        return [_largest_embedding(faces) for faces in results]
+                except (TypeError, ValueError, AttributeError):
+                    pass
+
+            return [
+                _largest_embedding(deepface.represent(
+                    img_path=img,
+                    model_name=self.model_name,
+                    detector_backend=self.detector_backend,
+                    enforce_detection=False
+                ))
+                for img in images
+            ]
+
+
+# Global instance (one resident model per process)
+face_engine = FaceRecognitionEngine()
@@ -0,0 +1,611 @@
+"""
+MedLink Face Recognition Worker
+Optional out-of-process host for the face model
+
+Runs FaceRecognitionEngine in its own process so TensorFlow no longer
+competes with the Tk main loop for the GIL and memory, and several GUI
+instances on one host share a single resident model:
+
+    python -m ai.face_worker [--address data/face_worker.sock]
+
+- Clients talk over a Unix socket (localhost TCP where AF_UNIX is not
+  available); frames travel as raw ndarray bytes, no image encoding.
+  Image files are decoded by the client: the worker never opens paths
+- Requests from all clients go through one bounded queue; the inference
+  thread drains up to max_batch frames arriving within batch_window and
+  embeds them in one engine.embed_batch() call
+- A full queue is answered with 'busy' right away instead of piling up
+  latency behind the model
+
+The GUI opts in by setting MEDLINK_FACE_WORKER (socket path or
+host:port); get_face_engine() falls back to the in-process engine when
+the worker is not configured or not reachable.
+"""
+
+import argparse
+import errno
+import json
+import os
+import queue
+import socket
+import struct
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+
+try:
+    from ai.face_engine import face_engine, STATE_COLD, STATE_LOADING, STATE_READY, STATE_FAILED
+except ImportError:
+    # Running from inside ai/ (face_auth_gui.py)
+    from face_engine import face_engine, STATE_COLD, STATE_LOADING, STATE_READY, STATE_FAILED
+
+
+ADDRESS_ENV = "MEDLINK_FACE_WORKER"
+DEFAULT_SOCKET = Path("data") / "face_worker.sock"
+DEFAULT_TCP_ADDRESS = ("127.0.0.1", 50517)
+
+MAX_BATCH = 8
+BATCH_WINDOW = 0.005  # seconds to wait for more frames after the first
+MAX_QUEUE = 64
+
+# 4-byte big-endian header length, JSON header, then header['size'] payload bytes
+_LENGTH = struct.Struct(">I")
+
+
+# ==================== ADDRESSES ====================
+
+def default_address():
+    """Unix socket under data/ where supported, localhost TCP otherwise"""
+    if hasattr(socket, "AF_UNIX"):
+        return str(DEFAULT_SOCKET)
+    return DEFAULT_TCP_ADDRESS
+
+
+def parse_address(value):
+    """
+    Parse a worker address
+
+    Args:
+        value: Socket path, 'host:port', or an already parsed (host, port)
+
+    Returns:
+        str or tuple: Unix socket path or (host, port)
+    """
+    if isinstance(value, (tuple, list)):
+        return (value[0], int(value[1]))
+    host, sep, port = str(value).rpartition(":")
+    if sep and port.isdigit() and "/" not in value and "\\" not in value:
+        return (host or "127.0.0.1", int(port))
+    return str(value)
+
+
+def configured_address():
+    """Worker address from MEDLINK_FACE_WORKER (None = worker not used)"""
+    value = os.environ.get(ADDRESS_ENV)
+    return parse_address(value) if value else None
+
+
+def _family(address):
+    return socket.AF_INET if isinstance(address, tuple) else socket.AF_UNIX
+
+
+# ==================== WIRE FORMAT ====================
+
+def _json_default(value):
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    raise TypeError(f"Not JSON serializable: {type(value).__name__}")
+
+
+def send_message(sock, header, payload=b""):
+    """Send one framed message (header dict + optional raw payload)"""
+    header = dict(header, size=len(payload))
+    encoded = json.dumps(header, default=_json_default).encode("utf-8")
+    sock.sendall(_LENGTH.pack(len(encoded)) + encoded)
+    if payload:
+        sock.sendall(payload)
+
+
+def _recv_exact(sock, size):
+    buffer = bytearray(size)
+    view = memoryview(buffer)
+    received = 0
+    while received < size:
+        count = sock.recv_into(view[received:], size - received)
+        if not count:
+            raise ConnectionError("Face worker connection closed")
+        received += count
+    return buffer
+
+
+def recv_message(sock):
+    """
+    Receive one framed message
+
+    Returns:
+        tuple: (header dict, payload bytearray)
+    """
+    (length,) = _LENGTH.unpack(_recv_exact(sock, _LENGTH.size))
+    header = json.loads(bytes(_recv_exact(sock, length)).decode("utf-8"))
+    size = header.get("size", 0)
+    payload = _recv_exact(sock, size) if size else bytearray()
+    return header, payload
+
+
+def _read_image(path):
+    """BGR frame of an image file, read in the calling process"""
+    import cv2  # Only needed for file inputs
+
+    frame = cv2.imread(str(path))
+    if frame is None:
+        raise ValueError(f"Cannot read image: {path}")
+    return frame
+
+
+def encode_image(img):
+    """Header fields + payload for a frame (ndarray) or an image path (decoded here)"""
+    if not isinstance(img, np.ndarray):
+        img = _read_image(img)
+    frame = np.ascontiguousarray(img)
+    return {"shape": list(frame.shape), "dtype": frame.dtype.str}, memoryview(frame).cast("B")
+
+
+def decode_image(header, payload):
+    """Inverse of encode_image (the array is a writable view of the payload)"""
+    if "shape" not in header or "dtype" not in header:
+        raise ValueError("Request carries no frame")
+    return np.frombuffer(payload, dtype=np.dtype(header["dtype"])).reshape(header["shape"])
+
+
+# ==================== SERVER ====================
+
+class _Request:
+    __slots__ = ("op", "image", "options", "done", "result", "error", "queued_at")
+
+    def __init__(self, op, image, options):
+        self.op = op
+        self.image = image
+        self.options = options
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.queued_at = time.perf_counter()
+
+
+class FaceWorkerServer:
+    """Socket front end + batching inference loop around one engine"""
+
+    def __init__(self, engine=face_engine, address=None, max_batch=MAX_BATCH,
+                 batch_window=BATCH_WINDOW, max_queue=MAX_QUEUE):
+        """
+        Args:
+            engine: FaceRecognitionEngine (tests inject one with a fake loader)
+            address: Socket path or (host, port); defaults to default_address()
+            max_batch: Most frames embedded in one engine call
+            batch_window: Seconds to wait for more frames after the first one
+            max_queue: Pending requests before clients get 'busy'
+        """
+        self.engine = engine
+        self.address = parse_address(address or default_address())
+        self.max_batch = max_batch
+        self.batch_window = batch_window
+
+        self.requests = queue.Queue(maxsize=max_queue)
+
+        self._listener = None
+        self._threads = []
+        self._stopping = threading.Event()
+        self._lock = threading.Lock()
+        self._counters = {
+            "clients": 0,
+            "requests": 0,
+            "frames": 0,
+            "batches": 0,
+            "busy": 0,
+            "errors": 0,
+        }
+
+    # ==================== LIFECYCLE ====================
+
+    def start(self):
+        """Bind the socket and start the accept and inference threads"""
+        if not isinstance(self.address, tuple):
+            self._remove_stale_socket()
+        self.engine.warm_up()
+
+        listener = socket.socket(_family(self.address), socket.SOCK_STREAM)
+        if isinstance(self.address, tuple):
+            listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        listener.bind(self.address)
+        if isinstance(self.address, tuple):
+            # Port 0 = pick a free one (tests, benchmark)
+            self.address = listener.getsockname()[:2]
+        listener.listen()
+        listener.settimeout(0.2)
+        self._listener = listener
+
+        self._stopping.clear()
+        for target, name in ((self._accept_loop, "face-worker-accept"),
+                             (self._inference_loop, "face-worker-inference")):
+            thread = threading.Thread(target=target, name=name, daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        return self.address
+
+    def _remove_stale_socket(self):
+        """Unlink a socket file left by a worker that did not shut down cleanly"""
+        path = Path(self.address)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if not path.exists():
+            return
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(self.address)
+        except ConnectionRefusedError:
+            path.unlink()
+            return
+        finally:
+            probe.close()
+        raise OSError(errno.EADDRINUSE, f"Another face worker is listening on {self.address}")
+
+    def serve_forever(self):
+        """Run until interrupted (CLI entry point)"""
+        self.start()
+        try:
+            while not self._stopping.is_set():
+                self._stopping.wait(1)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.stop()
+
+    def stop(self):
+        """Close the listener and stop the threads"""
+        self._stopping.set()
+        for thread in self._threads:
+            thread.join(timeout=5)
+        self._threads = []
+        if self._listener is not None:
+            self._listener.close()
+            self._listener = None
+            if not isinstance(self.address, tuple) and os.path.exists(self.address):
+                os.unlink(self.address)
+
+    # ==================== CONNECTIONS ====================
+
+    def _accept_loop(self):
+        while not self._stopping.is_set():
+            try:
+                conn, _ = self._listener.accept()
+            except socket.timeout:
+                continue
+            except OSError:
+                break
+            conn.settimeout(None)
+            with self._lock:
+                self._counters["clients"] += 1
+            threading.Thread(target=self._serve_client, args=(conn,),
+                             name="face-worker-client", daemon=True).start()
+
+    def _serve_client(self, conn):
+        with conn:
+            while not self._stopping.is_set():
+                try:
+                    header, payload = recv_message(conn)
+                except (ConnectionError, OSError, ValueError):
+                    break
+                try:
+                    reply, reply_payload = self._handle(header, payload)
+                except Exception as e:
+                    reply, reply_payload = {"ok": False, "error": str(e),
+                                            "error_type": type(e).__name__}, b""
+                try:
+                    send_message(conn, dict(reply, id=header.get("id")), reply_payload)
+                except OSError:
+                    break
+
+    def _handle(self, header, payload):
+        op = header.get("op")
+        if op == "ping":
+            return {"ok": True, "state": self.engine.state, "error": self.engine.error}, b""
+        if op == "stats":
+            return {"ok": True, "stats": self.stats()}, b""
+        if op not in ("embed", "extract_faces"):
+            return {"ok": False, "error": f"Unknown op: {op}", "error_type": "ValueError"}, b""
+
+        request = _Request(op, decode_image(header, payload), header.get("options") or {})
+        try:
+            self.requests.put_nowait(request)
+        except queue.Full:
+            with self._lock:
+                self._counters["busy"] += 1
+            return {"ok": False, "error": "Face worker busy", "error_type": "busy"}, b""
+
+        request.done.wait()
+        if request.error is not None:
+            return {"ok": False, "error": str(request.error),
+                    "error_type": type(request.error).__name__}, b""
+
+        if op == "embed":
+            if request.result is None:
+                return {"ok": True, "face": False}, b""
+            embedding = np.ascontiguousarray(request.result, dtype=np.float32)
+            return {"ok": True, "face": True}, embedding.tobytes()
+
+        # Face crops stay in the worker; callers only need where the faces are
+        faces = [{"facial_area": face.get("facial_area"), "confidence": face.get("confidence")}
+                 for face in request.result]
+        return {"ok": True, "faces": faces}, b""
+
+    # ==================== BATCHING ====================
+
+    def _next_batch(self):
+        """First pending request plus whatever arrives within batch_window"""
+        try:
+            batch = [self.requests.get(timeout=0.2)]
+        except queue.Empty:
+            return []
+        deadline = time.perf_counter() + self.batch_window
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.perf_counter()
+            try:
+                batch.append(self.requests.get(timeout=remaining) if remaining > 0
+                             else self.requests.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _inference_loop(self):
+        while not self._stopping.is_set():
+            batch = self._next_batch()
+            if batch:
+                self._run_batch(batch)
+
+    def _run_batch(self, batch):
+        embeds = [r for r in batch if r.op == "embed"]
+        if embeds:
+            try:
+                results = self.engine.embed_batch([r.image for r in embeds])
+                for request, result in zip(embeds, results):
+                    request.result = result
+            except Exception as e:
+                for request in embeds:
+                    request.error = e
+
+        for request in batch:
+            if request.op == "extract_faces":
+                try:
+                    request.result = self.engine.extract_faces(
+                        request.image,
+                        enforce_detection=request.options.get("enforce_detection", True)
+                    )
+                except Exception as e:
+                    request.error = e
+
+        with self._lock:
+            self._counters["requests"] += len(batch)
+            self._counters["frames"] += len(embeds)
+            self._counters["batches"] += 1
+            self._counters["errors"] += sum(1 for r in batch if r.error is not None)
+        for request in batch:
+            request.done.set()
+
+    def stats(self):
+        """Counters plus the average batch size and current queue depth"""
+        with self._lock:
+            stats = dict(self._counters)
+        stats["queued"] = self.requests.qsize()
+        stats["mean_batch"] = stats["requests"] / stats["batches"] if stats["batches"] else 0.0
+        return stats
+
+
+# ==================== CLIENT ====================
+
+class FaceWorkerError(RuntimeError):
+    """The worker is unreachable or rejected the request"""
+
+
+class FaceWorkerClient:
+    """
+    Engine-compatible proxy for a FaceWorkerServer
+
+    Exposes the FaceRecognitionEngine interface FaceAuthManager and the
+    GUI use (state, error, warm_up, wait_until_ready, embed, extract_faces).
+    One connection per client; calls from several threads are serialized.
+    """
+
+    def __init__(self, address=None, timeout=30.0, ready_timeout=120.0):
+        """
+        Args:
+            address: Socket path or (host, port)
+            timeout: Seconds to wait for one reply
+            ready_timeout: How long warm_up() waits for the worker's model
+        """
+        self.address = parse_address(address or default_address())
+        self.timeout = timeout
+        self.ready_timeout = ready_timeout
+
+        self.state = STATE_COLD
+        self.error = None
+
+        self._sock = None
+        self._lock = threading.Lock()
+        self._ready = threading.Event()
+        self._next_id = 0
+
+    # ==================== CONNECTION ====================
+
+    def _connect(self):
+        sock = socket.socket(_family(self.address), socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        try:
+            sock.connect(self.address)
+        except OSError:
+            sock.close()
+            raise
+        return sock
+
+    def close(self):
+        with self._lock:
+            if self._sock is not None:
+                self._sock.close()
+                self._sock = None
+
+    def _call(self, header, payload=b""):
+        """Send one request and wait for its reply (reconnects once)"""
+        with self._lock:
+            self._next_id += 1
+            header = dict(header, id=self._next_id)
+            for attempt in (1, 2):
+                try:
+                    if self._sock is None:
+                        self._sock = self._connect()
+                    send_message(self._sock, header, payload)
+                    reply, reply_payload = recv_message(self._sock)
+                    break
+                except OSError as e:
+                    if self._sock is not None:
+                        self._sock.close()
+                        self._sock = None
+                    if attempt == 2:
+                        raise FaceWorkerError(f"Face worker unreachable: {e}") from e
+
+        if not reply.get("ok"):
+            if reply.get("error_type") == "ValueError":
+                # DeepFace's "Face could not be detected" - same as in-process
+                raise ValueError(reply.get("error"))
+            raise FaceWorkerError(reply.get("error"))
+        return reply, reply_payload
+
+    def ping(self):
+        """Worker model state ('cold', 'loading', 'ready', 'failed')"""
+        reply, _ = self._call({"op": "ping"})
+        if reply.get("error"):
+            self.error = reply["error"]
+        return reply["state"]
+
+    def stats(self):
+        """Worker counters (see FaceWorkerServer.stats)"""
+        reply, _ = self._call({"op": "stats"})
+        return reply["stats"]
+
+    # ==================== ENGINE INTERFACE ====================
+
+    def warm_up(self):
+        """Wait for the worker's model in the background (idempotent)"""
+        with self._lock:
+            if self.state in (STATE_LOADING, STATE_READY):
+                return
+            self.state = STATE_LOADING
+            self.error = None
+            self._ready.clear()
+        threading.Thread(target=self._poll_ready, name="face-worker-ready", daemon=True).start()
+
+    def _poll_ready(self):
+        deadline = time.monotonic() + self.ready_timeout
+        try:
+            while True:
+                state = self.ping()
+                if state in (STATE_READY, STATE_FAILED):
+                    self.state = state
+                    return
+                if time.monotonic() >= deadline:
+                    self.error = "Face worker did not finish loading its model"
+                    self.state = STATE_FAILED
+                    return
+                time.sleep(0.2)
+        except FaceWorkerError as e:
+            self.error = str(e)
+            self.state = STATE_FAILED
+        finally:
+            self._ready.set()
+
+    @property
+    def is_ready(self):
+        return self.state == STATE_READY
+
+    def wait_until_ready(self, timeout=None):
+        self.warm_up()
+        self._ready.wait(timeout)
+        return self.is_ready
+
+    def embed(self, img):
+        """
+        Embedding of the most prominent face, computed by the worker
+
+        Args:
+            img: BGR np.ndarray or image path (files are decoded here, not by the worker)
+
+        Returns:
+            np.ndarray: Face embedding, or None if no face was found
+        """
+        fields, payload = encode_image(img)
+        reply, reply_payload = self._call(dict(fields, op="embed"), payload)
+        if not reply.get("face"):
+            return None
+        return np.frombuffer(reply_payload, dtype=np.float32).copy()
+
+    def extract_faces(self, img, enforce_detection=True):
+        """
+        Detect faces in a frame or image file
+
+        Returns:
+            list: Face dicts with facial_area and confidence (no crops)
+        """
+        fields, payload = encode_image(img)
+        header = dict(fields, op="extract_faces", options={"enforce_detection": enforce_detection})
+        reply, _ = self._call(header, payload)
+        return reply["faces"]
+
+
+def get_face_engine(address=None):
+    """
+    Engine for this process: the shared worker when one is configured
+    (MEDLINK_FACE_WORKER or address) and answering, else the in-process
+    resident engine
+
+    Returns:
+        FaceWorkerClient or FaceRecognitionEngine
+    """
+    address = parse_address(address) if address else configured_address()
+    if address is None:
+        return face_engine
+
+    client = FaceWorkerClient(address)
+    try:
+        client.ping()
+    except FaceWorkerError as e:
+        client.close()
+        print(f"⚠️ Face worker not available ({e}) - using in-process model")
+        return face_engine
+    return client
+
+
+# ==================== CLI ====================
+
+def main():
+    parser = argparse.ArgumentParser(description="MedLink face recognition worker")
+    parser.add_argument("--address", default=os.environ.get(ADDRESS_ENV) or default_address(),
+                        help="Unix socket path or host:port")
+    parser.add_argument("--max-batch", type=int, default=MAX_BATCH)
+    parser.add_argument("--batch-window-ms", type=float, default=BATCH_WINDOW * 1000)
+    parser.add_argument("--max-queue", type=int, default=MAX_QUEUE)
+    args = parser.parse_args()
+
+    server = FaceWorkerServer(
+        face_engine,
+        address=args.address,
+        max_batch=args.max_batch,
+        batch_window=args.batch_window_ms / 1000,
+        max_queue=args.max_queue,
+    )
+    print(f"🎭 Face worker listening on {server.address} (max batch {args.max_batch})")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
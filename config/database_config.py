@@ -1,6 +1,7 @@
 """
 Database Configuration
 """
+import os
 
 DATABASE_CONFIG = {
     'host': 'localhost',
@@ -20,3 +21,14 @@ DB_SETTINGS = {
     'import_json_data': True,
     'generate_test_data': False
 }
+
+# Connection pool per deployment profile (MEDLINK_DB_PROFILE)
+# One pool per database URL is shared by the ORM, raw SQL and importers
+# (core/engine_registry.py)
+POOL_PROFILES = {
+    'desktop': {'pool_size': 3, 'max_overflow': 2, 'pool_timeout': 10},   # single workstation
+    'clinic': {'pool_size': 10, 'max_overflow': 20, 'pool_timeout': 30},  # shared clinic server
+    'server': {'pool_size': 20, 'max_overflow': 30, 'pool_timeout': 30},  # API / multi-user host
+    'import': {'pool_size': 2, 'max_overflow': 2, 'pool_timeout': 60},    # bulk import scripts
+}
+DB_POOL_PROFILE = os.getenv('MEDLINK_DB_PROFILE', 'clinic')
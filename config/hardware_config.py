@@ -19,7 +19,8 @@ NFC_CONFIG = {
     'port': 'COM4',                    # Adjust based on system
     'baudrate': 9600,
     'mode': 'serial',                  # 'serial' or 'keyboard'
-    'timeout': 2
+    'timeout': 2,
+    'debounce': 1.5                    # seconds a held card is ignored
 }
 
 # Security Settings
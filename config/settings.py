@@ -30,3 +30,28 @@ SESSION_TIMEOUT = 30  # minutes
 # Date format
 DATE_FORMAT = "%Y-%m-%d"
 DATETIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# Patient search index settings
+SEARCH_INDEX_CHECK_INTERVAL = 5  # seconds between checks for writes made outside this process
+
+# Statistics settings
+STATISTICS_MAX_STALENESS = 60  # seconds a dashboard value may lag behind writes
+STATISTICS_FLUSH_INTERVAL = 5  # seconds rollup deltas are buffered before one batched write
+
+# NFC card settings
+CARD_CACHE_TTL = 30  # seconds a resolved card UID is served from memory
+CARD_USAGE_FLUSH_INTERVAL = 10  # seconds between card last_used/use_count flushes
+CARD_USAGE_FLUSH_EVENTS = 50  # flush early once this many scans are buffered
+
+# Hardware audit log settings
+AUDIT_QUEUE_SIZE = 10000  # events buffered in memory before backpressure applies
+AUDIT_BATCH_SIZE = 500  # rows per bulk INSERT
+AUDIT_FLUSH_INTERVAL = 2  # seconds between audit writes
+AUDIT_BACKPRESSURE = "spill"  # 'spill', 'drop_oldest' or 'drop_newest'
+AUDIT_SPILL_DIR = DATA_DIR / "audit_spill"  # crash-safe overflow / outage file
+HARDWARE_LOG_DIR = DATA_DIR / "hardware_audit"  # append-only JSONL segments + indexes
+HARDWARE_LOG_SEGMENT_BYTES = 4 * 1024 * 1024  # rotate the active segment at this size
+HARDWARE_LOG_SEGMENT_SECONDS = 24 * 3600  # ... or at this age
+AUDIT_RETENTION_DAYS = 90  # audit rows older than this move to the cold archive
+AUDIT_ARCHIVE_DIR = DATA_DIR / "audit_archive"  # compressed columnar files, one folder per month
+AUDIT_ARCHIVE_CHUNK_ROWS = 4096  # rows per compressed chunk (unit of predicate pushdown)
@@ -0,0 +1,96 @@
+"""
+Access Audit - Audit events for NFC card scans and patient record opens
+Feeds the card-scan and patient-profile paths into core.audit_sink (and
+through it utils.access_monitor), so the card_many_devices,
+user_many_patients and patient_many_users rules see real traffic
+
+- Card scans carry the card UID and the workstation's reader as
+  device_id; refused scans are logged as failed_login with success False
+- Record opens carry the viewing user and the patient's national ID,
+  stored as event_type 'other' with event_metadata['event'] set to
+  'patient_record_open'
+- Logging only appends to the sink's in-memory queue
+
+Location: core/access_audit.py
+"""
+
+import socket
+from datetime import datetime
+from typing import Dict, Optional
+
+from core.audit_sink import audit_sink
+from core.models import EventType
+
+# Each workstation has one NFC reader; the host name tells them apart
+NFC_DEVICE_ID = f"NFC@{socket.gethostname()}"
+
+RECORD_OPEN_EVENT = 'patient_record_open'
+
+
+def log_card_scan(card_uid: str, card: Optional[Dict] = None, success: bool = True,
+                  error: Optional[str] = None, user_id: Optional[str] = None,
+                  user_type: Optional[str] = None, purpose: str = 'login',
+                  device_id: str = NFC_DEVICE_ID) -> bool:
+    """
+    Queue one NFC card scan
+
+    Args:
+        card_uid: Scanned UID
+        card: core.card_resolver resolution (None for unknown cards)
+        success: False when the scan was refused
+        error: Reason the scan was refused
+        user_id: Acting user (defaults to the card owner for doctor
+            cards and to the patient for patient cards)
+        user_type: Role of the acting user (defaults to the card type)
+        purpose: What the scan was for ('login', 'open_patient_profile', ...)
+        device_id: Reader that produced the scan
+
+    Returns:
+        bool: False if the event was dropped by the sink
+    """
+    card = card or {}
+    card_type = card.get('card_type')
+    patient_national_id = card.get('owner_id') if card_type == 'patient' else None
+    user_id = user_id if user_id is not None else card.get('owner_id')
+    return audit_sink.log({
+        'event_type': EventType.nfc_card_scan if success else EventType.failed_login,
+        'user_id': str(user_id) if user_id is not None else None,
+        'user_type': user_type or card_type,
+        'patient_national_id': patient_national_id,
+        'device_id': device_id,
+        'card_uid': card_uid,
+        'success': success,
+        'error_message': error,
+        'timestamp': datetime.now(),
+        'event_metadata': {'access_type': 'nfc', 'purpose': purpose},
+    })
+
+
+def log_record_open(user_id: Optional[str], patient_national_id: Optional[str],
+                    source: str = 'search', user_type: str = 'doctor',
+                    card_uid: Optional[str] = None) -> bool:
+    """
+    Queue one patient record open
+
+    Args:
+        user_id: User viewing the record
+        patient_national_id: Patient whose record was opened
+        source: How the record was reached ('search', 'card', ...)
+        user_type: Role of the viewing user
+        card_uid: Card that opened the record, if any
+
+    Returns:
+        bool: False if the event was dropped by the sink (or no patient)
+    """
+    if not patient_national_id:
+        return False
+    return audit_sink.log({
+        'event_type': RECORD_OPEN_EVENT,
+        'user_id': str(user_id) if user_id is not None else None,
+        'user_type': user_type,
+        'patient_national_id': patient_national_id,
+        'device_id': NFC_DEVICE_ID if card_uid else None,
+        'card_uid': card_uid,
+        'timestamp': datetime.now(),
+        'event_metadata': {'source': source},
+    })
@@ -0,0 +1,463 @@
+"""
+Audit Archive - Cold tier for old hardware audit events
+Moves hardware_audit_logs rows older than the retention window into
+compressed columnar files, one folder per month, so the hot table
+stays small while years of access history remain queryable
+
+Layout of the archive directory:
+    2024-05/20241127-091523-4242-0001.cols        column blocks, compressed
+    2024-05/20241127-091523-4242-0001.meta.json   manifest (written last)
+
+- Each file holds chunks of AUDIT_ARCHIVE_CHUNK_ROWS rows; every column
+  of a chunk is compressed on its own (lz4 frames, or zlib where the
+  lz4 package is not installed - the codec is recorded per file)
+- The manifest keeps, per chunk, the timestamp range and the distinct
+  user ids, patient ids and event types, so queries skip whole months,
+  files and chunks without decompressing them, then decode only the
+  filter columns before touching the rest (predicate pushdown)
+- A file only counts once its manifest exists; rows are deleted from
+  the database after the manifest is on disk. A crash in between
+  archives a batch twice, and queries drop the duplicate ids
+
+Location: core/audit_archive.py
+"""
+
+import argparse
+import enum
+import json
+import os
+import time
+import zlib
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+from sqlalchemy import delete, select
+
+try:
+    import lz4.frame as lz4_frame
+except ImportError:
+    lz4_frame = None
+
+from config.settings import AUDIT_ARCHIVE_CHUNK_ROWS, AUDIT_ARCHIVE_DIR, AUDIT_RETENTION_DAYS
+from core.database import get_db
+from core.models import HardwareAuditLog
+
+
+ARCHIVE_VERSION = 1
+DATA_SUFFIX = '.cols'
+MANIFEST_SUFFIX = '.meta.json'
+DEFAULT_CODEC = 'lz4' if lz4_frame is not None else 'zlib'
+
+_TABLE = HardwareAuditLog.__table__
+COLUMNS = [c.name for c in _TABLE.columns]
+
+# Chunk-level sets in the manifest: manifest key -> column
+CHUNK_SETS = {
+    'users': 'user_id',
+    'patients': 'patient_national_id',
+    'event_types': 'event_type',
+}
+
+# Rows moved per archive transaction
+ARCHIVE_BATCH_ROWS = 20000
+
+
+# ==================== ENCODING ====================
+
+def _plain(value):
+    return value.value if isinstance(value, enum.Enum) else value
+
+
+def _compress(data: bytes, codec: str) -> bytes:
+    if codec == 'lz4':
+        return lz4_frame.compress(data)
+    return zlib.compress(data, 6)
+
+
+def _decompress(data: bytes, codec: str) -> bytes:
+    if codec == 'lz4':
+        if lz4_frame is None:
+            raise RuntimeError("Archive file is lz4-compressed - install the 'lz4' package to read it")
+        return lz4_frame.decompress(data)
+    return zlib.decompress(data)
+
+
+def _encode_column(name: str, values: List) -> bytes:
+    """id/timestamp/success as fixed-width arrays, everything else as a JSON list"""
+    if name == 'id':
+        return np.asarray(values, dtype='<i8').tobytes()
+    if name == 'timestamp':
+        return np.array(values, dtype='datetime64[us]').astype('<i8').tobytes()
+    if name == 'success':
+        return np.array([-1 if v is None else int(bool(v)) for v in values], dtype='i1').tobytes()
+    return json.dumps([_plain(v) for v in values], ensure_ascii=False, default=str).encode('utf-8')
+
+
+def _decode_column(name: str, data: bytes):
+    if name == 'id':
+        return np.frombuffer(data, dtype='<i8')
+    if name == 'timestamp':
+        return np.frombuffer(data, dtype='<i8').view('datetime64[us]')
+    if name == 'success':
+        return np.frombuffer(data, dtype='i1')
+    return np.array(json.loads(data), dtype=object)
+
+
+def _python_value(name: str, value):
+    if name == 'id':
+        return int(value)
+    if name == 'timestamp':
+        return None if np.isnat(value) else value.item()
+    if name == 'success':
+        return None if value < 0 else bool(value)
+    return value
+
+
+def _month_of(moment: datetime) -> str:
+    return moment.strftime('%Y-%m')
+
+
+class AuditArchive:
+    """Monthly compressed columnar archive of hardware audit rows"""
+
+    def __init__(self, directory=AUDIT_ARCHIVE_DIR, chunk_rows: int = AUDIT_ARCHIVE_CHUNK_ROWS,
+                 codec: str = DEFAULT_CODEC):
+        """
+        Args:
+            directory: Archive root (one sub-folder per month)
+            chunk_rows: Rows per compressed chunk
+            codec: 'lz4' or 'zlib' for newly written files
+        """
+        if codec == 'lz4' and lz4_frame is None:
+            raise ValueError("lz4 codec requested but the 'lz4' package is not installed")
+        self.directory = Path(directory)
+        self.chunk_rows = chunk_rows
+        self.codec = codec
+        self._sequence = 0
+        # manifest path -> (mtime, manifest)
+        self._manifest_cache: Dict[Path, tuple] = {}
+        self.last_scan: Dict = {}
+
+    # ==================== WRITING ====================
+
+    def write(self, rows: List[Dict]) -> List[Path]:
+        """
+        Write rows into one new file per calendar month
+
+        Args:
+            rows: hardware_audit_logs rows as column dicts
+
+        Returns:
+            list: Manifest paths written
+        """
+        by_month: Dict[str, List[Dict]] = {}
+        for row in rows:
+            by_month.setdefault(_month_of(row['timestamp']), []).append(row)
+        return [self._write_month(month, month_rows) for month, month_rows in sorted(by_month.items())]
+
+    def _new_stem(self, folder: Path) -> str:
+        while True:
+            self._sequence += 1
+            stem = f"{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{self._sequence:04d}"
+            if not (folder / (stem + MANIFEST_SUFFIX)).exists():
+                return stem
+
+    def _write_month(self, month: str, rows: List[Dict]) -> Path:
+        rows = sorted(rows, key=lambda r: (r['timestamp'], r['id']))
+        folder = self.directory / month
+        folder.mkdir(parents=True, exist_ok=True)
+        stem = self._new_stem(folder)
+        data_path = folder / (stem + DATA_SUFFIX)
+        manifest_path = folder / (stem + MANIFEST_SUFFIX)
+
+        chunks = []
+        offset = 0
+        temp = data_path.with_suffix('.tmp')
+        with open(temp, 'wb') as f:
+            for start in range(0, len(rows), self.chunk_rows):
+                chunk = rows[start:start + self.chunk_rows]
+                meta = {
+                    'rows': len(chunk),
+                    'min_ts': chunk[0]['timestamp'].isoformat(),
+                    'max_ts': chunk[-1]['timestamp'].isoformat(),
+                    'columns': {},
+                }
+                for key, column in CHUNK_SETS.items():
+                    meta[key] = sorted({str(_plain(r[column])) for r in chunk if r[column] is not None})
+                for name in COLUMNS:
+                    blob = _compress(_encode_column(name, [r[name] for r in chunk]), self.codec)
+                    f.write(blob)
+                    meta['columns'][name] = [offset, len(blob)]
+                    offset += len(blob)
+                chunks.append(meta)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp, data_path)
+
+        manifest = {
+            'version': ARCHIVE_VERSION,
+            'codec': self.codec,
+            'month': month,
+            'data': data_path.name,
+            'rows': len(rows),
+            'min_ts': chunks[0]['min_ts'],
+            'max_ts': chunks[-1]['max_ts'],
+            'chunks': chunks,
+        }
+        temp = manifest_path.with_suffix('.tmp')
+        with open(temp, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, separators=(',', ':'))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp, manifest_path)
+        return manifest_path
+
+    # ==================== ARCHIVAL JOB ====================
+
+    def archive_older_than(self, days: int = AUDIT_RETENTION_DAYS,
+                           now: Optional[datetime] = None,
+                           batch_size: int = ARCHIVE_BATCH_ROWS) -> Dict:
+        """
+        Move audit rows older than `days` from the database into the archive
+
+        Args:
+            days: Retention window of the hot table
+            now: Reference time (default: now)
+            batch_size: Rows moved per transaction
+
+        Returns:
+            dict: archived, files, cutoff (and error if a batch failed)
+        """
+        cutoff = (now or datetime.now()) - timedelta(days=days)
+        stats = {'archived': 0, 'files': 0, 'cutoff': cutoff}
+
+        while True:
+            db = get_db()
+            try:
+                rows = [dict(row) for row in db.execute(
+                    select(_TABLE).where(_TABLE.c.timestamp < cutoff)
+                    .order_by(_TABLE.c.timestamp, _TABLE.c.id).limit(batch_size)
+                ).mappings()]
+                if not rows:
+                    break
+
+                stats['files'] += len(self.write(rows))
+                ids = [row['id'] for row in rows]
+                for start in range(0, len(ids), 1000):
+                    db.execute(delete(_TABLE).where(_TABLE.c.id.in_(ids[start:start + 1000])))
+                db.commit()
+            except Exception as e:
+                db.rollback()
+                print(f"Error archiving audit events: {e}")
+                stats['error'] = str(e)
+                break
+            finally:
+                db.close()
+            stats['archived'] += len(rows)
+
+        return stats
+
+    # ==================== READING ====================
+
+    def manifests(self, start: Optional[datetime] = None,
+                  end: Optional[datetime] = None) -> List[Path]:
+        """Manifests of the months overlapping [start, end], oldest first"""
+        if not self.directory.exists():
+            return []
+        first = _month_of(start) if start is not None else None
+        last = _month_of(end) if end is not None else None
+        paths = []
+        for folder in sorted(p for p in self.directory.iterdir() if p.is_dir()):
+            if (first is not None and folder.name < first) or (last is not None and folder.name > last):
+                continue
+            paths.extend(sorted(folder.glob(f"*{MANIFEST_SUFFIX}")))
+        return paths
+
+    def _manifest(self, path: Path) -> Dict:
+        mtime = path.stat().st_mtime
+        cached = self._manifest_cache.get(path)
+        if cached is None or cached[0] != mtime:
+            with open(path, 'r', encoding='utf-8') as f:
+                cached = (mtime, json.load(f))
+            self._manifest_cache[path] = cached
+        return cached[1]
+
+    def _chunk_matches(self, chunk: Dict, start_iso, end_iso, filters: Dict) -> bool:
+        if start_iso is not None and chunk['max_ts'] < start_iso:
+            return False
+        if end_iso is not None and chunk['min_ts'] > end_iso:
+            return False
+        for key, column in CHUNK_SETS.items():
+            if column in filters and str(_plain(filters[column])) not in chunk[key]:
+                return False
+        return True
+
+    def query(self, start: Optional[datetime] = None, end: Optional[datetime] = None,
+              limit: Optional[int] = 100, columns: Optional[List[str]] = None,
+              **filters) -> List[Dict]:
+        """
+        Archived events in a time range matching exact column filters, newest first
+
+        Args:
+            start: Inclusive lower bound on timestamp
+            end: Inclusive upper bound on timestamp
+            limit: Max results (None = all)
+            columns: Columns to return (default: all)
+            **filters: column=value (user_id, patient_national_id and
+                event_type also prune whole chunks)
+
+        Returns:
+            list: Row dicts
+        """
+        filters = {name: value for name, value in filters.items() if value is not None}
+        unknown = set(filters) - set(COLUMNS)
+        if unknown:
+            raise ValueError(f"Unknown audit column(s): {', '.join(sorted(unknown))}")
+        wanted = list(columns or COLUMNS)
+        for required in ('id', 'timestamp'):
+            if required not in wanted:
+                wanted.append(required)
+
+        start_iso = start.isoformat() if start is not None else None
+        end_iso = end.isoformat() if end is not None else None
+        scan = {'files': 0, 'chunks': 0, 'chunks_read': 0}
+
+        candidates = []
+        for path in self.manifests(start, end):
+            manifest = self._manifest(path)
+            if (start_iso is not None and manifest['max_ts'] < start_iso) or \
+                    (end_iso is not None and manifest['min_ts'] > end_iso):
+                continue
+            scan['files'] += 1
+            for chunk in manifest['chunks']:
+                scan['chunks'] += 1
+                if self._chunk_matches(chunk, start_iso, end_iso, filters):
+                    candidates.append((path, manifest, chunk))
+
+        # Newest chunks first; stop once older chunks cannot make the cut
+        candidates.sort(key=lambda item: item[2]['max_ts'], reverse=True)
+        results: List[Dict] = []
+        seen = set()
+        for path, manifest, chunk in candidates:
+            if limit is not None and len(results) >= limit:
+                results.sort(key=lambda r: (r['timestamp'], r['id']), reverse=True)
+                del results[limit:]
+                if chunk['max_ts'] < results[-1]['timestamp'].isoformat():
+                    break
+            scan['chunks_read'] += 1
+            for row in self._read_chunk(path, manifest, chunk, start, end, filters, wanted):
+                if row['id'] not in seen:
+                    seen.add(row['id'])
+                    results.append(row)
+
+        self.last_scan = scan
+        results.sort(key=lambda r: (r['timestamp'], r['id']), reverse=True)
+        results = results if limit is None else results[:limit]
+        if columns is not None:
+            results = [{name: row[name] for name in columns} for row in results]
+        return results
+
+    def _read_chunk(self, path: Path, manifest: Dict, chunk: Dict, start, end,
+                    filters: Dict, wanted: List[str]) -> List[Dict]:
+        """Decode the filter columns, then only the matching rows of the rest"""
+        data_path = path.parent / manifest['data']
+        decoded = {}
+        with open(data_path, 'rb') as f:
+            def column(name):
+                if name not in decoded:
+                    offset, length = chunk['columns'][name]
+                    f.seek(offset)
+                    decoded[name] = _decode_column(name, _decompress(f.read(length), manifest['codec']))
+                return decoded[name]
+
+            timestamps = column('timestamp')
+            mask = np.ones(chunk['rows'], dtype=bool)
+            if start is not None:
+                mask &= timestamps >= np.datetime64(start, 'us')
+            if end is not None:
+                mask &= timestamps <= np.datetime64(end, 'us')
+            for name, value in filters.items():
+                if not mask.any():
+                    return []
+                if name == 'success':
+                    mask &= column(name) == int(bool(value))
+                else:
+                    mask &= column(name) == _plain(value)
+
+            positions = np.flatnonzero(mask)
+            if not len(positions):
+                return []
+            values = {name: column(name)[positions] for name in wanted}
+
+        return [
+            {name: _python_value(name, values[name][i]) for name in wanted}
+            for i in range(len(positions))
+        ]
+
+    def stats(self) -> Dict:
+        """Archived months, files and rows (from the manifests)"""
+        paths = self.manifests()
+        manifests = [self._manifest(path) for path in paths]
+        return {
+            'months': len({m['month'] for m in manifests}),
+            'files': len(manifests),
+            'rows': sum(m['rows'] for m in manifests),
+            'bytes': sum((path.parent / m['data']).stat().st_size for path, m in zip(paths, manifests)),
+        }
+
+
+# Global instance
+audit_archive = AuditArchive()
+
+
+# ==================== COMMAND LINE ====================
+
+def _parse_time(value: Optional[str], end_of_day: bool = False) -> Optional[datetime]:
+    if value is None:
+        return None
+    moment = datetime.fromisoformat(value)
+    if end_of_day and len(value) <= 10:
+        # '2024-05-31' as an end bound covers the whole day
+        moment += timedelta(days=1, microseconds=-1)
+    return moment
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Archive and query old hardware audit events")
+    parser.add_argument('--dir', default=str(AUDIT_ARCHIVE_DIR), help="archive directory")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    archive = commands.add_parser('archive', help="move old rows out of hardware_audit_logs")
+    archive.add_argument('--days', type=int, default=AUDIT_RETENTION_DAYS,
+                         help="keep this many days in the database")
+
+    query = commands.add_parser('query', help="search the archive")
+    query.add_argument('--start', help="YYYY-MM-DD[THH:MM:SS]")
+    query.add_argument('--end', help="YYYY-MM-DD[THH:MM:SS] (a day covers the whole day)")
+    query.add_argument('--user', dest='user_id')
+    query.add_argument('--patient', dest='patient_national_id')
+    query.add_argument('--event-type')
+    query.add_argument('--limit', type=int, default=100)
+
+    commands.add_parser('stats', help="archive size")
+    args = parser.parse_args()
+
+    store = AuditArchive(args.dir)
+    if args.command == 'archive':
+        print(store.archive_older_than(args.days))
+    elif args.command == 'stats':
+        print(store.stats())
+    else:
+        rows = store.query(start=_parse_time(args.start), end=_parse_time(args.end, end_of_day=True),
+                           limit=args.limit, user_id=args.user_id,
+                           patient_national_id=args.patient_national_id,
+                           event_type=args.event_type)
+        for row in rows:
+            print(json.dumps(row, ensure_ascii=False, default=str))
+        print(f"{len(rows)} rows - {store.last_scan}")
+
+
+if __name__ == "__main__":
+    main()
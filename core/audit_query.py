@@ -0,0 +1,186 @@
+"""
+Audit Query Engine - Indexed, time-partitioned reads of hardware_audit_logs
+Every lookup is an equality prefix on one composite (filter, timestamp)
+index plus a time range, walked one calendar month at a time, newest
+first, so a query touches only the partitions (MySQL RANGE partitions,
+or the matching index range on SQLite) that can hold its rows
+
+- A month window that yields too few rows is followed by one index probe
+  for the newest older match, so sparse histories skip empty months
+- Pages are keyset-paginated on (timestamp, id) with the shared
+  core.pagination cursors; page N costs the same as page 1
+- The walk is bounded by the filter's own oldest and newest events (one
+  MIN() and one MAX() probe), so it never scans months outside a
+  patient's or user's history
+
+Location: core/audit_query.py
+"""
+
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import func
+
+from core.database import get_db
+from core.models import EventType, HardwareAuditLog
+from core.pagination import build_page, decode_cursor, encode_cursor, seek_after
+
+
+CURSOR_SCOPE = 'hardware_audit'
+
+_SORT_COLUMNS = (HardwareAuditLog.timestamp, HardwareAuditLog.id)
+
+
+def month_start(moment: datetime) -> datetime:
+    """First instant of the calendar month (= partition) holding `moment`"""
+    return datetime(moment.year, moment.month, 1)
+
+
+class AuditQueryEngine:
+    """Partition-pruned hardware audit queries"""
+
+    # ==================== FILTERS ====================
+
+    def _filters(self, user_id=None, patient_national_id=None, event_type=None,
+                 success=None, device_id=None) -> List:
+        """Equality predicates (each combination is a composite index prefix)"""
+        filters = []
+        if user_id is not None:
+            filters.append(HardwareAuditLog.user_id == str(user_id))
+        if patient_national_id is not None:
+            filters.append(HardwareAuditLog.patient_national_id == str(patient_national_id))
+        if device_id is not None:
+            filters.append(HardwareAuditLog.device_id == device_id)
+        if event_type is not None:
+            if not isinstance(event_type, EventType):
+                event_type = EventType(event_type)
+            filters.append(HardwareAuditLog.event_type == event_type)
+        if success is not None:
+            filters.append(HardwareAuditLog.success == bool(success))
+        return filters
+
+    # ==================== QUERIES ====================
+
+    def page(self, start: Optional[datetime] = None, end: Optional[datetime] = None,
+             limit: int = 100, cursor: Optional[str] = None, **criteria) -> Dict:
+        """
+        Audit events newest first, one page at a time
+
+        Args:
+            start: Inclusive lower bound on timestamp
+            end: Inclusive upper bound on timestamp
+            limit: Page size
+            cursor: next_cursor of the previous page
+            **criteria: user_id, patient_national_id, event_type, success, device_id
+
+        Returns:
+            dict: items (HardwareAuditLog), count, has_more, next_cursor
+        """
+        key = decode_cursor(cursor, CURSOR_SCOPE)
+        filters = self._filters(**criteria)
+
+        db = get_db()
+        try:
+            rows = self._walk(db, filters, start, end, key, limit + 1)
+        finally:
+            db.close()
+
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        next_cursor = encode_cursor(CURSOR_SCOPE, [rows[-1].timestamp, rows[-1].id]) if rows else None
+        return build_page(rows, has_more, next_cursor)
+
+    def events(self, start: Optional[datetime] = None, end: Optional[datetime] = None,
+               limit: int = 100, **criteria) -> List[HardwareAuditLog]:
+        """First page of page() as a plain list"""
+        return self.page(start=start, end=end, limit=limit, **criteria)['items']
+
+    def _walk(self, db, filters: List, start, end, key, wanted: int) -> List[HardwareAuditLog]:
+        """Collect up to `wanted` rows, one month window at a time, newest first"""
+        upper = end
+        if key is not None and (upper is None or key[0] < upper):
+            upper = key[0]
+
+        # Oldest matching event - nothing to read below it
+        oldest = db.query(func.min(HardwareAuditLog.timestamp)).filter(*filters).scalar()
+        if oldest is None:
+            return []
+        lower = max(start, oldest) if start is not None else oldest
+        if upper is not None and upper < lower:
+            return []
+
+        # Newest window is the month of the newest match at or below `upper`
+        newest = db.query(func.max(HardwareAuditLog.timestamp)).filter(*filters)
+        if upper is not None:
+            newest = newest.filter(HardwareAuditLog.timestamp <= upper)
+        newest = newest.scalar()
+        if newest is None or newest < lower:
+            return []
+        window = month_start(newest)
+        window_end = None
+
+        rows: List[HardwareAuditLog] = []
+        while len(rows) < wanted:
+            query = db.query(HardwareAuditLog).filter(
+                *filters, HardwareAuditLog.timestamp >= max(window, lower)
+            )
+            if window_end is not None:
+                query = query.filter(HardwareAuditLog.timestamp < window_end)
+            if end is not None:
+                query = query.filter(HardwareAuditLog.timestamp <= end)
+            if key is not None:
+                query = query.filter(seek_after(_SORT_COLUMNS, key, descending=True))
+            rows.extend(
+                query.order_by(HardwareAuditLog.timestamp.desc(), HardwareAuditLog.id.desc())
+                .limit(wanted - len(rows)).all()
+            )
+
+            if window <= lower or len(rows) >= wanted:
+                break
+
+            # Jump straight to the month of the next older match
+            older = db.query(func.max(HardwareAuditLog.timestamp)).filter(
+                *filters, HardwareAuditLog.timestamp < window
+            ).scalar()
+            if older is None or older < lower:
+                break
+            window_end = window
+            window = month_start(older)
+        return rows
+
+    # ==================== ACCESS PATTERNS ====================
+
+    def patient_access_history(self, national_id: str, start: Optional[datetime] = None,
+                               end: Optional[datetime] = None, limit: int = 50,
+                               cursor: Optional[str] = None) -> Dict:
+        """Who accessed a patient's record/card, newest first (ix_hw_audit_patient_time)"""
+        return self.page(start=start, end=end, limit=limit, cursor=cursor,
+                         patient_national_id=national_id)
+
+    def user_history(self, user_id: str, start: Optional[datetime] = None,
+                     end: Optional[datetime] = None, limit: int = 50,
+                     cursor: Optional[str] = None) -> Dict:
+        """Events of one user, newest first (ix_hw_audit_user_time)"""
+        return self.page(start=start, end=end, limit=limit, cursor=cursor, user_id=user_id)
+
+    def failed_attempts(self, device_id: Optional[str] = None, since: Optional[datetime] = None,
+                        limit: int = 20) -> List[HardwareAuditLog]:
+        """Recent failed logins (ix_hw_audit_device_type_time / ix_hw_audit_type_success_time)"""
+        return self.events(start=since, limit=limit, device_id=device_id,
+                           event_type=EventType.failed_login, success=False)
+
+    def time_bounds(self, **criteria) -> Tuple[Optional[datetime], Optional[datetime]]:
+        """(oldest, newest) timestamp matching the criteria - two index probes"""
+        filters = self._filters(**criteria)
+        db = get_db()
+        try:
+            return (
+                db.query(func.min(HardwareAuditLog.timestamp)).filter(*filters).scalar(),
+                db.query(func.max(HardwareAuditLog.timestamp)).filter(*filters).scalar(),
+            )
+        finally:
+            db.close()
+
+
+# Global instance
+audit_query = AuditQueryEngine()
@@ -0,0 +1,400 @@
+"""
+Audit Sink - Asynchronous, batched writer for hardware audit events
+Callers only append the event to a bounded in-memory queue; a background
+thread writes queued events with one bulk INSERT per batch, so logins
+and card scans never wait for an audit commit
+
+- Backpressure when the queue is full (AUDIT_BACKPRESSURE):
+  'spill'       overflow is handed to the writer thread, which appends it
+                to the spill file before touching the database (default)
+  'drop_oldest' the oldest queued event is discarded
+  'drop_newest' the new event is discarded
+- A batch the database rejects is appended to the spill file (fsync'd
+  JSON lines) instead of being retried from memory, so a crash while
+  the database is down loses nothing
+- If the database is reachable, a rejected batch is retried one row at a
+  time instead; rows it refuses on their own (constraint or data errors)
+  go to the quarantine file, so one bad event cannot hold up the rest
+- The spill file is replayed after the next successful write and on
+  shutdown; replay is at-least-once (an interrupted replay may insert a
+  few events twice)
+- stop() (registered with atexit) flushes the queue, spilling whatever
+  the database does not accept
+- Every logged event is also fed to utils.access_monitor, so burst
+  alerts do not wait for (or read back) the database write
+
+Location: core/audit_sink.py
+"""
+
+import atexit
+import json
+import os
+import threading
+from collections import deque
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from sqlalchemy import insert, select
+
+from config.settings import (
+    AUDIT_BACKPRESSURE, AUDIT_BATCH_SIZE, AUDIT_FLUSH_INTERVAL,
+    AUDIT_QUEUE_SIZE, AUDIT_SPILL_DIR
+)
+from core.database import get_db
+from core.models import EventType, HardwareAuditLog
+from utils.access_monitor import access_monitor
+
+
+BACKPRESSURE_POLICIES = ('spill', 'drop_oldest', 'drop_newest')
+
+# Every row carries every column - executemany binds the keys of the first row
+_COLUMNS = [c.name for c in HardwareAuditLog.__table__.columns if c.name != 'id']
+
+
+def event_to_row(event: Dict) -> Dict:
+    """
+    Normalize an audit event into a full hardware_audit_logs row
+
+    Unknown keys move into event_metadata; an event_type outside
+    EventType is stored as 'other' with the original name kept in
+    event_metadata['event'].
+    """
+    event = dict(event)
+    metadata = dict(event.pop('event_metadata', None) or {})
+
+    event_type = event.pop('event_type', EventType.other)
+    if not isinstance(event_type, EventType):
+        try:
+            event_type = EventType(event_type)
+        except ValueError:
+            metadata.setdefault('event', str(event_type))
+            event_type = EventType.other
+
+    row = {column: event.pop(column, None) for column in _COLUMNS}
+    row['event_type'] = event_type
+    row['timestamp'] = row['timestamp'] or datetime.now()
+    if row['success'] is None:
+        row['success'] = True
+
+    # Whatever is left has no column of its own
+    metadata.update({key: value for key, value in event.items() if value is not None})
+    row['event_metadata'] = metadata or None
+    return row
+
+
+def _encode_row(row: Dict) -> str:
+    encoded = dict(row, event_type=row['event_type'].value,
+                   timestamp=row['timestamp'].isoformat())
+    return json.dumps(encoded, ensure_ascii=False, default=str)
+
+
+def _decode_row(line: str) -> Dict:
+    row = json.loads(line)
+    row['event_type'] = EventType(row['event_type'])
+    row['timestamp'] = datetime.fromisoformat(row['timestamp'])
+    return row
+
+
+class AuditSink:
+    """Bounded queue of audit rows drained by a background bulk writer"""
+
+    def __init__(self, max_queue: int = AUDIT_QUEUE_SIZE, batch_size: int = AUDIT_BATCH_SIZE,
+                 flush_interval: float = AUDIT_FLUSH_INTERVAL, policy: str = AUDIT_BACKPRESSURE,
+                 spill_dir: Path = AUDIT_SPILL_DIR, background: bool = True):
+        """
+        Args:
+            max_queue: Events held in memory before the backpressure policy applies
+            batch_size: Rows per bulk INSERT (a full batch wakes the writer early)
+            flush_interval: Seconds between writes when the queue stays small
+            policy: 'spill', 'drop_oldest' or 'drop_newest'
+            spill_dir: Directory of the crash-safe spill file
+            background: Start the writer thread on the first event (False = only
+                explicit flush() writes, for scripts and tests)
+        """
+        if policy not in BACKPRESSURE_POLICIES:
+            raise ValueError(f"Unknown audit backpressure policy: {policy}")
+
+        self.max_queue = max_queue
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.policy = policy
+        self.spill_dir = Path(spill_dir)
+        self.background = background
+        self.spill_path = self.spill_dir / 'pending.jsonl'
+        self.replay_path = self.spill_dir / 'replaying.jsonl'
+        self.quarantine_path = self.spill_dir / 'quarantine.jsonl'
+
+        self._queue: deque = deque()
+        # Overflow waiting to be spilled by the writer (bounded as well)
+        self._overflow: deque = deque(maxlen=max_queue)
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._counters = {
+            'logged': 0,
+            'written': 0,
+            'dropped': 0,
+            'spilled': 0,
+            'replayed': 0,
+            'quarantined': 0,
+            'errors': 0,
+        }
+
+    # ==================== PRODUCERS ====================
+
+    def log(self, event: Dict) -> bool:
+        """
+        Queue one audit event (never blocks on I/O)
+
+        Args:
+            event: HardwareAuditLog column values (extra keys go to event_metadata)
+
+        Returns:
+            bool: False if the event was dropped by the backpressure policy
+        """
+        row = event_to_row(event)
+        # Anomaly rules see the event now, whatever happens to it below
+        access_monitor.observe(row)
+
+        with self._lock:
+            self._counters['logged'] += 1
+            if len(self._queue) >= self.max_queue:
+                if self.policy == 'drop_newest':
+                    self._counters['dropped'] += 1
+                    return False
+                if self.policy == 'drop_oldest':
+                    self._queue.popleft()
+                    self._counters['dropped'] += 1
+                    self._queue.append(row)
+                else:
+                    if len(self._overflow) == self._overflow.maxlen:
+                        # Writer is not keeping up even with the spill file
+                        self._counters['dropped'] += 1
+                    self._overflow.append(row)
+                wake = True
+            else:
+                self._queue.append(row)
+                wake = len(self._queue) >= self.batch_size
+
+        self._ensure_started()
+        if wake:
+            self._wakeup.set()
+        return True
+
+    # ==================== WRITER ====================
+
+    def flush(self) -> int:
+        """
+        Write everything queued, then replay the spill file
+
+        Returns:
+            int: Number of queued events written to the database
+        """
+        with self._flush_lock:
+            self._spill_overflow()
+
+            written = 0
+            healthy = True
+            while True:
+                with self._lock:
+                    count = min(self.batch_size, len(self._queue))
+                    batch = [self._queue.popleft() for _ in range(count)]
+                if not batch:
+                    break
+                done, unwritten = self._write(batch)
+                written += done
+                if unwritten:
+                    # Database unavailable: keep this batch on disk, leave the rest queued
+                    self._spill(unwritten)
+                    healthy = False
+                    break
+
+            if healthy:
+                self._replay_spill()
+            return written
+
+    def _insert(self, rows: List[Dict]) -> bool:
+        """One executemany INSERT for a batch"""
+        db = get_db()
+        try:
+            db.execute(insert(HardwareAuditLog.__table__), rows)
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            with self._lock:
+                self._counters['errors'] += 1
+            print(f"Error writing audit events: {e}")
+            return False
+        finally:
+            db.close()
+
+        with self._lock:
+            self._counters['written'] += len(rows)
+        return True
+
+    def _available(self) -> bool:
+        """Whether the database (and the audit table) answers at all"""
+        db = get_db()
+        try:
+            db.execute(select(HardwareAuditLog.id).limit(0))
+            return True
+        except Exception:
+            return False
+        finally:
+            db.close()
+
+    def _write(self, rows: List[Dict]):
+        """
+        Insert a batch, falling back to one row at a time if the database
+        rejects it while still reachable
+
+        Returns:
+            tuple: (rows written, rows left unwritten because the database
+                is unavailable - a suffix of rows)
+        """
+        if self._insert(rows):
+            return len(rows), []
+        if not self._available():
+            return 0, rows
+
+        written = 0
+        for index, row in enumerate(rows):
+            if self._insert([row]):
+                written += 1
+            elif self._available():
+                self._quarantine(row)
+            else:
+                return written, rows[index:]
+        return written, []
+
+    # ==================== SPILL FILE ====================
+
+    def _spill_overflow(self) -> None:
+        with self._lock:
+            rows = list(self._overflow)
+            self._overflow.clear()
+        if rows:
+            self._spill(rows)
+
+    def _append(self, path: Path, rows: List[Dict]) -> None:
+        self.spill_dir.mkdir(parents=True, exist_ok=True)
+        with open(path, 'a', encoding='utf-8') as f:
+            f.write(''.join(_encode_row(row) + '\n' for row in rows))
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _spill(self, rows: List[Dict]) -> None:
+        """Append rows to the spill file and fsync before returning"""
+        try:
+            self._append(self.spill_path, rows)
+        except OSError as e:
+            with self._lock:
+                self._counters['dropped'] += len(rows)
+                self._counters['errors'] += 1
+            print(f"Error spilling audit events: {e}")
+            return
+        with self._lock:
+            self._counters['spilled'] += len(rows)
+
+    def _quarantine(self, row: Dict) -> None:
+        """Set aside a row the database refuses on its own (kept for inspection)"""
+        try:
+            self._append(self.quarantine_path, [row])
+        except OSError as e:
+            with self._lock:
+                self._counters['dropped'] += 1
+                self._counters['errors'] += 1
+            print(f"Error quarantining audit event: {e}")
+            return
+        with self._lock:
+            self._counters['quarantined'] += 1
+
+    def _read_spill(self, path: Path) -> List[Dict]:
+        rows = []
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    rows.append(_decode_row(line))
+                except (ValueError, KeyError):
+                    # Torn last line from a crash mid-append
+                    continue
+        return rows
+
+    def _replay_spill(self) -> None:
+        """Insert spilled events; what the database cannot take yet stays in the replay file"""
+        if not self.replay_path.exists():
+            if not self.spill_path.exists():
+                return
+            # New spills keep going to a fresh pending file meanwhile
+            os.replace(self.spill_path, self.replay_path)
+
+        rows = self._read_spill(self.replay_path)
+        for start in range(0, len(rows), self.batch_size):
+            batch = rows[start:start + self.batch_size]
+            written, unwritten = self._write(batch)
+            with self._lock:
+                self._counters['replayed'] += written
+            if unwritten:
+                remaining = self.replay_path.with_suffix('.tmp')
+                with open(remaining, 'w', encoding='utf-8') as f:
+                    f.write(''.join(_encode_row(row) + '\n'
+                                    for row in unwritten + rows[start + len(batch):]))
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(remaining, self.replay_path)
+                return
+        self.replay_path.unlink()
+
+    # ==================== BACKGROUND THREAD ====================
+
+    def _ensure_started(self) -> None:
+        if self._thread is not None or not self.background:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name='audit-sink-writer', daemon=True
+                )
+                self._thread.start()
+
+    def _run(self) -> None:
+        while not self._stopping.is_set():
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            self.flush()
+
+    def stop(self) -> None:
+        """Stop the writer, flush the queue and spill what could not be written"""
+        self._stopping.set()
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+        self._stopping.clear()
+
+        self.flush()
+        with self._lock:
+            leftover = list(self._queue)
+            self._queue.clear()
+        if leftover:
+            self._spill(leftover)
+
+    def stats(self) -> Dict:
+        """Counters plus queue depth and spilled events awaiting replay"""
+        with self._lock:
+            stats = dict(self._counters)
+            stats['queued'] = len(self._queue)
+            stats['overflow'] = len(self._overflow)
+        stats['spill_bytes'] = sum(p.stat().st_size for p in (self.spill_path, self.replay_path)
+                                   if p.exists())
+        return stats
+
+
+# Global instance
+audit_sink = AuditSink()
+
+# Don't lose queued events on a normal shutdown
+atexit.register(audit_sink.stop)
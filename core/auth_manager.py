@@ -6,9 +6,11 @@ Location: core/auth_manager.py
 
 from core.database import get_db
 from core.models import User, Patient
+from core.card_resolver import card_resolver
+from core.card_usage import card_usage_buffer
+from core.access_audit import log_card_scan
 from utils.security import hash_password, verify_password
 from typing import Tuple, Optional, Dict
-from sqlalchemy import text
 
 
 class AuthManager:
@@ -51,43 +53,38 @@ class AuthManager:
         Handles BOTH doctors (owner_id = user_id) and patients (owner_id = national_id)
         """
         try:
+            # One lookup across patient_cards, doctor_cards and nfc_cards,
+            # always read from the database (the hot map may be stale)
+            card = card_resolver.resolve(card_uid, fresh=True)
+            
+            if not card:
+                print(f"❌ Card {card_uid} not found in database")
+                log_card_scan(card_uid, success=False, error="Card not recognized")
+                return False, "Card not recognized", None
+            
+            owner_id, card_type = card['owner_id'], card['card_type']
+            
+            print(f"✅ Card found: UID={card['card_uid']}, Type={card_type}, Active={card['is_active']}, Status={card['status']}")
+            print(f"   Owner ID: {owner_id}, Name: {card['owner_name']}")
+            
+            # Check if active
+            if not card['is_active']:
+                message = f"Card status: {card['status']}" if card['status'] != 'active' else "Card is inactive"
+                log_card_scan(card_uid, card, success=False, error=message)
+                return False, message, None
+            
+            card_usage_buffer.record_card(card)
+            
             with get_db() as db:
-                # Query card from nfc_cards table
-                result = db.execute(
-                    text("""
-                        SELECT card_uid, owner_id, owner_name, card_type, 
-                               is_active, status
-                        FROM nfc_cards 
-                        WHERE card_uid = :card_uid
-                    """),
-                    {"card_uid": card_uid}
-                ).fetchone()
-                
-                if not result:
-                    print(f"❌ Card {card_uid} not found in database")
-                    return False, "Card not recognized", None
-                
-                # Parse result
-                db_card_uid, owner_id, owner_name, card_type, is_active, status = result
-                
-                print(f"✅ Card found: UID={db_card_uid}, Type={card_type}, Active={is_active}, Status={status}")
-                print(f"   Owner ID: {owner_id}, Name: {owner_name}")
-                
-                # Check if active
-                if is_active in [0, False, '0', 'false']:
-                    return False, "Card is inactive", None
-                
-                # Check status
-                if status and str(status).lower() != 'active':
-                    return False, f"Card status: {status}", None
-                
                 # Handle based on card type
                 if card_type == 'doctor':
                     # Doctor: owner_id is user_id in users table
                     user = db.query(User).filter(User.user_id == str(owner_id)).first()
                     
                     if not user:
-                        return False, f"Doctor account (ID: {owner_id}) not found", None
+                        message = f"Doctor account (ID: {owner_id}) not found"
+                        log_card_scan(card_uid, card, success=False, error=message)
+                        return False, message, None
                     
                     user_data = self._convert_user_to_dict(user)
                     
@@ -96,7 +93,9 @@ class AuthManager:
                     patient = db.query(Patient).filter(Patient.national_id == str(owner_id)).first()
                     
                     if not patient:
-                        return False, f"Patient (ID: {owner_id}) not found", None
+                        message = f"Patient (ID: {owner_id}) not found"
+                        log_card_scan(card_uid, card, success=False, error=message)
+                        return False, message, None
                     
                     # Convert patient to user_data format
                     user_data = {
@@ -116,7 +115,11 @@ class AuthManager:
                         'department': None
                     }
                 else:
-                    return False, f"Unknown card type: {card_type}", None
+                    message = f"Unknown card type: {card_type}"
+                    log_card_scan(card_uid, card, success=False, error=message)
+                    return False, message, None
+                
+                log_card_scan(card_uid, card)
                 
                 # Store current user
                 self.current_user = user_data
@@ -6,7 +6,9 @@ Location: core/card_manager.py (REPLACE YOUR FILE)
 
 from core.database import get_db
 from core.models import DoctorCard, PatientCard, User, Patient
-from datetime import datetime
+from core.card_resolver import card_resolver
+from core.card_usage import card_usage_buffer
+from core.profile_cache import patient_profile_cache
 
 
 def safe_get_attr(obj, attr_name, default=None):
@@ -52,9 +54,8 @@ class CardManager:
             ).first()
 
             if dc:
-                # Update last used
-                dc.last_used = datetime.now()
-                db.commit()
+                # Usage is written behind - no commit on the read path
+                card_usage_buffer.record('doctor_cards', dc.card_uid)
 
                 return {
                     "card_type": "doctor",
@@ -79,9 +80,8 @@ class CardManager:
             ).first()
 
             if pc:
-                # Update last used
-                pc.last_used = datetime.now()
-                db.commit()
+                # Usage is written behind - no commit on the read path
+                card_usage_buffer.record('patient_cards', pc.card_uid)
 
                 return {
                     "card_type": "patient",
@@ -112,20 +112,31 @@ class CardManager:
         Returns:
             dict: Complete patient data or None
         """
-        db = get_db()
-        try:
-            # Find patient card
-            patient_card = db.query(PatientCard).filter_by(
-                card_uid=card_uid,
-                is_active=True
-            ).first()
+        card = card_resolver.resolve_active(card_uid, 'patient')
+        if not card:
+            return None
+        card_usage_buffer.record_card(card)
 
-            if not patient_card:
-                return None
+        # Repeat scans are served from the profile cache (validated
+        # against Patient.last_updated on every hit)
+        return patient_profile_cache.get_or_load(
+            card['owner_id'], self._load_card_profile, namespace='card'
+        )
+
+    def _load_card_profile(self, national_id: str):
+        """
+        Build the card-scan patient dict (profile cache loader)
 
-            # ✅ FIXED: Use correct attribute name
+        Args:
+            national_id: Patient National ID
+
+        Returns:
+            dict: Complete patient data or None
+        """
+        db = get_db()
+        try:
             patient = db.query(Patient).filter_by(
-                national_id=patient_card.patient_national_id
+                national_id=national_id
             ).first()
 
             if not patient:
@@ -263,29 +274,28 @@ class CardManager:
         Returns:
             dict: Doctor user data or None
         """
+        card = card_resolver.resolve_active(card_uid, 'doctor')
+        if not card:
+            return None
+        card_usage_buffer.record_card(card)
+
         db = get_db()
         try:
-            doctor_card = db.query(DoctorCard).filter_by(
-                card_uid=card_uid,
-                is_active=True
-            ).first()
-
-            if doctor_card:
-                user = db.query(User).filter_by(
-                    user_id=doctor_card.user_id).first()
-                if user:
-                    return {
-                        'user_id': safe_get_attr(user, 'user_id'),
-                        'username': safe_get_attr(user, 'username', ''),
-                        'full_name': safe_get_attr(user, 'full_name', 'Unknown'),
-                        'role': safe_get_attr(user, 'role', 'doctor'),
-                        'national_id': safe_get_attr(user, 'national_id', ''),
-                        'specialization': safe_get_attr(user, 'specialization'),
-                        'hospital': safe_get_attr(user, 'hospital'),
-                        'license_number': safe_get_attr(user, 'license_number'),
-                        'email': safe_get_attr(user, 'email', ''),
-                        'phone': safe_get_attr(user, 'phone', '')
-                    }
+            user = db.query(User).filter_by(
+                user_id=card['owner_id']).first()
+            if user:
+                return {
+                    'user_id': safe_get_attr(user, 'user_id'),
+                    'username': safe_get_attr(user, 'username', ''),
+                    'full_name': safe_get_attr(user, 'full_name', 'Unknown'),
+                    'role': safe_get_attr(user, 'role', 'doctor'),
+                    'national_id': safe_get_attr(user, 'national_id', ''),
+                    'specialization': safe_get_attr(user, 'specialization'),
+                    'hospital': safe_get_attr(user, 'hospital'),
+                    'license_number': safe_get_attr(user, 'license_number'),
+                    'email': safe_get_attr(user, 'email', ''),
+                    'phone': safe_get_attr(user, 'phone', '')
+                }
             return None
         finally:
             db.close()
@@ -312,27 +322,11 @@ class CardManager:
 
     def is_doctor_card(self, card_uid: str):
         """Check if card is a doctor card"""
-        db = get_db()
-        try:
-            card = db.query(DoctorCard).filter_by(
-                card_uid=card_uid,
-                is_active=True
-            ).first()
-            return card is not None
-        finally:
-            db.close()
+        return card_resolver.resolve_active(card_uid, 'doctor') is not None
 
     def is_patient_card(self, card_uid: str):
         """Check if card is a patient card"""
-        db = get_db()
-        try:
-            card = db.query(PatientCard).filter_by(
-                card_uid=card_uid,
-                is_active=True
-            ).first()
-            return card is not None
-        finally:
-            db.close()
+        return card_resolver.resolve_active(card_uid, 'patient') is not None
 
 
 # Global instance
@@ -0,0 +1,242 @@
+"""
+Card Resolver - One lookup answering "who owns this UID and what may it do"
+Replaces the is_patient_card / get_patient_by_card / is_doctor_card /
+get_doctor_by_card / nfc_cards chain with a single indexed query over a
+unified card index (patient_cards + doctor_cards + nfc_cards), backed by
+a hot in-memory UID map
+
+- Card writes through the ORM (activate, deactivate, re-assign, delete)
+  drop the UID from the map when the transaction commits
+- Entries also expire after CARD_CACHE_TTL so changes made by another
+  workstation are picked up
+- Authentication (resolve(..., fresh=True)) never trusts the hot map:
+  it re-reads the card index, refreshes the entry, and never remembers
+  an unknown UID, so a card deactivated elsewhere stops logging in at
+  once
+
+Location: core/card_resolver.py
+"""
+
+import threading
+import time
+from typing import Dict, List, Optional
+
+from sqlalchemy import String, cast, event, inspect, literal, select, union_all
+from sqlalchemy.orm import Session
+
+from config.settings import CARD_CACHE_TTL
+from core.database import get_db
+from core.models import CardStatus, DoctorCard, NFCCard, PatientCard
+
+
+# What each kind of card is allowed to do once resolved
+CARD_PERMISSIONS = {
+    'doctor': ('login', 'switch_doctor'),
+    'patient': ('login', 'open_patient_profile'),
+}
+
+# When a UID is registered in several tables, the first one wins
+# (dedicated tables before the legacy generic nfc_cards table)
+SOURCE_PRIORITY = ('doctor_cards', 'patient_cards', 'nfc_cards')
+
+CARD_MODELS = (DoctorCard, PatientCard, NFCCard)
+
+
+def card_index_query(card_uids: Optional[List[str]] = None):
+    """
+    Unified card index: one row per card across all card tables
+
+    Columns: source, card_uid, card_type, owner_id, owner_name,
+    is_active, status. The UID filter is applied inside every branch so
+    each one is answered from that table's unique card_uid index.
+
+    Args:
+        card_uids: Restrict to these UIDs (None = every card)
+    """
+    branches = []
+    for source, model, card_type, owner_id, owner_name in (
+        ('doctor_cards', DoctorCard, literal('doctor'), DoctorCard.user_id, DoctorCard.full_name),
+        ('patient_cards', PatientCard, literal('patient'), PatientCard.patient_national_id, PatientCard.full_name),
+        ('nfc_cards', NFCCard, NFCCard.card_type, NFCCard.owner_id, NFCCard.owner_name),
+    ):
+        branch = select(
+            literal(source).label('source'),
+            model.card_uid.label('card_uid'),
+            cast(card_type, String(50)).label('card_type'),
+            cast(owner_id, String(50)).label('owner_id'),
+            owner_name.label('owner_name'),
+            model.is_active.label('is_active'),
+            model.status.label('status'),
+        )
+        if card_uids is not None:
+            branch = branch.where(model.card_uid.in_(card_uids))
+        branches.append(branch)
+    return union_all(*branches)
+
+
+def build_resolution(row) -> Dict:
+    """Turn one card index row into the resolution dict"""
+    status = row.status.value if isinstance(row.status, CardStatus) else row.status
+    active = bool(row.is_active) and (status is None or str(status).lower() == 'active')
+    card_type = (row.card_type or '').lower()
+    return {
+        'card_uid': row.card_uid,
+        'card_type': card_type,
+        'owner_id': row.owner_id,
+        'owner_name': row.owner_name,
+        'source': row.source,
+        'status': status or 'active',
+        'is_active': active,
+        'permissions': CARD_PERMISSIONS.get(card_type, ()) if active else (),
+    }
+
+
+def _pick(resolutions: List[Dict]) -> Optional[Dict]:
+    """Choose between rows for the same UID: active first, then by source"""
+    if not resolutions:
+        return None
+    return min(resolutions, key=lambda r: (not r['is_active'], SOURCE_PRIORITY.index(r['source'])))
+
+
+class CardResolver:
+    """Resolve NFC card UIDs to their owner and permissions"""
+
+    def __init__(self, ttl_seconds: float = CARD_CACHE_TTL):
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        # card_uid -> (resolution or None, stored_at)
+        self._hot: Dict[str, tuple] = {}
+        self._counters = {'hits': 0, 'misses': 0, 'invalidations': 0}
+
+    # ==================== LOOKUP ====================
+
+    def resolve(self, card_uid: str, fresh: bool = False) -> Optional[Dict]:
+        """
+        Resolve a scanned UID (inactive cards are returned with
+        is_active False and no permissions)
+
+        Args:
+            card_uid: NFC card UID
+            fresh: Bypass the hot map and read the card index (use for
+                authentication decisions)
+
+        Returns:
+            dict: card_uid, card_type, owner_id, owner_name, source,
+            status, is_active, permissions - or None if unknown
+        """
+        card_uid = (card_uid or '').strip()
+        if not card_uid:
+            return None
+
+        with self._lock:
+            entry = None if fresh else self._hot.get(card_uid)
+            if entry is not None and time.monotonic() - entry[1] <= self.ttl_seconds:
+                self._counters['hits'] += 1
+                return entry[0]
+            self._counters['misses'] += 1
+
+        db = get_db()
+        try:
+            rows = db.execute(card_index_query([card_uid])).all()
+        finally:
+            db.close()
+
+        resolution = _pick([build_resolution(row) for row in rows])
+        with self._lock:
+            if resolution is None and fresh:
+                # Never remember a failed login: the card may be registered next
+                self._hot.pop(card_uid, None)
+            else:
+                # Unknown UIDs are remembered for plain lookups, so a stray
+                # tag is one query per TTL
+                self._hot[card_uid] = (resolution, time.monotonic())
+        return resolution
+
+    def resolve_active(self, card_uid: str, card_type: Optional[str] = None) -> Optional[Dict]:
+        """Resolve and return only an active card (optionally of one type)"""
+        resolution = self.resolve(card_uid)
+        if not resolution or not resolution['is_active']:
+            return None
+        if card_type and resolution['card_type'] != card_type:
+            return None
+        return resolution
+
+    def warm(self) -> int:
+        """
+        Load every card into the hot map with one query
+
+        Returns:
+            int: Number of UIDs loaded
+        """
+        db = get_db()
+        try:
+            rows = db.execute(card_index_query()).all()
+        finally:
+            db.close()
+
+        grouped: Dict[str, List[Dict]] = {}
+        for row in rows:
+            grouped.setdefault(row.card_uid, []).append(build_resolution(row))
+
+        now = time.monotonic()
+        with self._lock:
+            self._hot = {uid: (_pick(items), now) for uid, items in grouped.items()}
+        return len(grouped)
+
+    # ==================== INVALIDATION ====================
+
+    def invalidate(self, card_uid: str) -> None:
+        """Forget one UID (next scan re-reads the card index)"""
+        with self._lock:
+            self._hot.pop(card_uid, None)
+            self._counters['invalidations'] += 1
+
+    def clear(self) -> None:
+        """Forget every UID"""
+        with self._lock:
+            self._hot.clear()
+
+    def stats(self) -> Dict:
+        """Hit/miss counters and hot map size"""
+        with self._lock:
+            stats = dict(self._counters)
+            stats['size'] = len(self._hot)
+        return stats
+
+
+# Global instance
+card_resolver = CardResolver()
+
+
+# ==================== ORM SYNC ====================
+# UIDs touched by a flush are staged per session and dropped from the hot
+# map only after commit, mirroring core.search_index.
+
+_PENDING_KEY = 'card_resolver_pending'
+
+
+def _card_written(mapper, connection, target):
+    session = Session.object_session(target)
+    if session is None:
+        return
+    pending = session.info.setdefault(_PENDING_KEY, set())
+    pending.add(target.card_uid)
+    # A re-assigned UID must also drop the old value
+    pending.update(uid for uid in inspect(target).attrs.card_uid.history.deleted if uid)
+
+
+for _model in CARD_MODELS:
+    event.listen(_model, 'after_insert', _card_written)
+    event.listen(_model, 'after_update', _card_written)
+    event.listen(_model, 'after_delete', _card_written)
+
+
+@event.listens_for(Session, 'after_commit')
+def _apply_pending(session):
+    for card_uid in session.info.pop(_PENDING_KEY, ()):
+        card_resolver.invalidate(card_uid)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_pending(session):
+    session.info.pop(_PENDING_KEY, None)
@@ -0,0 +1,189 @@
+"""
+Card Usage Buffer - Write-behind accumulator for card last_used / use_count
+Scans only record usage in memory; a background thread folds the
+accumulated counts into one executemany UPDATE per card table, every
+CARD_USAGE_FLUSH_INTERVAL seconds or as soon as CARD_USAGE_FLUSH_EVENTS
+scans are pending, so card reads stay read-only and scan latency never
+includes a commit
+
+Location: core/card_usage.py
+"""
+
+import atexit
+import threading
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy import bindparam, func, update
+
+from config.settings import CARD_USAGE_FLUSH_EVENTS, CARD_USAGE_FLUSH_INTERVAL
+from core.database import get_db
+from core.models import DoctorCard, NFCCard, PatientCard
+
+
+# Card index source (see core.card_resolver) -> card table
+USAGE_TABLES = {
+    'doctor_cards': DoctorCard.__table__,
+    'patient_cards': PatientCard.__table__,
+    'nfc_cards': NFCCard.__table__,
+}
+
+
+def _usage_update(table):
+    """UPDATE <table> SET use_count = use_count + :n, last_used = :ts WHERE card_uid = :uid"""
+    return update(table).where(table.c.card_uid == bindparam('uid')).values(
+        use_count=func.coalesce(table.c.use_count, 0) + bindparam('n'),
+        last_used=bindparam('ts'),
+    )
+
+
+_USAGE_UPDATES = {source: _usage_update(table) for source, table in USAGE_TABLES.items()}
+
+
+class CardUsageBuffer:
+    """In-memory accumulator of card scans, flushed in batches"""
+
+    def __init__(self, flush_interval: float = CARD_USAGE_FLUSH_INTERVAL,
+                 flush_events: int = CARD_USAGE_FLUSH_EVENTS):
+        self.flush_interval = flush_interval
+        self.flush_events = flush_events
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        # (source, card_uid) -> [scan count, latest scan time]
+        self._pending: Dict[Tuple[str, str], list] = {}
+        self._pending_events = 0
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._counters = {'recorded': 0, 'flushes': 0, 'rows_updated': 0, 'errors': 0}
+
+    # ==================== RECORDING ====================
+
+    def record(self, source: str, card_uid: str, when: Optional[datetime] = None) -> None:
+        """
+        Record one scan (never touches the database)
+
+        Args:
+            source: Card table name ('doctor_cards', 'patient_cards', 'nfc_cards')
+            card_uid: NFC card UID
+            when: Scan time (defaults to now)
+        """
+        if source not in USAGE_TABLES or not card_uid:
+            return
+        when = when or datetime.now()
+
+        with self._lock:
+            entry = self._pending.get((source, card_uid))
+            if entry is None:
+                self._pending[(source, card_uid)] = [1, when]
+            else:
+                entry[0] += 1
+                entry[1] = max(entry[1], when)
+            self._pending_events += 1
+            self._counters['recorded'] += 1
+            flush_now = self._pending_events >= self.flush_events
+
+        self._ensure_started()
+        if flush_now:
+            self._wakeup.set()
+
+    def record_card(self, card: Optional[Dict]) -> None:
+        """Record a scan of a card resolved by core.card_resolver"""
+        if card:
+            self.record(card['source'], card['card_uid'])
+
+    # ==================== FLUSHING ====================
+
+    def flush(self) -> int:
+        """
+        Write all pending usage with one bulk UPDATE per card table
+
+        Returns:
+            int: Number of card rows updated
+        """
+        with self._flush_lock:
+            with self._lock:
+                batch, self._pending = self._pending, {}
+                self._pending_events = 0
+            if not batch:
+                return 0
+
+            params: Dict[str, list] = {}
+            for (source, card_uid), (count, when) in batch.items():
+                params.setdefault(source, []).append({'uid': card_uid, 'n': count, 'ts': when})
+
+            db = get_db()
+            try:
+                connection = db.connection()
+                for source, rows in params.items():
+                    connection.execute(_USAGE_UPDATES[source], rows)
+                db.commit()
+            except Exception as e:
+                db.rollback()
+                self._requeue(batch)
+                with self._lock:
+                    self._counters['errors'] += 1
+                print(f"Error flushing card usage: {e}")
+                return 0
+            finally:
+                db.close()
+
+            with self._lock:
+                self._counters['flushes'] += 1
+                self._counters['rows_updated'] += len(batch)
+            return len(batch)
+
+    def _requeue(self, batch: Dict[Tuple[str, str], list]) -> None:
+        """Merge a failed batch back so no scans are lost"""
+        with self._lock:
+            for key, (count, when) in batch.items():
+                entry = self._pending.get(key)
+                if entry is None:
+                    self._pending[key] = [count, when]
+                else:
+                    entry[0] += count
+                    entry[1] = max(entry[1], when)
+                self._pending_events += count
+
+    # ==================== BACKGROUND THREAD ====================
+
+    def _ensure_started(self) -> None:
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name='card-usage-flusher', daemon=True
+                )
+                self._thread.start()
+
+    def _run(self) -> None:
+        while not self._stopping.is_set():
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            self.flush()
+
+    def stop(self) -> None:
+        """Stop the background thread and flush what is left"""
+        self._stopping.set()
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+        self._stopping.clear()
+        self.flush()
+
+    def stats(self) -> Dict:
+        """Counters plus the number of scans still buffered"""
+        with self._lock:
+            stats = dict(self._counters)
+            stats['pending_events'] = self._pending_events
+            stats['pending_cards'] = len(self._pending)
+        return stats
+
+
+# Global instance
+card_usage_buffer = CardUsageBuffer()
+
+# Don't lose buffered scans on a normal shutdown
+atexit.register(card_usage_buffer.stop)
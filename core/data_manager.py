@@ -6,6 +6,7 @@ MySQL Version - Compatible with existing GUI
 from datetime import datetime, date
 from database.database_manager import *
 from core.models import *
+from core.statistics_service import statistics_service
 import json
 
 class DataManager:
@@ -57,16 +58,8 @@ class DataManager:
             return db.query(ImagingResult).count()
     
     def get_dashboard_stats(self):
-        """Get dashboard statistics"""
-        with get_db() as db:
-            return {
-                'total_patients': db.query(Patient).count(),
-                'total_doctors': db.query(Doctor).count(),
-                'total_visits': db.query(Visit).count(),
-                'total_lab_results': db.query(LabResult).count(),
-                'total_imaging': db.query(ImagingResult).count(),
-                'active_cards': db.query(NFCCard).filter(NFCCard.is_active == True).count()
-            }
+        """Get dashboard statistics (from the statistics rollup)"""
+        return statistics_service.get_dashboard_stats()
     
     def get_recent_activity(self, limit=10):
         """Get recent system activity"""
@@ -169,36 +162,8 @@ class DataManager:
             ).order_by(Patient.age).all()
     
     def get_statistics_report(self):
-        """Generate comprehensive statistics report"""
-        with get_db() as db:
-            stats = {
-                'patients': {
-                    'total': db.query(Patient).count(),
-                    'male': db.query(Patient).filter(Patient.gender == 'Male').count(),
-                    'female': db.query(Patient).filter(Patient.gender == 'Female').count(),
-                    'with_nfc': db.query(Patient).filter(Patient.nfc_card_assigned == True).count()
-                },
-                'doctors': {
-                    'total': db.query(Doctor).count()
-                },
-                'medical_records': {
-                    'visits': db.query(Visit).count(),
-                    'lab_results': db.query(LabResult).count(),
-                    'imaging_results': db.query(ImagingResult).count(),
-                    'surgeries': db.query(Surgery).count(),
-                    'hospitalizations': db.query(Hospitalization).count(),
-                    'vaccinations': db.query(Vaccination).count()
-                },
-                'health_data': {
-                    'allergies': db.query(Allergy).count(),
-                    'chronic_diseases': db.query(ChronicDisease).count(),
-                    'current_medications': db.query(CurrentMedication).filter(
-                        CurrentMedication.is_active == True
-                    ).count()
-                }
-            }
-            
-            return stats
+        """Generate comprehensive statistics report (from the statistics rollup)"""
+        return statistics_service.get_statistics_report()
     
     def search_all(self, search_term):
         """Search across patients, doctors, and records"""
@@ -4,7 +4,7 @@ Use THIS file for all database connections
 Compatible with SQLAlchemy 2.0
 """
 
-from sqlalchemy import create_engine, text
+from sqlalchemy import text
 from sqlalchemy.orm import sessionmaker, declarative_base
 from contextlib import contextmanager
 import sys
@@ -12,27 +12,16 @@ from pathlib import Path
 
 # Add config to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
-from config.database_config import DATABASE_CONFIG
+from core.engine_registry import database_url, engine_registry
 
 # Create Base for models
 Base = declarative_base()
 
 # Create database URL
-DATABASE_URL = (
-    f"mysql+mysqlconnector://{DATABASE_CONFIG['user']}:{DATABASE_CONFIG['password']}"
-    f"@{DATABASE_CONFIG['host']}/{DATABASE_CONFIG['database']}"
-    f"?charset={DATABASE_CONFIG['charset']}"
-)
+DATABASE_URL = database_url()
 
-# Create engine
-engine = create_engine(
-    DATABASE_URL,
-    pool_pre_ping=True,
-    pool_recycle=3600,
-    echo=False,  # Set True for SQL logging
-    pool_size=10,
-    max_overflow=20
-)
+# Shared engine - the one pool of this URL in the process (core/engine_registry.py)
+engine = engine_registry.get_engine(DATABASE_URL)
 
 # Create SessionLocal
 SessionLocal = sessionmaker(
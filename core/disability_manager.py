@@ -4,6 +4,7 @@ Location: core/disability_manager.py
 """
 
 from core.database import get_db
+from core.profile_cache import patient_profile_cache
 from core.models import Disability
 from typing import Dict, Optional
 
@@ -21,6 +22,7 @@ class DisabilityManager:
             db.add(disability)
             db.commit()
             db.refresh(disability)
+            patient_profile_cache.invalidate(disability.patient_national_id)
             return disability
     
     def get_disability_info(self, national_id: str) -> Dict:
@@ -0,0 +1,269 @@
+"""
+Engine Registry - One connection pool per database URL
+Every database path in the process (ORM sessions, raw SQL, migrations,
+importers and seeders) gets its engine here, so a process holds exactly
+one pool per server/database instead of one per module
+
+- Pool sizes come from the deployment profile (MEDLINK_DB_PROFILE,
+  see POOL_PROFILES in config/database_config.py)
+- All MySQL URLs use the mysql-connector driver; raw_connection() hands
+  out pooled DBAPI connections, so cursor(dictionary=True) keeps working
+  for code written against mysql.connector
+- Pools record connects, checkouts, checkins, invalidations and the
+  time callers wait for a free connection (stats())
+
+Location: core/engine_registry.py
+"""
+
+import threading
+import time
+from collections import deque
+from typing import Dict, Optional
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool, StaticPool
+
+from config.database_config import DATABASE_CONFIG, DB_POOL_PROFILE, POOL_PROFILES
+
+
+# Wait samples kept per pool for the percentiles in stats()
+WAIT_SAMPLES = 1000
+
+
+def database_url(config: Optional[Dict] = None, use_database: bool = True) -> str:
+    """
+    SQLAlchemy URL of a MySQL configuration
+
+    Args:
+        config: DATABASE_CONFIG-style dict (default: DATABASE_CONFIG)
+        use_database: False for a server-level URL (CREATE DATABASE etc.)
+
+    Returns:
+        str: mysql+mysqlconnector URL
+    """
+    config = config or DATABASE_CONFIG
+    host = config['host'] if not config.get('port') else f"{config['host']}:{config['port']}"
+    database = config['database'] if use_database else ''
+    return (
+        f"mysql+mysqlconnector://{config['user']}:{config['password']}"
+        f"@{host}/{database}?charset={config.get('charset', 'utf8mb4')}"
+    )
+
+
+DEFAULT_URL = database_url()
+
+
+def _percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+class PoolMetrics:
+    """Counters fed by pool events and by MeteredQueuePool waits"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.connects = 0
+        self.checkouts = 0
+        self.checkins = 0
+        self.invalidated = 0
+        self.timeouts = 0
+        self.waits = deque(maxlen=WAIT_SAMPLES)
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def attach(self, pool) -> None:
+        event.listen(pool, 'connect', self._on_connect)
+        event.listen(pool, 'checkout', self._on_checkout)
+        event.listen(pool, 'checkin', self._on_checkin)
+        event.listen(pool, 'invalidate', self._on_invalidate)
+
+    def _on_connect(self, dbapi_connection, connection_record):
+        with self._lock:
+            self.connects += 1
+
+    def _on_checkout(self, dbapi_connection, connection_record, connection_proxy):
+        with self._lock:
+            self.checkouts += 1
+
+    def _on_checkin(self, dbapi_connection, connection_record):
+        with self._lock:
+            self.checkins += 1
+
+    def _on_invalidate(self, dbapi_connection, connection_record, exception):
+        with self._lock:
+            self.invalidated += 1
+
+    def record_wait(self, seconds: float, timed_out: bool = False) -> None:
+        with self._lock:
+            self.waits.append(seconds)
+            self.wait_total += seconds
+            self.wait_max = max(self.wait_max, seconds)
+            if timed_out:
+                self.timeouts += 1
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            waits = sorted(self.waits)
+            return {
+                'connects': self.connects,
+                'checkouts': self.checkouts,
+                'checkins': self.checkins,
+                'invalidated': self.invalidated,
+                'timeouts': self.timeouts,
+                'wait_total_ms': self.wait_total * 1000,
+                'wait_max_ms': self.wait_max * 1000,
+                'wait_p50_ms': _percentile(waits, 50) * 1000,
+                'wait_p99_ms': _percentile(waits, 99) * 1000,
+            }
+
+
+class MeteredQueuePool(QueuePool):
+    """QueuePool that times how long each checkout waits for a connection"""
+
+    metrics: Optional[PoolMetrics] = None
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            if self.metrics is not None:
+                self.metrics.record_wait(time.perf_counter() - started, timed_out=True)
+            raise
+        if self.metrics is not None:
+            self.metrics.record_wait(time.perf_counter() - started)
+        return connection
+
+    def recreate(self):
+        # engine.dispose() builds a fresh pool - keep counting into the same metrics
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+
+class EngineRegistry:
+    """Process-wide engines, one per database URL"""
+
+    def __init__(self, profile: str = DB_POOL_PROFILE, profiles: Optional[Dict] = None):
+        """
+        Args:
+            profile: Deployment profile name
+            profiles: Profile name -> pool settings (default: POOL_PROFILES)
+        """
+        self.profiles = profiles or POOL_PROFILES
+        if profile not in self.profiles:
+            raise ValueError(f"Unknown database pool profile: {profile}")
+        self.profile = profile
+        self._engines: Dict[str, object] = {}
+        self._metrics: Dict[str, PoolMetrics] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(url) -> str:
+        return make_url(url).render_as_string(hide_password=False)
+
+    def _create(self, url):
+        """Build an engine with the profile's pool settings"""
+        parsed = make_url(url)
+        if parsed.get_backend_name() == 'sqlite':
+            if parsed.database in (None, '', ':memory:'):
+                # One shared connection, or every checkout sees an empty database
+                return create_engine(url, poolclass=StaticPool,
+                                     connect_args={'check_same_thread': False})
+            return create_engine(url, poolclass=MeteredQueuePool,
+                                 connect_args={'check_same_thread': False},
+                                 **self.profiles[self.profile])
+
+        return create_engine(
+            url,
+            poolclass=MeteredQueuePool,
+            pool_pre_ping=True,
+            pool_recycle=3600,
+            echo=False,  # Set True for SQL logging
+            **self.profiles[self.profile]
+        )
+
+    def get_engine(self, url: Optional[str] = None):
+        """
+        Shared engine of a database URL (created on first use)
+
+        Args:
+            url: SQLAlchemy URL (default: the configured MySQL database)
+
+        Returns:
+            Engine: The one engine of this URL in the process
+        """
+        key = self._key(url or DEFAULT_URL)
+        engine = self._engines.get(key)
+        if engine is not None:
+            return engine
+        with self._lock:
+            engine = self._engines.get(key)
+            if engine is None:
+                engine = self._create(key)
+                metrics = PoolMetrics()
+                metrics.attach(engine.pool)
+                if isinstance(engine.pool, MeteredQueuePool):
+                    engine.pool.metrics = metrics
+                self._engines[key] = engine
+                self._metrics[key] = metrics
+        return engine
+
+    def raw_connection(self, url: Optional[str] = None):
+        """
+        Pooled DBAPI connection (close() returns it to the pool)
+
+        Args:
+            url: SQLAlchemy URL (default: the configured MySQL database)
+
+        Returns:
+            Pooled DBAPI connection proxy
+        """
+        return self.get_engine(url).raw_connection()
+
+    def dispose(self, url: Optional[str] = None) -> None:
+        """Close the pooled connections of one URL (or of every URL)"""
+        with self._lock:
+            keys = list(self._engines) if url is None else [self._key(url)]
+            for key in keys:
+                engine = self._engines.get(key)
+                if engine is not None:
+                    engine.dispose()
+
+    def stats(self) -> Dict:
+        """Pool size, usage and checkout/wait metrics per URL (passwords masked)"""
+        with self._lock:
+            items = list(self._engines.items())
+        stats = {}
+        for key, engine in items:
+            pool = engine.pool
+            entry = {'profile': self.profile, 'pool': type(pool).__name__}
+            if isinstance(pool, QueuePool):
+                entry.update({
+                    'pool_size': pool.size(),
+                    'checked_out': pool.checkedout(),
+                    'overflow': max(0, pool.overflow()),
+                    'idle': pool.checkedin(),
+                })
+            entry.update(self._metrics[key].snapshot())
+            stats[make_url(key).render_as_string(hide_password=True)] = entry
+        return stats
+
+
+# Global instance
+engine_registry = EngineRegistry()
+
+
+def get_engine(url: Optional[str] = None):
+    """Shared engine of a database URL (see EngineRegistry.get_engine)"""
+    return engine_registry.get_engine(url)
+
+
+def raw_connection(url: Optional[str] = None):
+    """Pooled DBAPI connection (see EngineRegistry.raw_connection)"""
+    return engine_registry.raw_connection(url)
@@ -4,6 +4,7 @@ Location: core/family_history_manager.py
 """
 
 from core.database import get_db
+from core.profile_cache import patient_profile_cache
 from core.models import FamilyHistory
 from typing import List, Dict, Optional
 
@@ -21,6 +22,7 @@ class FamilyHistoryManager:
             db.add(family)
             db.commit()
             db.refresh(family)
+            patient_profile_cache.invalidate(family.patient_national_id)
             return family
     
     def get_family_history(self, national_id: str) -> Dict:
@@ -5,9 +5,20 @@ MySQL Version - Compatible with existing GUI
 
 from datetime import datetime
 from core.database import get_db
-from core.models import Doctor, User, HardwareAuditLog
+from core.models import Doctor, User, EventType
+from core.audit_sink import audit_sink
+from core.audit_query import audit_query
 import uuid
 
+# Audit rows of the R307 sensor are tagged with this device_id
+FINGERPRINT_DEVICE_ID = 'R307'
+
+# Fingerprint events -> HardwareAuditLog.event_type (detail kept in event_metadata)
+FINGERPRINT_EVENT_TYPES = {
+    'authentication_success': EventType.fingerprint_login,
+    'authentication_failed': EventType.failed_login,
+}
+
 class FingerprintManager:
     """Manage fingerprint biometric authentication for doctors"""
     
@@ -185,44 +196,29 @@ class FingerprintManager:
             } for d in doctors]
     
     def _log_fingerprint_event(self, user_id, event_type, success, fingerprint_id=None):
-        """Log fingerprint event to audit log"""
-        with get_db() as db:
-            log = HardwareAuditLog(
-                event_id=f"FP-{uuid.uuid4().hex[:12]}",
-                timestamp=datetime.now(),
-                event_type=f"fingerprint_{event_type}",
-                user_id=user_id,
-                fingerprint_id=fingerprint_id,
-                accessed_by=user_id,
-                access_type='fingerprint',
-                success=success
-            )
-            db.add(log)
-            db.commit()
+        """Queue fingerprint event for the audit log (written in batches by core.audit_sink)"""
+        audit_sink.log({
+            'event_type': FINGERPRINT_EVENT_TYPES.get(event_type, EventType.other),
+            'user_id': user_id,
+            'user_type': 'doctor',
+            'device_id': FINGERPRINT_DEVICE_ID,
+            'fingerprint_id': fingerprint_id,
+            'success': success,
+            'timestamp': datetime.now(),
+            'event_metadata': {
+                'event': f"fingerprint_{event_type}",
+                'event_id': f"FP-{uuid.uuid4().hex[:12]}",
+                'access_type': 'fingerprint'
+            }
+        })
     
     def get_fingerprint_logs(self, user_id=None, limit=50):
         """Get fingerprint authentication logs"""
-        with get_db() as db:
-            query = db.query(HardwareAuditLog).filter(
-                HardwareAuditLog.event_type.like('fingerprint_%')
-            )
-            
-            if user_id:
-                query = query.filter(HardwareAuditLog.user_id == user_id)
-            
-            return query.order_by(
-                HardwareAuditLog.timestamp.desc()
-            ).limit(limit).all()
+        return audit_query.events(limit=limit, device_id=FINGERPRINT_DEVICE_ID, user_id=user_id)
     
     def get_failed_attempts(self, limit=20):
         """Get recent failed fingerprint attempts"""
-        with get_db() as db:
-            return db.query(HardwareAuditLog).filter(
-                HardwareAuditLog.event_type == 'fingerprint_authentication_failed',
-                HardwareAuditLog.success == False
-            ).order_by(
-                HardwareAuditLog.timestamp.desc()
-            ).limit(limit).all()
+        return audit_query.failed_attempts(device_id=FINGERPRINT_DEVICE_ID, limit=limit)
 
 # Global instance
 fingerprint_manager = FingerprintManager()
\ No newline at end of file
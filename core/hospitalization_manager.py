@@ -4,6 +4,7 @@ Location: core/hospitalization_manager.py
 """
 
 from core.database import get_db
+from core.profile_cache import patient_profile_cache
 from core.models import Hospitalization
 from sqlalchemy import desc
 from typing import List, Dict, Optional
@@ -23,6 +24,7 @@ class HospitalizationManager:
             db.add(hosp)
             db.commit()
             db.refresh(hosp)
+            patient_profile_cache.invalidate(hosp.patient_national_id)
             return hosp
     
     def get_patient_hospitalizations(self, national_id: str) -> List[Dict]:
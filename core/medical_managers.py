@@ -4,7 +4,9 @@ Visit, Lab Results, Imaging, and NFC Card Managers
 
 from datetime import datetime, date
 from database.database_manager import DatabaseManager
-from core.models import Visit, Prescription, LabResult, ImagingResult, NFCCard, HardwareAuditLog
+from core.models import Visit, Prescription, LabResult, ImagingResult, NFCCard
+from core.audit_sink import audit_sink
+from core.audit_query import audit_query
 
 # ============================================================================
 # VISIT MANAGER
@@ -338,33 +340,20 @@ class HardwareAuditManager:
     """Manage hardware audit logs"""
     
     def log_event(self, event_data: dict):
-        """Log hardware event"""
-        with get_db() as db:
-            log = HardwareAuditLog(**event_data)
-            db.add(log)
-            db.commit()
-            return log
+        """Queue hardware event (bulk-written in the background by core.audit_sink)"""
+        return audit_sink.log(event_data)
     
     def get_logs(self, limit=100):
         """Get recent logs"""
-        with get_db() as db:
-            return db.query(HardwareAuditLog).order_by(
-                HardwareAuditLog.timestamp.desc()
-            ).limit(limit).all()
+        return audit_query.events(limit=limit)
     
     def get_user_logs(self, user_id: str, limit=50):
         """Get logs for specific user"""
-        with get_db() as db:
-            return db.query(HardwareAuditLog).filter(
-                HardwareAuditLog.user_id == user_id
-            ).order_by(HardwareAuditLog.timestamp.desc()).limit(limit).all()
+        return audit_query.user_history(user_id, limit=limit)['items']
     
     def get_patient_access_logs(self, national_id: str, limit=50):
         """Get access logs for specific patient"""
-        with get_db() as db:
-            return db.query(HardwareAuditLog).filter(
-                HardwareAuditLog.patient_national_id == national_id
-            ).order_by(HardwareAuditLog.timestamp.desc()).limit(limit).all()
+        return audit_query.patient_access_history(national_id, limit=limit)['items']
 
 # Global instances
 visit_manager = VisitManager()
@@ -151,6 +151,8 @@ class Doctor(Base):
 class Patient(Base):
     """Patient model with complete medical information"""
     __tablename__ = 'patients'
+    # Recent-patients keyset pages order by (created_at DESC, id DESC)
+    __table_args__ = (Index('ix_patients_created_at_id', 'created_at', 'id'),)
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     national_id = Column(String(14), unique=True, nullable=False, index=True)
@@ -182,8 +184,9 @@ class Patient(Base):
     nfc_scan_count = Column(Integer, default=0)
 
     # System fields
-    created_at = Column(DateTime, default=func.now())
-    last_updated = Column(DateTime, default=func.now(), onupdate=func.now())
+    # Python-side defaults: bound the same way as cursor values on every backend
+    created_at = Column(DateTime, default=datetime.now)
+    last_updated = Column(DateTime, default=datetime.now, onupdate=datetime.now)
 
     # Relationships
     allergies = relationship("Allergy", back_populates="patient", cascade="all, delete-orphan")
@@ -211,6 +214,7 @@ class Patient(Base):
 class Allergy(Base):
     """Patient allergies"""
     __tablename__ = 'allergies'
+    __table_args__ = (Index('ix_allergies_patient_date', 'patient_national_id', 'date_identified'),)
     
     id = Column(Integer, primary_key=True, autoincrement=True)
     patient_national_id = Column(String(14), ForeignKey('patients.national_id'), nullable=False)
@@ -233,6 +237,7 @@ class Allergy(Base):
 class ChronicDisease(Base):
     """Patient chronic diseases"""
     __tablename__ = 'chronic_diseases'
+    __table_args__ = (Index('ix_chronic_diseases_patient_date', 'patient_national_id', 'date_diagnosed'),)
     
     id = Column(Integer, primary_key=True, autoincrement=True)
     patient_national_id = Column(String(14), ForeignKey('patients.national_id'), nullable=False)
@@ -257,6 +262,7 @@ class ChronicDisease(Base):
 class CurrentMedication(Base):
     """Patient current medications"""
     __tablename__ = 'current_medications'
+    __table_args__ = (Index('ix_current_medications_patient_date', 'patient_national_id', 'start_date'),)
     
     id = Column(Integer, primary_key=True, autoincrement=True)
     patient_national_id = Column(String(14), ForeignKey('patients.national_id'), nullable=False)
@@ -285,6 +291,7 @@ class CurrentMedication(Base):
 class Surgery(Base):
     """Surgical procedures"""
     __tablename__ = 'surgeries'
+    __table_args__ = (Index('ix_surgeries_patient_date', 'patient_national_id', 'surgery_date'),)
     
     id = Column(Integer, primary_key=True, autoincrement=True)
     patient_national_id = Column(String(14), ForeignKey('patients.national_id'), nullable=False)
@@ -314,6 +321,7 @@ class Surgery(Base):
 class Hospitalization(Base):
     """Hospital admissions"""
     __tablename__ = 'hospitalizations'
+    __table_args__ = (Index('ix_hospitalizations_patient_date', 'patient_national_id', 'admission_date'),)
     
     id = Column(Integer, primary_key=True, autoincrement=True)
     patient_national_id = Column(String(14), ForeignKey('patients.national_id'), nullable=False)
@@ -346,6 +354,7 @@ class Hospitalization(Base):
 class Vaccination(Base):
     """Vaccination records"""
     __tablename__ = 'vaccinations'
+    __table_args__ = (Index('ix_vaccinations_patient_date', 'patient_national_id', 'date_administered'),)
     
     id = Column(Integer, primary_key=True, autoincrement=True)
     patient_national_id = Column(String(14), ForeignKey('patients.national_id'), nullable=False)
@@ -375,6 +384,7 @@ class Vaccination(Base):
 class FamilyHistory(Base):
     """Family medical history"""
     __tablename__ = 'family_history'
+    __table_args__ = (Index('ix_family_history_patient', 'patient_national_id'),)
     
     id = Column(Integer, primary_key=True, autoincrement=True)
     patient_national_id = Column(String(14), ForeignKey('patients.national_id'), nullable=False)
@@ -401,6 +411,7 @@ class FamilyHistory(Base):
 class Disability(Base):
     """Disability and special needs"""
     __tablename__ = 'disabilities'
+    __table_args__ = (Index('ix_disabilities_patient_date', 'patient_national_id', 'date_diagnosed'),)
     
     id = Column(Integer, primary_key=True, autoincrement=True)
     patient_national_id = Column(String(14), ForeignKey('patients.national_id'), nullable=False)
@@ -431,6 +442,7 @@ class Disability(Base):
 class EmergencyDirective(Base):
     """Emergency directives and advance care planning"""
     __tablename__ = 'emergency_directives'
+    __table_args__ = (Index('ix_emergency_directives_patient', 'patient_national_id'),)
     
     id = Column(Integer, primary_key=True, autoincrement=True)
     patient_national_id = Column(String(14), ForeignKey('patients.national_id'), nullable=False)
@@ -520,6 +532,8 @@ class Insurance(Base):
 class Visit(Base):
     """Medical visits"""
     __tablename__ = 'visits'
+    # Covers the full ORDER BY visit_date DESC, visit_time DESC of the history queries
+    __table_args__ = (Index('ix_visits_patient_date', 'patient_national_id', 'visit_date', 'visit_time'),)
     
     id = Column(Integer, primary_key=True, autoincrement=True)
     visit_id = Column(String(50), unique=True)
@@ -605,6 +619,7 @@ class VitalSign(Base):
 class LabResult(Base):
     """Laboratory test results"""
     __tablename__ = 'lab_results'
+    __table_args__ = (Index('ix_lab_results_patient_date', 'patient_national_id', 'test_date'),)
     
     id = Column(Integer, primary_key=True, autoincrement=True)
     patient_national_id = Column(String(14), ForeignKey('patients.national_id'), nullable=False)
@@ -634,6 +649,7 @@ class LabResult(Base):
 class ImagingResult(Base):
     """Imaging/radiology results"""
     __tablename__ = 'imaging_results'
+    __table_args__ = (Index('ix_imaging_results_patient_date', 'patient_national_id', 'imaging_date'),)
     
     id = Column(Integer, primary_key=True, autoincrement=True)
     patient_national_id = Column(String(14), ForeignKey('patients.national_id'), nullable=False)
@@ -707,6 +723,7 @@ class DoctorCard(Base):
 class PatientCard(Base):
     """Patient NFC cards"""
     __tablename__ = 'patient_cards'
+    __table_args__ = (Index('ix_patient_cards_patient', 'patient_national_id'),)
     
     id = Column(Integer, primary_key=True, autoincrement=True)
     card_uid = Column(String(50), unique=True, nullable=False, index=True)
@@ -739,6 +756,7 @@ class HardwareAuditLog(Base):
     event_type = Column(Enum(EventType), nullable=False)
     user_id = Column(String(50))
     user_type = Column(String(20))  # doctor, patient
+    patient_national_id = Column(String(14))  # patient whose record/card was accessed
     device_id = Column(String(100))
     card_uid = Column(String(50))
     fingerprint_id = Column(String(100))
@@ -749,5 +767,29 @@ class HardwareAuditLog(Base):
     event_metadata = Column(JSON)  # Additional event data (renamed from 'metadata' - reserved word)
     timestamp = Column(DateTime, default=func.now(), index=True)
     
+    # One (filter, timestamp) index per access pattern of core.audit_query:
+    # equality prefix + time range, newest-first scans without a sort.
+    # On MySQL the table is RANGE-partitioned by month
+    # (database/migrations/partition_audit_log.py)
+    __table_args__ = (
+        Index('ix_hw_audit_user_time', 'user_id', 'timestamp'),
+        Index('ix_hw_audit_patient_time', 'patient_national_id', 'timestamp'),
+        Index('ix_hw_audit_type_success_time', 'event_type', 'success', 'timestamp'),
+        Index('ix_hw_audit_device_type_time', 'device_id', 'event_type', 'timestamp'),
+    )
+    
+    def __repr__(self):
+        return f"<HardwareAuditLog(event='{self.event_type.value}', user='{self.user_id}')>"
+
+# ==================== STATISTICS ROLLUP ====================
+
+class StatisticsRollup(Base):
+    """Pre-aggregated dashboard counters (maintained by core.statistics_service)"""
+    __tablename__ = 'statistics_rollup'
+    
+    metric = Column(String(100), primary_key=True)
+    value = Column(Float, nullable=False, default=0)
+    updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
+    
     def __repr__(self):
-        return f"<HardwareAuditLog(event='{self.event_type.value}', user='{self.user_id}')>"
\ No newline at end of file
+        return f"<StatisticsRollup(metric='{self.metric}', value={self.value})>"
@@ -5,7 +5,7 @@ Handles NFC card authentication and operations
 
 from core.database import get_db
 from core.models import DoctorCard, PatientCard, User, Patient
-from datetime import datetime
+from core.card_usage import card_usage_buffer
 
 
 class CardManager:
@@ -37,9 +37,8 @@ class CardManager:
                 # Get associated user
                 user = db.query(User).filter_by(user_id=doctor_card.user_id).first()
                 
-                # Update last used
-                doctor_card.last_used = datetime.now()
-                db.commit()
+                # Usage is written behind - no commit on the read path
+                card_usage_buffer.record('doctor_cards', doctor_card.card_uid)
                 
                 return {
                     'card_type': 'doctor',
@@ -63,9 +62,8 @@ class CardManager:
                     national_id=patient_card.national_id
                 ).first()
                 
-                # Update last used
-                patient_card.last_used = datetime.now()
-                db.commit()
+                # Usage is written behind - no commit on the read path
+                card_usage_buffer.record('patient_cards', patient_card.card_uid)
                 
                 return {
                     'card_type': 'patient',
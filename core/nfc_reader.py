@@ -0,0 +1,380 @@
+"""
+NFC Reader Driver - Background serial reader for the R20C NFC reader
+Reads UID frames from the serial port on a daemon thread and pushes
+debounced scan events onto a queue that the GUI drains from its main
+loop, so card reads no longer depend on window focus or per-keystroke
+Tk events (keyboard-wedge mode keeps working alongside it)
+
+- Frames are ASCII UIDs terminated by CR/LF (STX/ETX framing is also
+  accepted); a frame without terminator is completed after an idle gap
+- A card held on the reader repeats its UID; repeats within the
+  debounce window are dropped
+- Each event carries perf_counter timestamps so scan-to-event and
+  scan-to-handler latency can be measured (see stats())
+- Uses pyserial when installed, otherwise a termios port on POSIX
+
+Location: core/nfc_reader.py
+"""
+
+import os
+import queue
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from typing import Callable, Dict, Optional
+
+from config.hardware_config import NFC_CONFIG
+
+# Try to import pyserial (real COM ports), fallback to termios on POSIX
+try:
+    import serial
+    USE_PYSERIAL = True
+except ImportError:
+    USE_PYSERIAL = False
+
+
+# Frame bytes
+STX = 0x02
+ETX = 0x03
+TERMINATORS = {0x0A, 0x0D, ETX}
+
+# Shorter frames are treated as line noise
+MIN_UID_LENGTH = 4
+
+# Latency samples kept for percentiles
+LATENCY_SAMPLES = 1000
+
+
+# ==================== SERIAL PORTS ====================
+
+class PosixSerialPort:
+    """Minimal raw tty port (used when pyserial is not installed)"""
+
+    def __init__(self, port: str, baudrate: int = 9600, timeout: float = 0.1):
+        import termios
+        import tty
+
+        self.timeout = timeout
+        self._fd = os.open(port, os.O_RDWR | os.O_NOCTTY | os.O_NONBLOCK)
+        try:
+            # TCSANOW: keep bytes that arrived before the port was opened
+            tty.setraw(self._fd, termios.TCSANOW)
+            speed = getattr(termios, f'B{baudrate}', None)
+            if speed is not None:
+                attrs = termios.tcgetattr(self._fd)
+                attrs[4] = attrs[5] = speed
+                termios.tcsetattr(self._fd, termios.TCSANOW, attrs)
+        except termios.error:
+            # Not a real serial line (e.g. a pty) - speed does not apply
+            pass
+
+    def read(self, size: int = 1) -> bytes:
+        import select
+
+        ready, _, _ = select.select([self._fd], [], [], self.timeout)
+        if not ready:
+            return b''
+        data = os.read(self._fd, max(size, 256))
+        if not data:
+            raise OSError("Serial device disconnected")
+        return data
+
+    def close(self) -> None:
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+
+def open_serial_port(port: str, baudrate: int, timeout: float):
+    """
+    Open a serial port for reading
+
+    Args:
+        port: Device name ('COM4', '/dev/ttyUSB0', a pty path)
+        baudrate: Line speed
+        timeout: Read timeout in seconds
+
+    Returns:
+        Port object with read(size) and close()
+    """
+    if USE_PYSERIAL:
+        return serial.Serial(port, baudrate=baudrate, timeout=timeout)
+    if os.name == 'posix':
+        return PosixSerialPort(port, baudrate, timeout)
+    raise RuntimeError("pyserial is required for the NFC serial reader on this platform")
+
+
+def _read_chunk(port) -> bytes:
+    """Read whatever is buffered (at least one byte or a timeout)"""
+    waiting = getattr(port, 'in_waiting', 0)
+    return port.read(waiting or 1)
+
+
+# ==================== READER ====================
+
+class NFCSerialReader:
+    """Threaded serial reader producing debounced card scan events"""
+
+    def __init__(self, port: str, baudrate: int = 9600, timeout: float = 2,
+                 debounce_seconds: float = 1.5, idle_frame_seconds: float = 0.2,
+                 reconnect_seconds: float = 3.0, max_queue: int = 100,
+                 opener: Callable = open_serial_port):
+        """
+        Args:
+            port: Serial device name
+            baudrate: Line speed
+            timeout: Upper bound for one blocking read (seconds)
+            debounce_seconds: Repeats of the same UID inside this window are dropped
+            idle_frame_seconds: Complete an unterminated frame after this gap
+            reconnect_seconds: Delay before reopening a failed port
+            max_queue: Events kept for the consumer before new ones are dropped
+            opener: Port factory (tests inject their own)
+        """
+        self.port_name = port
+        self.baudrate = baudrate
+        # Short reads keep the idle-frame check and stop() responsive
+        self.read_timeout = min(timeout, idle_frame_seconds / 2)
+        self.debounce_seconds = debounce_seconds
+        self.idle_frame_seconds = idle_frame_seconds
+        self.reconnect_seconds = reconnect_seconds
+        self.opener = opener
+
+        self.events: "queue.Queue[Dict]" = queue.Queue(maxsize=max_queue)
+
+        self._port = None
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = threading.Event()
+        self._lock = threading.Lock()
+
+        self._frame = bytearray()
+        self._frame_started: Optional[float] = None
+        self._last_uid: Optional[str] = None
+        self._last_seen = 0.0
+
+        self._scan_latency = deque(maxlen=LATENCY_SAMPLES)
+        self._delivery_latency = deque(maxlen=LATENCY_SAMPLES)
+        self._counters = {
+            'frames': 0,
+            'events': 0,
+            'debounced': 0,
+            'dropped': 0,
+            'noise': 0,
+            'port_errors': 0,
+        }
+
+    @classmethod
+    def from_config(cls, config: Dict = NFC_CONFIG) -> 'NFCSerialReader':
+        """Build a reader from config.hardware_config.NFC_CONFIG"""
+        return cls(
+            port=config['port'],
+            baudrate=config.get('baudrate', 9600),
+            timeout=config.get('timeout', 2),
+            debounce_seconds=config.get('debounce', 1.5),
+        )
+
+    # ==================== LIFECYCLE ====================
+
+    @property
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    @property
+    def is_connected(self) -> bool:
+        return self._port is not None
+
+    def start(self) -> None:
+        """Start the background reader thread (idempotent)"""
+        with self._lock:
+            if self.is_running:
+                return
+            self._stopping.clear()
+            self._thread = threading.Thread(target=self._run, name='nfc-serial-reader', daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the thread and close the port"""
+        self._stopping.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+        self._close_port()
+
+    def _close_port(self) -> None:
+        if self._port is not None:
+            try:
+                self._port.close()
+            except Exception:
+                pass
+            self._port = None
+
+    def _run(self) -> None:
+        while not self._stopping.is_set():
+            if self._port is None:
+                try:
+                    self._port = self.opener(self.port_name, self.baudrate, self.read_timeout)
+                except Exception:
+                    self._counters['port_errors'] += 1
+                    self._stopping.wait(self.reconnect_seconds)
+                    continue
+
+            try:
+                chunk = _read_chunk(self._port)
+            except Exception:
+                # Unplugged / device error - reopen after a pause
+                self._counters['port_errors'] += 1
+                self._close_port()
+                self._stopping.wait(self.reconnect_seconds)
+                continue
+
+            self.feed(chunk)
+
+    # ==================== FRAMING ====================
+
+    def feed(self, data: bytes, now: Optional[float] = None) -> None:
+        """
+        Process raw bytes from the port (also usable without a thread)
+
+        Args:
+            data: Bytes read from the device (b'' on a read timeout)
+            now: perf_counter timestamp of the read
+        """
+        now = time.perf_counter() if now is None else now
+
+        if not data:
+            # Idle gap: complete an unterminated frame
+            if self._frame and now - self._frame_started >= self.idle_frame_seconds:
+                self._complete_frame(now)
+            return
+
+        for byte in data:
+            if byte in TERMINATORS:
+                if self._frame:
+                    self._complete_frame(now)
+            elif byte == STX:
+                self._frame.clear()
+                self._frame_started = None
+            else:
+                if not self._frame:
+                    self._frame_started = now
+                self._frame.append(byte)
+
+    def _complete_frame(self, now: float) -> None:
+        uid = self._frame.decode('ascii', errors='ignore').strip()
+        first_byte_at = self._frame_started
+        self._frame.clear()
+        self._frame_started = None
+        self._counters['frames'] += 1
+
+        if len(uid) < MIN_UID_LENGTH:
+            self._counters['noise'] += 1
+            return
+
+        # Debounce: a held card keeps extending its own window
+        repeat = uid == self._last_uid and now - self._last_seen < self.debounce_seconds
+        self._last_uid, self._last_seen = uid, now
+        if repeat:
+            self._counters['debounced'] += 1
+            return
+
+        queued_at = time.perf_counter()
+        event = {
+            'card_uid': uid,
+            'scanned_at': datetime.now(),
+            'first_byte_at': first_byte_at,
+            'queued_at': queued_at,
+        }
+        try:
+            self.events.put_nowait(event)
+        except queue.Full:
+            self._counters['dropped'] += 1
+            return
+
+        self._counters['events'] += 1
+        self._scan_latency.append(queued_at - first_byte_at)
+
+    # ==================== CONSUMER ====================
+
+    def get_event(self, timeout: Optional[float] = None) -> Optional[Dict]:
+        """
+        Take the next scan event
+
+        Args:
+            timeout: Seconds to wait (None = don't wait)
+
+        Returns:
+            dict: card_uid, scanned_at, first_byte_at, queued_at - or None
+        """
+        try:
+            if timeout is None:
+                event = self.events.get_nowait()
+            else:
+                event = self.events.get(timeout=timeout)
+        except queue.Empty:
+            return None
+        self._delivery_latency.append(time.perf_counter() - event['first_byte_at'])
+        return event
+
+    def stats(self) -> Dict:
+        """Counters plus scan-to-event / scan-to-consumer latency (ms)"""
+        stats = dict(self._counters)
+        stats['connected'] = self.is_connected
+        stats['queued'] = self.events.qsize()
+        for name, samples in (('scan_to_event', self._scan_latency),
+                              ('scan_to_consumer', self._delivery_latency)):
+            ordered = sorted(samples)
+            if ordered:
+                stats[f'{name}_p50_ms'] = ordered[len(ordered) // 2] * 1000
+                stats[f'{name}_p99_ms'] = ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))] * 1000
+            else:
+                stats[f'{name}_p50_ms'] = stats[f'{name}_p99_ms'] = None
+        return stats
+
+
+# Global instance (started by the GUI when NFC_CONFIG['mode'] == 'serial')
+nfc_reader = NFCSerialReader.from_config(NFC_CONFIG)
+
+
+def start_nfc_reader() -> Optional[NFCSerialReader]:
+    """Start the shared reader if the serial mode is configured"""
+    if not NFC_CONFIG.get('enabled') or NFC_CONFIG.get('mode') != 'serial':
+        return None
+    nfc_reader.start()
+    return nfc_reader
+
+
+# ==================== TK INTEGRATION ====================
+
+def pump_card_events(window, handler: Callable[[str], None], interval_ms: int = 50) -> None:
+    """
+    Deliver serial scans to a Tk window from its own main loop
+
+    Only a visible window consumes events, so a withdrawn login window
+    does not steal scans from the dashboard opened on top of it.
+
+    Args:
+        window: Tk/CTk window
+        handler: Called with the card UID (e.g. window.process_card)
+        interval_ms: Queue polling interval
+    """
+    reader = start_nfc_reader()
+    if reader is None:
+        return
+
+    def poll():
+        try:
+            if not window.winfo_exists():
+                return
+            if window.winfo_viewable() and getattr(window, 'card_reading_active', True):
+                event = reader.get_event()
+                if event is not None:
+                    handler(event['card_uid'])
+        except Exception as e:
+            print(f"NFC reader event error: {e}")
+        try:
+            window.after(interval_ms, poll)
+        except Exception:
+            # Window destroyed while handling the scan
+            pass
+
+    window.after(interval_ms, poll)
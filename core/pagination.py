@@ -0,0 +1,118 @@
+"""
+Keyset (cursor) pagination helpers
+Opaque continuation tokens plus seek predicates for ORDER BY keys,
+so page N costs the same as page 1 and pages never skip or repeat rows
+
+Location: core/pagination.py
+"""
+
+import base64
+import json
+from datetime import date, datetime
+from typing import Any, List, Optional, Sequence
+
+from sqlalchemy import and_, or_
+
+
+CURSOR_VERSION = 1
+
+
+def _encode_value(value: Any):
+    """Make a key value JSON-safe, keeping date/datetime types"""
+    if isinstance(value, datetime):
+        return {'dt': value.isoformat()}
+    if isinstance(value, date):
+        return {'d': value.isoformat()}
+    return value
+
+
+def _decode_value(value: Any):
+    if isinstance(value, dict):
+        if 'dt' in value:
+            return datetime.fromisoformat(value['dt'])
+        if 'd' in value:
+            return date.fromisoformat(value['d'])
+    return value
+
+
+def encode_cursor(scope: str, key: Sequence[Any]) -> str:
+    """
+    Build an opaque continuation token
+
+    Args:
+        scope: Identifies the listing the cursor belongs to (e.g. 'all')
+        key: Sort-key values of the last row on the current page
+
+    Returns:
+        str: URL-safe token
+    """
+    payload = {
+        'v': CURSOR_VERSION,
+        's': scope,
+        'k': [_encode_value(v) for v in key],
+    }
+    raw = json.dumps(payload, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(token: Optional[str], scope: str) -> Optional[List[Any]]:
+    """
+    Decode a continuation token produced by encode_cursor()
+
+    Args:
+        token: Token from a previous page (None/'' for the first page)
+        scope: Scope the caller expects the token to belong to
+
+    Returns:
+        List: Sort-key values, or None for the first page
+
+    Raises:
+        ValueError: Token is malformed or belongs to another listing
+    """
+    if not token:
+        return None
+
+    try:
+        raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+        payload = json.loads(raw.decode('utf-8'))
+        version, token_scope, key = payload['v'], payload['s'], payload['k']
+    except (ValueError, KeyError, TypeError) as e:
+        raise ValueError(f"Invalid pagination cursor: {e}")
+
+    if version != CURSOR_VERSION or token_scope != scope:
+        raise ValueError("Pagination cursor does not match this listing")
+
+    return [_decode_value(v) for v in key]
+
+
+def seek_after(columns: Sequence, key: Sequence[Any], descending: bool = False):
+    """
+    Build the WHERE predicate for rows strictly after `key`
+
+    Expands (a, b) > (x, y) into a > x OR (a = x AND b > y), which every
+    backend can satisfy from a composite/secondary index range scan.
+
+    Args:
+        columns: ORDER BY columns, most significant first
+        key: Values of those columns for the last row seen
+        descending: True when the listing is ordered DESC
+
+    Returns:
+        SQLAlchemy boolean clause
+    """
+    clauses = []
+    for i, column in enumerate(columns):
+        step = column < key[i] if descending else column > key[i]
+        equal_prefix = [columns[j] == key[j] for j in range(i)]
+        clauses.append(and_(*equal_prefix, step) if equal_prefix else step)
+    return or_(*clauses)
+
+
+def build_page(items: list, has_more: bool, next_cursor: Optional[str]) -> dict:
+    """Standard page envelope returned by *_page() listing methods"""
+    return {
+        'items': items,
+        'count': len(items),
+        'has_more': has_more,
+        'next_cursor': next_cursor if has_more else None,
+    }
@@ -4,6 +4,7 @@ Location: core/patient_manager.py (REPLACE YOUR FILE)
 """
 
 from core.database import get_db
+from core.profile_cache import patient_profile_cache
 from core.models import User, Patient, Surgery, Hospitalization, Vaccination, CurrentMedication
 from datetime import datetime
 
@@ -142,6 +143,8 @@ class PatientManager:
             patient.last_updated = datetime.now()
             db.commit()
             db.refresh(patient)
+            # last_updated alone can collide within one second on MySQL
+            patient_profile_cache.invalidate(national_id)
             
             return self._patient_to_dict(patient)
         except Exception as e:
@@ -0,0 +1,148 @@
+"""
+Patient Profile Cache - Versioned in-process cache of patient dicts
+Avoids rebuilding the full patient dict on every NFC scan / search when
+nothing has changed
+
+- LRU eviction (max_entries) plus TTL expiry (ttl_seconds)
+- Every hit is validated against Patient.last_updated (one indexed
+  single-column lookup) so edits made elsewhere are picked up
+- Child-record writes (surgeries, vaccinations, visits, ...) do not touch
+  last_updated, so managers call invalidate(national_id) explicitly
+
+Location: core/profile_cache.py
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Optional
+
+from core.database import get_db
+from core.models import Patient
+
+
+class PatientProfileCache:
+    """LRU + TTL cache of patient profile dicts keyed by national_id"""
+
+    def __init__(self, max_entries: int = 256, ttl_seconds: float = 300):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        # (namespace, national_id) -> (profile, version, stored_at)
+        self._entries: "OrderedDict[tuple, tuple]" = OrderedDict()
+        self._counters = {
+            'hits': 0,
+            'misses': 0,
+            'stale': 0,
+            'expirations': 0,
+            'evictions': 0,
+            'invalidations': 0,
+        }
+
+    # ==================== LOOKUP ====================
+
+    def get_or_load(self, national_id: str, loader: Callable[[str], Optional[Dict]],
+                    namespace: str = 'default') -> Optional[Dict]:
+        """
+        Return the cached profile or build it with loader()
+
+        Args:
+            national_id: Patient National ID
+            loader: Builds the profile dict (returns None if not found)
+            namespace: Separates different dict shapes for the same patient
+
+        Returns:
+            dict: Patient profile or None
+        """
+        if not national_id:
+            return loader(national_id)
+
+        key = (namespace, national_id)
+        version = self._current_version(national_id)
+        if version is None:
+            # Patient does not exist (or was deleted)
+            self._drop(key)
+            self._count('misses')
+            return None
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                profile, cached_version, stored_at = entry
+                if time.monotonic() - stored_at > self.ttl_seconds:
+                    del self._entries[key]
+                    self._counters['expirations'] += 1
+                elif cached_version != version:
+                    del self._entries[key]
+                    self._counters['stale'] += 1
+                else:
+                    self._entries.move_to_end(key)
+                    self._counters['hits'] += 1
+                    return profile
+            self._counters['misses'] += 1
+
+        profile = loader(national_id)
+        if profile is not None:
+            self._store(key, profile, version)
+        return profile
+
+    def _current_version(self, national_id: str):
+        """Cheap version probe: the patient's last_updated timestamp"""
+        db = get_db()
+        try:
+            row = db.query(Patient.last_updated).filter(
+                Patient.national_id == national_id
+            ).first()
+        finally:
+            db.close()
+        if row is None:
+            return None
+        # Patients never edited may have NULL last_updated; still cacheable
+        return row[0] or 'unversioned'
+
+    def _store(self, key: tuple, profile: Dict, version) -> None:
+        with self._lock:
+            self._entries[key] = (profile, version, time.monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._counters['evictions'] += 1
+
+    def _drop(self, key: tuple) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def _count(self, counter: str) -> None:
+        with self._lock:
+            self._counters[counter] += 1
+
+    # ==================== INVALIDATION ====================
+
+    def invalidate(self, national_id: str) -> None:
+        """Drop every cached shape of one patient (call after any write)"""
+        if not national_id:
+            return
+        with self._lock:
+            for key in [k for k in self._entries if k[1] == national_id]:
+                del self._entries[key]
+            self._counters['invalidations'] += 1
+
+    def clear(self) -> None:
+        """Drop all cached profiles"""
+        with self._lock:
+            self._entries.clear()
+
+    # ==================== METRICS ====================
+
+    def stats(self) -> Dict:
+        """Hit/miss/eviction counters and current size"""
+        with self._lock:
+            stats = dict(self._counters)
+            stats['size'] = len(self._entries)
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = stats['hits'] / lookups if lookups else 0.0
+        return stats
+
+
+# Global instance
+patient_profile_cache = PatientProfileCache()
@@ -6,15 +6,95 @@ Location: core/search_engine.py (REPLACE YOUR FILE)
 """
 
 from core.database import get_db
+from core.search_index import patient_search_index
+from core.pagination import encode_cursor, decode_cursor, seek_after, build_page
+from core.profile_cache import patient_profile_cache
 from core.models import (
-    Patient, User, Visit, LabResult, ImagingResult,
+    Patient, Visit, LabResult, ImagingResult,
     Surgery, Hospitalization, Vaccination
 )
-from sqlalchemy import or_, and_, desc, func
+from sqlalchemy import or_, and_, desc, func, case
+from sqlalchemy.orm import selectinload
 from typing import List, Dict, Optional
 from datetime import datetime, date, timedelta
 
 
+# ==================== LOADING PROFILES ====================
+# summary: columns-only projection for list views (never touches relationships)
+# full:    complete record, relationships batch-loaded with one IN query each
+# The list/search methods default to full (their original result shape);
+# list views pass PROFILE_SUMMARY explicitly.
+
+PROFILE_SUMMARY = 'summary'
+PROFILE_FULL = 'full'
+
+SUMMARY_COLUMNS = (
+    Patient.id,
+    Patient.national_id,
+    Patient.full_name,
+    Patient.date_of_birth,
+    Patient.age,
+    Patient.gender,
+    Patient.blood_type,
+    Patient.phone,
+    Patient.email,
+    Patient.city,
+    Patient.governorate,
+    Patient.nfc_card_uid,
+    Patient.nfc_card_assigned,
+    Patient.nfc_card_status,
+    Patient.created_at,
+    Patient.last_updated,
+)
+
+FULL_PROFILE_OPTIONS = (
+    selectinload(Patient.allergies),
+    selectinload(Patient.chronic_diseases),
+    selectinload(Patient.current_medications),
+    selectinload(Patient.surgeries),
+    selectinload(Patient.hospitalizations),
+    selectinload(Patient.vaccinations),
+    selectinload(Patient.family_history),
+    selectinload(Patient.emergency_directives),
+    selectinload(Patient.lifestyle),
+)
+
+
+def apply_profile(query, profile: str = PROFILE_FULL):
+    """
+    Shape a Patient query for the requested loading profile
+    
+    Args:
+        query: Query over Patient (filters/ordering/limit already applied)
+        profile: PROFILE_SUMMARY or PROFILE_FULL
+        
+    Returns:
+        Query returning summary rows or Patients with eager relationships
+    """
+    if profile == PROFILE_SUMMARY:
+        return query.with_entities(*SUMMARY_COLUMNS)
+    return query.options(*FULL_PROFILE_OPTIONS)
+
+
+def convert_summary_row_to_dict(row) -> dict:
+    """Convert a SUMMARY_COLUMNS row to the list-view patient dict"""
+    if row is None:
+        return None
+    
+    data = dict(row._mapping)
+    for key in ('gender', 'blood_type', 'nfc_card_status'):
+        if hasattr(data[key], 'value'):
+            data[key] = data[key].value
+    return data
+
+
+def convert_rows_to_dicts(rows, profile: str = PROFILE_FULL) -> List[dict]:
+    """Convert query results produced by apply_profile() to dicts"""
+    if profile == PROFILE_SUMMARY:
+        return [convert_summary_row_to_dict(r) for r in rows]
+    return [convert_patient_to_dict(p) for p in rows]
+
+
 def convert_patient_to_dict(patient) -> dict:
     """
     Convert Patient SQLAlchemy object to dict within session
@@ -43,7 +123,7 @@ def convert_patient_to_dict(patient) -> dict:
             'allergies': patient.allergies or [],
             'chronic_diseases': patient.chronic_diseases or [],
             'family_history': patient.family_history or {},
-            'disabilities_special_needs': patient.disabilities_special_needs or {},
+            'disabilities_special_needs': getattr(patient, 'disabilities_special_needs', None) or {},
             'emergency_directives': patient.emergency_directives or {},
             'lifestyle': patient.lifestyle or {},
             'insurance': patient.insurance or {},
@@ -55,10 +135,10 @@ def convert_patient_to_dict(patient) -> dict:
                     'name': m.medication_name,
                     'dosage': m.dosage,
                     'frequency': m.frequency,
-                    'started_date': str(m.started_date) if m.started_date else None
+                    'started_date': str(m.start_date) if m.start_date else None
                 }
                 for m in patient.current_medications 
-                if hasattr(m, 'is_active') and m.is_active
+                if m.is_active
             ] if hasattr(patient, 'current_medications') else [],
             
             'surgeries': [
@@ -125,6 +205,28 @@ class SearchEngine:
     def __init__(self):
         pass
     
+    def _indexed_search(self, db, query: str, limit: int, fields: tuple,
+                        profile: str = PROFILE_FULL) -> Optional[List]:
+        """
+        Resolve a substring search through the trigram index
+        
+        Returns:
+            List: Rows for the given profile in ranked order, or None when
+            the query is too short for the index (caller falls back to SQL)
+        """
+        patient_search_index.ensure_loaded()
+        patient_ids = patient_search_index.search(query, limit, fields)
+        if patient_ids is None:
+            return None
+        if not patient_ids:
+            return []
+        
+        rows = apply_profile(
+            db.query(Patient).filter(Patient.id.in_(patient_ids)), profile
+        ).all()
+        by_id = {row.id: row for row in rows}
+        return [by_id[pid] for pid in patient_ids if pid in by_id]
+    
     # ==================== PATIENT SEARCH (All return dicts!) ====================
     
     def search_by_national_id(self, national_id: str) -> Optional[dict]:
@@ -137,11 +239,17 @@ class SearchEngine:
         Returns:
             dict: Complete patient data or None
         """
+        return patient_profile_cache.get_or_load(
+            national_id, self._load_full_profile, namespace='search'
+        )
+
+    def _load_full_profile(self, national_id: str) -> Optional[dict]:
+        """Build the full patient dict (profile cache loader)"""
         db = get_db()
         try:
-            patient = db.query(Patient).filter_by(
+            patient = apply_profile(db.query(Patient).filter_by(
                 national_id=national_id
-            ).first()
+            )).first()
             
             if not patient:
                 return None
@@ -151,35 +259,41 @@ class SearchEngine:
         finally:
             db.close()
     
-    def search_by_name(self, name: str, limit: int = 50) -> List[dict]:
+    def search_by_name(self, name: str, limit: int = 50,
+                       profile: str = PROFILE_FULL) -> List[dict]:
         """
         Search patients by name (partial match, case-insensitive)
         
         Args:
             name: Patient name or partial name
             limit: Maximum results to return
+            profile: Loading profile (summary for list views, full for records)
             
         Returns:
             List[dict]: List of patient dicts
         """
         db = get_db()
         try:
-            patients = db.query(Patient).filter(
-                Patient.full_name.ilike(f"%{name}%")
-            ).limit(limit).all()
+            patients = self._indexed_search(db, name, limit, ('full_name',), profile)
+            if patients is None:
+                patients = apply_profile(db.query(Patient).filter(
+                    Patient.full_name.ilike(f"%{name}%")
+                ).limit(limit), profile).all()
             
             # Convert all to dicts WITHIN session
-            return [convert_patient_to_dict(p) for p in patients]
+            return convert_rows_to_dicts(patients, profile)
         finally:
             db.close()
     
-    def search_by_phone(self, phone: str, limit: int = 50) -> List[dict]:
+    def search_by_phone(self, phone: str, limit: int = 50,
+                        profile: str = PROFILE_FULL) -> List[dict]:
         """
         Search patients by phone number
         
         Args:
             phone: Phone number or partial
             limit: Maximum results to return
+            profile: Loading profile (summary for list views, full for records)
             
         Returns:
             List[dict]: List of patient dicts
@@ -189,22 +303,27 @@ class SearchEngine:
             # Remove common phone formatting
             clean_phone = phone.replace('-', '').replace(' ', '').replace('(', '').replace(')', '')
             
-            patients = db.query(Patient).filter(
-                Patient.phone.contains(clean_phone)
-            ).limit(limit).all()
+            patients = self._indexed_search(db, clean_phone, limit, ('phone',), profile)
+            if patients is None:
+                patients = apply_profile(db.query(Patient).filter(
+                    Patient.phone.contains(clean_phone)
+                ).limit(limit), profile).all()
             
             # Convert all to dicts WITHIN session
-            return [convert_patient_to_dict(p) for p in patients]
+            return convert_rows_to_dicts(patients, profile)
         finally:
             db.close()
     
-    def search_patients(self, query: str, limit: int = 50) -> List[dict]:
+    def search_patients(self, query: str, limit: int = 50,
+                        profile: str = PROFILE_FULL) -> List[dict]:
         """
         Universal patient search (searches name, national_id, phone, email)
+        Results are ranked: exact match, prefix, word prefix, substring
         
         Args:
             query: Search term
             limit: Maximum results to return
+            profile: Loading profile (summary for list views, full for records)
             
         Returns:
             List[dict]: List of patient dicts matching the query
@@ -214,21 +333,27 @@ class SearchEngine:
             # Clean query
             clean_query = query.strip()
             
-            patients = db.query(Patient).filter(
-                or_(
-                    Patient.full_name.ilike(f"%{clean_query}%"),
-                    Patient.national_id.contains(clean_query),
-                    Patient.phone.contains(clean_query),
-                    Patient.email.ilike(f"%{clean_query}%")
-                )
-            ).limit(limit).all()
+            patients = self._indexed_search(
+                db, clean_query, limit,
+                ('full_name', 'national_id', 'phone', 'email'), profile
+            )
+            if patients is None:
+                patients = apply_profile(db.query(Patient).filter(
+                    or_(
+                        Patient.full_name.ilike(f"%{clean_query}%"),
+                        Patient.national_id.contains(clean_query),
+                        Patient.phone.contains(clean_query),
+                        Patient.email.ilike(f"%{clean_query}%")
+                    )
+                ).limit(limit), profile).all()
             
             # Convert all to dicts WITHIN session
-            return [convert_patient_to_dict(p) for p in patients]
+            return convert_rows_to_dicts(patients, profile)
         finally:
             db.close()
     
-    def search_by_age_range(self, min_age: int, max_age: int, limit: int = 50) -> List[dict]:
+    def search_by_age_range(self, min_age: int, max_age: int, limit: int = 50,
+                            profile: str = PROFILE_FULL) -> List[dict]:
         """
         Search patients by age range
         
@@ -236,30 +361,33 @@ class SearchEngine:
             min_age: Minimum age
             max_age: Maximum age
             limit: Maximum results
+            profile: Loading profile (summary for list views, full for records)
             
         Returns:
             List[dict]: Patients in age range
         """
         db = get_db()
         try:
-            patients = db.query(Patient).filter(
+            patients = apply_profile(db.query(Patient).filter(
                 and_(
                     Patient.age >= min_age,
                     Patient.age <= max_age
                 )
-            ).limit(limit).all()
+            ).limit(limit), profile).all()
             
-            return [convert_patient_to_dict(p) for p in patients]
+            return convert_rows_to_dicts(patients, profile)
         finally:
             db.close()
     
-    def search_by_blood_type(self, blood_type: str, limit: int = 50) -> List[dict]:
+    def search_by_blood_type(self, blood_type: str, limit: int = 50,
+                             profile: str = PROFILE_FULL) -> List[dict]:
         """
         Search patients by blood type
         
         Args:
             blood_type: Blood type (e.g., "O+", "A-", "AB+")
             limit: Maximum results
+            profile: Loading profile (summary for list views, full for records)
             
         Returns:
             List[dict]: Patients with matching blood type
@@ -272,65 +400,72 @@ class SearchEngine:
             try:
                 blood_type_enum = BloodType[blood_type.replace('+', '_pos').replace('-', '_neg')]
                 
-                patients = db.query(Patient).filter(
+                patients = apply_profile(db.query(Patient).filter(
                     Patient.blood_type == blood_type_enum
-                ).limit(limit).all()
+                ).limit(limit), profile).all()
                 
-                return [convert_patient_to_dict(p) for p in patients]
+                return convert_rows_to_dicts(patients, profile)
             except (KeyError, AttributeError):
                 return []
         finally:
             db.close()
     
-    def search_by_city(self, city: str, limit: int = 50) -> List[dict]:
+    def search_by_city(self, city: str, limit: int = 50,
+                       profile: str = PROFILE_FULL) -> List[dict]:
         """
         Search patients by city
         
         Args:
             city: City name
             limit: Maximum results
+            profile: Loading profile (summary for list views, full for records)
             
         Returns:
             List[dict]: Patients in specified city
         """
         db = get_db()
         try:
-            patients = db.query(Patient).filter(
+            patients = apply_profile(db.query(Patient).filter(
                 Patient.city.ilike(f"%{city}%")
-            ).limit(limit).all()
+            ).limit(limit), profile).all()
             
-            return [convert_patient_to_dict(p) for p in patients]
+            return convert_rows_to_dicts(patients, profile)
         finally:
             db.close()
     
-    def get_all_patients(self, limit: int = 100, offset: int = 0) -> List[dict]:
+    def get_all_patients(self, limit: int = 100, offset: int = 0,
+                         profile: str = PROFILE_FULL) -> List[dict]:
         """
-        Get all patients (with pagination)
+        Get all patients (with OFFSET pagination)
+        Prefer get_all_patients_page() - OFFSET gets slower with depth
         
         Args:
             limit: Number of patients to return
             offset: Number of patients to skip
+            profile: Loading profile (summary for list views, full for records)
             
         Returns:
             List[dict]: Patient dicts
         """
         db = get_db()
         try:
-            patients = db.query(Patient).order_by(
-                Patient.full_name
-            ).limit(limit).offset(offset).all()
+            patients = apply_profile(db.query(Patient).order_by(
+                Patient.full_name, Patient.id
+            ).limit(limit).offset(offset), profile).all()
             
-            return [convert_patient_to_dict(p) for p in patients]
+            return convert_rows_to_dicts(patients, profile)
         finally:
             db.close()
     
-    def get_recent_patients(self, days: int = 30, limit: int = 50) -> List[dict]:
+    def get_recent_patients(self, days: int = 30, limit: int = 50,
+                            profile: str = PROFILE_FULL) -> List[dict]:
         """
         Get recently registered patients
         
         Args:
             days: Number of days to look back
             limit: Maximum results
+            profile: Loading profile (summary for list views, full for records)
             
         Returns:
             List[dict]: Recently registered patients
@@ -339,13 +474,181 @@ class SearchEngine:
         try:
             cutoff_date = datetime.now() - timedelta(days=days)
             
-            patients = db.query(Patient).filter(
+            patients = apply_profile(db.query(Patient).filter(
                 Patient.created_at >= cutoff_date
             ).order_by(
-                desc(Patient.created_at)
-            ).limit(limit).all()
+                desc(Patient.created_at), desc(Patient.id)
+            ).limit(limit), profile).all()
+            
+            return convert_rows_to_dicts(patients, profile)
+        finally:
+            db.close()
+    
+    # ==================== CURSOR PAGINATION ====================
+    # Keyset pages: each call returns {'items', 'count', 'has_more',
+    # 'next_cursor'}; pass next_cursor back to fetch the following page.
+    
+    def _keyset_page(self, db, query, order_columns: tuple, scope: str,
+                     cursor: Optional[str], limit: int, profile: str,
+                     descending: bool = False) -> dict:
+        """Fetch one keyset page ordered by order_columns"""
+        key = decode_cursor(cursor, scope)
+        if key is not None:
+            query = query.filter(seek_after(order_columns, key, descending))
+        
+        ordering = [desc(c) for c in order_columns] if descending else list(order_columns)
+        rows = apply_profile(query.order_by(*ordering).limit(limit + 1), profile).all()
+        
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        next_cursor = encode_cursor(
+            scope, [getattr(rows[-1], c.key) for c in order_columns]
+        ) if rows else None
+        
+        return build_page(convert_rows_to_dicts(rows, profile), has_more, next_cursor)
+    
+    def _indexed_page(self, db, query: str, fields: tuple, scope: str,
+                      cursor: Optional[str], limit: int, profile: str) -> Optional[dict]:
+        """Fetch one page of trigram-ranked results (None = query too short)"""
+        key = decode_cursor(cursor, scope)
+        patient_search_index.ensure_loaded()
+        ranked = patient_search_index.search_ranked(
+            query, limit + 1, fields, tuple(key) if key else None
+        )
+        if ranked is None:
+            return None
+        
+        has_more = len(ranked) > limit
+        ranked = ranked[:limit]
+        patient_ids = [rank_key[-1] for rank_key in ranked]
+        
+        rows = apply_profile(
+            db.query(Patient).filter(Patient.id.in_(patient_ids)), profile
+        ).all() if patient_ids else []
+        by_id = {row.id: row for row in rows}
+        rows = [by_id[pid] for pid in patient_ids if pid in by_id]
+        next_cursor = encode_cursor(scope, ranked[-1]) if ranked else None
+        
+        return build_page(convert_rows_to_dicts(rows, profile), has_more, next_cursor)
+    
+    def get_all_patients_page(self, limit: int = 100, cursor: Optional[str] = None,
+                              profile: str = PROFILE_SUMMARY) -> dict:
+        """
+        Get all patients ordered by (full_name, id) - keyset pagination
+        
+        Args:
+            limit: Page size
+            cursor: next_cursor from the previous page (None for first page)
+            profile: Loading profile (summary for list views, full for records)
+            
+        Returns:
+            dict: Page envelope with patient dicts in 'items'
+        """
+        db = get_db()
+        try:
+            return self._keyset_page(
+                db, db.query(Patient), (Patient.full_name, Patient.id),
+                'all', cursor, limit, profile
+            )
+        finally:
+            db.close()
+    
+    def get_recent_patients_page(self, days: int = 30, limit: int = 50,
+                                 cursor: Optional[str] = None,
+                                 profile: str = PROFILE_SUMMARY) -> dict:
+        """
+        Get recently registered patients, newest first - keyset pagination
+        
+        Args:
+            days: Number of days to look back
+            limit: Page size
+            cursor: next_cursor from the previous page (None for first page)
+            profile: Loading profile (summary for list views, full for records)
+            
+        Returns:
+            dict: Page envelope with patient dicts in 'items'
+        """
+        db = get_db()
+        try:
+            cutoff_date = datetime.now() - timedelta(days=days)
+            query = db.query(Patient).filter(Patient.created_at >= cutoff_date)
+            
+            return self._keyset_page(
+                db, query, (Patient.created_at, Patient.id),
+                f"recent:{days}", cursor, limit, profile, descending=True
+            )
+        finally:
+            db.close()
+    
+    def search_patients_page(self, query: str, limit: int = 50,
+                             cursor: Optional[str] = None,
+                             profile: str = PROFILE_SUMMARY) -> dict:
+        """
+        Universal patient search - keyset pagination
+        Ranked by match quality; short queries page by (full_name, id)
+        
+        Args:
+            query: Search term
+            limit: Page size
+            cursor: next_cursor from the previous page (None for first page)
+            profile: Loading profile (summary for list views, full for records)
+            
+        Returns:
+            dict: Page envelope with patient dicts in 'items'
+        """
+        clean_query = query.strip()
+        fields = ('full_name', 'national_id', 'phone', 'email')
+        scope = f"search:{clean_query}"
+        
+        db = get_db()
+        try:
+            page = self._indexed_page(db, clean_query, fields, scope, cursor, limit, profile)
+            if page is not None:
+                return page
+            
+            sql_query = db.query(Patient).filter(
+                or_(
+                    Patient.full_name.ilike(f"%{clean_query}%"),
+                    Patient.national_id.contains(clean_query),
+                    Patient.phone.contains(clean_query),
+                    Patient.email.ilike(f"%{clean_query}%")
+                )
+            )
+            return self._keyset_page(
+                db, sql_query, (Patient.full_name, Patient.id),
+                scope, cursor, limit, profile
+            )
+        finally:
+            db.close()
+    
+    def search_by_name_page(self, name: str, limit: int = 50,
+                            cursor: Optional[str] = None,
+                            profile: str = PROFILE_SUMMARY) -> dict:
+        """
+        Search patients by name - keyset pagination
+        
+        Args:
+            name: Patient name or partial name
+            limit: Page size
+            cursor: next_cursor from the previous page (None for first page)
+            profile: Loading profile (summary for list views, full for records)
             
-            return [convert_patient_to_dict(p) for p in patients]
+        Returns:
+            dict: Page envelope with patient dicts in 'items'
+        """
+        scope = f"name:{name}"
+        
+        db = get_db()
+        try:
+            page = self._indexed_page(db, name, ('full_name',), scope, cursor, limit, profile)
+            if page is not None:
+                return page
+            
+            sql_query = db.query(Patient).filter(Patient.full_name.ilike(f"%{name}%"))
+            return self._keyset_page(
+                db, sql_query, (Patient.full_name, Patient.id),
+                scope, cursor, limit, profile
+            )
         finally:
             db.close()
     
@@ -413,45 +716,75 @@ class SearchEngine:
     def get_database_statistics(self) -> dict:
         """
         Get overall database statistics
+        Served from the statistics rollup (see core/statistics_service.py)
         
         Returns:
             dict: Database-wide statistics
         """
-        db = get_db()
-        try:
-            stats = {
-                'total_patients': db.query(Patient).count(),
-                'total_doctors': db.query(User).filter(User.role == 'doctor').count(),
-                'total_visits': db.query(Visit).count(),
-                'total_lab_results': db.query(LabResult).count(),
-                'total_imaging_results': db.query(ImagingResult).count(),
-                'total_surgeries': db.query(Surgery).count(),
-                'total_hospitalizations': db.query(Hospitalization).count(),
-                'total_vaccinations': db.query(Vaccination).count(),
-                
-                # Blood type distribution
-                'blood_type_distribution': {},
-                
-                # Age statistics
-                'avg_patient_age': db.query(func.avg(Patient.age)).scalar() or 0,
-                'min_patient_age': db.query(func.min(Patient.age)).scalar() or 0,
-                'max_patient_age': db.query(func.max(Patient.age)).scalar() or 0,
-            }
-            
-            # Calculate blood type distribution
-            from core.models import BloodType
-            for blood_type in BloodType:
-                count = db.query(Patient).filter(
-                    Patient.blood_type == blood_type
-                ).count()
-                stats['blood_type_distribution'][blood_type.value] = count
-            
-            return stats
-        finally:
-            db.close()
+        from core.statistics_service import statistics_service
+        return statistics_service.get_database_statistics()
     
     # ==================== ADVANCED FILTERS ====================
     
+    def _filter_criteria(self,
+                         gender: Optional[str] = None,
+                         min_age: Optional[int] = None,
+                         max_age: Optional[int] = None,
+                         city: Optional[str] = None,
+                         blood_type: Optional[str] = None,
+                         has_chronic_diseases: Optional[bool] = None,
+                         has_allergies: Optional[bool] = None) -> Dict[str, object]:
+        """
+        Compile filter arguments into named SQL predicates
+        
+        Allergy/chronic disease presence becomes an EXISTS subquery on the
+        child table, so every criterion is evaluated by the database.
+        Unrecognised gender/blood type values are ignored (as before).
+        
+        Returns:
+            Dict[str, clause]: Criterion name -> boolean SQL expression
+        """
+        from core.models import Gender, BloodType
+        
+        criteria = {}
+        
+        if gender:
+            try:
+                criteria['gender'] = Patient.gender == Gender[gender]
+            except KeyError:
+                pass
+        
+        if min_age is not None:
+            criteria['min_age'] = Patient.age >= min_age
+        
+        if max_age is not None:
+            criteria['max_age'] = Patient.age <= max_age
+        
+        if city:
+            criteria['city'] = Patient.city.ilike(f"%{city}%")
+        
+        if blood_type:
+            blood_type_enum = None
+            try:
+                blood_type_enum = BloodType(blood_type)
+            except ValueError:
+                try:
+                    blood_type_enum = BloodType[blood_type.replace('+', '_pos').replace('-', '_neg')]
+                except KeyError:
+                    pass
+            if blood_type_enum is not None:
+                criteria['blood_type'] = Patient.blood_type == blood_type_enum
+        
+        if has_chronic_diseases is not None:
+            exists_clause = Patient.chronic_diseases.any()
+            criteria['has_chronic_diseases'] = exists_clause if has_chronic_diseases else ~exists_clause
+        
+        if has_allergies is not None:
+            exists_clause = Patient.allergies.any()
+            criteria['has_allergies'] = exists_clause if has_allergies else ~exists_clause
+        
+        return criteria
+    
     def filter_patients(self, 
                        gender: Optional[str] = None,
                        min_age: Optional[int] = None,
@@ -460,9 +793,12 @@ class SearchEngine:
                        blood_type: Optional[str] = None,
                        has_chronic_diseases: Optional[bool] = None,
                        has_allergies: Optional[bool] = None,
-                       limit: int = 50) -> List[dict]:
+                       limit: int = 50,
+                       profile: str = PROFILE_FULL) -> List[dict]:
         """
         Advanced patient filtering with multiple criteria
+        All criteria (including allergy/chronic disease presence) are
+        applied in SQL before LIMIT, so up to `limit` matches are returned
         
         Args:
             gender: Gender filter
@@ -473,58 +809,79 @@ class SearchEngine:
             has_chronic_diseases: Filter by chronic disease presence
             has_allergies: Filter by allergy presence
             limit: Maximum results
+            profile: Loading profile (summary for list views, full for records)
             
         Returns:
             List[dict]: Filtered patients
         """
+        criteria = self._filter_criteria(
+            gender, min_age, max_age, city, blood_type,
+            has_chronic_diseases, has_allergies
+        )
+        
         db = get_db()
         try:
-            query = db.query(Patient)
-            
-            # Apply filters
-            if gender:
-                from core.models import Gender
-                try:
-                    gender_enum = Gender[gender]
-                    query = query.filter(Patient.gender == gender_enum)
-                except KeyError:
-                    pass
-            
-            if min_age is not None:
-                query = query.filter(Patient.age >= min_age)
-            
-            if max_age is not None:
-                query = query.filter(Patient.age <= max_age)
-            
-            if city:
-                query = query.filter(Patient.city.ilike(f"%{city}%"))
-            
-            if blood_type:
-                from core.models import BloodType
-                try:
-                    blood_type_enum = BloodType[blood_type.replace('+', '_pos').replace('-', '_neg')]
-                    query = query.filter(Patient.blood_type == blood_type_enum)
-                except KeyError:
-                    pass
+            query = db.query(Patient).filter(*criteria.values()).order_by(
+                Patient.full_name, Patient.id
+            )
+            patients = apply_profile(query.limit(limit), profile).all()
             
-            # Get results
-            patients = query.limit(limit).all()
-            
-            # Convert to dicts
-            result = [convert_patient_to_dict(p) for p in patients]
-            
-            # Apply JSON field filters (must be done after query)
-            if has_chronic_diseases is not None:
-                result = [p for p in result 
-                         if (len(p.get('chronic_diseases', [])) > 0) == has_chronic_diseases]
+            return convert_rows_to_dicts(patients, profile)
+        finally:
+            db.close()
+    
+    def count_filtered_patients(self, **filters) -> int:
+        """
+        Count patients matching filter_patients() criteria (in SQL)
+        
+        Args:
+            **filters: Same keyword filters as filter_patients()
             
-            if has_allergies is not None:
-                result = [p for p in result 
-                         if (len(p.get('allergies', [])) > 0) == has_allergies]
+        Returns:
+            int: Number of matching patients
+        """
+        criteria = self._filter_criteria(**filters)
+        
+        db = get_db()
+        try:
+            return db.query(func.count(Patient.id)).filter(*criteria.values()).scalar() or 0
+        finally:
+            db.close()
+    
+    def filter_patients_facets(self, **filters) -> dict:
+        """
+        Facet counts for a filter_patients() query in one round trip
+        
+        A single aggregate SELECT returns the total patient count, the
+        number matching all criteria, and the number matching each
+        criterion on its own.
+        
+        Args:
+            **filters: Same keyword filters as filter_patients()
             
-            return result
+        Returns:
+            dict: {'total_patients', 'matching_all', 'criteria': {name: count}}
+        """
+        criteria = self._filter_criteria(**filters)
+        
+        def count_where(clause):
+            return func.coalesce(func.sum(case((clause, 1), else_=0)), 0)
+        
+        columns = [func.count(Patient.id)]
+        columns.append(count_where(and_(*criteria.values())) if criteria else func.count(Patient.id))
+        columns.extend(count_where(clause) for clause in criteria.values())
+        
+        db = get_db()
+        try:
+            row = db.query(*columns).one()
         finally:
             db.close()
+        
+        return {
+            'total_patients': row[0],
+            'matching_all': row[1],
+            'criteria': dict(zip(criteria.keys(), row[2:]))
+        }
 
 
 # Global instance
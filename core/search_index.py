@@ -0,0 +1,358 @@
+"""
+Patient Search Index - In-process trigram index for substring search
+Turns '%term%' lookups on name / national ID / phone / email into
+posting-list intersection instead of a full table scan
+
+ORM commits in this process update the index directly. Writes that
+bypass the ORM (bulk loader, JSON importer, population generator) or
+happen in another process are picked up by a cheap probe of
+COUNT(*) / MAX(id) / MAX(last_updated), run at most every
+SEARCH_INDEX_CHECK_INTERVAL seconds: new or updated rows are read
+incrementally, and a row count that still differs (deletes) triggers
+a rebuild.
+
+Location: core/search_index.py
+"""
+
+import heapq
+import threading
+import time
+from typing import Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import event, func, or_
+from sqlalchemy.orm import Session
+
+from config.settings import SEARCH_INDEX_CHECK_INTERVAL
+from core.database import get_db
+from core.models import Patient
+
+
+# Fields covered by the index (Patient column names)
+INDEXED_FIELDS = ('full_name', 'national_id', 'phone', 'email')
+
+# Shortest query the index can answer (shorter terms fall back to SQL)
+MIN_QUERY_LENGTH = 3
+
+# Ranking weights - lower is better
+RANK_EXACT = 0
+RANK_PREFIX = 1
+RANK_WORD_PREFIX = 2
+RANK_SUBSTRING = 3
+
+
+def normalize_phone(phone: str) -> str:
+    """Remove common phone formatting characters"""
+    return phone.replace('-', '').replace(' ', '').replace('(', '').replace(')', '')
+
+
+def normalize_value(field: str, value) -> str:
+    """Normalize a field value the same way for indexing and querying"""
+    if value is None:
+        return ''
+    text = str(value).strip().lower()
+    if field == 'phone':
+        text = normalize_phone(text)
+    return text
+
+
+def trigrams(text: str) -> Set[str]:
+    """Split text into its set of 3-character grams"""
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class TrigramIndex:
+    """
+    Trigram index over patient search fields
+
+    Each trigram maps to the set of patient ids whose indexed text
+    contains it. A query is answered by intersecting the posting sets
+    of its trigrams (rarest first), then verifying the substring on the
+    surviving candidates and ranking them by match quality.
+    """
+
+    def __init__(self, check_interval: float = SEARCH_INDEX_CHECK_INTERVAL):
+        """
+        Args:
+            check_interval: Seconds between staleness probes (0 = every search)
+        """
+        self._lock = threading.RLock()
+        self._postings: Dict[str, Set[int]] = {}
+        self._documents: Dict[int, Dict[str, str]] = {}
+        self._loaded = False
+        self.check_interval = check_interval
+        # (row count, max id, max last_updated) the index reflects
+        self._signature: Optional[Tuple] = None
+        self._checked_at = 0.0
+
+    # ==================== MAINTENANCE ====================
+
+    @property
+    def is_loaded(self) -> bool:
+        """True once the index has been built from the database"""
+        return self._loaded
+
+    def __len__(self) -> int:
+        return len(self._documents)
+
+    def build(self, rows) -> None:
+        """
+        Rebuild the index from (id, full_name, national_id, phone, email) rows
+
+        Args:
+            rows: Iterable of tuples in INDEXED_FIELDS order, prefixed by id
+        """
+        with self._lock:
+            self._postings = {}
+            self._documents = {}
+            for row in rows:
+                self._add(row[0], dict(zip(INDEXED_FIELDS, row[1:])))
+            self._loaded = True
+
+    @staticmethod
+    def _probe(db) -> Tuple:
+        """(row count, max id, max last_updated) of the patients table"""
+        return tuple(db.query(
+            func.count(Patient.id), func.max(Patient.id), func.max(Patient.last_updated)
+        ).one())
+
+    @staticmethod
+    def _rows(query):
+        return query.with_entities(
+            Patient.id, Patient.full_name, Patient.national_id,
+            Patient.phone, Patient.email
+        ).yield_per(5000)
+
+    def load_from_database(self) -> None:
+        """Build the index from the patients table (columns only)"""
+        db = get_db()
+        try:
+            # Probe first: writes racing the build are caught by the next check
+            signature = self._probe(db)
+            self.build(self._rows(db.query(Patient)))
+            self._signature = signature
+            self._checked_at = time.monotonic()
+        finally:
+            db.close()
+
+    def ensure_loaded(self) -> None:
+        """Lazily build the index on first use, then keep it in step with the table"""
+        if not self._loaded:
+            with self._lock:
+                if not self._loaded:
+                    self.load_from_database()
+                    return
+        if time.monotonic() - self._checked_at >= self.check_interval:
+            self.refresh_if_stale()
+
+    def refresh_if_stale(self) -> bool:
+        """
+        Catch up with writes the ORM hooks did not see
+
+        Returns:
+            bool: True when the index was changed
+        """
+        with self._lock:
+            self._checked_at = time.monotonic()
+            db = get_db()
+            try:
+                signature = self._probe(db)
+                if signature == self._signature:
+                    return False
+                count, _, _ = signature
+                known_count, known_max_id, known_updated = self._signature or (0, None, None)
+
+                changed = []
+                if known_max_id is not None:
+                    changed.append(Patient.id > known_max_id)
+                if known_updated is not None:
+                    changed.append(Patient.last_updated > known_updated)
+                if changed:
+                    for row in self._rows(db.query(Patient).filter(or_(*changed))):
+                        self.upsert(row[0], dict(zip(INDEXED_FIELDS, row[1:])))
+
+                if not changed or len(self._documents) != count:
+                    # Deletes (or nothing to compare against) - start over
+                    self.build(self._rows(db.query(Patient)))
+                self._signature = signature
+                return True
+            finally:
+                db.close()
+
+    def upsert(self, patient_id: int, values: Dict[str, Optional[str]]) -> None:
+        """Add or replace one patient in the index"""
+        with self._lock:
+            self._remove(patient_id)
+            self._add(patient_id, values)
+
+    def remove(self, patient_id: int) -> None:
+        """Remove one patient from the index"""
+        with self._lock:
+            self._remove(patient_id)
+
+    def clear(self) -> None:
+        """Drop all index data (next search rebuilds it)"""
+        with self._lock:
+            self._postings = {}
+            self._documents = {}
+            self._loaded = False
+            self._signature = None
+
+    def _add(self, patient_id: int, values: Dict[str, Optional[str]]) -> None:
+        document = {
+            field: normalize_value(field, values.get(field))
+            for field in INDEXED_FIELDS
+        }
+        self._documents[patient_id] = document
+        for gram in set().union(*(trigrams(text) for text in document.values())):
+            self._postings.setdefault(gram, set()).add(patient_id)
+
+    def _remove(self, patient_id: int) -> None:
+        document = self._documents.pop(patient_id, None)
+        if not document:
+            return
+        for gram in set().union(*(trigrams(text) for text in document.values())):
+            posting = self._postings.get(gram)
+            if posting is not None:
+                posting.discard(patient_id)
+                if not posting:
+                    del self._postings[gram]
+
+    # ==================== QUERY ====================
+
+    def search(self, query: str, limit: int = 50,
+               fields: Tuple[str, ...] = INDEXED_FIELDS) -> Optional[List[int]]:
+        """
+        Find patient ids whose indexed fields contain the query
+
+        Args:
+            query: Search term (case-insensitive substring)
+            limit: Maximum ids to return
+            fields: Subset of INDEXED_FIELDS to match against
+
+        Returns:
+            List[int]: Patient ids, best match first, or None when the
+            query is too short for the index to answer
+        """
+        ranked = self.search_ranked(query, limit, fields)
+        if ranked is None:
+            return None
+        return [rank_key[-1] for rank_key in ranked]
+
+    def search_ranked(self, query: str, limit: int = 50,
+                      fields: Tuple[str, ...] = INDEXED_FIELDS,
+                      after: Optional[Tuple] = None) -> Optional[List[Tuple]]:
+        """
+        Ranked search returning full sort keys (for cursor pagination)
+
+        Args:
+            query: Search term (case-insensitive substring)
+            limit: Maximum entries to return
+            fields: Subset of INDEXED_FIELDS to match against
+            after: Rank key of the last entry on the previous page
+
+        Returns:
+            List[tuple]: (score, name_length, full_name, patient_id) keys,
+            best match first, or None when the query is too short
+        """
+        terms = {field: normalize_value(field, query) for field in fields}
+        if min(len(term) for term in terms.values()) < MIN_QUERY_LENGTH:
+            return None
+
+        with self._lock:
+            candidates: Set[int] = set()
+            for term in set(terms.values()):
+                candidates |= self._candidates(term)
+
+            ranked = []
+            for patient_id in candidates:
+                document = self._documents[patient_id]
+                best = None
+                for field in fields:
+                    score = self._score(document[field], terms[field])
+                    if score is not None and (best is None or score < best):
+                        best = score
+                if best is None:
+                    continue
+                rank_key = (best, len(document['full_name']), document['full_name'], patient_id)
+                if after is None or rank_key > after:
+                    ranked.append(rank_key)
+
+        return heapq.nsmallest(limit, ranked)
+
+    def _candidates(self, term: str) -> Set[int]:
+        """Intersect posting sets for every trigram of the term"""
+        postings = []
+        for gram in trigrams(term):
+            posting = self._postings.get(gram)
+            if not posting:
+                return set()
+            postings.append(posting)
+
+        postings.sort(key=len)
+        result = set(postings[0])
+        for posting in postings[1:]:
+            result &= posting
+            if not result:
+                break
+        return result
+
+    @staticmethod
+    def _score(text: str, term: str) -> Optional[int]:
+        """Rank how well a field matches (None = no substring match)"""
+        position = text.find(term)
+        if position < 0:
+            return None
+        if text == term:
+            return RANK_EXACT
+        if position == 0:
+            return RANK_PREFIX
+        if text[position - 1] in ' .@_-':
+            return RANK_WORD_PREFIX
+        return RANK_SUBSTRING
+
+
+# Global instance
+patient_search_index = TrigramIndex()
+
+
+# ==================== ORM SYNC ====================
+# Changes are staged per session during flush and applied only when the
+# transaction commits, so rolled-back writes never reach the index.
+
+_PENDING_KEY = 'patient_search_index_pending'
+
+
+def _stage(session: Session, patient_id: int, values: Optional[Dict]) -> None:
+    session.info.setdefault(_PENDING_KEY, {})[patient_id] = values
+
+
+@event.listens_for(Patient, 'after_insert')
+@event.listens_for(Patient, 'after_update')
+def _patient_written(mapper, connection, target):
+    session = Session.object_session(target)
+    if session is not None and target.id is not None:
+        _stage(session, target.id, {field: getattr(target, field) for field in INDEXED_FIELDS})
+
+
+@event.listens_for(Patient, 'after_delete')
+def _patient_deleted(mapper, connection, target):
+    session = Session.object_session(target)
+    if session is not None and target.id is not None:
+        _stage(session, target.id, None)
+
+
+@event.listens_for(Session, 'after_commit')
+def _apply_pending(session):
+    pending = session.info.pop(_PENDING_KEY, None)
+    if not pending or not patient_search_index.is_loaded:
+        return
+    for patient_id, values in pending.items():
+        if values is None:
+            patient_search_index.remove(patient_id)
+        else:
+            patient_search_index.upsert(patient_id, values)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_pending(session):
+    session.info.pop(_PENDING_KEY, None)
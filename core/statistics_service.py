@@ -0,0 +1,543 @@
+"""
+Statistics Service - Pre-aggregated dashboard statistics
+Computes every dashboard counter with two GROUP BY/UNION queries, keeps
+them in the statistics_rollup table, and updates that table incrementally
+from ORM inserts/updates/deletes so dashboard cards never scan tables
+
+- Committed changes only buffer their metric deltas in memory; a
+  background thread writes them every STATISTICS_FLUSH_INTERVAL seconds
+  in one short transaction of its own, so writers never hold locks on
+  the hot rollup rows
+- Rows written outside the ORM (bulk loader, importers, migrations) are
+  caught by a row-count probe on every reload, which rebuilds the rollup
+  when the table counts disagree with it
+
+Location: core/statistics_service.py
+"""
+
+import atexit
+import threading
+import time
+from typing import Dict, Optional
+
+from sqlalchemy import event, func, inspect, literal, select, union_all, update, bindparam, case
+from sqlalchemy.orm import Session
+
+import core.database
+from core.database import get_db
+from core.engine_registry import engine_registry
+from core.models import (
+    Patient, User, Doctor, Visit, LabResult, ImagingResult, Surgery,
+    Hospitalization, Vaccination, Allergy, ChronicDisease, CurrentMedication,
+    NFCCard, StatisticsRollup, UserRole, BloodType, Gender
+)
+from config.settings import STATISTICS_FLUSH_INTERVAL, STATISTICS_MAX_STALENESS
+
+
+# ==================== METRIC DEFINITIONS ====================
+# Each tracked model maps an instance's attribute values to the metrics it
+# contributes to. Inserts add the contribution, deletes subtract it, and
+# updates apply (new - old). New patient ages can only widen the age
+# min/max; deleting a patient or changing an age recomputes both.
+
+def _enum_value(value):
+    return value.value if hasattr(value, 'value') else value
+
+
+def _patient_metrics(values: dict) -> Dict[str, float]:
+    metrics = {'patients.total': 1}
+    if values.get('gender') is not None:
+        metrics[f"patients.gender.{_enum_value(values['gender'])}"] = 1
+    if values.get('blood_type') is not None:
+        metrics[f"patients.blood_type.{_enum_value(values['blood_type'])}"] = 1
+    if values.get('nfc_card_assigned'):
+        metrics['patients.with_nfc'] = 1
+    if values.get('age') is not None:
+        metrics['patients.age_sum'] = values['age']
+        metrics['patients.age_count'] = 1
+    return metrics
+
+
+def _counter(metric: str):
+    return lambda values: {metric: 1}
+
+
+def _flag_counter(metric: str, flag: str):
+    return lambda values: {metric: 1} if values.get(flag) else {}
+
+
+TRACKED_MODELS = {
+    Patient: (('gender', 'blood_type', 'nfc_card_assigned', 'age'), _patient_metrics),
+    Doctor: ((), _counter('doctors.total')),
+    User: (('role',), lambda values: {'users.doctors': 1} if _enum_value(values.get('role')) == UserRole.doctor.value else {}),
+    Visit: ((), _counter('visits.total')),
+    LabResult: ((), _counter('lab_results.total')),
+    ImagingResult: ((), _counter('imaging_results.total')),
+    Surgery: ((), _counter('surgeries.total')),
+    Hospitalization: ((), _counter('hospitalizations.total')),
+    Vaccination: ((), _counter('vaccinations.total')),
+    Allergy: ((), _counter('allergies.total')),
+    ChronicDisease: ((), _counter('chronic_diseases.total')),
+    CurrentMedication: (('is_active',), _flag_counter('current_medications.active', 'is_active')),
+    NFCCard: (('is_active',), _flag_counter('nfc_cards.active', 'is_active')),
+}
+
+# Metrics that are plain row counts, compared against the tables on reload
+COUNTED_TABLES = {
+    'patients.total': Patient, 'doctors.total': Doctor, 'visits.total': Visit,
+    'lab_results.total': LabResult, 'imaging_results.total': ImagingResult,
+    'surgeries.total': Surgery, 'hospitalizations.total': Hospitalization,
+    'vaccinations.total': Vaccination, 'allergies.total': Allergy,
+    'chronic_diseases.total': ChronicDisease,
+}
+
+
+class StatisticsService:
+    """
+    Serve dashboard statistics from the statistics_rollup table
+
+    Reads come from an in-memory snapshot that is reloaded from the rollup
+    table (one small SELECT) once it is older than max_staleness seconds,
+    or immediately after this process commits a tracked change. Deltas
+    committed by other processes show up once their flush_interval and
+    this process's max_staleness have passed. Each reload also counts the
+    rows of COUNTED_TABLES; a mismatch means rows were written around the
+    ORM and the rollup is rebuilt.
+    """
+
+    def __init__(self, max_staleness: float = STATISTICS_MAX_STALENESS,
+                 flush_interval: float = STATISTICS_FLUSH_INTERVAL):
+        self.max_staleness = max_staleness
+        self.flush_interval = flush_interval
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._snapshot: Optional[Dict[str, float]] = None
+        self._loaded_at = 0.0
+        self._rollup_available: Optional[bool] = None
+
+        # Committed deltas not yet written to the rollup table
+        self._pending: Dict[str, float] = {}
+        self._pending_ages: list = []
+        self._ages_dirty = False
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    # ==================== FULL RECOMPUTE ====================
+
+    def compute(self, db) -> Dict[str, float]:
+        """
+        Compute all metrics from base tables in two queries
+
+        Returns:
+            Dict[str, float]: metric name -> value
+        """
+        metrics: Dict[str, float] = {'patients.total': 0, 'patients.with_nfc': 0,
+                                     'patients.age_sum': 0, 'patients.age_count': 0}
+        for gender in Gender:
+            metrics[f"patients.gender.{gender.value}"] = 0
+        for blood_type in BloodType:
+            metrics[f"patients.blood_type.{blood_type.value}"] = 0
+
+        # Query 1: patient distribution in one GROUP BY
+        age_min, age_max = None, None
+        rows = db.query(
+            Patient.gender, Patient.blood_type, Patient.nfc_card_assigned,
+            func.count(Patient.id), func.coalesce(func.sum(Patient.age), 0),
+            func.count(Patient.age), func.min(Patient.age), func.max(Patient.age)
+        ).group_by(Patient.gender, Patient.blood_type, Patient.nfc_card_assigned).all()
+
+        for gender, blood_type, with_nfc, count, age_sum, age_count, group_min, group_max in rows:
+            metrics['patients.total'] += count
+            if gender is not None:
+                metrics[f"patients.gender.{_enum_value(gender)}"] = \
+                    metrics.get(f"patients.gender.{_enum_value(gender)}", 0) + count
+            if blood_type is not None:
+                metrics[f"patients.blood_type.{_enum_value(blood_type)}"] = \
+                    metrics.get(f"patients.blood_type.{_enum_value(blood_type)}", 0) + count
+            if with_nfc:
+                metrics['patients.with_nfc'] += count
+            metrics['patients.age_sum'] += age_sum
+            metrics['patients.age_count'] += age_count
+            if group_min is not None:
+                age_min = group_min if age_min is None else min(age_min, group_min)
+                age_max = group_max if age_max is None else max(age_max, group_max)
+
+        metrics['patients.age_min'] = age_min or 0
+        metrics['patients.age_max'] = age_max or 0
+
+        # Query 2: every table counter in one UNION ALL
+        counters = [
+            select(literal('doctors.total'), func.count()).select_from(Doctor),
+            select(literal('users.doctors'), func.count()).select_from(User).where(User.role == UserRole.doctor),
+            select(literal('visits.total'), func.count()).select_from(Visit),
+            select(literal('lab_results.total'), func.count()).select_from(LabResult),
+            select(literal('imaging_results.total'), func.count()).select_from(ImagingResult),
+            select(literal('surgeries.total'), func.count()).select_from(Surgery),
+            select(literal('hospitalizations.total'), func.count()).select_from(Hospitalization),
+            select(literal('vaccinations.total'), func.count()).select_from(Vaccination),
+            select(literal('allergies.total'), func.count()).select_from(Allergy),
+            select(literal('chronic_diseases.total'), func.count()).select_from(ChronicDisease),
+            select(literal('current_medications.active'), func.count()).select_from(CurrentMedication)
+            .where(CurrentMedication.is_active == True),
+            select(literal('nfc_cards.active'), func.count()).select_from(NFCCard)
+            .where(NFCCard.is_active == True),
+        ]
+        for metric, count in db.execute(union_all(*counters)).all():
+            metrics[metric] = count
+
+        return metrics
+
+    def rebuild(self) -> Dict[str, float]:
+        """Recompute every metric and rewrite the rollup table"""
+        with self._flush_lock:
+            # Buffered deltas are already part of the base tables
+            with self._lock:
+                self._pending, self._pending_ages, self._ages_dirty = {}, [], False
+
+            db = get_db()
+            try:
+                StatisticsRollup.__table__.create(bind=db.connection(), checkfirst=True)
+                metrics = self.compute(db)
+                db.query(StatisticsRollup).delete()
+                db.bulk_insert_mappings(StatisticsRollup, [
+                    {'metric': name, 'value': value} for name, value in metrics.items()
+                ])
+                db.commit()
+            except Exception:
+                db.rollback()
+                raise
+            finally:
+                db.close()
+
+        with self._lock:
+            self._rollup_available = True
+            self._snapshot = metrics
+            self._loaded_at = time.monotonic()
+        return metrics
+
+    def rebuild_after_bulk_write(self, url: Optional[str] = None) -> bool:
+        """
+        Rebuild after rows were written outside the ORM
+
+        Args:
+            url: Database that was written (None = the configured one)
+
+        Returns:
+            bool: True if the rollup was rebuilt (False when url is another
+                database than the one these statistics come from)
+        """
+        if url is not None and engine_registry.get_engine(url) is not core.database.engine:
+            return False
+        try:
+            self.rebuild()
+            return True
+        except Exception as e:
+            print(f"Error rebuilding statistics rollup: {e}")
+            return False
+
+    # ==================== SNAPSHOT ====================
+
+    def invalidate(self) -> None:
+        """Force the next read to reload from the rollup table"""
+        with self._lock:
+            self._loaded_at = 0.0
+
+    def get_metrics(self) -> Dict[str, float]:
+        """
+        Current metric snapshot (at most max_staleness seconds old)
+
+        Returns:
+            Dict[str, float]: metric name -> value
+        """
+        with self._lock:
+            if self._snapshot is not None and time.monotonic() - self._loaded_at < self.max_staleness:
+                return self._snapshot
+
+        # Our own committed changes must be in the table we reload from
+        self.flush()
+
+        db = get_db()
+        try:
+            if self._rollup_available is False or not self._has_rollup(db.connection()):
+                rows, counts = [], {}
+            else:
+                rows = db.query(StatisticsRollup.metric, StatisticsRollup.value).all()
+                counts = self._probe(db)
+        finally:
+            db.close()
+
+        snapshot = {metric: value for metric, value in rows}
+        if not rows or any(snapshot.get(metric, 0) != count for metric, count in counts.items()):
+            # Empty, or rows were written around the ORM hooks
+            return self.rebuild()
+
+        with self._lock:
+            self._snapshot = snapshot
+            self._loaded_at = time.monotonic()
+            return self._snapshot
+
+    @staticmethod
+    def _probe(db) -> Dict[str, int]:
+        """Row counts of COUNTED_TABLES in one UNION ALL"""
+        return dict(db.execute(union_all(*(
+            select(literal(metric), func.count()).select_from(model)
+            for metric, model in COUNTED_TABLES.items()
+        ))).all())
+
+    def _has_rollup(self, connection) -> bool:
+        if self._rollup_available is None:
+            self._rollup_available = inspect(connection).has_table(StatisticsRollup.__tablename__)
+        return self._rollup_available
+
+    # ==================== DELTA BUFFER ====================
+
+    def record(self, deltas: Dict[str, float], new_ages: list = (), ages_dirty: bool = False) -> None:
+        """
+        Buffer the metric deltas of one committed transaction
+
+        Args:
+            deltas: metric name -> change
+            new_ages: Ages of inserted patients (can only widen min/max)
+            ages_dirty: A patient was deleted or its age changed, so
+                min/max must be recomputed
+        """
+        with self._lock:
+            for metric, delta in deltas.items():
+                self._pending[metric] = self._pending.get(metric, 0) + delta
+            self._pending_ages.extend(new_ages)
+            self._ages_dirty = self._ages_dirty or ages_dirty
+            # This process's next read reloads (and flushes first)
+            self._loaded_at = 0.0
+        self._ensure_started()
+
+    def flush(self) -> int:
+        """
+        Write buffered deltas in one short transaction
+
+        Returns:
+            int: Number of metrics updated
+        """
+        with self._flush_lock:
+            with self._lock:
+                deltas = {metric: delta for metric, delta in self._pending.items() if delta}
+                new_ages, ages_dirty = self._pending_ages, self._ages_dirty
+                self._pending, self._pending_ages, self._ages_dirty = {}, [], False
+            if not deltas and not new_ages and not ages_dirty:
+                return 0
+
+            db = get_db()
+            try:
+                connection = db.connection()
+                if not self._has_rollup(connection):
+                    return 0  # rebuild() will compute everything from scratch
+                if new_ages and not ages_dirty:
+                    # The first ages replace the 0 placeholders instead of widening them
+                    known_ages = connection.execute(select(StatisticsRollup.value).where(
+                        StatisticsRollup.metric == 'patients.age_count')).scalar()
+                    ages_dirty = not known_ages
+                if deltas:
+                    connection.execute(_increment, [{'m': m, 'd': d} for m, d in deltas.items()])
+                if ages_dirty:
+                    age_min, age_max = connection.execute(
+                        select(func.min(Patient.age), func.max(Patient.age))
+                    ).one()
+                    connection.execute(_assign, [{'m': 'patients.age_min', 'v': age_min or 0},
+                                                 {'m': 'patients.age_max', 'v': age_max or 0}])
+                elif new_ages:
+                    connection.execute(_extremum['min'], [{'m': 'patients.age_min', 'v': min(new_ages)}])
+                    connection.execute(_extremum['max'], [{'m': 'patients.age_max', 'v': max(new_ages)}])
+                db.commit()
+            except Exception as e:
+                db.rollback()
+                self.record(deltas, new_ages, ages_dirty)
+                print(f"Error flushing statistics rollup: {e}")
+                return 0
+            finally:
+                db.close()
+
+            self.invalidate()
+            return len(deltas)
+
+    def _ensure_started(self) -> None:
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name='statistics-rollup-flusher', daemon=True
+                )
+                self._thread.start()
+
+    def _run(self) -> None:
+        while not self._stopping.is_set():
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            self.flush()
+
+    def stop(self) -> None:
+        """Stop the background thread and flush what is left"""
+        self._stopping.set()
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+        self._stopping.clear()
+        self._wakeup.clear()
+        self.flush()
+
+    # ==================== DASHBOARD VIEWS ====================
+
+    def get_dashboard_stats(self) -> dict:
+        """Dashboard card counters"""
+        m = self.get_metrics()
+        return {
+            'total_patients': int(m.get('patients.total', 0)),
+            'total_doctors': int(m.get('doctors.total', 0)),
+            'total_visits': int(m.get('visits.total', 0)),
+            'total_lab_results': int(m.get('lab_results.total', 0)),
+            'total_imaging': int(m.get('imaging_results.total', 0)),
+            'active_cards': int(m.get('nfc_cards.active', 0))
+        }
+
+    def get_database_statistics(self) -> dict:
+        """Database-wide statistics (SearchEngine.get_database_statistics shape)"""
+        m = self.get_metrics()
+        age_count = m.get('patients.age_count', 0)
+        return {
+            'total_patients': int(m.get('patients.total', 0)),
+            'total_doctors': int(m.get('users.doctors', 0)),
+            'total_visits': int(m.get('visits.total', 0)),
+            'total_lab_results': int(m.get('lab_results.total', 0)),
+            'total_imaging_results': int(m.get('imaging_results.total', 0)),
+            'total_surgeries': int(m.get('surgeries.total', 0)),
+            'total_hospitalizations': int(m.get('hospitalizations.total', 0)),
+            'total_vaccinations': int(m.get('vaccinations.total', 0)),
+            'blood_type_distribution': {
+                bt.value: int(m.get(f"patients.blood_type.{bt.value}", 0)) for bt in BloodType
+            },
+            'avg_patient_age': m.get('patients.age_sum', 0) / age_count if age_count else 0,
+            'min_patient_age': int(m.get('patients.age_min', 0)),
+            'max_patient_age': int(m.get('patients.age_max', 0)),
+        }
+
+    def get_statistics_report(self) -> dict:
+        """Comprehensive report (DataManager.get_statistics_report shape)"""
+        m = self.get_metrics()
+        return {
+            'patients': {
+                'total': int(m.get('patients.total', 0)),
+                'male': int(m.get('patients.gender.Male', 0)),
+                'female': int(m.get('patients.gender.Female', 0)),
+                'with_nfc': int(m.get('patients.with_nfc', 0))
+            },
+            'doctors': {
+                'total': int(m.get('doctors.total', 0))
+            },
+            'medical_records': {
+                'visits': int(m.get('visits.total', 0)),
+                'lab_results': int(m.get('lab_results.total', 0)),
+                'imaging_results': int(m.get('imaging_results.total', 0)),
+                'surgeries': int(m.get('surgeries.total', 0)),
+                'hospitalizations': int(m.get('hospitalizations.total', 0)),
+                'vaccinations': int(m.get('vaccinations.total', 0))
+            },
+            'health_data': {
+                'allergies': int(m.get('allergies.total', 0)),
+                'chronic_diseases': int(m.get('chronic_diseases.total', 0)),
+                'current_medications': int(m.get('current_medications.active', 0))
+            }
+        }
+
+
+# Global instance
+statistics_service = StatisticsService()
+
+
+# ==================== INCREMENTAL MAINTENANCE ====================
+# After every flush the net metric deltas are accumulated on the session;
+# a commit hands them to the statistics_service buffer and a rollback
+# discards them. Nothing touches the rollup table inside the writer's
+# transaction.
+
+_DELTAS_KEY = 'statistics_rollup_deltas'
+
+_increment = update(StatisticsRollup).where(
+    StatisticsRollup.metric == bindparam('m')
+).values(value=StatisticsRollup.value + bindparam('d'))
+
+_assign = update(StatisticsRollup).where(
+    StatisticsRollup.metric == bindparam('m')
+).values(value=bindparam('v'))
+
+_extremum = {
+    'min': update(StatisticsRollup).where(StatisticsRollup.metric == bindparam('m')).values(
+        value=case((StatisticsRollup.value > bindparam('v'), bindparam('v')), else_=StatisticsRollup.value)),
+    'max': update(StatisticsRollup).where(StatisticsRollup.metric == bindparam('m')).values(
+        value=case((StatisticsRollup.value < bindparam('v'), bindparam('v')), else_=StatisticsRollup.value)),
+}
+
+
+def _current_values(obj, attrs) -> dict:
+    return {attr: getattr(obj, attr, None) for attr in attrs}
+
+
+def _previous_values(obj, attrs) -> dict:
+    state = inspect(obj)
+    values = {}
+    for attr in attrs:
+        history = state.attrs[attr].history
+        values[attr] = history.deleted[0] if history.deleted else getattr(obj, attr, None)
+    return values
+
+
+def _accumulate(deltas: Dict[str, float], metrics: Dict[str, float], sign: int) -> None:
+    for metric, value in metrics.items():
+        deltas[metric] = deltas.get(metric, 0) + sign * value
+
+
+@event.listens_for(Session, 'after_flush')
+def _collect_deltas(session, flush_context):
+    pending = session.info.setdefault(_DELTAS_KEY, {'deltas': {}, 'new_ages': [], 'ages_dirty': False})
+    deltas = pending['deltas']
+
+    for obj in session.new:
+        tracked = TRACKED_MODELS.get(type(obj))
+        if tracked:
+            _accumulate(deltas, tracked[1](_current_values(obj, tracked[0])), 1)
+            if isinstance(obj, Patient) and obj.age is not None:
+                pending['new_ages'].append(obj.age)
+
+    for obj in session.deleted:
+        tracked = TRACKED_MODELS.get(type(obj))
+        if tracked:
+            _accumulate(deltas, tracked[1](_previous_values(obj, tracked[0])), -1)
+            if isinstance(obj, Patient):
+                pending['ages_dirty'] = True
+
+    for obj in session.dirty:
+        tracked = TRACKED_MODELS.get(type(obj))
+        if tracked and tracked[0] and session.is_modified(obj):
+            _accumulate(deltas, tracked[1](_previous_values(obj, tracked[0])), -1)
+            _accumulate(deltas, tracked[1](_current_values(obj, tracked[0])), 1)
+            if isinstance(obj, Patient) and inspect(obj).attrs['age'].history.has_changes():
+                pending['ages_dirty'] = True
+
+
+@event.listens_for(Session, 'after_commit')
+def _buffer_after_commit(session):
+    pending = session.info.pop(_DELTAS_KEY, None)
+    if not pending:
+        return
+    deltas = {metric: delta for metric, delta in pending['deltas'].items() if delta}
+    if deltas or pending['new_ages'] or pending['ages_dirty']:
+        statistics_service.record(deltas, pending['new_ages'], pending['ages_dirty'])
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_after_rollback(session):
+    session.info.pop(_DELTAS_KEY, None)
+
+
+# Don't lose buffered deltas on a normal shutdown
+atexit.register(statistics_service.stop)
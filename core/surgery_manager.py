@@ -6,6 +6,7 @@ Location: core/surgery_manager.py
 """
 
 from core.database import get_db
+from core.profile_cache import patient_profile_cache
 from core.models import Surgery
 from sqlalchemy import desc
 from typing import List, Dict, Optional
@@ -25,6 +26,7 @@ class SurgeryManager:
             db.add(surgery)
             db.commit()
             db.refresh(surgery)
+            patient_profile_cache.invalidate(surgery.patient_national_id)
             return surgery
     
     def get_patient_surgeries(self, national_id: str) -> List[Surgery]:
@@ -70,7 +72,9 @@ class SurgeryManager:
                 if hasattr(surgery, key):
                     setattr(surgery, key, value)
             
+            national_id = surgery.patient_national_id
             db.commit()
+            patient_profile_cache.invalidate(national_id)
             return True
     
     def delete_surgery(self, surgery_id: int) -> bool:
@@ -83,8 +87,10 @@ class SurgeryManager:
             if not surgery:
                 return False
             
+            national_id = surgery.patient_national_id
             db.delete(surgery)
             db.commit()
+            patient_profile_cache.invalidate(national_id)
             return True
     
     def get_surgery_count(self, national_id: str) -> int:
@@ -4,6 +4,7 @@ Location: core/vaccination_manager.py
 """
 
 from core.database import get_db
+from core.profile_cache import patient_profile_cache
 from core.models import Vaccination
 from sqlalchemy import desc
 from typing import List, Dict, Optional
@@ -22,6 +23,7 @@ class VaccinationManager:
             db.add(vacc)
             db.commit()
             db.refresh(vacc)
+            patient_profile_cache.invalidate(vacc.patient_national_id)
             return vacc
     
     def get_patient_vaccinations(self, national_id: str) -> List[Dict]:
@@ -0,0 +1,168 @@
+"""
+Bulk loader - Batched multi-row INSERTs over a DBAPI connection
+One INSERT statement carries a whole chunk of rows and every chunk is
+its own transaction, instead of one round trip per row
+
+- on_duplicate='skip'   INSERT IGNORE (MySQL) / INSERT OR IGNORE (SQLite);
+                        rows hitting a unique key are skipped and counted
+                        (note: IGNORE also turns other row errors - a missing
+                        foreign key on MySQL, NOT NULL on SQLite - into
+                        skipped rows; use 'error' to have them reported)
+- on_duplicate='update' INSERT ... ON DUPLICATE KEY UPDATE (MySQL) /
+                        ON CONFLICT DO UPDATE (SQLite)
+- on_duplicate='error'  plain INSERT
+- A chunk the database rejects is rolled back and retried row by row,
+  so one bad row costs only itself; failures go to on_error
+- Rows per statement are capped so a statement stays under the
+  driver's bound-parameter limit
+
+Location: database/bulk_loader.py
+"""
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Sequence
+
+DEFAULT_CHUNK_SIZE = 1000
+
+# Bound parameters per statement (SQLite 3.32+ default / MySQL prepared-statement limit)
+MAX_PARAMS = {
+    'sqlite': 32766,
+    'mysql': 65535,
+}
+
+DUPLICATE_POLICIES = ('skip', 'update', 'error')
+
+
+def chunked(records: Sequence, size: int) -> Iterable[Sequence]:
+    """Consecutive slices of at most `size` records"""
+    for start in range(0, len(records), size):
+        yield records[start:start + size]
+
+
+class BulkInserter:
+    """Multi-row INSERTs in per-chunk transactions"""
+
+    def __init__(self, connection, dialect: str = 'mysql', chunk_size: int = DEFAULT_CHUNK_SIZE,
+                 on_duplicate: str = 'skip',
+                 on_error: Optional[Callable[[str, Sequence, Exception], None]] = None,
+                 progress: Optional[Callable[[str, Dict], None]] = None):
+        """
+        Args:
+            connection: DBAPI connection (mysql-connector, PyMySQL or sqlite3)
+            dialect: 'mysql' or 'sqlite'
+            chunk_size: Rows per transaction
+            on_duplicate: 'skip', 'update' or 'error'
+            on_error: Called with (table, row, exception) for rows that fail alone
+            progress: Called with (table, stats) after every chunk
+        """
+        if on_duplicate not in DUPLICATE_POLICIES:
+            raise ValueError(f"Unknown duplicate policy: {on_duplicate}")
+        if dialect not in MAX_PARAMS:
+            raise ValueError(f"Unsupported dialect for bulk loading: {dialect}")
+        self.connection = connection
+        self.dialect = dialect
+        self.chunk_size = chunk_size
+        self.on_duplicate = on_duplicate
+        self.on_error = on_error
+        self.progress = progress
+        self.placeholder = '?' if dialect == 'sqlite' else '%s'
+        self._statements: Dict[tuple, str] = {}
+
+    # ==================== STATEMENTS ====================
+
+    def statement(self, table: str, columns: Sequence[str], rows: int) -> str:
+        """INSERT for `rows` rows (cached per table/columns/row count)"""
+        key = (table, tuple(columns), rows)
+        sql = self._statements.get(key)
+        if sql is not None:
+            return sql
+
+        column_list = ', '.join(columns)
+        values = '(' + ', '.join([self.placeholder] * len(columns)) + ')'
+        verb = 'INSERT'
+        if self.on_duplicate == 'skip':
+            verb = 'INSERT OR IGNORE' if self.dialect == 'sqlite' else 'INSERT IGNORE'
+        sql = f"{verb} INTO {table} ({column_list}) VALUES " + ', '.join([values] * rows)
+
+        if self.on_duplicate == 'update':
+            if self.dialect == 'sqlite':
+                sql += " ON CONFLICT DO UPDATE SET " + ', '.join(f"{c} = excluded.{c}" for c in columns)
+            else:
+                sql += " ON DUPLICATE KEY UPDATE " + ', '.join(f"{c} = VALUES({c})" for c in columns)
+
+        self._statements[key] = sql
+        return sql
+
+    def rows_per_statement(self, columns: Sequence[str]) -> int:
+        return max(1, min(self.chunk_size, MAX_PARAMS[self.dialect] // max(1, len(columns))))
+
+    # ==================== LOADING ====================
+
+    def insert(self, table: str, columns: Sequence[str], rows: Iterable[Sequence]) -> Dict:
+        """
+        Insert rows in chunks
+
+        Args:
+            table: Table name
+            columns: Column names, in row order
+            rows: Iterable of value sequences
+
+        Returns:
+            dict: rows, inserted (affected rows for 'update'), skipped,
+                failed, batches, seconds, rows_per_sec
+        """
+        started = time.perf_counter()
+        stats = {'rows': 0, 'inserted': 0, 'skipped': 0, 'failed': 0, 'batches': 0}
+        per_statement = self.rows_per_statement(columns)
+
+        cursor = self.connection.cursor()
+        try:
+            batch: List[Sequence] = []
+            for row in rows:
+                batch.append(row)
+                if len(batch) >= per_statement:
+                    self._write_batch(cursor, table, columns, batch, stats, started)
+                    batch = []
+            if batch:
+                self._write_batch(cursor, table, columns, batch, stats, started)
+        finally:
+            cursor.close()
+
+        stats['seconds'] = time.perf_counter() - started
+        stats['rows_per_sec'] = stats['rows'] / stats['seconds'] if stats['seconds'] else 0.0
+        return stats
+
+    def _write_batch(self, cursor, table, columns, batch, stats, started) -> None:
+        params = [value for row in batch for value in row]
+        try:
+            cursor.execute(self.statement(table, columns, len(batch)), params)
+            self.connection.commit()
+            written = cursor.rowcount if cursor.rowcount is not None and cursor.rowcount >= 0 else len(batch)
+            failed = 0
+        except Exception:
+            self.connection.rollback()
+            written, failed = self._write_rows(cursor, table, columns, batch)
+
+        stats['rows'] += len(batch)
+        stats['inserted'] += written
+        stats['failed'] += failed
+        stats['skipped'] += max(0, len(batch) - written - failed)
+        stats['batches'] += 1
+        if self.progress is not None:
+            elapsed = time.perf_counter() - started
+            self.progress(table, dict(stats, seconds=elapsed,
+                                      rows_per_sec=stats['rows'] / elapsed if elapsed else 0.0))
+
+    def _write_rows(self, cursor, table, columns, batch):
+        """Fallback for a rejected chunk: one INSERT per row, one commit"""
+        sql = self.statement(table, columns, 1)
+        written = failed = 0
+        for row in batch:
+            try:
+                cursor.execute(sql, list(row))
+                written += max(cursor.rowcount, 0) if cursor.rowcount is not None else 1
+            except Exception as e:
+                failed += 1
+                if self.on_error is not None:
+                    self.on_error(table, row, e)
+        self.connection.commit()
+        return written, failed
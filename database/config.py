@@ -6,6 +6,8 @@ Location: database/config.py
 import os
 from pathlib import Path
 
+from core.engine_registry import database_url, engine_registry
+
 # Project root directory
 PROJECT_ROOT = Path(__file__).parent.parent
 
@@ -33,12 +35,8 @@ def get_database_url():
         str: SQLAlchemy database URL
     """
     if DB_TYPE == 'mysql':
-        # MySQL connection string
-        return (
-            f"mysql+pymysql://{MYSQL_CONFIG['user']}:{MYSQL_CONFIG['password']}"
-            f"@{MYSQL_CONFIG['host']}:{MYSQL_CONFIG['port']}/{MYSQL_CONFIG['database']}"
-            f"?charset=utf8mb4"
-        )
+        # MySQL connection string (same driver/format as core.database)
+        return database_url(MYSQL_CONFIG)
     else:
         # SQLite connection string (default)
         # Ensure data directory exists
@@ -49,6 +47,12 @@ def get_database_url():
 # Database URL
 DATABASE_URL = get_database_url()
 
+
+def get_engine():
+    """Shared engine of DATABASE_URL (one pool per URL, see core/engine_registry.py)"""
+    return engine_registry.get_engine(DATABASE_URL)
+
+
 # SQLAlchemy engine configuration
 ENGINE_CONFIG = {
     'echo': False,  # Set to True for SQL query logging
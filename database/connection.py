@@ -3,15 +3,16 @@ Database connection and session management
 Similar to Laravel's DB facade pattern
 Location: database/connection.py
 """
-from sqlalchemy import create_engine, text
+from sqlalchemy import text
 from sqlalchemy.orm import sessionmaker, declarative_base
-from sqlalchemy.pool import StaticPool
 from contextlib import contextmanager
 from config.database_config import *
+from core.engine_registry import database_url, engine_registry
 
 
 DB_TYPE = 'mysql'  # or 'sqlite'
-DATABASE_URL = f"mysql+pymysql://{DATABASE_CONFIG['user']}:{DATABASE_CONFIG['password']}@{DATABASE_CONFIG['host']}/{DATABASE_CONFIG['database']}?charset={DATABASE_CONFIG['charset']}"
+# Same URL as core.database, so both share one pool (core/engine_registry.py)
+DATABASE_URL = database_url(DATABASE_CONFIG)
 ENGINE_CONFIG = {
     'pool_pre_ping': True,
     'pool_recycle': 3600,
@@ -24,23 +25,8 @@ SESSION_CONFIG ={
     
 }
 
-# Create SQLAlchemy engine
-if DB_TYPE == 'sqlite':
-    # SQLite specific configuration
-    engine = create_engine(
-        DATABASE_URL,
-        connect_args={'check_same_thread': False},
-        poolclass=StaticPool,
-        echo=ENGINE_CONFIG['echo']
-    )
-else:
-    # MySQL configuration
-    engine = create_engine(
-        DATABASE_URL,
-        pool_pre_ping=ENGINE_CONFIG['pool_pre_ping'],
-        pool_recycle=ENGINE_CONFIG['pool_recycle'],
-        echo=ENGINE_CONFIG['echo']
-    )
+# Shared SQLAlchemy engine (pool sizes from the deployment profile)
+engine = engine_registry.get_engine(DATABASE_URL)
 
 # Create SessionLocal class (similar to Laravel's DB::connection())
 SessionLocal = sessionmaker(
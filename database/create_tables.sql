@@ -8,6 +8,9 @@ COLLATE utf8mb4_unicode_ci;
 
 USE medlink_db;
 
+-- Patient child tables are indexed on (patient_national_id, <date>), under
+-- the index names of core/models.py, for the per-patient history queries
+
 -- 2. Create Users Table (Doctors/Staff)
 CREATE TABLE IF NOT EXISTS users (
     id INT AUTO_INCREMENT PRIMARY KEY,
@@ -81,7 +84,8 @@ CREATE TABLE IF NOT EXISTS patients (
     
     INDEX idx_national_id (national_id),
     INDEX idx_full_name (full_name),
-    INDEX idx_nfc_card (nfc_card_uid)
+    INDEX idx_nfc_card (nfc_card_uid),
+    INDEX ix_patients_created_at_id (created_at, id)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
 
 -- 4. Create Doctor Cards Table
@@ -133,7 +137,7 @@ CREATE TABLE IF NOT EXISTS visits (
     
     FOREIGN KEY (patient_national_id) REFERENCES patients(national_id) ON DELETE CASCADE,
     FOREIGN KEY (doctor_id) REFERENCES users(user_id) ON DELETE CASCADE,
-    INDEX idx_patient (patient_national_id),
+    INDEX ix_visits_patient_date (patient_national_id, date, time),
     INDEX idx_doctor (doctor_id),
     INDEX idx_date (date)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
@@ -154,7 +158,7 @@ CREATE TABLE IF NOT EXISTS surgeries (
     outcome VARCHAR(100),
     
     FOREIGN KEY (patient_national_id) REFERENCES patients(national_id) ON DELETE CASCADE,
-    INDEX idx_patient (patient_national_id),
+    INDEX ix_surgeries_patient_date (patient_national_id, date),
     INDEX idx_date (date)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
 
@@ -174,7 +178,7 @@ CREATE TABLE IF NOT EXISTS hospitalizations (
     days_stayed INT,
     
     FOREIGN KEY (patient_national_id) REFERENCES patients(national_id) ON DELETE CASCADE,
-    INDEX idx_patient (patient_national_id),
+    INDEX ix_hospitalizations_patient_date (patient_national_id, admission_date),
     INDEX idx_admission_date (admission_date)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
 
@@ -193,7 +197,7 @@ CREATE TABLE IF NOT EXISTS vaccinations (
     notes TEXT,
     
     FOREIGN KEY (patient_national_id) REFERENCES patients(national_id) ON DELETE CASCADE,
-    INDEX idx_patient (patient_national_id),
+    INDEX ix_vaccinations_patient_date (patient_national_id, date_administered),
     INDEX idx_date (date_administered)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
 
@@ -210,7 +214,7 @@ CREATE TABLE IF NOT EXISTS current_medications (
     is_active BOOLEAN DEFAULT TRUE,
     
     FOREIGN KEY (patient_national_id) REFERENCES patients(national_id) ON DELETE CASCADE,
-    INDEX idx_patient (patient_national_id),
+    INDEX ix_current_medications_patient_date (patient_national_id, started_date),
     INDEX idx_active (is_active)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
 
@@ -229,7 +233,7 @@ CREATE TABLE IF NOT EXISTS lab_results (
     notes TEXT,
     
     FOREIGN KEY (patient_national_id) REFERENCES patients(national_id) ON DELETE CASCADE,
-    INDEX idx_patient (patient_national_id),
+    INDEX ix_lab_results_patient_date (patient_national_id, date),
     INDEX idx_date (date)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
 
@@ -247,7 +251,7 @@ CREATE TABLE IF NOT EXISTS imaging_results (
     status ENUM('normal', 'abnormal', 'critical', 'pending') DEFAULT 'pending',
     
     FOREIGN KEY (patient_national_id) REFERENCES patients(national_id) ON DELETE CASCADE,
-    INDEX idx_patient (patient_national_id),
+    INDEX ix_imaging_results_patient_date (patient_national_id, date),
     INDEX idx_date (date)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
 
@@ -291,7 +295,7 @@ CREATE TABLE IF NOT EXISTS vital_signs (
     INDEX idx_patient (patient_national_id)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
 
--- 15. Create Hardware Audit Log Table
+-- 15. Create Hardware Audit Log Table (legacy import format, database/schema.py)
 CREATE TABLE IF NOT EXISTS hardware_audit_log (
     id INT AUTO_INCREMENT PRIMARY KEY,
     event_id VARCHAR(50) UNIQUE,
@@ -311,6 +315,32 @@ CREATE TABLE IF NOT EXISTS hardware_audit_log (
     INDEX idx_patient (patient_national_id)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
 
+-- 16. Create Hardware Audit Logs Table (core.models.HardwareAuditLog)
+-- Written by core/audit_sink.py, read by core/audit_query.py: one
+-- (filter, timestamp) index per query access pattern
+CREATE TABLE IF NOT EXISTS hardware_audit_logs (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    event_type ENUM('fingerprint_login', 'nfc_card_scan', 'failed_login', 'logout', 'other') NOT NULL,
+    user_id VARCHAR(50),
+    user_type VARCHAR(20),
+    patient_national_id VARCHAR(14),
+    device_id VARCHAR(100),
+    card_uid VARCHAR(50),
+    fingerprint_id VARCHAR(100),
+    success BOOLEAN DEFAULT TRUE,
+    ip_address VARCHAR(50),
+    user_agent VARCHAR(200),
+    error_message TEXT,
+    event_metadata JSON,
+    timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+    
+    INDEX ix_hardware_audit_logs_timestamp (timestamp),
+    INDEX ix_hw_audit_user_time (user_id, timestamp),
+    INDEX ix_hw_audit_patient_time (patient_national_id, timestamp),
+    INDEX ix_hw_audit_type_success_time (event_type, success, timestamp),
+    INDEX ix_hw_audit_device_type_time (device_id, event_type, timestamp)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
 -- Show all tables
 SHOW TABLES;
 
@@ -3,15 +3,16 @@ Complete Database Manager for MedLink
 Handles database creation, migrations, and operations
 """
 
-import mysql.connector
 from mysql.connector import Error
 from colorama import Fore, Style, init
+from sqlalchemy.exc import SQLAlchemyError
 from pathlib import Path
 import sys
 
 # Import from our modules
 from database.schema import DatabaseSchema
 from config.database_config import *
+from core.engine_registry import database_url, engine_registry
 
 init(autoreset=True)
 
@@ -42,14 +43,12 @@ class DatabaseManager:
             bool: True if successful
         """
         try:
-            config = self.config.copy()
-            if not use_database:
-                config.pop('database', None)
-            
-            self.connection = mysql.connector.connect(**config)
+            # Pooled connection from the shared engine of this server/database
+            url = database_url(self.config, use_database=use_database)
+            self.connection = engine_registry.raw_connection(url)
             self.cursor = self.connection.cursor(dictionary=True)
             return True
-        except Error as e:
+        except (Error, SQLAlchemyError) as e:
             print(f"{Fore.RED}❌ Connection Error: {e}{Style.RESET_ALL}")
             return False
     
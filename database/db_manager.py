@@ -147,12 +147,9 @@ def create_database():
         else:
             # Try using python mysql connector
             try:
-                import mysql.connector
-                conn = mysql.connector.connect(
-                    host=config['host'],
-                    user=config['user'],
-                    password=password
-                )
+                from core.engine_registry import database_url, engine_registry
+                server = dict(config, password=password)
+                conn = engine_registry.raw_connection(database_url(server, use_database=False))
                 cursor = conn.cursor()
                 cursor.execute(create_db_sql)
                 cursor.close()
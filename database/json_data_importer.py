@@ -1,36 +1,144 @@
 """
 JSON Data Importer for MedLink
 Import existing JSON data files into MySQL database
+Rows are written with batched multi-row INSERTs (database/bulk_loader.py),
+one transaction per chunk, with progress and rows/second reporting
+patients.json and visits.json are streamed record by record
+(utils/json_stream.py) with a resumable checkpoint per file
+
+Location: database/json_data_importer.py
 """
 
 import json
-import mysql.connector
-from mysql.connector import Error
+import time
+from itertools import islice
 from pathlib import Path
 from colorama import Fore, Style, init
+from sqlalchemy.exc import SQLAlchemyError
 from datetime import datetime
 import sys
 
 sys.path.append(str(Path(__file__).parent.parent))
 
 from config.database_config import DATABASE_CONFIG
+from core.engine_registry import database_url, engine_registry
+from core.statistics_service import statistics_service
+from database.bulk_loader import BulkInserter, DEFAULT_CHUNK_SIZE, chunked
+from utils.json_stream import ImportCheckpoint, iter_batches, iter_json_array
 
 init(autoreset=True)
 
 
+# ==================== TABLE LAYOUT ====================
+# table -> columns written by the importer (database/schema.py)
+TABLE_COLUMNS = {
+    'users': (
+        'user_id', 'username', 'password_hash', 'role', 'full_name', 'email', 'phone',
+        'specialization', 'hospital', 'license_number', 'years_experience',
+        'fingerprint_id', 'fingerprint_enrolled', 'fingerprint_enrollment_date',
+        'nfc_card_uid', 'biometric_enabled', 'last_fingerprint_login', 'fingerprint_login_count',
+        'national_id', 'date_of_birth', 'created_at', 'last_login', 'login_count', 'account_status',
+    ),
+    'patients': (
+        'national_id', 'full_name', 'date_of_birth', 'age', 'gender', 'blood_type',
+        'phone', 'email', 'address', 'city', 'governorate',
+        'emergency_contact', 'chronic_diseases', 'allergies',
+        'family_history', 'disabilities_special_needs', 'emergency_directives',
+        'lifestyle', 'insurance', 'external_links',
+        'nfc_card_uid', 'nfc_card_assigned', 'nfc_card_assignment_date',
+        'nfc_card_type', 'nfc_card_status', 'nfc_card_last_scan', 'nfc_scan_count',
+        'created_at', 'last_updated',
+    ),
+    'surgeries': (
+        'surgery_id', 'patient_national_id', 'surgery_type', 'surgery_date',
+        'surgeon', 'hospital', 'reason', 'outcome', 'complications', 'notes',
+    ),
+    'hospitalizations': (
+        'hospitalization_id', 'patient_national_id', 'hospital', 'admission_date',
+        'discharge_date', 'reason', 'diagnosis', 'treatment', 'length_of_stay', 'notes',
+    ),
+    'vaccinations': (
+        'patient_national_id', 'vaccine_name', 'date_administered',
+        'dose_number', 'location', 'batch_number', 'next_dose_due',
+    ),
+    'current_medications': (
+        'patient_national_id', 'medication_name', 'dosage', 'frequency', 'started_date',
+    ),
+    'visits': (
+        'visit_id', 'patient_national_id', 'doctor_id', 'doctor_name',
+        'visit_date', 'visit_time', 'hospital', 'department', 'visit_type',
+        'chief_complaint', 'diagnosis', 'treatment_plan', 'notes', 'attachments', 'created_at',
+    ),
+    'prescriptions': (
+        'visit_id', 'medication', 'dosage', 'frequency', 'duration', 'instructions',
+    ),
+    'vital_signs': (
+        'visit_id', 'blood_pressure', 'heart_rate', 'temperature', 'weight', 'height',
+    ),
+    'lab_results': (
+        'result_id', 'patient_national_id', 'ordered_by', 'test_date',
+        'lab_name', 'test_type', 'status', 'results', 'notes', 'attachment', 'created_at',
+    ),
+    'imaging_results': (
+        'imaging_id', 'patient_national_id', 'ordered_by', 'imaging_date',
+        'imaging_center', 'imaging_type', 'body_part', 'findings', 'radiologist',
+        'images', 'created_at',
+    ),
+    'doctor_cards': ('card_uid', 'username', 'full_name', 'card_type'),
+    'patient_cards': ('card_uid', 'national_id', 'full_name', 'card_type'),
+    'hardware_audit_log': (
+        'event_id', 'timestamp', 'event_type', 'user_id', 'patient_national_id',
+        'card_uid', 'fingerprint_id', 'success', 'accessed_by', 'access_type',
+        'ip_address', 'device_name',
+    ),
+}
+
+# Column -> JSON key where the JSON files use another name
+SOURCE_KEYS = {
+    'current_medications': {'medication_name': 'name'},
+    'visits': {'visit_date': 'date', 'visit_time': 'time'},
+    'lab_results': {'test_date': 'date'},
+    'imaging_results': {'imaging_date': 'date'},
+    'doctor_cards': {'full_name': 'name', 'card_type': 'type'},
+    'patient_cards': {'full_name': 'name', 'card_type': 'type'},
+}
+
+# Patient fields stored as JSON text
+PATIENT_JSON_FIELDS = {
+    'emergency_contact': dict, 'chronic_diseases': list, 'allergies': list,
+    'family_history': dict, 'disabilities_special_needs': dict, 'emergency_directives': dict,
+    'lifestyle': dict, 'insurance': dict, 'external_links': dict,
+}
+
+# Child lists imported with each patient: JSON key -> table
+PATIENT_CHILDREN = {
+    'surgeries': 'surgeries',
+    'hospitalizations': 'hospitalizations',
+    'vaccinations': 'vaccinations',
+    'current_medications': 'current_medications',
+}
+
+
 class JSONDataImporter:
     """Import JSON data files into database"""
     
-    def __init__(self, data_folder="data"):
+    def __init__(self, data_folder="data", chunk_size=DEFAULT_CHUNK_SIZE, url=None, restart=False):
         """
         Initialize importer
         
         Args:
             data_folder (str): Path to folder containing JSON files
+            chunk_size (int): Rows per multi-row INSERT / transaction
+            url (str): Database URL (default: the configured MySQL database)
+            restart (bool): Ignore checkpoints of interrupted imports
         """
         self.data_folder = Path(data_folder)
+        self.chunk_size = chunk_size
+        self.restart = restart
+        self.url = url or database_url(DATABASE_CONFIG)
         self.connection = None
         self.cursor = None
+        self.loader = None
         self.stats = {
             'users': 0,
             'patients': 0,
@@ -47,14 +155,20 @@ class JSONDataImporter:
             'patient_cards': 0,
             'hardware_events': 0
         }
+        # table -> rows sent, seconds spent (for rows/second)
+        self.timings = {}
     
     def connect(self):
         """Connect to database"""
         try:
-            self.connection = mysql.connector.connect(**DATABASE_CONFIG)
-            self.cursor = self.connection.cursor(dictionary=True)
+            # Pooled connection from the shared engine (core/engine_registry.py)
+            dialect = engine_registry.get_engine(self.url).dialect.name
+            self.connection = engine_registry.raw_connection(self.url)
+            self.cursor = self.connection.cursor()
+            self.loader = BulkInserter(self.connection, dialect, self.chunk_size,
+                                       on_error=self._report_row_error)
             return True
-        except Error as e:
+        except (SQLAlchemyError, ValueError) as e:
             print(f"{Fore.RED}❌ Connection Error: {e}{Style.RESET_ALL}")
             return False
     
@@ -62,8 +176,10 @@ class JSONDataImporter:
         """Disconnect from database"""
         if self.cursor:
             self.cursor.close()
-        if self.connection and self.connection.is_connected():
+            self.cursor = None
+        if self.connection:
             self.connection.close()
+            self.connection = None
     
     def load_json_file(self, filename):
         """Load JSON file"""
@@ -79,6 +195,63 @@ class JSONDataImporter:
             print(f"{Fore.RED}❌ Error loading {filename}: {e}{Style.RESET_ALL}")
             return None
     
+    # ==================== BULK HELPERS ====================
+    
+    def _report_row_error(self, table, row, error):
+        print(f"\n{Fore.YELLOW}⚠️  Error importing {table} row {row[0]!r}: {error}{Style.RESET_ALL}")
+    
+    def _insert(self, table, records, stat_key=None):
+        """
+        Multi-row INSERT of JSON records into one table
+        
+        Args:
+            table (str): Table name (see TABLE_COLUMNS)
+            records (list): Dicts keyed by column (or SOURCE_KEYS name)
+            stat_key (str): Key in self.stats (default: table)
+        
+        Returns:
+            int: Rows inserted
+        """
+        if not records:
+            return 0
+        columns = TABLE_COLUMNS[table]
+        renamed = SOURCE_KEYS.get(table, {})
+        keys = [renamed.get(column, column) for column in columns]
+        result = self.loader.insert(table, columns, ([record.get(key) for key in keys] for record in records))
+        
+        self.stats[stat_key or table] += result['inserted']
+        timing = self.timings.setdefault(table, {'rows': 0, 'seconds': 0.0})
+        timing['rows'] += result['rows']
+        timing['seconds'] += result['seconds']
+        return result['inserted']
+    
+    def _existing(self, table, column, values):
+        """Values of `column` that are already in `table` (one IN query)"""
+        values = [v for v in values if v is not None]
+        if not values:
+            return set()
+        placeholders = ', '.join([self.loader.placeholder] * len(values))
+        self.cursor.execute(f"SELECT {column} FROM {table} WHERE {column} IN ({placeholders})", values)
+        return {row[0] for row in self.cursor.fetchall()}
+    
+    def _progress(self, label, done, total, started):
+        elapsed = time.perf_counter() - started
+        rate = done / elapsed if elapsed else 0
+        count = f"{done:,}/{total:,}" if total is not None else f"{done:,}"
+        print(f"\r{Fore.WHITE}   {label}: {count} ({rate:,.0f} records/s){Style.RESET_ALL}",
+              end='', flush=True)
+    
+    def _import_table(self, label, table, records, stat_key=None):
+        """Insert records chunk by chunk with progress"""
+        started = time.perf_counter()
+        for done, chunk in enumerate(chunked(records, self.chunk_size), 1):
+            self._insert(table, chunk, stat_key)
+            self._progress(label, min(done * self.chunk_size, len(records)), len(records), started)
+        if records:
+            print()
+    
+    # ==================== IMPORTS ====================
+    
     def import_users(self):
         """Import users from users.json"""
         print(f"\n{Fore.CYAN}📥 Importing Users...{Style.RESET_ALL}")
@@ -88,31 +261,7 @@ class JSONDataImporter:
             return False
         
         try:
-            query = """
-            INSERT INTO users (
-                user_id, username, password_hash, role, full_name, email, phone,
-                specialization, hospital, license_number, years_experience,
-                fingerprint_id, fingerprint_enrolled, fingerprint_enrollment_date,
-                nfc_card_uid, biometric_enabled, last_fingerprint_login, fingerprint_login_count,
-                national_id, date_of_birth, created_at, last_login, login_count, account_status
-            ) VALUES (
-                %(user_id)s, %(username)s, %(password_hash)s, %(role)s, %(full_name)s, %(email)s, %(phone)s,
-                %(specialization)s, %(hospital)s, %(license_number)s, %(years_experience)s,
-                %(fingerprint_id)s, %(fingerprint_enrolled)s, %(fingerprint_enrollment_date)s,
-                %(nfc_card_uid)s, %(biometric_enabled)s, %(last_fingerprint_login)s, %(fingerprint_login_count)s,
-                %(national_id)s, %(date_of_birth)s, %(created_at)s, %(last_login)s, %(login_count)s, %(account_status)s
-            )
-            """
-            
-            for user in data['users']:
-                try:
-                    self.cursor.execute(query, user)
-                    self.stats['users'] += 1
-                except Error as e:
-                    if "Duplicate entry" not in str(e):
-                        print(f"{Fore.YELLOW}⚠️  Error importing user {user.get('username')}: {e}{Style.RESET_ALL}")
-            
-            self.connection.commit()
+            self._import_table('users', 'users', data['users'])
             print(f"{Fore.GREEN}✅ Imported {self.stats['users']} users{Style.RESET_ALL}")
             return True
             
@@ -120,249 +269,136 @@ class JSONDataImporter:
             print(f"{Fore.RED}❌ Error importing users: {e}{Style.RESET_ALL}")
             return False
     
-    def import_patients(self):
-        """Import patients from patients.json"""
-        print(f"\n{Fore.CYAN}📥 Importing Patients...{Style.RESET_ALL}")
+    def _delete_children(self, table, column, keys):
+        """Remove child rows of parents whose import was interrupted"""
+        placeholders = ', '.join([self.loader.placeholder] * len(keys))
+        self.cursor.execute(f"DELETE FROM {table} WHERE {column} IN ({placeholders})", list(keys))
+        self.connection.commit()
+    
+    def _import_stream(self, filename, key, table, id_key, to_row, children):
+        """
+        Stream parent records with their child records, chunk by chunk
+        
+        Parents already in the database are skipped together with their
+        children. Progress is checkpointed after every chunk; the keys of
+        the chunk being written are saved first, so after an interruption
+        the children of those parents are deleted and written again
+        
+        Args:
+            filename (str): JSON file in the data folder
+            key (str): Top-level array in the file
+            table (str): Parent table
+            id_key (str): Parent key (JSON key and column)
+            to_row: Parent record -> row dict
+            children: Parent records -> [(table, parent column, rows)]
         
-        data = self.load_json_file('patients.json')
-        if not data or 'patients' not in data:
+        Returns:
+            bool: True when the whole file was imported
+        """
+        path = self.data_folder / filename
+        if not path.exists():
+            print(f"{Fore.YELLOW}⚠️  File not found: {path}{Style.RESET_ALL}")
             return False
         
-        try:
-            # Main patient data
-            patient_query = """
-            INSERT INTO patients (
-                national_id, full_name, date_of_birth, age, gender, blood_type,
-                phone, email, address, city, governorate,
-                emergency_contact, chronic_diseases, allergies,
-                family_history, disabilities_special_needs, emergency_directives,
-                lifestyle, insurance, external_links,
-                nfc_card_uid, nfc_card_assigned, nfc_card_assignment_date,
-                nfc_card_type, nfc_card_status, nfc_card_last_scan, nfc_scan_count,
-                created_at, last_updated
-            ) VALUES (
-                %(national_id)s, %(full_name)s, %(date_of_birth)s, %(age)s, %(gender)s, %(blood_type)s,
-                %(phone)s, %(email)s, %(address)s, %(city)s, %(governorate)s,
-                %(emergency_contact)s, %(chronic_diseases)s, %(allergies)s,
-                %(family_history)s, %(disabilities_special_needs)s, %(emergency_directives)s,
-                %(lifestyle)s, %(insurance)s, %(external_links)s,
-                %(nfc_card_uid)s, %(nfc_card_assigned)s, %(nfc_card_assignment_date)s,
-                %(nfc_card_type)s, %(nfc_card_status)s, %(nfc_card_last_scan)s, %(nfc_scan_count)s,
-                %(created_at)s, %(last_updated)s
-            )
-            """
+        checkpoint = ImportCheckpoint(path)
+        if self.restart:
+            checkpoint.clear()
+        state = checkpoint.load()
+        done = state['records']
+        recovered = set(state['in_flight'])
+        if done or recovered:
+            print(f"{Fore.YELLOW}   ↻ Resuming after {done:,} records{Style.RESET_ALL}")
+        
+        started = time.perf_counter()
+        records = islice(iter_json_array(path, key), done, None)
+        for chunk in iter_batches(records, self.chunk_size):
+            existing = self._existing(table, id_key, [r.get(id_key) for r in chunk])
+            new, redo, seen = [], [], set()
+            for record in chunk:
+                record_id = record.get(id_key)
+                if record_id in seen:
+                    continue
+                seen.add(record_id)
+                if record_id not in existing:
+                    new.append(record)
+                elif record_id in recovered:
+                    # Written by the interrupted run - its children may be incomplete
+                    redo.append(record)
+                    recovered.discard(record_id)
             
-            for patient in data['patients']:
-                try:
-                    # Convert nested objects to JSON
-                    patient_data = patient.copy()
-                    patient_data['emergency_contact'] = json.dumps(patient.get('emergency_contact', {}))
-                    patient_data['chronic_diseases'] = json.dumps(patient.get('chronic_diseases', []))
-                    patient_data['allergies'] = json.dumps(patient.get('allergies', []))
-                    patient_data['family_history'] = json.dumps(patient.get('family_history', {}))
-                    patient_data['disabilities_special_needs'] = json.dumps(patient.get('disabilities_special_needs', {}))
-                    patient_data['emergency_directives'] = json.dumps(patient.get('emergency_directives', {}))
-                    patient_data['lifestyle'] = json.dumps(patient.get('lifestyle', {}))
-                    patient_data['insurance'] = json.dumps(patient.get('insurance', {}))
-                    patient_data['external_links'] = json.dumps(patient.get('external_links', {}))
-                    
-                    self.cursor.execute(patient_query, patient_data)
-                    self.stats['patients'] += 1
-                    
-                    # Import surgeries
-                    if 'surgeries' in patient and patient['surgeries']:
-                        self.import_surgeries(patient['national_id'], patient['surgeries'])
-                    
-                    # Import hospitalizations
-                    if 'hospitalizations' in patient and patient['hospitalizations']:
-                        self.import_hospitalizations(patient['national_id'], patient['hospitalizations'])
-                    
-                    # Import vaccinations
-                    if 'vaccinations' in patient and patient['vaccinations']:
-                        self.import_vaccinations(patient['national_id'], patient['vaccinations'])
-                    
-                    # Import current medications
-                    if 'current_medications' in patient and patient['current_medications']:
-                        self.import_current_medications(patient['national_id'], patient['current_medications'])
-                    
-                except Error as e:
-                    if "Duplicate entry" not in str(e):
-                        print(f"{Fore.YELLOW}⚠️  Error importing patient {patient.get('national_id')}: {e}{Style.RESET_ALL}")
+            checkpoint.save(done, [r.get(id_key) for r in new + redo] + list(recovered))
+            self._insert(table, [to_row(r) for r in new])
+            for child_table, parent_column, rows in children(new + redo):
+                if redo:
+                    self._delete_children(child_table, parent_column, [r[id_key] for r in redo])
+                self._insert(child_table, rows)
             
-            self.connection.commit()
-            print(f"{Fore.GREEN}✅ Imported {self.stats['patients']} patients{Style.RESET_ALL}")
-            return True
-            
-        except Exception as e:
-            print(f"{Fore.RED}❌ Error importing patients: {e}{Style.RESET_ALL}")
-            return False
+            done += len(chunk)
+            checkpoint.save(done)
+            self._progress(table, done, None, started)
+        print()
+        checkpoint.clear()
+        return True
     
-    def import_surgeries(self, patient_national_id, surgeries):
-        """Import surgeries for a patient"""
-        query = """
-        INSERT INTO surgeries (
-            surgery_id, patient_national_id, surgery_type, surgery_date,
-            surgeon, hospital, reason, outcome, complications, notes
-        ) VALUES (
-            %(surgery_id)s, %(patient_national_id)s, %(surgery_type)s, %(surgery_date)s,
-            %(surgeon)s, %(hospital)s, %(reason)s, %(outcome)s, %(complications)s, %(notes)s
-        )
-        """
-        
-        for surgery in surgeries:
-            try:
-                surgery['patient_national_id'] = patient_national_id
-                self.cursor.execute(query, surgery)
-                self.stats['surgeries'] += 1
-            except Error as e:
-                if "Duplicate entry" not in str(e):
-                    print(f"{Fore.YELLOW}⚠️  Error importing surgery: {e}{Style.RESET_ALL}")
+    def _patient_row(self, patient):
+        """Patient record with nested objects as JSON text"""
+        row = patient.copy()
+        for field, empty in PATIENT_JSON_FIELDS.items():
+            row[field] = json.dumps(patient.get(field, empty()))
+        return row
     
-    def import_hospitalizations(self, patient_national_id, hospitalizations):
-        """Import hospitalizations for a patient"""
-        query = """
-        INSERT INTO hospitalizations (
-            hospitalization_id, patient_national_id, hospital, admission_date,
-            discharge_date, reason, diagnosis, treatment, length_of_stay, notes
-        ) VALUES (
-            %(hospitalization_id)s, %(patient_national_id)s, %(hospital)s, %(admission_date)s,
-            %(discharge_date)s, %(reason)s, %(diagnosis)s, %(treatment)s, %(length_of_stay)s, %(notes)s
-        )
-        """
-        
-        for hosp in hospitalizations:
-            try:
-                hosp['patient_national_id'] = patient_national_id
-                self.cursor.execute(query, hosp)
-                self.stats['hospitalizations'] += 1
-            except Error as e:
-                if "Duplicate entry" not in str(e):
-                    print(f"{Fore.YELLOW}⚠️  Error importing hospitalization: {e}{Style.RESET_ALL}")
+    def _patient_children(self, patients):
+        return [
+            (table, 'patient_national_id', [
+                dict(child, patient_national_id=patient['national_id'])
+                for patient in patients for child in (patient.get(key) or [])
+            ])
+            for key, table in PATIENT_CHILDREN.items()
+        ]
     
-    def import_vaccinations(self, patient_national_id, vaccinations):
-        """Import vaccinations for a patient"""
-        query = """
-        INSERT INTO vaccinations (
-            patient_national_id, vaccine_name, date_administered,
-            dose_number, location, batch_number, next_dose_due
-        ) VALUES (
-            %(patient_national_id)s, %(vaccine_name)s, %(date_administered)s,
-            %(dose_number)s, %(location)s, %(batch_number)s, %(next_dose_due)s
-        )
-        """
-        
-        for vacc in vaccinations:
-            try:
-                vacc['patient_national_id'] = patient_national_id
-                self.cursor.execute(query, vacc)
-                self.stats['vaccinations'] += 1
-            except Error as e:
-                print(f"{Fore.YELLOW}⚠️  Error importing vaccination: {e}{Style.RESET_ALL}")
+    def _visit_children(self, visits):
+        return [
+            ('prescriptions', 'visit_id', [
+                dict(presc, visit_id=visit['visit_id'], instructions=presc.get('instructions', ''))
+                for visit in visits for presc in (visit.get('prescriptions') or [])
+            ]),
+            ('vital_signs', 'visit_id', [
+                dict(visit['vital_signs'], visit_id=visit['visit_id'])
+                for visit in visits if visit.get('vital_signs')
+            ]),
+        ]
     
-    def import_current_medications(self, patient_national_id, medications):
-        """Import current medications for a patient"""
-        query = """
-        INSERT INTO current_medications (
-            patient_national_id, medication_name, dosage, frequency, started_date
-        ) VALUES (
-            %(patient_national_id)s, %(name)s, %(dosage)s, %(frequency)s, %(started_date)s
-        )
-        """
+    def import_patients(self):
+        """Import patients (and their surgeries, hospitalizations, vaccinations, medications)"""
+        print(f"\n{Fore.CYAN}📥 Importing Patients...{Style.RESET_ALL}")
         
-        for med in medications:
-            try:
-                med['patient_national_id'] = patient_national_id
-                self.cursor.execute(query, med)
-                self.stats['current_medications'] += 1
-            except Error as e:
-                print(f"{Fore.YELLOW}⚠️  Error importing medication: {e}{Style.RESET_ALL}")
+        try:
+            if not self._import_stream('patients.json', 'patients', 'patients', 'national_id',
+                                       self._patient_row, self._patient_children):
+                return False
+            print(f"{Fore.GREEN}✅ Imported {self.stats['patients']} patients{Style.RESET_ALL}")
+            return True
+            
+        except Exception as e:
+            print(f"\n{Fore.RED}❌ Error importing patients: {e}{Style.RESET_ALL}")
+            return False
     
     def import_visits(self):
-        """Import visits from visits.json"""
+        """Import visits (and their prescriptions and vital signs) from visits.json"""
         print(f"\n{Fore.CYAN}📥 Importing Visits...{Style.RESET_ALL}")
         
-        data = self.load_json_file('visits.json')
-        if not data or 'visits' not in data:
-            return False
-        
         try:
-            visit_query = """
-            INSERT INTO visits (
-                visit_id, patient_national_id, doctor_id, doctor_name,
-                visit_date, visit_time, hospital, department, visit_type,
-                chief_complaint, diagnosis, treatment_plan, notes, attachments, created_at
-            ) VALUES (
-                %(visit_id)s, %(patient_national_id)s, %(doctor_id)s, %(doctor_name)s,
-                %(date)s, %(time)s, %(hospital)s, %(department)s, %(visit_type)s,
-                %(chief_complaint)s, %(diagnosis)s, %(treatment_plan)s, %(notes)s, %(attachments)s, %(created_at)s
-            )
-            """
-            
-            for visit in data['visits']:
-                try:
-                    # Convert attachments to JSON
-                    visit['attachments'] = json.dumps(visit.get('attachments', []))
-                    
-                    self.cursor.execute(visit_query, visit)
-                    self.stats['visits'] += 1
-                    
-                    # Import prescriptions
-                    if 'prescriptions' in visit and visit['prescriptions']:
-                        self.import_prescriptions(visit['visit_id'], visit['prescriptions'])
-                    
-                    # Import vital signs
-                    if 'vital_signs' in visit and visit['vital_signs']:
-                        self.import_vital_signs(visit['visit_id'], visit['vital_signs'])
-                    
-                except Error as e:
-                    if "Duplicate entry" not in str(e):
-                        print(f"{Fore.YELLOW}⚠️  Error importing visit {visit.get('visit_id')}: {e}{Style.RESET_ALL}")
-            
-            self.connection.commit()
+            if not self._import_stream('visits.json', 'visits', 'visits', 'visit_id',
+                                       lambda v: dict(v, attachments=json.dumps(v.get('attachments', []))),
+                                       self._visit_children):
+                return False
             print(f"{Fore.GREEN}✅ Imported {self.stats['visits']} visits{Style.RESET_ALL}")
             return True
             
         except Exception as e:
-            print(f"{Fore.RED}❌ Error importing visits: {e}{Style.RESET_ALL}")
+            print(f"\n{Fore.RED}❌ Error importing visits: {e}{Style.RESET_ALL}")
             return False
     
-    def import_prescriptions(self, visit_id, prescriptions):
-        """Import prescriptions for a visit"""
-        query = """
-        INSERT INTO prescriptions (
-            visit_id, medication, dosage, frequency, duration, instructions
-        ) VALUES (
-            %(visit_id)s, %(medication)s, %(dosage)s, %(frequency)s, %(duration)s, %(instructions)s
-        )
-        """
-        
-        for presc in prescriptions:
-            try:
-                presc['visit_id'] = visit_id
-                presc['instructions'] = presc.get('instructions', '')
-                self.cursor.execute(query, presc)
-                self.stats['prescriptions'] += 1
-            except Error as e:
-                print(f"{Fore.YELLOW}⚠️  Error importing prescription: {e}{Style.RESET_ALL}")
-    
-    def import_vital_signs(self, visit_id, vital_signs):
-        """Import vital signs for a visit"""
-        query = """
-        INSERT INTO vital_signs (
-            visit_id, blood_pressure, heart_rate, temperature, weight, height
-        ) VALUES (
-            %(visit_id)s, %(blood_pressure)s, %(heart_rate)s, %(temperature)s, %(weight)s, %(height)s
-        )
-        """
-        
-        try:
-            vital_signs['visit_id'] = visit_id
-            vital_signs['height'] = vital_signs.get('height', None)
-            self.cursor.execute(query, vital_signs)
-            self.stats['vital_signs'] += 1
-        except Error as e:
-            print(f"{Fore.YELLOW}⚠️  Error importing vital signs: {e}{Style.RESET_ALL}")
-    
     def import_lab_results(self):
         """Import lab results from lab_results.json"""
         print(f"\n{Fore.CYAN}📥 Importing Lab Results...{Style.RESET_ALL}")
@@ -372,27 +408,8 @@ class JSONDataImporter:
             return False
         
         try:
-            query = """
-            INSERT INTO lab_results (
-                result_id, patient_national_id, ordered_by, test_date,
-                lab_name, test_type, status, results, notes, attachment, created_at
-            ) VALUES (
-                %(result_id)s, %(patient_national_id)s, %(ordered_by)s, %(date)s,
-                %(lab_name)s, %(test_type)s, %(status)s, %(results)s, %(notes)s, %(attachment)s, %(created_at)s
-            )
-            """
-            
-            for result in data['lab_results']:
-                try:
-                    # Convert results to JSON
-                    result['results'] = json.dumps(result.get('results', {}))
-                    self.cursor.execute(query, result)
-                    self.stats['lab_results'] += 1
-                except Error as e:
-                    if "Duplicate entry" not in str(e):
-                        print(f"{Fore.YELLOW}⚠️  Error importing lab result: {e}{Style.RESET_ALL}")
-            
-            self.connection.commit()
+            results = [dict(r, results=json.dumps(r.get('results', {}))) for r in data['lab_results']]
+            self._import_table('lab results', 'lab_results', results)
             print(f"{Fore.GREEN}✅ Imported {self.stats['lab_results']} lab results{Style.RESET_ALL}")
             return True
             
@@ -409,29 +426,8 @@ class JSONDataImporter:
             return False
         
         try:
-            query = """
-            INSERT INTO imaging_results (
-                imaging_id, patient_national_id, ordered_by, imaging_date,
-                imaging_center, imaging_type, body_part, findings, radiologist,
-                images, created_at
-            ) VALUES (
-                %(imaging_id)s, %(patient_national_id)s, %(ordered_by)s, %(date)s,
-                %(imaging_center)s, %(imaging_type)s, %(body_part)s, %(findings)s, %(radiologist)s,
-                %(images)s, %(created_at)s
-            )
-            """
-            
-            for result in data['imaging_results']:
-                try:
-                    # Convert images to JSON
-                    result['images'] = json.dumps(result.get('images', []))
-                    self.cursor.execute(query, result)
-                    self.stats['imaging_results'] += 1
-                except Error as e:
-                    if "Duplicate entry" not in str(e):
-                        print(f"{Fore.YELLOW}⚠️  Error importing imaging result: {e}{Style.RESET_ALL}")
-            
-            self.connection.commit()
+            results = [dict(r, images=json.dumps(r.get('images', []))) for r in data['imaging_results']]
+            self._import_table('imaging results', 'imaging_results', results)
             print(f"{Fore.GREEN}✅ Imported {self.stats['imaging_results']} imaging results{Style.RESET_ALL}")
             return True
             
@@ -448,45 +444,10 @@ class JSONDataImporter:
             return False
         
         try:
-            # Import doctor cards
-            if 'doctor_cards' in data:
-                doctor_query = """
-                INSERT INTO doctor_cards (
-                    card_uid, username, full_name, card_type
-                ) VALUES (
-                    %(card_uid)s, %(username)s, %(name)s, %(type)s
-                )
-                """
-                
-                for card_uid, card_data in data['doctor_cards'].items():
-                    try:
-                        card_data['card_uid'] = card_uid
-                        self.cursor.execute(doctor_query, card_data)
-                        self.stats['doctor_cards'] += 1
-                    except Error as e:
-                        if "Duplicate entry" not in str(e):
-                            print(f"{Fore.YELLOW}⚠️  Error importing doctor card: {e}{Style.RESET_ALL}")
-            
-            # Import patient cards
-            if 'patient_cards' in data:
-                patient_query = """
-                INSERT INTO patient_cards (
-                    card_uid, national_id, full_name, card_type
-                ) VALUES (
-                    %(card_uid)s, %(national_id)s, %(name)s, %(type)s
-                )
-                """
-                
-                for card_uid, card_data in data['patient_cards'].items():
-                    try:
-                        card_data['card_uid'] = card_uid
-                        self.cursor.execute(patient_query, card_data)
-                        self.stats['patient_cards'] += 1
-                    except Error as e:
-                        if "Duplicate entry" not in str(e):
-                            print(f"{Fore.YELLOW}⚠️  Error importing patient card: {e}{Style.RESET_ALL}")
+            for table in ('doctor_cards', 'patient_cards'):
+                cards = [dict(card, card_uid=uid) for uid, card in data.get(table, {}).items()]
+                self._import_table(table.replace('_', ' '), table, cards)
             
-            self.connection.commit()
             print(f"{Fore.GREEN}✅ Imported {self.stats['doctor_cards']} doctor cards, {self.stats['patient_cards']} patient cards{Style.RESET_ALL}")
             return True
             
@@ -503,37 +464,9 @@ class JSONDataImporter:
             return False
         
         try:
-            query = """
-            INSERT INTO hardware_audit_log (
-                event_id, timestamp, event_type, user_id, patient_national_id,
-                card_uid, fingerprint_id, success, accessed_by, access_type,
-                ip_address, device_name
-            ) VALUES (
-                %(event_id)s, %(timestamp)s, %(event_type)s, %(user_id)s, %(patient_national_id)s,
-                %(card_uid)s, %(fingerprint_id)s, %(success)s, %(accessed_by)s, %(access_type)s,
-                %(ip_address)s, %(device_name)s
-            )
-            """
-            
-            for event in data['hardware_events']:
-                try:
-                    # Fill optional fields with None
-                    event.setdefault('user_id', None)
-                    event.setdefault('patient_national_id', None)
-                    event.setdefault('card_uid', None)
-                    event.setdefault('fingerprint_id', None)
-                    event.setdefault('accessed_by', None)
-                    event.setdefault('access_type', None)
-                    event.setdefault('ip_address', None)
-                    event.setdefault('device_name', None)
-                    
-                    self.cursor.execute(query, event)
-                    self.stats['hardware_events'] += 1
-                except Error as e:
-                    if "Duplicate entry" not in str(e):
-                        print(f"{Fore.YELLOW}⚠️  Error importing hardware event: {e}{Style.RESET_ALL}")
-            
-            self.connection.commit()
+            # Missing optional fields are written as NULL
+            self._import_table('hardware events', 'hardware_audit_log', data['hardware_events'],
+                               stat_key='hardware_events')
             print(f"{Fore.GREEN}✅ Imported {self.stats['hardware_events']} hardware events{Style.RESET_ALL}")
             return True
             
@@ -560,6 +493,8 @@ class JSONDataImporter:
         self.import_hardware_audit_log()
         
         self.disconnect()
+        # Bulk inserts bypass the ORM hooks that maintain the dashboard rollup
+        statistics_service.rebuild_after_bulk_write(self.url)
         
         # Print summary
         print(f"\n{Fore.GREEN}{'='*60}{Style.RESET_ALL}")
@@ -572,14 +507,29 @@ class JSONDataImporter:
                 print(f"{Fore.WHITE}  • {key.replace('_', ' ').title():.<30} {value:>6,}{Style.RESET_ALL}")
         
         total = sum(self.stats.values())
-        print(f"\n{Fore.GREEN}  Total Records Imported: {total:,}{Style.RESET_ALL}\n")
+        print(f"\n{Fore.GREEN}  Total Records Imported: {total:,}{Style.RESET_ALL}")
+        
+        rows = sum(t['rows'] for t in self.timings.values())
+        seconds = sum(t['seconds'] for t in self.timings.values())
+        if seconds:
+            print(f"{Fore.GREEN}  Throughput: {rows / seconds:,.0f} rows/s "
+                  f"(chunk size {self.chunk_size:,}){Style.RESET_ALL}\n")
         
         return True
 
 
 def main():
     """CLI interface"""
-    importer = JSONDataImporter()
+    import argparse
+    parser = argparse.ArgumentParser(description="Import MedLink JSON data files")
+    parser.add_argument('--data', default='data', help="folder with the JSON files")
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE,
+                        help="rows per multi-row INSERT / transaction")
+    parser.add_argument('--restart', action='store_true',
+                        help="ignore checkpoints of an interrupted import")
+    args = parser.parse_args()
+
+    importer = JSONDataImporter(args.data, chunk_size=args.chunk_size, restart=args.restart)
     importer.import_all()
 
 
@@ -11,6 +11,7 @@ from datetime import datetime
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
 from database.connection import get_db_context
+from database.migrations.prefetch import existing_keys
 from core.models import NFCCard
 
 
@@ -54,11 +55,13 @@ def migrate_cards(json_file_path: str = 'data/cards.json'):
         seen_uids = set()
         
         with get_db_context() as db:
+            # One set-based lookup instead of a SELECT per card
+            existing_uids = existing_keys(db, NFCCard.card_uid, list(doctor_cards) + list(patient_cards))
+            
             # Migrate doctor cards
             for card_uid, card_data in doctor_cards.items():
                 # Check if card already exists in database
-                existing = db.query(NFCCard).filter_by(card_uid=card_uid).first()
-                if existing:
+                if card_uid in existing_uids:
                     print(f"  ⏭️  Skipping {card_uid} (already exists in database)")
                     skipped_count += 1
                     continue
@@ -91,8 +94,7 @@ def migrate_cards(json_file_path: str = 'data/cards.json'):
             # Migrate patient cards
             for card_uid, card_data in patient_cards.items():
                 # Check if card already exists in database
-                existing = db.query(NFCCard).filter_by(card_uid=card_uid).first()
-                if existing:
+                if card_uid in existing_uids:
                     print(f"  ⏭️  Skipping {card_uid} (already exists in database)")
                     skipped_count += 1
                     continue
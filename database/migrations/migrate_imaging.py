@@ -11,6 +11,7 @@ from datetime import datetime
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
 from database.connection import get_db_context
+from database.migrations.prefetch import existing_keys
 from core.models import ImagingResult
 
 
@@ -47,6 +48,10 @@ def migrate_imaging(json_file_path: str = 'data/imaging_results.json'):
         skipped_count = 0
         
         with get_db_context() as db:
+            # One set-based lookup instead of a SELECT per record
+            existing_ids = existing_keys(db, ImagingResult.imaging_id,
+                                         [r.get('imaging_id') for r in imaging_results_data])
+            
             for result_data in imaging_results_data:
                 imaging_id = result_data.get('imaging_id')
                 
@@ -56,12 +61,12 @@ def migrate_imaging(json_file_path: str = 'data/imaging_results.json'):
                     skipped_count += 1
                     continue
                 
-                # Check if result already exists
-                existing = db.query(ImagingResult).filter_by(imaging_id=imaging_id).first()
-                if existing:
+                # Check if it already exists (in the database or earlier in the file)
+                if imaging_id in existing_ids:
                     print(f"  ⏭️  Skipping {imaging_id} (already exists)")
                     skipped_count += 1
                     continue
+                existing_ids.add(imaging_id)
                 
                 # Parse date
                 result_date = None
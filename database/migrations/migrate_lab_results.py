@@ -11,6 +11,7 @@ from datetime import datetime
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
 from database.connection import get_db_context
+from database.migrations.prefetch import existing_keys
 from core.models import LabResult
 
 
@@ -47,6 +48,10 @@ def migrate_lab_results(json_file_path: str = 'data/lab_results.json'):
         skipped_count = 0
         
         with get_db_context() as db:
+            # One set-based lookup instead of a SELECT per record
+            existing_ids = existing_keys(db, LabResult.result_id,
+                                         [r.get('result_id') for r in lab_results_data])
+            
             for result_data in lab_results_data:
                 result_id = result_data.get('result_id')
                 
@@ -56,12 +61,12 @@ def migrate_lab_results(json_file_path: str = 'data/lab_results.json'):
                     skipped_count += 1
                     continue
                 
-                # Check if result already exists
-                existing = db.query(LabResult).filter_by(result_id=result_id).first()
-                if existing:
+                # Check if it already exists (in the database or earlier in the file)
+                if result_id in existing_ids:
                     print(f"  ⏭️  Skipping {result_id} (already exists)")
                     skipped_count += 1
                     continue
+                existing_ids.add(result_id)
                 
                 # Parse date
                 result_date = None
@@ -1,9 +1,11 @@
 """
 Migrate patients from JSON to database
+patients.json is streamed (utils/json_stream.py) and committed in
+batches, with a checkpoint so an interrupted migration resumes
 Location: database/migrations/migrate_patients.py
 """
 import sys
-import json
+from itertools import islice
 from pathlib import Path
 from datetime import datetime
 
@@ -11,15 +13,20 @@ from datetime import datetime
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
 from database.connection import get_db_context
+from database.migrations.prefetch import existing_keys
 from core.models import Patient
+from utils.json_stream import ImportCheckpoint, iter_batches, iter_json_array
 
+BATCH_SIZE = 500
 
-def migrate_patients(json_file_path: str = 'data/patients.json'):
+
+def migrate_patients(json_file_path: str = 'data/patients.json', batch_size: int = BATCH_SIZE):
     """
     Migrate patients from JSON file to database
     
     Args:
         json_file_path: Path to patients.json file
+        batch_size: Patients per transaction
     
     Returns:
         (success: bool, message: str, count: int)
@@ -29,119 +36,126 @@ def migrate_patients(json_file_path: str = 'data/patients.json'):
     print("="*60)
     
     try:
-        # Load JSON data
-        print(f"📖 Reading from: {json_file_path}")
-        with open(json_file_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-        
-        patients_data = data.get('patients', [])
-        print(f"✅ Found {len(patients_data)} patients in JSON")
+        print(f"📖 Streaming from: {json_file_path}")
+        if not Path(json_file_path).exists():
+            raise FileNotFoundError(json_file_path)
         
-        if not patients_data:
-            return True, "No patients to migrate", 0
+        checkpoint = ImportCheckpoint(json_file_path, 'migrate')
+        done = checkpoint.load()['records']
+        if done:
+            print(f"↻ Resuming after {done} patients")
         
         # Migrate to database
         migrated_count = 0
         skipped_count = 0
         
-        with get_db_context() as db:
-            for patient_data in patients_data:
-                national_id = patient_data.get('national_id')
+        records = islice(iter_json_array(json_file_path, 'patients'), done, None)
+        for batch in iter_batches(records, batch_size):
+            with get_db_context() as db:
+                existing_ids = existing_keys(db, Patient.national_id, (p.get('national_id') for p in batch))
+            
+                for patient_data in batch:
+                    national_id = patient_data.get('national_id')
                 
-                # Check if patient already exists
-                existing = db.query(Patient).filter_by(national_id=national_id).first()
-                if existing:
-                    print(f"  ⏭️  Skipping {national_id} (already exists)")
-                    skipped_count += 1
-                    continue
+                    # Check if patient already exists (in the database or earlier in this batch)
+                    if national_id in existing_ids:
+                        print(f"  ⏭️  Skipping {national_id} (already exists)")
+                        skipped_count += 1
+                        continue
+                    existing_ids.add(national_id)
                 
-                # Parse date of birth
-                dob = None
-                if patient_data.get('date_of_birth'):
-                    try:
-                        dob = datetime.strptime(patient_data['date_of_birth'], "%Y-%m-%d").date()
-                    except:
-                        pass
+                    # Parse date of birth
+                    dob = None
+                    if patient_data.get('date_of_birth'):
+                        try:
+                            dob = datetime.strptime(patient_data['date_of_birth'], "%Y-%m-%d").date()
+                        except:
+                            pass
                 
-                # Create patient object
-                patient = Patient(
-                    national_id=national_id,
-                    full_name=patient_data.get('full_name'),
-                    date_of_birth=dob,
-                    age=patient_data.get('age'),
-                    gender=patient_data.get('gender'),
-                    blood_type=patient_data.get('blood_type'),
+                    # Create patient object
+                    patient = Patient(
+                        national_id=national_id,
+                        full_name=patient_data.get('full_name'),
+                        date_of_birth=dob,
+                        age=patient_data.get('age'),
+                        gender=patient_data.get('gender'),
+                        blood_type=patient_data.get('blood_type'),
                     
-                    # Contact information
-                    phone=patient_data.get('phone'),
-                    email=patient_data.get('email'),
-                    address=patient_data.get('address'),
+                        # Contact information
+                        phone=patient_data.get('phone'),
+                        email=patient_data.get('email'),
+                        address=patient_data.get('address'),
                     
-                    # Emergency contact (already JSON)
-                    emergency_contact=patient_data.get('emergency_contact'),
+                        # Emergency contact (already JSON)
+                        emergency_contact=patient_data.get('emergency_contact'),
                     
-                    # Medical information (already JSON arrays)
-                    chronic_diseases=patient_data.get('chronic_diseases', []),
-                    allergies=patient_data.get('allergies', []),
-                    current_medications=patient_data.get('current_medications', []),
+                        # Medical information (already JSON arrays)
+                        chronic_diseases=patient_data.get('chronic_diseases', []),
+                        allergies=patient_data.get('allergies', []),
+                        current_medications=patient_data.get('current_medications', []),
                     
-                    # Insurance (already JSON)
-                    insurance=patient_data.get('insurance'),
+                        # Insurance (already JSON)
+                        insurance=patient_data.get('insurance'),
                     
-                    # External links (already JSON)
-                    external_links=patient_data.get('external_links', {}),
+                        # External links (already JSON)
+                        external_links=patient_data.get('external_links', {}),
                     
-                    # NFC Card information
-                    nfc_card_uid=patient_data.get('nfc_card_uid'),
-                    nfc_card_assigned=patient_data.get('nfc_card_assigned', False),
-                    nfc_card_type=patient_data.get('nfc_card_type'),
-                    nfc_card_status=patient_data.get('nfc_card_status'),
-                    nfc_scan_count=patient_data.get('nfc_scan_count', 0),
+                        # NFC Card information
+                        nfc_card_uid=patient_data.get('nfc_card_uid'),
+                        nfc_card_assigned=patient_data.get('nfc_card_assigned', False),
+                        nfc_card_type=patient_data.get('nfc_card_type'),
+                        nfc_card_status=patient_data.get('nfc_card_status'),
+                        nfc_scan_count=patient_data.get('nfc_scan_count', 0),
                     
-                    # Complex nested medical records (stored as JSON)
-                    surgeries=patient_data.get('surgeries', []),
-                    hospitalizations=patient_data.get('hospitalizations', []),
-                    vaccinations=patient_data.get('vaccinations', []),
-                    family_history=patient_data.get('family_history', {}),
-                    disabilities_special_needs=patient_data.get('disabilities_special_needs', {}),
-                    emergency_directives=patient_data.get('emergency_directives', {}),
-                    lifestyle=patient_data.get('lifestyle', {}),
+                        # Complex nested medical records (stored as JSON)
+                        surgeries=patient_data.get('surgeries', []),
+                        hospitalizations=patient_data.get('hospitalizations', []),
+                        vaccinations=patient_data.get('vaccinations', []),
+                        family_history=patient_data.get('family_history', {}),
+                        disabilities_special_needs=patient_data.get('disabilities_special_needs', {}),
+                        emergency_directives=patient_data.get('emergency_directives', {}),
+                        lifestyle=patient_data.get('lifestyle', {}),
                     
-                    # Timestamps
-                    created_at=datetime.now(),
-                    last_updated=datetime.now()
-                )
+                        # Timestamps
+                        created_at=datetime.now(),
+                        last_updated=datetime.now()
+                    )
                 
-                # Parse NFC assignment date
-                if patient_data.get('nfc_card_assignment_date'):
-                    try:
-                        patient.nfc_card_assignment_date = datetime.strptime(
-                            patient_data['nfc_card_assignment_date'], "%Y-%m-%d"
-                        ).date()
-                    except:
-                        pass
+                    # Parse NFC assignment date
+                    if patient_data.get('nfc_card_assignment_date'):
+                        try:
+                            patient.nfc_card_assignment_date = datetime.strptime(
+                                patient_data['nfc_card_assignment_date'], "%Y-%m-%d"
+                            ).date()
+                        except:
+                            pass
                 
-                # Parse last NFC scan
-                if patient_data.get('nfc_card_last_scan'):
-                    try:
-                        patient.nfc_card_last_scan = datetime.strptime(
-                            patient_data['nfc_card_last_scan'], "%Y-%m-%d %H:%M:%S"
-                        )
-                    except:
-                        pass
+                    # Parse last NFC scan
+                    if patient_data.get('nfc_card_last_scan'):
+                        try:
+                            patient.nfc_card_last_scan = datetime.strptime(
+                                patient_data['nfc_card_last_scan'], "%Y-%m-%d %H:%M:%S"
+                            )
+                        except:
+                            pass
                 
-                db.add(patient)
+                    db.add(patient)
                 
-                # Show progress with medical data counts
-                surgeries_count = len(patient.surgeries) if patient.surgeries else 0
-                hospitalizations_count = len(patient.hospitalizations) if patient.hospitalizations else 0
-                vaccinations_count = len(patient.vaccinations) if patient.vaccinations else 0
+                    # Show progress with medical data counts
+                    surgeries_count = len(patient.surgeries) if patient.surgeries else 0
+                    hospitalizations_count = len(patient.hospitalizations) if patient.hospitalizations else 0
+                    vaccinations_count = len(patient.vaccinations) if patient.vaccinations else 0
                 
-                print(f"  ✅ {patient.full_name}")
-                print(f"     ID: {national_id}")
-                print(f"     Medical: {surgeries_count} surgeries, {hospitalizations_count} hospitalizations, {vaccinations_count} vaccines")
+                    print(f"  ✅ {patient.full_name}")
+                    print(f"     ID: {national_id}")
+                    print(f"     Medical: {surgeries_count} surgeries, {hospitalizations_count} hospitalizations, {vaccinations_count} vaccines")
                 
-                migrated_count += 1
+                    migrated_count += 1
+            
+            # Committed - a rerun continues after this batch
+            done += len(batch)
+            checkpoint.save(done)
+        checkpoint.clear()
         
         print(f"\n✅ Migration complete!")
         print(f"   Migrated: {migrated_count}")
@@ -11,6 +11,7 @@ from datetime import datetime
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
 from database.connection import get_db_context
+from database.migrations.prefetch import existing_keys
 from core.models import User
 
 
@@ -45,15 +46,19 @@ def migrate_users(json_file_path: str = 'data/users.json'):
         skipped_count = 0
         
         with get_db_context() as db:
+            # One set-based lookup instead of a SELECT per record
+            existing_ids = existing_keys(db, User.user_id,
+                                         [r.get('user_id') for r in users_data])
+            
             for user_data in users_data:
                 user_id = user_data.get('user_id')
                 
-                # Check if user already exists
-                existing = db.query(User).filter_by(user_id=user_id).first()
-                if existing:
+                # Check if it already exists (in the database or earlier in the file)
+                if user_id in existing_ids:
                     print(f"  ⏭️  Skipping {user_id} (already exists)")
                     skipped_count += 1
                     continue
+                existing_ids.add(user_id)
                 
                 # Create user object
                 user = User(
@@ -11,6 +11,7 @@ from datetime import datetime
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
 from database.connection import get_db_context
+from database.migrations.prefetch import existing_keys
 from core.models import Visit
 
 
@@ -45,15 +46,19 @@ def migrate_visits(json_file_path: str = 'data/visits.json'):
         skipped_count = 0
         
         with get_db_context() as db:
+            # One set-based lookup instead of a SELECT per record
+            existing_ids = existing_keys(db, Visit.visit_id,
+                                         [r.get('visit_id') for r in visits_data])
+            
             for visit_data in visits_data:
                 visit_id = visit_data.get('visit_id')
                 
-                # Check if visit already exists
-                existing = db.query(Visit).filter_by(visit_id=visit_id).first()
-                if existing:
+                # Check if it already exists (in the database or earlier in the file)
+                if visit_id in existing_ids:
                     print(f"  ⏭️  Skipping {visit_id} (already exists)")
                     skipped_count += 1
                     continue
+                existing_ids.add(visit_id)
                 
                 # Parse date
                 visit_date = None
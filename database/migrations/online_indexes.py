@@ -0,0 +1,161 @@
+"""
+Online index migration
+Creates every index declared in core/models.py that is missing from an
+existing database, one index at a time, without long table locks
+
+- MySQL: CREATE INDEX ... ALGORITHM=INPLACE, LOCK=NONE (InnoDB online
+  DDL - reads and writes continue while the index builds). The short
+  metadata lock taken at the start and end is requested with a small
+  lock_wait_timeout and retried, so a long-running transaction makes the
+  migration wait instead of queueing every other query behind it
+- SQLite has no online DDL: each index is built in its own short
+  transaction (the write lock is held for one index, not the whole
+  migration), followed by ANALYZE so the planner picks it up
+- --dry-run prints the DDL without running it
+
+Location: database/migrations/online_indexes.py
+"""
+import sys
+import time
+import argparse
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from sqlalchemy import inspect, text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.schema import CreateIndex
+
+from core.database import Base, get_engine
+import core.models  # noqa: F401  (registers every table on Base.metadata)
+
+# MySQL error codes: lock wait timeout, online DDL not supported for this change
+LOCK_WAIT_TIMEOUT = 1205
+ONLINE_NOT_SUPPORTED = (1845, 1846)
+
+
+def missing_indexes(engine, tables=None) -> list:
+    """
+    Model indexes that do not exist in the database yet
+
+    Args:
+        engine: SQLAlchemy engine
+        tables: Table names to check (default: every model table)
+
+    Returns:
+        list: sqlalchemy Index objects
+    """
+    inspector = inspect(engine)
+    existing_tables = set(inspector.get_table_names())
+    missing = []
+    for table in Base.metadata.sorted_tables:
+        if tables is not None and table.name not in tables:
+            continue
+        if table.name not in existing_tables:
+            continue  # created with all its indexes by init_db()
+        existing = {i['name'] for i in inspector.get_indexes(table.name)}
+        missing.extend(sorted((i for i in table.indexes if i.name not in existing),
+                              key=lambda i: i.name))
+    return missing
+
+
+def index_ddl(index, dialect, online: bool = True) -> str:
+    """CREATE INDEX statement for one index on this dialect"""
+    ddl = str(CreateIndex(index, if_not_exists=dialect.name == 'sqlite').compile(dialect=dialect))
+    if dialect.name == 'mysql' and online:
+        ddl += " ALGORITHM=INPLACE, LOCK=NONE"
+    return ddl
+
+
+def build_index(engine, index, lock_wait_timeout: int = 5, retries: int = 5) -> float:
+    """
+    Build one index online
+
+    Args:
+        engine: SQLAlchemy engine
+        index: sqlalchemy Index
+        lock_wait_timeout: Seconds to wait for the metadata lock per attempt (MySQL)
+        retries: Attempts when the metadata lock is busy
+
+    Returns:
+        float: Build time in seconds
+    """
+    started = time.perf_counter()
+    if engine.dialect.name != 'mysql':
+        with engine.begin() as conn:
+            conn.execute(text(index_ddl(index, engine.dialect)))
+            if engine.dialect.name == 'sqlite':
+                conn.execute(text(f"ANALYZE {index.table.name}"))
+        return time.perf_counter() - started
+
+    online = True
+    for attempt in range(1, retries + 1):
+        try:
+            with engine.connect() as conn:
+                conn.execute(text(f"SET SESSION lock_wait_timeout = {int(lock_wait_timeout)}"))
+                try:
+                    conn.execute(text(index_ddl(index, engine.dialect, online=online)))
+                finally:
+                    # Pooled connection - do not leak the short timeout to other users
+                    conn.execute(text("SET SESSION lock_wait_timeout = DEFAULT"))
+            return time.perf_counter() - started
+        except OperationalError as e:
+            code = e.orig.args[0] if e.orig is not None and e.orig.args else None
+            if code in ONLINE_NOT_SUPPORTED and online:
+                print(f"   ⚠️  {index.name}: online build not supported, using the default algorithm")
+                online = False
+            elif code == LOCK_WAIT_TIMEOUT and attempt < retries:
+                print(f"   ⏳ {index.name}: table busy, retrying ({attempt}/{retries})")
+                time.sleep(min(30, 2 ** attempt))
+            else:
+                raise
+    raise RuntimeError(f"Could not build {index.name}")
+
+
+def migrate_indexes(engine, tables=None, dry_run: bool = False,
+                    lock_wait_timeout: int = 5) -> list:
+    """
+    Create all missing model indexes, one at a time
+
+    Args:
+        engine: SQLAlchemy engine
+        tables: Table names to migrate (default: all)
+        dry_run: Print the DDL only
+        lock_wait_timeout: Metadata lock wait per attempt (MySQL)
+
+    Returns:
+        list: (index name, seconds) of the indexes built
+    """
+    built = []
+    for index in missing_indexes(engine, tables):
+        if dry_run:
+            print(f"   {index_ddl(index, engine.dialect)};")
+            continue
+        seconds = build_index(engine, index, lock_wait_timeout=lock_wait_timeout)
+        built.append((index.name, seconds))
+        print(f"   ✅ {index.table.name}.{index.name} ({seconds:.2f}s)")
+    return built
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Create missing model indexes without long table locks")
+    parser.add_argument('--table', action='append', dest='tables',
+                        help="only this table (repeatable)")
+    parser.add_argument('--dry-run', action='store_true', help="print the DDL only")
+    parser.add_argument('--lock-wait-timeout', type=int, default=5,
+                        help="seconds to wait for the metadata lock per attempt (MySQL)")
+    args = parser.parse_args()
+
+    print("\n" + "="*60)
+    print("🗂️  ONLINE INDEX MIGRATION")
+    print("="*60)
+
+    engine = get_engine()
+    built = migrate_indexes(engine, args.tables, args.dry_run, args.lock_wait_timeout)
+    if not args.dry_run:
+        print(f"\n{len(built)} index(es) created")
+
+
+if __name__ == "__main__":
+    main()
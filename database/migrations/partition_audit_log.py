@@ -0,0 +1,150 @@
+"""
+Audit log indexes and monthly partitions
+Adds patient_national_id and the composite (filter, timestamp) indexes
+used by core.audit_query, then (MySQL only) RANGE-partitions
+hardware_audit_logs by month so time-bounded queries prune partitions
+
+- MySQL requires the partitioning column in every unique key, so the
+  primary key becomes (id, timestamp)
+- Monthly partitions are named p<YYYYMM>; pmax catches anything newer
+  and is split again on every run (months_ahead keeps future months ready)
+- SQLite has no partitions; the composite indexes plus the month-window
+  walk in core.audit_query give the same pruning
+
+Location: database/migrations/partition_audit_log.py
+"""
+import sys
+import argparse
+from pathlib import Path
+from datetime import datetime
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from sqlalchemy import inspect, text
+
+from core.database import get_engine
+from core.models import HardwareAuditLog
+from database.migrations.online_indexes import migrate_indexes
+
+TABLE = HardwareAuditLog.__tablename__
+
+
+def _add_months(moment: datetime, months: int) -> datetime:
+    month = moment.month - 1 + months
+    return datetime(moment.year + month // 12, month % 12 + 1, 1)
+
+
+def ensure_audit_indexes(engine) -> list:
+    """
+    Add patient_national_id and any missing composite index
+
+    Args:
+        engine: SQLAlchemy engine
+
+    Returns:
+        list: Names of the indexes created
+    """
+    inspector = inspect(engine)
+    columns = {c['name'] for c in inspector.get_columns(TABLE)}
+    if 'patient_national_id' not in columns:
+        with engine.begin() as conn:
+            conn.execute(text(f"ALTER TABLE {TABLE} ADD COLUMN patient_national_id VARCHAR(14)"))
+        print("   ✅ Added column patient_national_id")
+
+    return [name for name, _ in migrate_indexes(engine, tables=[TABLE])]
+
+
+def _partition_names(engine):
+    """Names of the existing partitions of the table"""
+    with engine.connect() as conn:
+        rows = conn.execute(text(
+            "SELECT PARTITION_NAME FROM information_schema.PARTITIONS "
+            "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :table "
+            "AND PARTITION_NAME IS NOT NULL"
+        ), {'table': TABLE}).scalars().all()
+    return sorted(rows)
+
+
+def _partition_clause(first: datetime, last: datetime) -> str:
+    """p<YYYYMM> partitions for every month in [first, last], plus pmax"""
+    parts = []
+    month = datetime(first.year, first.month, 1)
+    while month <= last:
+        upper = _add_months(month, 1)
+        parts.append(f"PARTITION p{month:%Y%m} VALUES LESS THAN (TO_DAYS('{upper:%Y-%m-%d}'))")
+        month = upper
+    parts.append("PARTITION pmax VALUES LESS THAN MAXVALUE")
+    return ",\n    ".join(parts)
+
+
+def partition_audit_log(engine, months_ahead: int = 3) -> int:
+    """
+    RANGE-partition hardware_audit_logs by month (MySQL)
+
+    Args:
+        engine: SQLAlchemy engine
+        months_ahead: Future months to create partitions for
+
+    Returns:
+        int: Number of monthly partitions added
+    """
+    if engine.dialect.name != 'mysql':
+        print(f"   ℹ️  {engine.dialect.name} has no table partitions - "
+              "the composite indexes provide time-range pruning")
+        return 0
+
+    horizon = _add_months(datetime.now(), months_ahead)
+    existing = _partition_names(engine)
+
+    if not existing:
+        with engine.connect() as conn:
+            oldest = conn.execute(text(f"SELECT MIN(timestamp) FROM {TABLE}")).scalar()
+        first = oldest or datetime.now()
+        months = _partition_clause(first, horizon)
+        with engine.begin() as conn:
+            conn.execute(text(
+                f"ALTER TABLE {TABLE} DROP PRIMARY KEY, ADD PRIMARY KEY (id, timestamp)"
+            ))
+            conn.execute(text(
+                f"ALTER TABLE {TABLE} PARTITION BY RANGE (TO_DAYS(timestamp)) (\n    {months}\n)"
+            ))
+        added = months.count('PARTITION p') - 1
+        print(f"   ✅ Partitioned {TABLE} into {added} monthly partitions")
+        return added
+
+    # Split pmax for the months that do not have a partition yet
+    newest = max(name for name in existing if name != 'pmax')
+    first = _add_months(datetime.strptime(newest[1:], '%Y%m'), 1)
+    if first > horizon:
+        return 0
+    months = _partition_clause(first, horizon)
+    with engine.begin() as conn:
+        conn.execute(text(
+            f"ALTER TABLE {TABLE} REORGANIZE PARTITION pmax INTO (\n    {months}\n)"
+        ))
+    added = months.count('PARTITION p') - 1
+    print(f"   ✅ Added {added} monthly partitions")
+    return added
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Index and partition the hardware audit log")
+    parser.add_argument('--months-ahead', type=int, default=3,
+                        help="future monthly partitions to create")
+    parser.add_argument('--indexes-only', action='store_true',
+                        help="create the composite indexes without partitioning")
+    args = parser.parse_args()
+
+    print("\n" + "="*60)
+    print("🗂️  AUDIT LOG INDEXES AND PARTITIONS")
+    print("="*60)
+
+    engine = get_engine()
+    ensure_audit_indexes(engine)
+    if not args.indexes_only:
+        partition_audit_log(engine, args.months_ahead)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,30 @@
+"""
+Set-based existence checks for migrations
+One IN query per chunk of keys instead of one SELECT per record
+
+Location: database/migrations/prefetch.py
+"""
+
+# Keys per IN (...) list
+PREFETCH_CHUNK = 1000
+
+
+def existing_keys(db, column, keys, chunk_size: int = PREFETCH_CHUNK) -> set:
+    """
+    Keys that already exist in the database
+
+    Args:
+        db: SQLAlchemy session
+        column: Mapped key column (e.g. Patient.national_id)
+        keys: Candidate key values (None is ignored)
+        chunk_size: Keys per query
+
+    Returns:
+        set: The subset of `keys` present in the table
+    """
+    keys = list({key for key in keys if key is not None})
+    found = set()
+    for start in range(0, len(keys), chunk_size):
+        chunk = keys[start:start + chunk_size]
+        found.update(row[0] for row in db.query(column).filter(column.in_(chunk)).all())
+    return found
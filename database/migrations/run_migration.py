@@ -1,8 +1,13 @@
 """
-Master migration script - Runs all migrations in correct order
+Master migration script - Runs all migrations in dependency order
+Users and patients migrate first, then visits, lab results, imaging and
+cards run in parallel, each on its own session/connection
 Location: database/migrations/run_migration.py
 """
 import sys
+import time
+import argparse
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from pathlib import Path
 from datetime import datetime
 import shutil
@@ -19,6 +24,106 @@ from database.migrations.migrate_imaging import migrate_imaging
 from database.migrations.migrate_cards import migrate_cards
 
 
+# ==================== DEPENDENCY GRAPH ====================
+# step -> (label, migration, steps that must finish first)
+MIGRATION_STEPS = {
+    'users': ("Users", migrate_users, ()),
+    'patients': ("Patients", migrate_patients, ()),
+    'visits': ("Visits", migrate_visits, ('users', 'patients')),
+    'lab_results': ("Lab Results", migrate_lab_results, ('users', 'patients')),
+    'imaging': ("Imaging Results", migrate_imaging, ('users', 'patients')),
+    'cards': ("NFC Cards", migrate_cards, ('users', 'patients')),
+}
+
+DEFAULT_WORKERS = 4
+
+
+def _check_graph(steps):
+    """Raise ValueError on unknown prerequisites or cycles"""
+    for step, (_, _, requires) in steps.items():
+        unknown = [r for r in requires if r not in steps]
+        if unknown:
+            raise ValueError(f"Migration step {step} requires unknown step(s): {', '.join(unknown)}")
+    done = set()
+    remaining = dict(steps)
+    while remaining:
+        ready = [s for s, (_, _, requires) in remaining.items() if set(requires) <= done]
+        if not ready:
+            raise ValueError(f"Migration steps form a cycle: {', '.join(remaining)}")
+        for step in ready:
+            done.add(step)
+            del remaining[step]
+
+
+def _run_step(step, label, migration, origin):
+    started = time.perf_counter()
+    try:
+        success, message, count = migration()
+    except Exception as e:
+        success, message, count = False, f"{type(e).__name__}: {e}", 0
+    finished = time.perf_counter()
+    return {
+        'step': step,
+        'name': label,
+        'success': success,
+        'message': message,
+        'count': count,
+        'start': started - origin,
+        'seconds': finished - started,
+    }
+
+
+def run_migration_graph(steps=None, max_workers: int = DEFAULT_WORKERS):
+    """
+    Run migration steps as soon as their prerequisites have finished
+    
+    A failed step does not stop the steps after it (as in the sequential
+    runner); its result carries the error message
+    
+    Args:
+        steps: step -> (label, migration, prerequisites) (default: MIGRATION_STEPS)
+        max_workers: Steps running at the same time (1 = one after another)
+    
+    Returns:
+        list: One result dict per step (step, name, success, message,
+            count, start and seconds relative to the start of the run)
+    """
+    steps = steps or MIGRATION_STEPS
+    _check_graph(steps)
+    
+    origin = time.perf_counter()
+    pending = dict(steps)
+    running = {}
+    results = {}
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='migration') as pool:
+        while pending or running:
+            ready = [s for s, (_, _, requires) in pending.items() if all(r in results for r in requires)]
+            for step in ready:
+                label, migration, _ = pending.pop(step)
+                running[pool.submit(_run_step, step, label, migration, origin)] = step
+            
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                del running[future]
+                result = future.result()
+                results[result['step']] = result
+    
+    return [results[step] for step in steps]
+
+
+def print_stage_timings(results, wall_seconds):
+    """Per-step start offset, duration and throughput"""
+    print(f"\n  {'Stage':<18} {'start':>8} {'time':>8} {'records':>8} {'rec/s':>9}")
+    for result in sorted(results, key=lambda r: r['start']):
+        rate = result['count'] / result['seconds'] if result['seconds'] else 0
+        print(f"  {result['name']:<18} {result['start']:>7.2f}s {result['seconds']:>7.2f}s "
+              f"{result['count']:>8} {rate:>9.0f}")
+    serial = sum(r['seconds'] for r in results)
+    speedup = serial / wall_seconds if wall_seconds else 1
+    print(f"  {'Sum of stages':<18} {'':>8} {serial:>7.2f}s")
+    print(f"  {'Wall clock':<18} {'':>8} {wall_seconds:>7.2f}s  (x{speedup:.1f} from running stages in parallel)")
+
+
 def create_backup():
     """Create backup of JSON files before migration"""
     print("\n" + "="*60)
@@ -58,17 +163,16 @@ def create_backup():
         return False, None
 
 
-def run_all_migrations():
+def run_all_migrations(max_workers: int = DEFAULT_WORKERS):
     """
-    Run all migrations in the correct order
-    
-    Order is important:
-    1. Users (no dependencies)
-    2. Patients (no dependencies)
-    3. Visits (depends on patients)
-    4. Lab Results (depends on patients)
-    5. Imaging Results (depends on patients)
-    6. NFC Cards (no dependencies)
+    Run all migrations in dependency order (see MIGRATION_STEPS)
+    
+    1. Users and Patients (no dependencies)
+    2. Visits, Lab Results, Imaging Results and NFC Cards
+       (depend on users and patients), in parallel
+    
+    Args:
+        max_workers: Steps running at the same time (1 = one after another)
     """
     print("\n" + "="*70)
     print(" "*15 + "🚀 MEDLINK DATA MIGRATION")
@@ -99,12 +203,9 @@ def run_all_migrations():
     print("⚠️  READY TO MIGRATE")
     print("="*70)
     print("\nThis will:")
-    print("  1. Migrate users")
-    print("  2. Migrate patients (with full medical history)")
-    print("  3. Migrate visits")
-    print("  4. Migrate lab results")
-    print("  5. Migrate imaging results")
-    print("  6. Migrate NFC cards")
+    print("  1. Migrate users and patients (with full medical history)")
+    print("  2. Then migrate visits, lab results, imaging results and NFC cards")
+    print(f"     ({max_workers} at a time)")
     print("\n" + "="*70)
     
     user_input = input("\nProceed with migration? (yes/no): ").lower()
@@ -118,50 +219,14 @@ def run_all_migrations():
     print(f"⏱️  Migration started at: {start_time.strftime('%Y-%m-%d %H:%M:%S')}")
     print("="*70)
     
-    results = []
-    total_records = 0
-    
-    # 1. Migrate Users
-    success, message, count = migrate_users()
-    results.append(("Users", success, count))
-    total_records += count
-    if not success:
-        print(f"\n⚠️  Warning: {message}")
-    
-    # 2. Migrate Patients
-    success, message, count = migrate_patients()
-    results.append(("Patients", success, count))
-    total_records += count
-    if not success:
-        print(f"\n⚠️  Warning: {message}")
-    
-    # 3. Migrate Visits
-    success, message, count = migrate_visits()
-    results.append(("Visits", success, count))
-    total_records += count
-    if not success:
-        print(f"\n⚠️  Warning: {message}")
-    
-    # 4. Migrate Lab Results
-    success, message, count = migrate_lab_results()
-    results.append(("Lab Results", success, count))
-    total_records += count
-    if not success:
-        print(f"\n⚠️  Warning: {message}")
-    
-    # 5. Migrate Imaging Results
-    success, message, count = migrate_imaging()
-    results.append(("Imaging Results", success, count))
-    total_records += count
-    if not success:
-        print(f"\n⚠️  Warning: {message}")
-    
-    # 6. Migrate NFC Cards
-    success, message, count = migrate_cards()
-    results.append(("NFC Cards", success, count))
-    total_records += count
-    if not success:
-        print(f"\n⚠️  Warning: {message}")
+    wall_started = time.perf_counter()
+    results = run_migration_graph(max_workers=max_workers)
+    wall_seconds = time.perf_counter() - wall_started
+    
+    for result in results:
+        if not result['success']:
+            print(f"\n⚠️  Warning ({result['name']}): {result['message']}")
+    total_records = sum(result['count'] for result in results)
     
     # End migration
     end_time = datetime.now()
@@ -172,9 +237,11 @@ def run_all_migrations():
     print(" "*20 + "🎉 MIGRATION SUMMARY")
     print("="*70)
     
-    for name, success, count in results:
-        status = "✅" if success else "❌"
-        print(f"  {status} {name:.<25} {count:>5} records")
+    for result in results:
+        status = "✅" if result['success'] else "❌"
+        print(f"  {status} {result['name']:.<25} {result['count']:>5} records")
+    
+    print_stage_timings(results, wall_seconds)
     
     print("="*70)
     print(f"  📊 Total Records Migrated: {total_records}")
@@ -183,7 +250,7 @@ def run_all_migrations():
     print("="*70)
     
     # Check if all successful
-    all_success = all(success for _, success, _ in results)
+    all_success = all(result['success'] for result in results)
     
     if all_success:
         print("\n✅ ALL MIGRATIONS COMPLETED SUCCESSFULLY!")
@@ -201,5 +268,10 @@ def run_all_migrations():
 
 
 if __name__ == "__main__":
-    success = run_all_migrations()
+    parser = argparse.ArgumentParser(description="Migrate MedLink JSON data to the database")
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS,
+                        help="migration steps run in parallel (1 = one after another)")
+    args = parser.parse_args()
+    
+    success = run_all_migrations(max_workers=args.workers)
     sys.exit(0 if success else 1)
\ No newline at end of file
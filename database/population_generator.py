@@ -0,0 +1,622 @@
+"""
+Synthetic population generator for load testing
+Builds patients (with chronic diseases, visits, lab results and
+vaccinations) a whole chunk at a time with NumPy and writes them through
+the bulk loader, so millions of patients take minutes instead of days
+
+- Deterministic: the same seed and chunk size give the same population
+  on an empty database; chunk n draws from its own generator seeded with
+  (seed, n + 1), the synthetic doctors from (seed, 0)
+- National IDs are valid 14-digit Egyptian IDs (century, birth date,
+  governorate code, serial, sex digit, check digit) and unique by
+  construction: serials are counted per (birth date, governorate, sex),
+  patients from the bottom of the range and doctors from the top
+- Loading continues after the rows already in the database: serials of
+  existing national IDs and this seed's visit numbers are skipped, so a
+  second run (same seed or not) adds new patients instead of attaching
+  records to old ones
+- Ages follow the Egyptian age pyramid, governorates their population
+  share, blood types the local ABO/Rh frequencies, and chronic disease
+  prevalence rises with age band; visit and lab counts per patient grow
+  with age and number of chronic conditions
+- Rows go to the tables of core/models.py (enum columns hold member
+  names, as SQLAlchemy stores them); visits are assigned to the existing
+  doctors, or to synthetic doctors created when there are none
+
+database/seeder.py stays the tool for small Faker-based demo data.
+
+Usage:
+    python -m database.population_generator --patients 1000000 --seed 42
+    python -m database.population_generator --patients 200000 --url sqlite:///load.db --create-tables
+
+Location: database/population_generator.py
+"""
+
+import argparse
+import hashlib
+import sys
+import time
+from datetime import date
+from itertools import repeat
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from core.models import BloodType, Gender, UserRole
+from database.bulk_loader import BulkInserter, DEFAULT_CHUNK_SIZE
+
+DEFAULT_GENERATION_CHUNK = 50000
+DEFAULT_DOCTORS = 200
+DEFAULT_AS_OF = date(2025, 1, 1)
+
+# Serials per (birth date, governorate, sex): 3-digit sequence x 5 sex digits
+SERIAL_LIMIT = 5000
+
+# ==================== DISTRIBUTIONS ====================
+
+# Governorate code -> (name, capital, population share in millions)
+GOVERNORATES = {
+    1: ('Cairo', 'Cairo', 10.1), 2: ('Alexandria', 'Alexandria', 5.4),
+    3: ('Port Said', 'Port Said', 0.78), 4: ('Suez', 'Suez', 0.77),
+    11: ('Damietta', 'Damietta', 1.5), 12: ('Dakahlia', 'Mansoura', 6.9),
+    13: ('Sharqia', 'Zagazig', 7.6), 14: ('Qalyubia', 'Banha', 5.9),
+    15: ('Kafr El Sheikh', 'Kafr El Sheikh', 3.6), 16: ('Gharbia', 'Tanta', 5.3),
+    17: ('Monufia', 'Shibin El Kom', 4.6), 18: ('Beheira', 'Damanhur', 6.7),
+    19: ('Ismailia', 'Ismailia', 1.4), 21: ('Giza', 'Giza', 9.2),
+    22: ('Beni Suef', 'Beni Suef', 3.4), 23: ('Faiyum', 'Faiyum', 3.8),
+    24: ('Minya', 'Minya', 6.0), 25: ('Asyut', 'Asyut', 4.8),
+    26: ('Sohag', 'Sohag', 5.4), 27: ('Qena', 'Qena', 3.4),
+    28: ('Aswan', 'Aswan', 1.6), 29: ('Luxor', 'Luxor', 1.3),
+    31: ('Red Sea', 'Hurghada', 0.37), 32: ('New Valley', 'Kharga', 0.25),
+    33: ('Matrouh', 'Marsa Matrouh', 0.5), 34: ('North Sinai', 'Arish', 0.45),
+    35: ('South Sinai', 'El Tor', 0.1),
+}
+
+BLOOD_TYPES = {
+    BloodType.O_POSITIVE: 0.34, BloodType.A_POSITIVE: 0.30, BloodType.B_POSITIVE: 0.17,
+    BloodType.AB_POSITIVE: 0.07, BloodType.A_NEGATIVE: 0.04, BloodType.O_NEGATIVE: 0.04,
+    BloodType.B_NEGATIVE: 0.03, BloodType.AB_NEGATIVE: 0.01,
+}
+
+# (first age, last age, share of the population)
+AGE_BANDS = [(0, 14, 0.33), (15, 24, 0.18), (25, 44, 0.28), (45, 64, 0.16), (65, 90, 0.05)]
+
+# Prevalence per age band: <18, 18-39, 40-59, 60+
+PREVALENCE_BANDS = np.array([18, 40, 60])
+CHRONIC_DISEASES = {
+    'Hypertension': (0.01, 0.08, 0.30, 0.50),
+    'Diabetes Type 2': (0.005, 0.05, 0.20, 0.30),
+    'Hepatitis C': (0.002, 0.02, 0.06, 0.08),
+    'Asthma': (0.08, 0.06, 0.05, 0.05),
+    'Hypothyroidism': (0.005, 0.03, 0.05, 0.07),
+    'Chronic Kidney Disease': (0.002, 0.01, 0.04, 0.10),
+    'Coronary Artery Disease': (0.0, 0.005, 0.05, 0.12),
+}
+SEVERITIES = np.array(['Mild', 'Moderate', 'Severe'])
+SEVERITY_WEIGHTS = [0.5, 0.35, 0.15]
+
+MALE_NAMES = np.array([
+    'Ahmed', 'Mohamed', 'Mahmoud', 'Omar', 'Youssef', 'Khaled', 'Hassan', 'Mostafa',
+    'Ali', 'Ibrahim', 'Karim', 'Tarek', 'Amr', 'Hany', 'Sherif', 'Walid',
+])
+FEMALE_NAMES = np.array([
+    'Fatma', 'Mona', 'Sara', 'Nour', 'Aya', 'Mariam', 'Heba', 'Salma',
+    'Yasmin', 'Dina', 'Reem', 'Hana', 'Laila', 'Rania', 'Eman', 'Nadia',
+])
+FAMILY_NAMES = np.array([
+    'Hassan', 'Ibrahim', 'Mahmoud', 'Abdelrahman', 'Elsayed', 'Farouk', 'Gamal', 'Hegazy',
+    'Kamel', 'Mansour', 'Nasser', 'Ragab', 'Saleh', 'Soliman', 'Taha', 'Zaki',
+])
+STREETS = np.array(['Tahrir', 'Nile', 'Gamal Abdel Nasser', 'El Horreya', 'Port Said',
+                    'El Gomhoreya', 'Salah Salem', 'El Geish', 'Saad Zaghloul', 'El Nasr'])
+
+HOSPITALS = np.array([
+    'Cairo University Hospital - Kasr El Aini', 'Ain Shams University Hospital',
+    'Alexandria University Hospital', 'Mansoura University Hospital',
+    'Assiut University Hospital', 'Dar El Fouad Hospital', 'Saudi German Hospital',
+    'Cleopatra Hospital', 'Al Salam International Hospital', 'Nile Badrawi Hospital',
+])
+
+# (chief complaint, diagnosis, department)
+VISIT_REASONS = [
+    ('Fever and cough', 'Upper respiratory tract infection', 'Internal Medicine'),
+    ('Headache', 'Tension headache', 'Neurology'),
+    ('Chest pain', 'Stable angina', 'Cardiology'),
+    ('Back pain', 'Lumbar strain', 'Orthopedics'),
+    ('Abdominal pain', 'Gastritis', 'Internal Medicine'),
+    ('High blood pressure follow-up', 'Essential hypertension', 'Cardiology'),
+    ('Blood sugar follow-up', 'Type 2 diabetes mellitus', 'Internal Medicine'),
+    ('Skin rash', 'Contact dermatitis', 'Dermatology'),
+    ('Ear pain', 'Otitis media', 'ENT'),
+    ('Blurred vision', 'Refractive error', 'Ophthalmology'),
+    ('Child vaccination check', 'Healthy child', 'Pediatrics'),
+    ('Shortness of breath', 'Asthma exacerbation', 'Emergency'),
+]
+VISIT_TYPES = {'Consultation': 0.45, 'FollowUp': 0.30, 'Routine': 0.15, 'Emergency': 0.10}
+
+LAB_TESTS = np.array([
+    ('Complete Blood Count', 'Hematology'), ('Fasting Blood Sugar', 'Biochemistry'),
+    ('HbA1c', 'Biochemistry'), ('Lipid Profile', 'Biochemistry'),
+    ('Liver Function Tests', 'Biochemistry'), ('Kidney Function Tests', 'Biochemistry'),
+    ('TSH', 'Endocrinology'), ('HCV Antibody', 'Serology'), ('Urinalysis', 'Urinalysis'),
+])
+LABS = np.array(['Al Borg Laboratories', 'Al Mokhtabar Labs', 'Cairo Lab', 'Hospital Laboratory'])
+
+VACCINES = np.array(['BCG', 'Hepatitis B', 'Polio (OPV)', 'Pentavalent', 'MMR',
+                     'COVID-19', 'Influenza', 'Tetanus'])
+
+# Visit times: 08:00 to 19:45 in 15 minute slots
+TIME_SLOTS = np.array([f"{8 + m // 60:02d}:{m % 60:02d}:00" for m in range(0, 12 * 60, 15)])
+
+# Weights of the first 13 digits for the check digit
+CHECK_WEIGHTS = np.array([2, 7, 6, 5, 4, 3, 2, 7, 6, 5, 4, 3, 2])
+
+
+def _normalized(weights) -> np.ndarray:
+    weights = np.asarray(list(weights), dtype=float)
+    return weights / weights.sum()
+
+
+def _rows(*columns) -> List[Tuple]:
+    """Row tuples from column arrays (scalars are repeated); NumPy values become Python values"""
+    return list(zip(*(column.tolist() if isinstance(column, np.ndarray) else repeat(column)
+                      for column in columns)))
+
+
+def _join(*parts) -> np.ndarray:
+    result = parts[0]
+    for part in parts[1:]:
+        result = np.char.add(result, part)
+    return result
+
+
+def check_digits(first13: np.ndarray) -> np.ndarray:
+    """Weighted mod-11 check digit of 13-digit ID prefixes"""
+    digits = (first13[:, None] // 10 ** np.arange(12, -1, -1, dtype=np.int64)) % 10
+    return (11 - (digits * CHECK_WEIGHTS).sum(axis=1) % 11) % 10
+
+
+class PopulationGenerator:
+    """Seedable, chunked generator of synthetic patients and their records"""
+
+    def __init__(self, seed: int = 42, as_of: date = DEFAULT_AS_OF, history_years: int = 3):
+        """
+        Args:
+            seed: Random seed
+            as_of: "Today" of the population (ages, record dates)
+            history_years: Years of visits and lab results before as_of
+        """
+        self.seed = seed
+        self.as_of = np.datetime64(as_of, 'D')
+        self.history_days = int(history_years * 365)
+        self.created_at = f"{as_of.isoformat()} 00:00:00"
+
+        self.gov_codes = np.array(list(GOVERNORATES))
+        self.gov_names = np.array([g[0] for g in GOVERNORATES.values()])
+        self.gov_capitals = np.array([g[1] for g in GOVERNORATES.values()])
+        self.gov_weights = _normalized(g[2] for g in GOVERNORATES.values())
+        self.blood_types = np.array([b.name for b in BLOOD_TYPES])
+        self.blood_weights = _normalized(BLOOD_TYPES.values())
+        self.disease_names = np.array(list(CHRONIC_DISEASES))
+        self.disease_prevalence = np.array(list(CHRONIC_DISEASES.values()))
+        self.visit_types = np.array(list(VISIT_TYPES))
+        self.visit_type_weights = _normalized(VISIT_TYPES.values())
+
+        # Serials handed out per (birth day, governorate, sex) - unique IDs across chunks
+        self.first_day = self.as_of - np.timedelta64(366 * (AGE_BANDS[-1][1] + 1), 'D')
+        days = int((self.as_of - self.first_day).astype(int)) + 1
+        self._serials = np.zeros(days * len(self.gov_codes) * 2, dtype=np.int32)
+        # Doctors count down from the top, so creating them leaves patient IDs unchanged
+        self._doctor_serials = np.zeros_like(self._serials)
+        self._gov_index = np.full(100, -1)
+        self._gov_index[self.gov_codes] = np.arange(len(self.gov_codes))
+        self.patients_generated = 0
+        self.visits_generated = 0
+        self.chunks_generated = 0
+
+    # ==================== PATIENTS ====================
+
+    def _serial_keys(self, dob: np.ndarray, gov_index: np.ndarray, male: np.ndarray) -> np.ndarray:
+        return ((dob - self.first_day).astype(np.int64) * len(self.gov_codes) + gov_index) * 2 + male
+
+    def national_ids(self, dob: np.ndarray, gov_index: np.ndarray, male: np.ndarray,
+                     doctors: bool = False) -> np.ndarray:
+        """
+        Unique 14-digit national IDs
+
+        Args:
+            dob: Birth dates (datetime64[D])
+            gov_index: Index into the governorate table
+            male: Boolean array
+            doctors: Take serials from the doctors' end of the range
+
+        Returns:
+            np.ndarray: ID strings
+        """
+        key = self._serial_keys(dob, gov_index, male)
+        # Rank of each patient among the patients of the same key in this chunk
+        order = np.argsort(key, kind='stable')
+        sorted_keys = key[order]
+        group_start = np.flatnonzero(np.r_[True, sorted_keys[1:] != sorted_keys[:-1]])
+        group_sizes = np.diff(np.r_[group_start, len(key)])
+        rank = np.empty(len(key), dtype=np.int64)
+        rank[order] = np.arange(len(key)) - np.repeat(group_start, group_sizes)
+        counters = self._doctor_serials if doctors else self._serials
+        serial = counters[key] + rank
+        np.add.at(counters, key, 1)
+        if serial.size and (self._serials[key] + self._doctor_serials[key]).max() > SERIAL_LIMIT:
+            raise ValueError("Too many patients share a birth date and governorate for unique IDs")
+        if doctors:
+            serial = SERIAL_LIMIT - 1 - serial
+
+        year = dob.astype('datetime64[Y]').astype(np.int64) + 1970
+        month = dob.astype('datetime64[M]').astype(np.int64) % 12 + 1
+        day = (dob - dob.astype('datetime64[M]')).astype(np.int64) + 1
+        century = np.where(year < 2000, 2, 3)
+        # 3-digit sequence + sex digit (odd = male)
+        sequence, sex_digit = serial // 5, 2 * (serial % 5) + male
+
+        first13 = (((((century * 100 + year % 100) * 100 + month) * 100 + day) * 100
+                    + self.gov_codes[gov_index]) * 1000 + sequence) * 10 + sex_digit
+        return (first13 * 10 + check_digits(first13)).astype(str)
+
+    def reserve(self, national_ids: Iterable[str]) -> int:
+        """
+        Skip the serials of national IDs that already exist
+
+        Serials in the lower half of the range move the patient counters past
+        them, serials in the upper half the doctor counters
+
+        Args:
+            national_ids: Existing IDs (malformed ones are ignored)
+
+        Returns:
+            int: IDs that fall in the generator's birth date range
+        """
+        ids = np.array([int(nid) for nid in national_ids
+                        if nid and len(nid) == 14 and nid.isdigit()], dtype=np.int64)
+
+        def digits(position, width):
+            return ids // 10 ** (14 - position - width) % 10 ** width
+
+        century, month, day = digits(0, 1), digits(3, 2), digits(5, 2)
+        gov_index = self._gov_index[digits(7, 2)]
+        valid = np.isin(century, (2, 3)) & (month >= 1) & (month <= 12) & (day >= 1) & (gov_index >= 0)
+        months = ((1700 + 100 * century + digits(1, 2) - 1970) * 12 + month - 1).astype('datetime64[M]')
+        dob = months.astype('datetime64[D]') + (day - 1).astype('timedelta64[D]')
+        valid &= (dob.astype('datetime64[M]') == months) & (dob >= self.first_day) & (dob <= self.as_of)
+
+        sex = digits(12, 1)[valid]
+        serial = digits(9, 3)[valid] * 5 + sex // 2
+        key = self._serial_keys(dob[valid], gov_index[valid], sex % 2)
+        low = serial < SERIAL_LIMIT // 2
+        np.maximum.at(self._serials, key[low], serial[low] + 1)
+        np.maximum.at(self._doctor_serials, key[~low], SERIAL_LIMIT - serial[~low])
+        return int(valid.sum())
+
+    def _ages(self, rng, count: int) -> np.ndarray:
+        band = rng.choice(len(AGE_BANDS), size=count, p=_normalized(b[2] for b in AGE_BANDS))
+        low = np.array([b[0] for b in AGE_BANDS])[band]
+        high = np.array([b[1] for b in AGE_BANDS])[band]
+        return rng.integers(low, high + 1)
+
+    def _patients(self, rng, start: int, count: int) -> Dict:
+        age = self._ages(rng, count)
+        # Birthday somewhere in the year after turning `age`
+        age_days = age * 365 + rng.integers(0, 365, size=count)
+        dob = self.as_of - age_days.astype('timedelta64[D]')
+        male = rng.random(count) < 0.5
+        gov = rng.choice(len(self.gov_codes), size=count, p=self.gov_weights)
+
+        first = np.where(male, rng.choice(MALE_NAMES, count), rng.choice(FEMALE_NAMES, count))
+        full_name = _join(first, ' ', rng.choice(MALE_NAMES, count), ' ', rng.choice(FAMILY_NAMES, count))
+        number = np.arange(start, start + count)
+        phone = _join('01', rng.choice(np.array(['0', '1', '2', '5']), count),
+                      np.char.zfill(rng.integers(0, 10 ** 8, size=count).astype(str), 8))
+        email = _join(np.char.lower(first), '.', number.astype(str), '@example.com')
+        address = _join(rng.integers(1, 200, size=count).astype(str), ' ',
+                        rng.choice(STREETS, count), ' Street, ', self.gov_capitals[gov])
+
+        return {
+            'national_id': self.national_ids(dob, gov, male.astype(np.int64)),
+            'full_name': full_name,
+            'date_of_birth': dob,
+            'age': age,
+            'age_days': age_days,
+            'male': male,
+            'blood_type': rng.choice(self.blood_types, size=count, p=self.blood_weights),
+            'phone': phone,
+            'email': email,
+            'address': address,
+            'city': self.gov_capitals[gov],
+            'governorate': self.gov_names[gov],
+        }
+
+    # ==================== RECORDS ====================
+
+    def _event_dates(self, rng, owner: np.ndarray, age_days: np.ndarray, span_days) -> np.ndarray:
+        """Dates within the last `span_days` (per owner) but not before birth"""
+        limit = np.minimum(span_days, age_days[owner]) + 1
+        return self.as_of - rng.integers(0, limit).astype('timedelta64[D]')
+
+    def generate(self, start: int, count: int, doctor_ids: Sequence[int]) -> Dict[str, Tuple]:
+        """
+        One chunk of patients and their records
+
+        Args:
+            start: Number of the first patient (used for unique visit IDs / emails)
+            count: Patients in this chunk
+            doctor_ids: Doctors the visits are assigned to (empty = no visits)
+
+        Returns:
+            dict: table -> (columns, rows), in insert order
+        """
+        rng = np.random.default_rng([self.seed, self.chunks_generated + 1])
+        self.chunks_generated += 1
+        p = self._patients(rng, start, count)
+        nid, age, age_days = p['national_id'], p['age'], p['age_days']
+        tables = {}
+
+        tables['patients'] = (
+            ('national_id', 'full_name', 'date_of_birth', 'age', 'gender', 'blood_type',
+             'phone', 'email', 'address', 'city', 'governorate',
+             'nfc_card_assigned', 'nfc_card_status', 'nfc_scan_count', 'created_at', 'last_updated'),
+            _rows(nid, p['full_name'], p['date_of_birth'].astype(str), age,
+                  np.where(p['male'], Gender.Male.name, Gender.Female.name), p['blood_type'],
+                  p['phone'], p['email'], p['address'], p['city'], p['governorate'],
+                  False, 'active', 0, self.created_at, self.created_at),
+        )
+
+        # Chronic diseases: one Bernoulli draw per patient and disease
+        band = np.searchsorted(PREVALENCE_BANDS, age, side='right')
+        has = rng.random((count, len(self.disease_names))) < self.disease_prevalence[:, band].T
+        owner, disease = np.nonzero(has)
+        chronic_count = has.sum(axis=1)
+        tables['chronic_diseases'] = (
+            ('patient_national_id', 'disease_name', 'date_diagnosed', 'severity', 'is_active', 'created_at'),
+            _rows(nid[owner], self.disease_names[disease],
+                  self._event_dates(rng, owner, age_days, 20 * 365).astype(str),
+                  rng.choice(SEVERITIES, size=len(owner), p=SEVERITY_WEIGHTS),
+                  True, self.created_at),
+        )
+
+        # Visits: more for older patients and for each chronic condition
+        if len(doctor_ids):
+            visits = np.minimum(rng.poisson(0.5 + age / 40 + 1.2 * chronic_count), 30)
+            owner = np.repeat(np.arange(count), visits)
+            reason = rng.integers(0, len(VISIT_REASONS), size=len(owner))
+            reasons = np.array(VISIT_REASONS)
+            number = np.arange(self.visits_generated, self.visits_generated + len(owner))
+            self.visits_generated += len(owner)
+            tables['visits'] = (
+                ('visit_id', 'patient_national_id', 'doctor_id', 'visit_date', 'visit_time',
+                 'visit_type', 'hospital', 'department', 'chief_complaint', 'diagnosis',
+                 'status', 'created_at'),
+                _rows(_join(f"SYN{self.seed}-V", np.char.zfill(number.astype(str), 10)),
+                      nid[owner], rng.choice(np.asarray(doctor_ids), size=len(owner)),
+                      self._event_dates(rng, owner, age_days, self.history_days).astype(str),
+                      rng.choice(TIME_SLOTS, size=len(owner)),
+                      rng.choice(self.visit_types, size=len(owner), p=self.visit_type_weights),
+                      rng.choice(HOSPITALS, size=len(owner)),
+                      reasons[reason, 2], reasons[reason, 0], reasons[reason, 1],
+                      'Completed', self.created_at),
+            )
+
+        # Lab results
+        labs = rng.poisson(0.6 + 0.8 * chronic_count)
+        owner = np.repeat(np.arange(count), labs)
+        test = rng.integers(0, len(LAB_TESTS), size=len(owner))
+        tables['lab_results'] = (
+            ('patient_national_id', 'test_name', 'test_category', 'test_date', 'lab_name',
+             'results_summary', 'status', 'created_at'),
+            _rows(nid[owner], LAB_TESTS[test, 0], LAB_TESTS[test, 1],
+                  self._event_dates(rng, owner, age_days, self.history_days).astype(str),
+                  rng.choice(LABS, size=len(owner)),
+                  np.where(rng.random(len(owner)) < 0.8, 'Normal', 'Abnormal'),
+                  'completed', self.created_at),
+        )
+
+        # Vaccinations: childhood schedule for under 18s, occasional adult doses
+        doses = rng.poisson(np.where(age < 18, 4.0, 1.0))
+        owner = np.repeat(np.arange(count), doses)
+        tables['vaccinations'] = (
+            ('patient_national_id', 'vaccine_name', 'date_administered', 'dose_number', 'created_at'),
+            _rows(nid[owner], rng.choice(VACCINES, size=len(owner)),
+                  self._event_dates(rng, owner, age_days, age_days[owner]).astype(str),
+                  rng.integers(1, 4, size=len(owner)).astype(str), self.created_at),
+        )
+
+        self.patients_generated += count
+        return tables
+
+    def chunks(self, patients: int, chunk_size: int = DEFAULT_GENERATION_CHUNK,
+               doctor_ids: Sequence[int] = ()) -> Iterator[Dict[str, Tuple]]:
+        """Generate `patients` patients, `chunk_size` at a time"""
+        for start in range(0, patients, chunk_size):
+            yield self.generate(start, min(chunk_size, patients - start), doctor_ids)
+
+
+# ==================== LOADING ====================
+
+def ensure_doctors(connection, loader: BulkInserter, count: int = DEFAULT_DOCTORS,
+                   generator: Optional[PopulationGenerator] = None) -> List[int]:
+    """
+    Doctor IDs to assign visits to (synthetic doctors are added if there are none)
+
+    Args:
+        connection: DBAPI connection
+        loader: Bulk inserter on that connection
+        count: Synthetic doctors to create when the table is empty
+        generator: Generator used for the doctors' national IDs
+
+    Returns:
+        list: doctor_id values
+    """
+    cursor = connection.cursor()
+    try:
+        cursor.execute("SELECT doctor_id FROM doctors")
+        doctor_ids = [row[0] for row in cursor.fetchall()]
+        if doctor_ids or count <= 0:
+            return doctor_ids
+
+        generator = generator or PopulationGenerator()
+        rng = np.random.default_rng([generator.seed, 0])
+        created_at = generator.created_at
+        usernames = [f"synthetic.dr{n:04d}" for n in range(count)]
+        password_hash = hashlib.sha256(b'synthetic').hexdigest()
+        names = _join('Dr. ', rng.choice(MALE_NAMES, count), ' ', rng.choice(FAMILY_NAMES, count))
+        loader.insert('users', ('username', 'password_hash', 'role', 'full_name', 'is_active',
+                                'account_status', 'created_at'),
+                      _rows(np.array(usernames), password_hash, UserRole.doctor.name, names,
+                            True, 'active', created_at))
+
+        placeholders = ', '.join([loader.placeholder] * count)
+        cursor.execute(f"SELECT user_id FROM users WHERE username IN ({placeholders}) ORDER BY username",
+                       usernames)
+        user_ids = np.array([row[0] for row in cursor.fetchall()])
+
+        dob = generator.as_of - rng.integers(30 * 365, 65 * 365, size=len(user_ids)).astype('timedelta64[D]')
+        national_ids = generator.national_ids(dob, rng.integers(0, len(generator.gov_codes), size=len(user_ids)),
+                                              np.ones(len(user_ids), dtype=np.int64), doctors=True)
+        departments = np.array([reason[2] for reason in VISIT_REASONS])
+        department = rng.choice(departments, size=len(user_ids))
+        loader.insert('doctors', ('user_id', 'national_id', 'specialization', 'license_number',
+                                  'hospital', 'department', 'years_of_experience', 'created_at'),
+                      _rows(user_ids, national_ids, department,
+                            _join('EG-SYN-', np.char.zfill(np.arange(len(user_ids)).astype(str), 5)),
+                            rng.choice(HOSPITALS, size=len(user_ids)), department,
+                            rng.integers(1, 35, size=len(user_ids)), created_at))
+
+        cursor.execute("SELECT doctor_id FROM doctors")
+        return [row[0] for row in cursor.fetchall()]
+    finally:
+        cursor.close()
+
+
+def continue_after_existing(connection, loader: BulkInserter, generator: PopulationGenerator) -> int:
+    """
+    Point the generator past the rows already in the database
+
+    Reserves the serials of every patient and doctor national ID and
+    continues the generator's visit numbering after its seed's last visit
+
+    Args:
+        connection: DBAPI connection
+        loader: Bulk inserter on that connection
+        generator: Generator to advance
+
+    Returns:
+        int: Existing national IDs reserved
+    """
+    cursor = connection.cursor()
+    try:
+        cursor.execute("SELECT national_id FROM patients UNION SELECT national_id FROM doctors")
+        reserved = generator.reserve(row[0] for row in cursor.fetchall())
+
+        prefix = f"SYN{generator.seed}-V"
+        cursor.execute(f"SELECT MAX(visit_id) FROM visits WHERE visit_id LIKE {loader.placeholder}",
+                       (prefix + '%',))
+        last_visit = cursor.fetchone()[0]
+        if last_visit and last_visit[len(prefix):].isdigit():
+            generator.visits_generated = max(generator.visits_generated, int(last_visit[len(prefix):]) + 1)
+        return reserved
+    finally:
+        cursor.close()
+
+
+def load_population(connection, dialect: str, patients: int, seed: int = 42,
+                    chunk_size: int = DEFAULT_GENERATION_CHUNK, insert_chunk: int = DEFAULT_CHUNK_SIZE,
+                    doctors: int = DEFAULT_DOCTORS, progress=None) -> Dict:
+    """
+    Generate a population and write it through the bulk loader
+
+    Args:
+        connection: DBAPI connection
+        dialect: 'mysql' or 'sqlite'
+        patients: Number of patients
+        seed: Random seed
+        chunk_size: Patients generated per chunk
+        insert_chunk: Rows per multi-row INSERT / transaction
+        doctors: Synthetic doctors to create when there are none
+        progress: Called with (patients done, stats) after every chunk
+
+    Returns:
+        dict: table -> {rows, inserted, seconds}, plus 'generate_seconds'
+    """
+    generator = PopulationGenerator(seed)
+    loader = BulkInserter(connection, dialect, insert_chunk)
+    continue_after_existing(connection, loader, generator)
+    doctor_ids = ensure_doctors(connection, loader, doctors, generator)
+
+    stats = {'generate_seconds': 0.0}
+    chunks = generator.chunks(patients, chunk_size, doctor_ids)
+    while True:
+        started = time.perf_counter()
+        tables = next(chunks, None)
+        stats['generate_seconds'] += time.perf_counter() - started
+        if tables is None:
+            return stats
+        for table, (columns, rows) in tables.items():
+            result = loader.insert(table, columns, rows)
+            entry = stats.setdefault(table, {'rows': 0, 'inserted': 0, 'seconds': 0.0})
+            entry['rows'] += result['rows']
+            entry['inserted'] += result['inserted']
+            entry['seconds'] += result['seconds']
+        if progress is not None:
+            progress(generator.patients_generated, stats)
+
+
+def main():
+    """CLI interface"""
+    from core.database import Base
+    from core.engine_registry import engine_registry
+    from core.statistics_service import statistics_service
+
+    parser = argparse.ArgumentParser(description="Generate a synthetic patient population for load testing")
+    parser.add_argument('--patients', type=int, default=100000)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_GENERATION_CHUNK,
+                        help="patients generated at a time")
+    parser.add_argument('--insert-chunk', type=int, default=DEFAULT_CHUNK_SIZE,
+                        help="rows per multi-row INSERT / transaction")
+    parser.add_argument('--doctors', type=int, default=DEFAULT_DOCTORS,
+                        help="synthetic doctors to create when there are none")
+    parser.add_argument('--url', default=None, help="database URL (default: the configured database)")
+    parser.add_argument('--create-tables', action='store_true', help="create missing model tables first")
+    args = parser.parse_args()
+
+    engine = engine_registry.get_engine(args.url)
+    if args.create_tables:
+        Base.metadata.create_all(engine)
+
+    started = time.perf_counter()
+
+    def report(done, stats):
+        elapsed = time.perf_counter() - started
+        rows = sum(entry['rows'] for key, entry in stats.items() if key != 'generate_seconds')
+        print(f"\r   {done:,}/{args.patients:,} patients, {rows:,} rows ({rows / elapsed:,.0f} rows/s)",
+              end='', flush=True)
+
+    connection = engine_registry.raw_connection(args.url)
+    try:
+        stats = load_population(connection, engine.dialect.name, args.patients, args.seed,
+                                args.chunk_size, args.insert_chunk, args.doctors, progress=report)
+    finally:
+        connection.close()
+    # The bulk loader bypasses the ORM hooks that maintain the dashboard rollup
+    statistics_service.rebuild_after_bulk_write(args.url)
+
+    print(f"\n\n   {'table':<18} {'rows':>12} {'inserted':>12} {'rows/s':>10}")
+    for table, entry in stats.items():
+        if table == 'generate_seconds':
+            continue
+        rate = entry['rows'] / entry['seconds'] if entry['seconds'] else 0
+        print(f"   {table:<18} {entry['rows']:>12,} {entry['inserted']:>12,} {rate:>10,.0f}")
+    print(f"\n   generation {stats['generate_seconds']:.1f}s, total {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -44,11 +44,9 @@ class MedLinkDatabaseSetup:
         print(f"{Fore.CYAN}{'-'*70}{Style.RESET_ALL}\n")
         
         try:
-            config = DATABASE_CONFIG.copy()
-            config.pop('database', None)  # Don't specify database yet
-            
-            import mysql.connector
-            connection = mysql.connector.connect(**config)
+            # Server-level pool (no database yet) from the shared registry
+            from core.engine_registry import database_url, engine_registry
+            connection = engine_registry.raw_connection(database_url(DATABASE_CONFIG, use_database=False))
             
             if connection.is_connected():
                 db_info = connection.get_server_info()
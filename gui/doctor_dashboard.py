@@ -11,8 +11,9 @@ from gui.components.disability_dialog import DisabilityDialog
 from gui.styles import *
 from gui.components.sidebar import Sidebar 
 from gui.components.patient_card import PatientCard
-from core.patient_manager import patient_manager
+from core.statistics_service import statistics_service
 from core.search_engine import search_engine
+from core.nfc_reader import pump_card_events
 
 
 class DoctorDashboard(ctk.CTkToplevel):
@@ -198,6 +199,8 @@ class DoctorDashboard(ctk.CTkToplevel):
             # Force update
             self.update()
             self.bind("<Key>", self.on_key_press)
+            # Serial reader scans (independent of keyboard focus)
+            pump_card_events(self, self.process_card)
 
         except Exception as e:
             print(f"❌ Error creating dashboard UI: {e}")
@@ -267,8 +270,7 @@ class DoctorDashboard(ctk.CTkToplevel):
 
             # Get stats
             try:
-                all_patients = patient_manager.get_all_patients()
-                total_patients = len(all_patients)
+                total_patients = statistics_service.get_dashboard_stats()['total_patients']
             except:
                 total_patients = 0
 
@@ -396,8 +398,12 @@ class DoctorDashboard(ctk.CTkToplevel):
         # Show patient profile
         self.show_patient_profile(patient)
 
-    def show_patient_profile(self, patient):
+    def show_patient_profile(self, patient, source='search', card_uid=None):
         """Display patient profile with all enhanced features"""
+        from core.access_audit import log_record_open
+
+        log_record_open(self.user_data.get('user_id'), patient.get('national_id'),
+                        source=source, card_uid=card_uid)
         try:
             self.current_patient = patient
             if hasattr(self, 'emergency_btn'):
@@ -725,13 +731,22 @@ class DoctorDashboard(ctk.CTkToplevel):
         - Doctor cards → Offer to switch doctor
         - Unknown cards → Show error
         """
+        from core.access_audit import log_card_scan
         from core.card_manager import card_manager
+        from core.card_resolver import card_resolver
         from tkinter import messagebox
 
         print(f"🔍 Card scanned: {card_id}")
 
-        # Check card type
-        if card_manager.is_patient_card(card_id):
+        # Resolve owner + card type once (served from the hot UID map)
+        card = card_resolver.resolve_active(card_id)
+        card_type = card['card_type'] if card else None
+        log_card_scan(card_id, card, success=card is not None,
+                      error=None if card else "Card not registered or inactive",
+                      user_id=self.user_data.get('user_id'), user_type='doctor',
+                      purpose='dashboard_scan')
+
+        if card_type == 'patient':
             # ========================================
             # PATIENT CARD SCANNED
             # ========================================
@@ -752,7 +767,7 @@ class DoctorDashboard(ctk.CTkToplevel):
                 
                 # ✅ CRITICAL: Load patient profile into dashboard
                 try:
-                    self.show_patient_profile(patient_data)
+                    self.show_patient_profile(patient_data, source='card', card_uid=card_id)
                     
                     # Show success notification
                     messagebox.showinfo(
@@ -780,7 +795,7 @@ class DoctorDashboard(ctk.CTkToplevel):
                     "Please contact system administrator."
                 )
         
-        elif card_manager.is_doctor_card(card_id):
+        elif card_type == 'doctor':
             # ========================================
             # DOCTOR CARD SCANNED (Another Doctor)
             # ========================================
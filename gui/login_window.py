@@ -7,6 +7,7 @@ import customtkinter as ctk
 from tkinter import messagebox
 from gui.styles import *
 from core.auth_manager import AuthManager
+from core.nfc_reader import pump_card_events
 
 
 class LoginWindow(ctk.CTk):
@@ -35,6 +36,8 @@ class LoginWindow(ctk.CTk):
 
         # Bind key events for NFC (invisible to user)
         self.bind("<Key>", self.on_key_press)
+        # Serial reader scans (independent of keyboard focus)
+        pump_card_events(self, self.process_card)
 
     def center_window(self):
         """Center window on screen"""
@@ -13,6 +13,7 @@ from gui.components.imaging_tab import ImagingTab
 from gui.components.emergency_directives_manager import EmergencyDirectivesManager
 from gui.components.lifestyle_manager import LifestyleManager
 from core.patient_manager import patient_manager
+from core.nfc_reader import pump_card_events
 
 
 class PatientDashboard(ctk.CTkToplevel):
@@ -345,6 +346,8 @@ class PatientDashboard(ctk.CTkToplevel):
             messagebox.showerror("Error", f"Failed to create dashboard: {
                                  str(e)}")
         self.bind("<Key>", self.on_key_press)
+        # Serial reader scans (independent of keyboard focus)
+        pump_card_events(self, self.process_card)
 
     def show_emergency_card(self):
         """Show emergency card dialog"""
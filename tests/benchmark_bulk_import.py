@@ -0,0 +1,104 @@
+"""
+Benchmark for the bulk loader used by the JSON importer
+Loads synthetic visit rows at several chunk sizes and reports rows/second;
+chunk size 1 is the old one-INSERT-and-commit-per-row path
+
+Usage:
+    python tests/benchmark_bulk_import.py
+    python tests/benchmark_bulk_import.py --rows 200000 --chunk-sizes 1,100,1000,5000
+    python tests/benchmark_bulk_import.py --url mysql+mysqlconnector://user:pw@localhost/medlink_bench
+
+Location: tests/benchmark_bulk_import.py
+"""
+import argparse
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.engine_registry import EngineRegistry
+from database.bulk_loader import BulkInserter
+
+COLUMNS = ('visit_id', 'patient_national_id', 'doctor_id', 'visit_date', 'visit_time',
+           'hospital', 'visit_type', 'chief_complaint', 'diagnosis', 'notes')
+
+HOSPITALS = ['Cairo University Hospital', 'Ain Shams Hospital', 'Alexandria Main Hospital']
+COMPLAINTS = ['Headache', 'Fever', 'Chest pain', 'Back pain', 'Cough', 'Follow-up']
+
+
+def generate_rows(count: int, rng: random.Random):
+    """Yield visit tuples in COLUMNS order"""
+    for n in range(count):
+        yield (
+            f"VIS{n:09d}",
+            f"{rng.choice('23')}{rng.randint(0, 10**13 - 1):013d}",
+            f"DOC{rng.randint(1, 200):04d}",
+            f"2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+            f"{rng.randint(8, 20):02d}:{rng.choice(['00', '15', '30', '45'])}",
+            rng.choice(HOSPITALS),
+            rng.choice(['checkup', 'follow_up', 'emergency']),
+            rng.choice(COMPLAINTS),
+            'Observation',
+            'Synthetic benchmark visit',
+        )
+
+
+def reset_table(connection) -> None:
+    cursor = connection.cursor()
+    cursor.execute("DROP TABLE IF EXISTS bench_visits")
+    columns = ', '.join(f"{c} VARCHAR(100)" for c in COLUMNS[1:])
+    cursor.execute(f"CREATE TABLE bench_visits (visit_id VARCHAR(20) PRIMARY KEY, {columns})")
+    connection.commit()
+    cursor.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk import throughput benchmark")
+    parser.add_argument('--rows', type=int, default=50000)
+    parser.add_argument('--chunk-sizes', default='1,100,1000,5000')
+    parser.add_argument('--url', default=None,
+                        help="database URL (default: temporary SQLite file)")
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    scratch = Path(tempfile.gettempdir()) / 'medlink_bench_bulk_import.db'
+    url = args.url or f"sqlite:///{scratch}"
+
+    registry = EngineRegistry('import')
+    dialect = registry.get_engine(url).dialect.name
+    rows = list(generate_rows(args.rows, random.Random(args.seed)))
+
+    print(f"\n{args.rows:,} rows, {len(COLUMNS)} columns ({dialect})")
+    print(f"{'chunk':>8} {'seconds':>9} {'rows/s':>12} {'batches':>8}")
+    baseline = None
+    for size in (int(s) for s in args.chunk_sizes.split(',')):
+        connection = registry.raw_connection(url)
+        try:
+            reset_table(connection)
+            started = time.perf_counter()
+            stats = BulkInserter(connection, dialect, chunk_size=size).insert('bench_visits', COLUMNS, rows)
+            seconds = time.perf_counter() - started
+        finally:
+            connection.close()
+        rate = stats['rows'] / seconds
+        baseline = baseline or rate
+        print(f"{size:>8,} {seconds:>9.2f} {rate:>12,.0f} {stats['batches']:>8,}  (x{rate / baseline:.1f})")
+
+    connection = registry.raw_connection(url)
+    try:
+        cursor = connection.cursor()
+        cursor.execute("DROP TABLE IF EXISTS bench_visits")
+        connection.commit()
+    finally:
+        connection.close()
+    registry.dispose()
+    if args.url is None:
+        scratch.unlink(missing_ok=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Benchmark for vectorized face matching
+Fills the embedding store with synthetic Facenet512 embeddings and
+reports p50/p99 match latency as the staff count grows
+
+Usage:
+    python tests/benchmark_face_matching.py
+    python tests/benchmark_face_matching.py --staff 100,1000,5000 --photos 5
+
+Location: tests/benchmark_face_matching.py
+"""
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from ai.face_embedding_store import FaceEmbeddingStore
+
+
+DIM = 512
+
+
+def percentile(sorted_values, pct: float) -> float:
+    index = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def run(staff: int, photos: int, queries: int, seed: int):
+    rng = np.random.default_rng(seed)
+    with tempfile.TemporaryDirectory() as directory:
+        store = FaceEmbeddingStore(directory)
+        identities = rng.normal(size=(staff, DIM)).astype(np.float32)
+        entries = [
+            (f"user{u:05d}", f"user{u:05d}_{p}.jpg", identities[u] + rng.normal(scale=0.1, size=DIM))
+            for u in range(staff) for p in range(photos)
+        ]
+        started = time.perf_counter()
+        store.replace_all(entries)
+        build_seconds = time.perf_counter() - started
+
+        # Reopen so matching runs against the memory-mapped file
+        store = FaceEmbeddingStore(directory)
+        latencies, correct = [], 0
+        for _ in range(queries):
+            user = int(rng.integers(staff))
+            query = identities[user] + rng.normal(scale=0.1, size=DIM)
+            started = time.perf_counter()
+            username, _ = store.match(query)[0]
+            latencies.append((time.perf_counter() - started) * 1000)
+            correct += username == f"user{user:05d}"
+        latencies.sort()
+
+    print(f"{staff:>7,} staff x {photos} photos | build {build_seconds:5.2f}s | "
+          f"p50 {percentile(latencies, 50):6.3f} ms | "
+          f"p99 {percentile(latencies, 99):6.3f} ms | "
+          f"accuracy {correct / queries:.1%}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Face embedding matching benchmark")
+    parser.add_argument('--staff', default='100,1000,5000',
+                        help="Comma-separated staff counts")
+    parser.add_argument('--photos', type=int, default=5)
+    parser.add_argument('--queries', type=int, default=500)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("FACE EMBEDDING MATCHING BENCHMARK")
+    print("=" * 60)
+    for staff in (int(s) for s in args.staff.split(',')):
+        run(staff, args.photos, args.queries, args.seed)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""
+Benchmark for the out-of-process face recognition worker
+Starts a worker process, drives it from several concurrent clients
+sending 640x480 frames over the socket, and reports frames/s and
+per-frame latency for each client count
+
+The default 'synthetic' model costs --call-ms per model call plus
+--frame-ms per frame, which isolates IPC and batching overhead; use
+--model deepface on a machine with the real model installed.
+
+Usage:
+    python tests/benchmark_face_worker.py
+    python tests/benchmark_face_worker.py --clients 1,2,4,8 --max-batch 8
+    python tests/benchmark_face_worker.py --model deepface --frames 20
+
+Location: tests/benchmark_face_worker.py
+"""
+import argparse
+import multiprocessing
+import os
+import socket
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from ai.face_engine import FaceRecognitionEngine
+from ai.face_worker import FaceWorkerServer, FaceWorkerClient
+
+
+class SyntheticDeepFace:
+    """Fixed cost per model call plus a per-frame cost (batched represent)"""
+
+    def __init__(self, call_ms, frame_ms):
+        self.call_seconds = call_ms / 1000
+        self.frame_seconds = frame_ms / 1000
+
+    def build_model(self, model_name):
+        pass
+
+    def represent(self, img_path, model_name, detector_backend, enforce_detection):
+        frames = img_path if isinstance(img_path, list) else [img_path]
+        time.sleep(self.call_seconds + self.frame_seconds * len(frames))
+        faces = [[{'embedding': np.ones(512), 'facial_area': {'w': 100, 'h': 100}}] for _ in frames]
+        return faces if isinstance(img_path, list) else faces[0]
+
+
+def percentile(sorted_values, pct: float) -> float:
+    index = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def serve(address, args, ready):
+    """Worker process entry point"""
+    if args.model == 'synthetic':
+        fake = SyntheticDeepFace(args.call_ms, args.frame_ms)
+        engine = FaceRecognitionEngine(loader=lambda: fake)
+    else:
+        engine = FaceRecognitionEngine()
+    server = FaceWorkerServer(engine, address=address, max_batch=args.max_batch,
+                              batch_window=args.batch_ms / 1000)
+    server.start()
+    engine.wait_until_ready()
+    ready.set()
+    server.serve_forever()
+
+
+def run(address, clients: int, frames: int):
+    frame = np.random.default_rng(0).integers(0, 255, size=(480, 640, 3), dtype=np.uint8)
+    latencies = []
+    lock = threading.Lock()
+
+    def client_loop():
+        client = FaceWorkerClient(address)
+        client.embed(frame)  # connect outside the measured window
+        samples = []
+        for _ in range(frames):
+            started = time.perf_counter()
+            client.embed(frame)
+            samples.append((time.perf_counter() - started) * 1000)
+        client.close()
+        with lock:
+            latencies.extend(samples)
+
+    threads = [threading.Thread(target=client_loop) for _ in range(clients)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+
+    print(f"{clients:>3} clients | {len(latencies) / elapsed:8.1f} frames/s | "
+          f"p50 {percentile(latencies, 50):7.2f} ms | "
+          f"p99 {percentile(latencies, 99):7.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Face worker throughput benchmark")
+    parser.add_argument('--clients', default='1,2,4,8', help="Comma-separated client counts")
+    parser.add_argument('--frames', type=int, default=100, help="Frames per client")
+    parser.add_argument('--model', choices=('synthetic', 'deepface'), default='synthetic')
+    parser.add_argument('--call-ms', type=float, default=20.0, help="Synthetic cost per model call")
+    parser.add_argument('--frame-ms', type=float, default=5.0, help="Synthetic cost per frame")
+    parser.add_argument('--max-batch', type=int, default=8)
+    parser.add_argument('--batch-ms', type=float, default=5.0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        address = os.path.join(directory, "face_worker.sock") if hasattr(socket, 'AF_UNIX') \
+            else ("127.0.0.1", 50518)
+        ready = multiprocessing.Event()
+        worker = multiprocessing.Process(target=serve, args=(address, args, ready), daemon=True)
+        worker.start()
+        if not ready.wait(300):
+            print("Worker did not start")
+            return
+
+        print("=" * 60)
+        print(f"FACE WORKER BENCHMARK ({args.model}, max batch {args.max_batch}, "
+              f"window {args.batch_ms} ms)")
+        print("=" * 60)
+        try:
+            for clients in (int(c) for c in args.clients.split(',')):
+                run(address, clients, args.frames)
+        finally:
+            worker.terminate()
+            worker.join()
+
+
+if __name__ == "__main__":
+    main()
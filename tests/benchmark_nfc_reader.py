@@ -0,0 +1,68 @@
+"""
+Benchmark for the background NFC serial reader
+Taps cards on the pty fake R20C device and reports scan-to-event
+latency (card write -> event consumed from the queue)
+
+Usage:
+    python tests/benchmark_nfc_reader.py
+    python tests/benchmark_nfc_reader.py --scans 500 --interval 0.01
+
+Location: tests/benchmark_nfc_reader.py
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.nfc_reader import NFCSerialReader
+from tests.fake_nfc_device import FakeR20CDevice
+
+
+def percentile(sorted_values, pct: float) -> float:
+    index = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="NFC serial reader latency benchmark")
+    parser.add_argument('--scans', type=int, default=200)
+    parser.add_argument('--interval', type=float, default=0.02,
+                        help="Seconds between taps")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("NFC SERIAL READER BENCHMARK")
+    print("=" * 60)
+
+    with FakeR20CDevice() as device:
+        reader = NFCSerialReader(device.slave_path, debounce_seconds=0)
+        reader.start()
+        try:
+            latencies = []
+            missed = 0
+            for i in range(args.scans):
+                tapped_at = device.tap(f"{i:010d}")
+                event = reader.get_event(timeout=2)
+                if event is None:
+                    missed += 1
+                    continue
+                latencies.append((time.perf_counter() - tapped_at) * 1000)
+                time.sleep(args.interval)
+        finally:
+            reader.stop()
+
+    latencies.sort()
+    stats = reader.stats()
+    print(f"{len(latencies):>6} scans | missed {missed} | "
+          f"tap->consumer p50 {percentile(latencies, 50):6.2f} ms | "
+          f"p99 {percentile(latencies, 99):6.2f} ms | "
+          f"max {latencies[-1]:6.2f} ms")
+    print(f"driver scan->event p50 {stats['scan_to_event_p50_ms']:.3f} ms | "
+          f"p99 {stats['scan_to_event_p99_ms']:.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
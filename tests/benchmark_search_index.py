@@ -0,0 +1,109 @@
+"""
+Benchmark for the patient trigram search index
+Builds a synthetic registry in memory and reports p50/p99 query latency
+
+Usage:
+    python tests/benchmark_search_index.py
+    python tests/benchmark_search_index.py --sizes 100000,1000000 --queries 2000
+
+Location: tests/benchmark_search_index.py
+"""
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.search_index import TrigramIndex
+
+
+FIRST_NAMES = [
+    'Ahmed', 'Mohamed', 'Mahmoud', 'Omar', 'Youssef', 'Khaled', 'Hassan',
+    'Mostafa', 'Ali', 'Ibrahim', 'Fatma', 'Mona', 'Sara', 'Nour', 'Aya',
+    'Mariam', 'Heba', 'Salma', 'Yasmin', 'Dina', 'Reem', 'Hana', 'Laila'
+]
+LAST_NAMES = [
+    'Hassan', 'Ibrahim', 'Mahmoud', 'Abdelrahman', 'Elsayed', 'Farouk',
+    'Gamal', 'Hegazy', 'Kamel', 'Mansour', 'Nasser', 'Ragab', 'Saleh',
+    'Shaker', 'Soliman', 'Taha', 'Younis', 'Zaki', 'Fouad', 'Lotfy'
+]
+
+
+def generate_rows(count: int, rng: random.Random):
+    """Yield (id, full_name, national_id, phone, email) tuples"""
+    for patient_id in range(1, count + 1):
+        first = rng.choice(FIRST_NAMES)
+        full_name = f"{first} {rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+        national_id = f"{rng.choice('23')}{rng.randint(0, 10**13 - 1):013d}"
+        phone = f"01{rng.choice('0125')}{rng.randint(0, 10**8 - 1):08d}"
+        email = f"{first.lower()}{patient_id}@mail.com"
+        yield patient_id, full_name, national_id, phone, email
+
+
+def make_queries(rows, count: int, rng: random.Random):
+    """Pick realistic substrings (name parts, ID/phone fragments, emails)"""
+    sample = rng.sample(rows, min(count, len(rows)))
+    queries = []
+    for _, full_name, national_id, phone, email in sample:
+        kind = rng.randrange(4)
+        if kind == 0:
+            queries.append(rng.choice(full_name.split()))
+        elif kind == 1:
+            start = rng.randrange(0, 8)
+            queries.append(national_id[start:start + 6])
+        elif kind == 2:
+            queries.append(phone[3:9])
+        else:
+            queries.append(email.split('@')[0])
+    return queries
+
+
+def percentile(sorted_values, pct: float) -> float:
+    index = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def run(size: int, query_count: int, limit: int, seed: int):
+    rng = random.Random(seed)
+    rows = list(generate_rows(size, rng))
+
+    index = TrigramIndex()
+    started = time.perf_counter()
+    index.build(rows)
+    build_seconds = time.perf_counter() - started
+
+    queries = make_queries(rows, query_count, rng)
+    latencies = []
+    for query in queries:
+        started = time.perf_counter()
+        index.search(query, limit)
+        latencies.append((time.perf_counter() - started) * 1000)
+    latencies.sort()
+
+    print(f"{size:>10,} patients | build {build_seconds:6.1f}s | "
+          f"p50 {percentile(latencies, 50):7.2f} ms | "
+          f"p99 {percentile(latencies, 99):7.2f} ms | "
+          f"max {latencies[-1]:7.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Trigram search index benchmark")
+    parser.add_argument('--sizes', default='100000,1000000',
+                        help="Comma-separated registry sizes")
+    parser.add_argument('--queries', type=int, default=1000)
+    parser.add_argument('--limit', type=int, default=50)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("TRIGRAM SEARCH INDEX BENCHMARK")
+    print("=" * 60)
+    for size in (int(s) for s in args.sizes.split(',')):
+        run(size, args.queries, args.limit, args.seed)
+
+
+if __name__ == "__main__":
+    main()
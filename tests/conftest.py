@@ -0,0 +1,72 @@
+"""
+Shared pytest fixtures
+Binds the core session factory to an in-memory SQLite database so
+database-backed managers can be tested without a MySQL server
+
+Location: tests/conftest.py
+"""
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+
+class QueryCounter:
+    """Counts SQL statements executed on an engine"""
+
+    def __init__(self):
+        self.statements = []
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+    @property
+    def count(self):
+        return len(self.statements)
+
+    def reset(self):
+        self.statements = []
+
+
+@pytest.fixture
+def sqlite_db(monkeypatch):
+    """
+    Fresh in-memory database with all tables, bound to core.database
+
+    Yields:
+        QueryCounter: counts statements run through the engine
+    """
+    from sqlalchemy import create_engine, event
+    from sqlalchemy.pool import StaticPool
+
+    import core.database
+    import core.models
+
+    engine = create_engine(
+        'sqlite://',
+        connect_args={'check_same_thread': False},
+        poolclass=StaticPool
+    )
+    core.database.Base.metadata.create_all(engine)
+
+    original_engine = core.database.engine
+    monkeypatch.setattr(core.database, 'engine', engine)
+    core.database.SessionLocal.configure(bind=engine)
+
+    counter = QueryCounter()
+    event.listen(engine, 'before_cursor_execute', counter)
+    yield counter
+
+    # Write-behind buffers must drain into this database, not the real one
+    from core.audit_sink import audit_sink
+    from core.card_usage import card_usage_buffer
+    from core.statistics_service import statistics_service
+    for buffer in (audit_sink, card_usage_buffer, statistics_service):
+        buffer.flush()
+
+    event.remove(engine, 'before_cursor_execute', counter)
+    core.database.SessionLocal.configure(bind=original_engine)
+    engine.dispose()
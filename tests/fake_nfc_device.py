@@ -0,0 +1,48 @@
+"""
+Fake R20C NFC reader on a pseudo-terminal
+The reader driver opens slave_path like a real serial port; tap()
+writes a UID frame on the master side as the hardware would
+
+Location: tests/fake_nfc_device.py
+"""
+import os
+import pty
+import time
+import tty
+
+
+class FakeR20CDevice:
+    """pty-backed stand-in for the R20C serial reader (POSIX only)"""
+
+    def __init__(self):
+        self.master_fd, self._slave_fd = pty.openpty()
+        tty.setraw(self._slave_fd)
+        self.slave_path = os.ttyname(self._slave_fd)
+
+    def tap(self, card_uid: str, terminator: bytes = b'\r\n') -> float:
+        """
+        Present a card to the reader
+
+        Returns:
+            float: perf_counter timestamp of the write
+        """
+        return self.write(card_uid.encode('ascii') + terminator)
+
+    def write(self, data: bytes) -> float:
+        """Write raw bytes as the device would"""
+        written_at = time.perf_counter()
+        os.write(self.master_fd, data)
+        return written_at
+
+    def close(self) -> None:
+        for fd in (self.master_fd, self._slave_fd):
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
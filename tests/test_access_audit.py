@@ -0,0 +1,85 @@
+"""
+Tests for the card-scan and patient-record audit producers
+NFC logins and record opens reach the audit sink with the patient's
+national ID, so the access monitor's card/patient rules can fire
+
+Location: tests/test_access_audit.py
+"""
+from datetime import date
+
+import pytest
+
+import core.access_audit
+import core.audit_sink
+from core.access_audit import NFC_DEVICE_ID, log_card_scan, log_record_open
+from core.audit_sink import AuditSink
+from core.card_resolver import card_resolver
+from core.database import get_db
+from core.models import Patient, Gender, BloodType, PatientCard, EventType
+from utils.access_monitor import AccessMonitor
+
+PATIENT_ID = "29501010000001"
+
+
+@pytest.fixture
+def audit(sqlite_db, tmp_path, monkeypatch):
+    """Sink without a writer thread, feeding a private monitor"""
+    monitor = AccessMonitor()
+    monkeypatch.setattr(core.audit_sink, 'access_monitor', monitor)
+    sink = AuditSink(spill_dir=tmp_path, background=False)
+    monkeypatch.setattr(core.access_audit, 'audit_sink', sink)
+    card_resolver.clear()
+    yield sink, monitor
+    card_resolver.clear()
+    sink.stop()
+
+
+def queued(sink):
+    return list(sink._queue)
+
+
+def test_nfc_login_is_audited(audit):
+    from core.auth_manager import AuthManager
+    sink, _ = audit
+    with get_db() as db:
+        db.add(Patient(national_id=PATIENT_ID, full_name="Audit Patient",
+                       date_of_birth=date(1995, 1, 1), gender=Gender.Female,
+                       blood_type=BloodType.A_POSITIVE))
+        db.add(PatientCard(card_uid="PATIENT001", patient_national_id=PATIENT_ID,
+                           full_name="Audit Patient"))
+        db.commit()
+
+    assert AuthManager().login_with_nfc("PATIENT001")[0]
+    assert not AuthManager().login_with_nfc("UNKNOWN001")[0]
+
+    ok, refused = queued(sink)
+    assert ok['event_type'] == EventType.nfc_card_scan
+    assert (ok['card_uid'], ok['patient_national_id'], ok['device_id']) == \
+        ("PATIENT001", PATIENT_ID, NFC_DEVICE_ID)
+    assert refused['event_type'] == EventType.failed_login
+    assert refused['success'] is False
+    assert refused['error_message'] == "Card not recognized"
+
+
+def test_record_opens_reach_patient_rules(audit):
+    sink, monitor = audit
+    for user_id in range(5):
+        log_record_open(user_id, PATIENT_ID)
+
+    row = queued(sink)[0]
+    assert row['event_type'] == EventType.other
+    assert row['event_metadata'] == {'event': 'patient_record_open', 'source': 'search'}
+    assert row['patient_national_id'] == PATIENT_ID
+    assert [a['rule'] for a in monitor.recent_alerts()] == ['patient_many_users']
+    assert log_record_open('D1', None) is False
+
+
+def test_card_on_many_workstations(audit):
+    _, monitor = audit
+    card = {'card_type': 'doctor', 'owner_id': 'D1'}
+    for device in ('NFC@ER', 'NFC@ICU', 'NFC@CLINIC'):
+        log_card_scan("DOCTOR0001", card, device_id=device)
+
+    alert = monitor.recent_alerts()[0]
+    assert (alert['rule'], alert['key']) == ('card_many_devices', "DOCTOR0001")
+    assert alert['event']['user_id'] == 'D1'
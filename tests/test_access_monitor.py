@@ -0,0 +1,92 @@
+"""
+Tests for the streaming access anomaly detector
+Sliding windows count events / distinct values per key, expire old
+entries, and alert once per window
+
+Location: tests/test_access_monitor.py
+"""
+from datetime import datetime, timedelta
+
+from core.models import EventType
+from utils.access_monitor import AccessMonitor, WindowRule, default_rules
+
+START = datetime(2024, 11, 27, 9, 0, 0)
+
+
+def at(seconds, **fields):
+    return dict(fields, timestamp=START + timedelta(seconds=seconds))
+
+
+def rule(name, monitor):
+    return next(r for r in monitor.rules if r.name == name)
+
+
+def test_card_on_many_devices():
+    monitor = AccessMonitor()
+    alerts = []
+    monitor.subscribe(alerts.append)
+
+    monitor.observe(at(0, card_uid='04B5C6D7', device_id='ACR122U-1'))
+    monitor.observe(at(10, card_uid='04B5C6D7', device_id='ACR122U-1'))
+    monitor.observe(at(20, card_uid='04B5C6D7', device_id='ACR122U-2'))
+    assert alerts == []
+
+    monitor.observe(at(30, card_uid='04B5C6D7', device_id='R20C-ER'))
+    assert [(a['rule'], a['key'], a['count']) for a in alerts] == [('card_many_devices', '04B5C6D7', 3)]
+
+    # Same burst keeps going: no second alert within the window
+    monitor.observe(at(40, card_uid='04B5C6D7', device_id='R20C-ICU'))
+    assert len(alerts) == 1
+
+
+def test_window_expires_old_entries():
+    window = WindowRule('failed', key=lambda e: e.get('user_id'), threshold=3, window=60)
+    monitor = AccessMonitor(rules=[window])
+
+    assert monitor.observe(at(0, user_id='D1')) == []
+    assert monitor.observe(at(30, user_id='D1')) == []
+    # The first event left the window - still only two
+    assert monitor.observe(at(61, user_id='D1')) == []
+    assert len(monitor.observe(at(62, user_id='D1'))) == 1
+
+
+def test_doctor_opening_many_patient_files():
+    monitor = AccessMonitor()
+    for n in range(29):
+        patient = f"295010100{n:05d}"
+        assert monitor.observe(at(n * 60, user_id='D007', patient_national_id=patient)) == []
+        # Reopening the same file does not count twice
+        assert monitor.observe(at(n * 60 + 1, user_id='D007', patient_national_id=patient)) == []
+
+    alerts = monitor.observe(at(29 * 60, user_id='D007', patient_national_id='29501019999999'))
+    assert [a['rule'] for a in alerts] == ['user_many_patients']
+
+
+def test_failed_logins_and_idle_keys_dropped():
+    monitor = AccessMonitor()
+    for n in range(4):
+        monitor.observe(at(n, user_id='D1', device_id='R307',
+                           event_type=EventType.failed_login, success=False))
+    # A success is not a failure
+    monitor.observe(at(5, user_id='D1', device_id='R307', event_type=EventType.fingerprint_login))
+    alerts = monitor.observe(at(6, user_id='D1', device_id='R307', event_type='failed_login'))
+    assert [a['rule'] for a in alerts] == ['user_failed_burst']
+
+    # Much later, another user's event evicts the idle windows
+    monitor.observe(at(7200, user_id='D2', device_id='R307'))
+    assert rule('user_failed_burst', monitor).windows.keys() == set()
+    assert monitor.stats()['events'] == 7
+
+
+def test_audit_sink_feeds_monitor(sqlite_db, tmp_path, monkeypatch):
+    import core.audit_sink
+    monitor = AccessMonitor(rules=default_rules())
+    monkeypatch.setattr(core.audit_sink, 'access_monitor', monitor)
+    sink = core.audit_sink.AuditSink(spill_dir=tmp_path, background=False)
+
+    for device in ('ACR122U-1', 'ACR122U-2', 'R20C-ER'):
+        sink.log({'event_type': 'nfc_card_scan', 'card_uid': 'CARD1', 'device_id': device})
+    # Alert raised before anything was written to the database
+    assert sqlite_db.count == 0
+    assert monitor.recent_alerts()[0]['rule'] == 'card_many_devices'
+    sink.stop()
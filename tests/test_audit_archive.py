@@ -0,0 +1,87 @@
+"""
+Tests for the cold-tier audit archive
+Old rows move from hardware_audit_logs into monthly compressed columnar
+files, and archive queries prune months and chunks before decoding
+
+Location: tests/test_audit_archive.py
+"""
+from datetime import datetime
+
+from sqlalchemy import insert
+
+from core.database import get_db
+from core.models import EventType, HardwareAuditLog
+from core.audit_archive import AuditArchive
+from core.audit_sink import event_to_row
+
+PATIENT = '29501012345678'
+
+
+def add_events(rows):
+    with get_db() as db:
+        db.execute(insert(HardwareAuditLog.__table__), [
+            event_to_row(dict({'event_type': EventType.nfc_card_scan}, **row)) for row in rows
+        ])
+        db.commit()
+
+
+def hot_rows():
+    with get_db() as db:
+        return db.query(HardwareAuditLog).order_by(HardwareAuditLog.timestamp).all()
+
+
+def test_archive_moves_old_rows(sqlite_db, tmp_path):
+    add_events([{'user_id': f"D{n % 4}", 'timestamp': datetime(2024, 1 + n % 3, 1 + n // 3, 9),
+                 'event_metadata': {'n': n}} for n in range(60)])
+    add_events([{'user_id': 'D0', 'timestamp': datetime(2024, 6, 20)}])
+
+    archive = AuditArchive(tmp_path, chunk_rows=8, codec='zlib')
+    stats = archive.archive_older_than(days=30, now=datetime(2024, 6, 25), batch_size=25)
+    assert stats['archived'] == 60
+    assert [r.timestamp for r in hot_rows()] == [datetime(2024, 6, 20)]
+
+    assert sorted(p.name for p in tmp_path.iterdir()) == ['2024-01', '2024-02', '2024-03']
+    assert archive.stats()['rows'] == 60
+
+    rows = archive.query(limit=None)
+    assert len(rows) == 60
+    assert rows[0]['timestamp'] == datetime(2024, 3, 20, 9)
+    assert rows[0]['event_type'] == 'nfc_card_scan'
+    assert rows[0]['success'] is True
+    assert {r['event_metadata']['n'] for r in rows} == set(range(60))
+
+
+def test_query_pushdown(sqlite_db, tmp_path):
+    rows = []
+    for n in range(200):
+        patient = PATIENT if n in (5, 150) else None
+        rows.append({'user_id': f"D{n // 50}", 'patient_national_id': patient,
+                     'event_type': EventType.nfc_card_scan, 'success': n % 7 != 0,
+                     'timestamp': datetime(2023, 1 + n // 20, 1, 8, n % 60)})
+    archive = AuditArchive(tmp_path, chunk_rows=10, codec='zlib')
+    archive.write([dict(event_to_row(row), id=n + 1) for n, row in enumerate(rows)])
+
+    patient = archive.query(patient_national_id=PATIENT)
+    assert [r['id'] for r in patient] == [151, 6]
+    # Only the two chunks holding the patient were decompressed
+    assert archive.last_scan['chunks_read'] == 2
+
+    march = archive.query(start=datetime(2023, 3, 1), end=datetime(2023, 3, 31), user_id='D0',
+                          columns=['id', 'success'])
+    assert [r['id'] for r in march] == list(range(50, 40, -1))
+    assert archive.last_scan['files'] == 1
+    assert set(march[0]) == {'id', 'success'}
+
+    failed = archive.query(success=False, user_id='D3', limit=3)
+    assert [r['id'] for r in failed] == [197, 190, 183]
+
+
+def test_reruns_do_not_duplicate(sqlite_db, tmp_path):
+    archive = AuditArchive(tmp_path, codec='zlib')
+    row = dict(event_to_row({'event_type': 'fingerprint_login', 'user_id': 'D1',
+                        'timestamp': datetime(2022, 5, 1)}), id=1)
+    # A crash between writing the file and deleting the rows archives them again
+    archive.write([row])
+    archive.write([row])
+    assert len(archive.query(user_id='D1')) == 1
+    assert archive.query(user_id='D2') == []
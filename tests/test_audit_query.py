@@ -0,0 +1,95 @@
+"""
+Tests for the partition-pruned audit query engine
+Queries walk month windows newest first, skip empty months with one
+index probe, and page with keyset cursors
+
+Location: tests/test_audit_query.py
+"""
+from datetime import datetime
+
+from sqlalchemy import insert
+
+from core.database import get_db
+from core.models import EventType, HardwareAuditLog
+from core.audit_query import audit_query, month_start
+from core.audit_sink import event_to_row
+from database.migrations.partition_audit_log import ensure_audit_indexes, partition_audit_log
+
+PATIENT = '29501012345678'
+
+
+def add_events(rows):
+    with get_db() as db:
+        db.execute(insert(HardwareAuditLog.__table__), [
+            event_to_row(dict({'event_type': EventType.nfc_card_scan}, **row)) for row in rows
+        ])
+        db.commit()
+
+
+def test_month_start():
+    assert month_start(datetime(2024, 2, 29, 23, 59)) == datetime(2024, 2, 1)
+
+
+def test_patient_history_pages_newest_first(sqlite_db):
+    add_events([{'patient_national_id': PATIENT, 'user_id': f"D{n % 2}",
+                 'timestamp': datetime(2024, 1 + n % 6, 1 + n // 6, 10)} for n in range(30)])
+    add_events([{'patient_national_id': '30001010000000', 'timestamp': datetime(2024, 3, 3)}])
+
+    seen = []
+    cursor = None
+    while True:
+        page = audit_query.patient_access_history(PATIENT, limit=7, cursor=cursor)
+        seen.extend(page['items'])
+        if not page['has_more']:
+            break
+        cursor = page['next_cursor']
+
+    assert len(seen) == 30
+    stamps = [row.timestamp for row in seen]
+    assert stamps == sorted(stamps, reverse=True)
+    assert {row.patient_national_id for row in seen} == {PATIENT}
+
+
+def test_sparse_history_skips_empty_months(sqlite_db):
+    add_events([
+        {'user_id': 'D1', 'timestamp': datetime(2021, 5, 10)},
+        {'user_id': 'D1', 'timestamp': datetime(2024, 8, 2)},
+        {'user_id': 'D2', 'timestamp': datetime(2023, 1, 1)},
+    ])
+    sqlite_db.reset()
+
+    rows = audit_query.user_history('D1', limit=10)['items']
+    assert [r.timestamp for r in rows] == [datetime(2024, 8, 2), datetime(2021, 5, 10)]
+    # MIN probe, then two month windows joined by one MAX probe - not one query per month
+    assert sqlite_db.count <= 5
+
+
+def test_time_bounds_and_failed_attempts(sqlite_db):
+    add_events([
+        {'user_id': 'D1', 'timestamp': datetime(2024, 4, 30, 23, 0)},
+        {'user_id': 'D1', 'timestamp': datetime(2024, 5, 15)},
+        {'user_id': 'D1', 'timestamp': datetime(2024, 6, 1)},
+        {'event_type': EventType.failed_login, 'success': False, 'device_id': 'R307',
+         'timestamp': datetime(2024, 6, 2)},
+        {'event_type': EventType.failed_login, 'success': False, 'device_id': 'ACR122U',
+         'timestamp': datetime(2024, 6, 3)},
+    ])
+
+    window = audit_query.events(start=datetime(2024, 5, 1), end=datetime(2024, 5, 31), user_id='D1')
+    assert [r.timestamp for r in window] == [datetime(2024, 5, 15)]
+
+    failed = audit_query.failed_attempts(device_id='R307')
+    assert [r.device_id for r in failed] == ['R307']
+    assert len(audit_query.failed_attempts()) == 2
+    assert audit_query.time_bounds(user_id='D1') == (datetime(2024, 4, 30, 23, 0), datetime(2024, 6, 1))
+
+
+def test_migration_creates_missing_indexes(sqlite_db):
+    import core.database
+    engine = core.database.engine
+    with engine.begin() as conn:
+        conn.exec_driver_sql("DROP INDEX ix_hw_audit_patient_time")
+
+    assert ensure_audit_indexes(engine) == ['ix_hw_audit_patient_time']
+    assert ensure_audit_indexes(engine) == []
+    assert partition_audit_log(engine) == 0
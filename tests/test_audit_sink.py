@@ -0,0 +1,163 @@
+"""
+Tests for the asynchronous hardware audit sink
+Events are queued without touching the database, written with bulk
+INSERTs, and survive a database outage through the spill file
+
+Location: tests/test_audit_sink.py
+"""
+from datetime import datetime
+
+import core.database
+from core.database import get_db
+from core.models import EventType, HardwareAuditLog
+from core.audit_sink import AuditSink
+
+
+def make_sink(tmp_path, **kwargs):
+    kwargs.setdefault('background', False)
+    return AuditSink(spill_dir=tmp_path / 'spill', **kwargs)
+
+
+def audit_rows():
+    with get_db() as db:
+        return db.query(HardwareAuditLog).order_by(HardwareAuditLog.id).all()
+
+
+def event(n, **extra):
+    return dict({'event_type': 'nfc_card_scan', 'card_uid': f"CARD{n:04d}",
+                 'timestamp': datetime(2024, 5, 1, 8, 0, n % 60)}, **extra)
+
+
+def test_events_written_in_one_bulk_insert(sqlite_db, tmp_path):
+    sink = make_sink(tmp_path)
+    sqlite_db.reset()
+
+    for n in range(20):
+        assert sink.log(event(n))
+    sink.log({'event_type': 'fingerprint_enrollment', 'user_id': 'D1', 'reader': 'desk-2'})
+    assert sqlite_db.count == 0
+    assert sink.stats()['queued'] == 21
+
+    assert sink.flush() == 21
+    assert sqlite_db.count == 1
+
+    rows = audit_rows()
+    assert len(rows) == 21
+    assert rows[0].event_type == EventType.nfc_card_scan
+    assert rows[0].success is True
+    # Unknown type and extra keys are kept in event_metadata
+    assert rows[-1].event_type == EventType.other
+    assert rows[-1].event_metadata == {'event': 'fingerprint_enrollment', 'reader': 'desk-2'}
+    sink.stop()
+
+
+def test_drop_policies(sqlite_db, tmp_path):
+    newest = make_sink(tmp_path / 'newest', max_queue=3, policy='drop_newest')
+    results = [newest.log(event(n)) for n in range(5)]
+    assert results == [True, True, True, False, False]
+    assert [r['card_uid'] for r in newest._queue] == ['CARD0000', 'CARD0001', 'CARD0002']
+
+    oldest = make_sink(tmp_path / 'oldest', max_queue=3, policy='drop_oldest')
+    for n in range(5):
+        oldest.log(event(n))
+    assert [r['card_uid'] for r in oldest._queue] == ['CARD0002', 'CARD0003', 'CARD0004']
+    assert oldest.stats()['dropped'] == 2
+
+
+def test_outage_spills_and_replays(sqlite_db, tmp_path):
+    sink = make_sink(tmp_path, batch_size=4)
+    table = HardwareAuditLog.__table__
+    table.drop(core.database.engine)
+
+    for n in range(6):
+        sink.log(event(n))
+    assert sink.flush() == 0
+    stats = sink.stats()
+    assert stats['spilled'] == 4
+    assert stats['queued'] == 2
+    assert stats['spill_bytes'] > 0
+
+    table.create(core.database.engine)
+    assert sink.flush() == 2
+    assert sorted(r.card_uid for r in audit_rows()) == [f"CARD{n:04d}" for n in range(6)]
+    stats = sink.stats()
+    assert stats['replayed'] == 4
+    assert stats['spill_bytes'] == 0
+    sink.stop()
+
+
+def test_bad_row_is_quarantined(sqlite_db, tmp_path):
+    """A row the database refuses on its own does not hold up its batch"""
+    sink = make_sink(tmp_path, batch_size=5)
+    for n in range(5):
+        sink.log(event(n, success='maybe') if n == 2 else event(n))
+
+    assert sink.flush() == 4
+    assert [r.card_uid for r in audit_rows()] == ['CARD0000', 'CARD0001', 'CARD0003', 'CARD0004']
+    stats = sink.stats()
+    assert (stats['quarantined'], stats['spilled'], stats['queued']) == (1, 0, 0)
+    assert sink.quarantine_path.read_text(encoding='utf-8').count('CARD0002') == 1
+    sink.stop()
+
+
+def test_bad_spilled_row_does_not_block_replay(sqlite_db, tmp_path):
+    sink = make_sink(tmp_path, batch_size=3)
+    table = HardwareAuditLog.__table__
+    table.drop(core.database.engine)
+    for n in range(6):
+        sink.log(event(n, success='maybe') if n == 1 else event(n))
+    sink.flush()
+    assert sink.stats()['spilled'] == 3
+
+    table.create(core.database.engine)
+    assert sink.flush() == 3
+    assert len(audit_rows()) == 5
+    stats = sink.stats()
+    assert (stats['replayed'], stats['quarantined'], stats['spill_bytes']) == (2, 1, 0)
+    sink.stop()
+
+
+def test_overflow_spilled_instead_of_dropped(sqlite_db, tmp_path):
+    sink = make_sink(tmp_path, max_queue=5, policy='spill')
+    for n in range(8):
+        assert sink.log(event(n))
+    assert sink.stats()['overflow'] == 3
+
+    sink.flush()
+    assert len(audit_rows()) == 8
+    assert sink.stats()['dropped'] == 0
+    sink.stop()
+
+
+def test_unwritten_events_survive_restart(sqlite_db, tmp_path):
+    table = HardwareAuditLog.__table__
+    table.drop(core.database.engine)
+
+    sink = make_sink(tmp_path)
+    for n in range(3):
+        sink.log(event(n))
+    sink.stop()
+
+    table.create(core.database.engine)
+    restarted = make_sink(tmp_path)
+    restarted.flush()
+    assert len(audit_rows()) == 3
+    restarted.stop()
+
+
+def test_fingerprint_events_go_through_sink(sqlite_db, tmp_path, monkeypatch):
+    import core.fingerprint_manager
+    sink = make_sink(tmp_path)
+    monkeypatch.setattr(core.fingerprint_manager, 'audit_sink', sink)
+    manager = core.fingerprint_manager.FingerprintManager()
+
+    manager._log_fingerprint_event(None, 'authentication_failed', False, 'FP-UNKNOWN')
+    manager._log_fingerprint_event('D1', 'enrollment', True)
+    assert audit_rows() == []
+
+    sink.flush()
+    failed = manager.get_failed_attempts()
+    assert len(failed) == 1
+    assert failed[0].fingerprint_id == 'FP-UNKNOWN'
+    assert failed[0].event_metadata['event'] == 'fingerprint_authentication_failed'
+    sink.stop()
@@ -0,0 +1,87 @@
+"""
+Tests for the bulk loader
+Multi-row INSERTs, duplicate policies, row-by-row fallback of rejected
+chunks and the bound-parameter cap
+
+Location: tests/test_bulk_loader.py
+"""
+import sqlite3
+
+import pytest
+
+from database.bulk_loader import BulkInserter, MAX_PARAMS
+
+
+@pytest.fixture
+def conn():
+    connection = sqlite3.connect(':memory:')
+    connection.execute("""
+        CREATE TABLE visits (
+            visit_id TEXT PRIMARY KEY,
+            patient_national_id TEXT NOT NULL,
+            diagnosis TEXT
+        )
+    """)
+    yield connection
+    connection.close()
+
+
+def _rows(start, stop):
+    return [(f"V{n:05d}", f"P{n % 7}", f"diagnosis {n}") for n in range(start, stop)]
+
+
+COLUMNS = ('visit_id', 'patient_national_id', 'diagnosis')
+
+
+def test_chunks_and_skips_duplicates(conn):
+    progress = []
+    loader = BulkInserter(conn, 'sqlite', chunk_size=100,
+                          progress=lambda table, stats: progress.append(stats['rows']))
+
+    stats = loader.insert('visits', COLUMNS, _rows(0, 250))
+    assert stats['inserted'] == 250
+    assert stats['batches'] == 3
+    assert progress == [100, 200, 250]
+
+    # Second run overlaps the first by 150 rows
+    stats = loader.insert('visits', COLUMNS, iter(_rows(100, 300)))
+    assert (stats['inserted'], stats['skipped'], stats['failed']) == (50, 150, 0)
+    assert conn.execute("SELECT COUNT(*) FROM visits").fetchone()[0] == 300
+
+
+def test_update_policy(conn):
+    BulkInserter(conn, 'sqlite').insert('visits', COLUMNS, _rows(0, 10))
+    loader = BulkInserter(conn, 'sqlite', on_duplicate='update')
+    loader.insert('visits', COLUMNS, [("V00003", "P3", "revised")])
+
+    assert conn.execute("SELECT diagnosis FROM visits WHERE visit_id = 'V00003'").fetchone()[0] == 'revised'
+    assert conn.execute("SELECT COUNT(*) FROM visits").fetchone()[0] == 10
+
+
+def test_bad_row_only_fails_itself(conn):
+    errors = []
+    # OR IGNORE would also swallow the NOT NULL violation - use plain INSERT
+    loader = BulkInserter(conn, 'sqlite', chunk_size=50, on_duplicate='error',
+                          on_error=lambda table, row, e: errors.append(row[0]))
+    rows = _rows(0, 100)
+    rows[60] = ("V00060", None, "missing patient")
+
+    stats = loader.insert('visits', COLUMNS, rows)
+    assert errors == ["V00060"]
+    assert (stats['inserted'], stats['failed'], stats['skipped']) == (99, 1, 0)
+    assert conn.execute("SELECT COUNT(*) FROM visits").fetchone()[0] == 99
+
+
+def test_statement_shapes():
+    loader = BulkInserter(None, 'mysql', chunk_size=100000, on_duplicate='update')
+    assert loader.rows_per_statement(COLUMNS) == MAX_PARAMS['mysql'] // 3
+
+    sql = loader.statement('visits', COLUMNS[:2], 2)
+    assert sql == ("INSERT INTO visits (visit_id, patient_national_id) VALUES (%s, %s), (%s, %s)"
+                   " ON DUPLICATE KEY UPDATE visit_id = VALUES(visit_id),"
+                   " patient_national_id = VALUES(patient_national_id)")
+    assert loader.statement('visits', COLUMNS[:2], 2) is sql
+    assert BulkInserter(None, 'mysql').statement('t', ('a',), 1) == "INSERT IGNORE INTO t (a) VALUES (%s)"
+
+    with pytest.raises(ValueError):
+        BulkInserter(None, 'sqlite', on_duplicate='replace')
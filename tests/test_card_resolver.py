@@ -0,0 +1,152 @@
+"""
+Tests for unified NFC card resolution
+One query resolves any card table; repeat scans are served from the hot
+UID map, and activate/deactivate is reflected after commit
+
+Location: tests/test_card_resolver.py
+"""
+from datetime import date
+
+import pytest
+
+from core.database import get_db
+from core.models import (
+    Patient, Gender, BloodType, User, UserRole, PatientCard, DoctorCard,
+    NFCCard, CardStatus
+)
+from core.card_resolver import card_resolver
+from core.card_manager import card_manager
+
+PATIENT_UID = "PATIENT001"
+DOCTOR_UID = "DOCTOR0001"
+LEGACY_UID = "LEGACY0001"
+
+
+@pytest.fixture
+def cards(sqlite_db):
+    """One patient card, one doctor card and one legacy nfc_cards entry"""
+    card_resolver.clear()
+    with get_db() as db:
+        db.add(Patient(
+            national_id="29501010000001", full_name="Card Patient",
+            date_of_birth=date(1995, 1, 1), age=30,
+            gender=Gender.Male, blood_type=BloodType.O_POSITIVE
+        ))
+        doctor = User(username="dr_card", password_hash="x",
+                      role=UserRole.doctor, full_name="Dr. Card")
+        db.add(doctor)
+        db.flush()
+        db.add_all([
+            PatientCard(card_uid=PATIENT_UID, patient_national_id="29501010000001",
+                        full_name="Card Patient"),
+            DoctorCard(card_uid=DOCTOR_UID, user_id=doctor.user_id, full_name="Dr. Card"),
+            NFCCard(card_uid=LEGACY_UID, card_type="patient",
+                    owner_id="29501010000001", owner_name="Card Patient"),
+        ])
+        db.commit()
+    card_resolver.clear()
+    sqlite_db.reset()
+    yield sqlite_db
+    card_resolver.clear()
+
+
+def test_resolves_every_card_table(cards):
+    patient = card_resolver.resolve(PATIENT_UID)
+    doctor = card_resolver.resolve(DOCTOR_UID)
+    legacy = card_resolver.resolve(LEGACY_UID)
+
+    assert (patient['card_type'], patient['owner_id']) == ('patient', "29501010000001")
+    assert (doctor['card_type'], doctor['source']) == ('doctor', 'doctor_cards')
+    assert legacy['source'] == 'nfc_cards'
+    assert 'open_patient_profile' in patient['permissions']
+    assert card_resolver.resolve("UNKNOWN000") is None
+
+
+def test_repeat_scan_is_served_from_memory(cards):
+    card_resolver.resolve(PATIENT_UID)
+    assert cards.count == 1
+
+    cards.reset()
+    assert card_manager.is_patient_card(PATIENT_UID)
+    assert not card_manager.is_doctor_card(PATIENT_UID)
+    assert cards.count == 0
+
+
+def test_deactivate_and_reactivate(cards):
+    assert card_manager.is_patient_card(PATIENT_UID)
+
+    with get_db() as db:
+        db.query(PatientCard).filter_by(card_uid=PATIENT_UID).one().is_active = False
+        db.commit()
+
+    resolution = card_resolver.resolve(PATIENT_UID)
+    assert resolution['is_active'] is False
+    assert resolution['permissions'] == ()
+    assert not card_manager.is_patient_card(PATIENT_UID)
+
+    with get_db() as db:
+        card = db.query(PatientCard).filter_by(card_uid=PATIENT_UID).one()
+        card.is_active, card.status = True, CardStatus.active
+        db.commit()
+
+    assert card_manager.is_patient_card(PATIENT_UID)
+
+
+def test_rollback_keeps_hot_entry(cards):
+    card_resolver.resolve(DOCTOR_UID)
+
+    with get_db() as db:
+        db.query(DoctorCard).filter_by(card_uid=DOCTOR_UID).one().status = CardStatus.lost
+        db.flush()
+        db.rollback()
+
+    cards.reset()
+    assert card_resolver.resolve(DOCTOR_UID)['is_active']
+    assert cards.count == 0
+
+
+def test_lost_status_blocks_login(cards):
+    from core.auth_manager import AuthManager
+
+    with get_db() as db:
+        db.query(DoctorCard).filter_by(card_uid=DOCTOR_UID).one().status = CardStatus.lost
+        db.commit()
+
+    success, message, _ = AuthManager().login_with_nfc(DOCTOR_UID)
+    assert not success
+    assert message == "Card status: lost"
+
+
+def test_login_ignores_stale_hot_entry(cards):
+    """A card deactivated by another process stops logging in immediately"""
+    from core.auth_manager import AuthManager
+
+    assert card_resolver.resolve(DOCTOR_UID)['is_active']
+    # Raw UPDATE: no ORM commit in this process invalidates the hot map
+    with get_db() as db:
+        db.execute(DoctorCard.__table__.update().where(
+            DoctorCard.card_uid == DOCTOR_UID).values(is_active=False))
+        db.commit()
+    assert card_resolver.resolve(DOCTOR_UID)['is_active']
+
+    success, message, _ = AuthManager().login_with_nfc(DOCTOR_UID)
+    assert not success
+    assert message == "Card is inactive"
+    assert not card_resolver.resolve(DOCTOR_UID)['is_active']
+
+
+def test_login_does_not_cache_unknown_cards(cards):
+    from core.auth_manager import AuthManager
+
+    success, _, _ = AuthManager().login_with_nfc("NEWCARD001")
+    assert not success
+    assert card_resolver.stats()['size'] == 0
+
+    with get_db() as db:
+        db.add(PatientCard(card_uid="NEWCARD001", patient_national_id="29501010000001",
+                           full_name="Card Patient"))
+        db.commit()
+
+    success, _, user = AuthManager().login_with_nfc("NEWCARD001")
+    assert success
+    assert user['national_id'] == "29501010000001"
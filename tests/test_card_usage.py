@@ -0,0 +1,91 @@
+"""
+Tests for the write-behind card usage buffer
+Scans accumulate in memory and reach the card tables in one batched
+UPDATE per table
+
+Location: tests/test_card_usage.py
+"""
+import time
+from datetime import date, datetime
+
+from core.database import get_db
+from core.models import NFCCard, PatientCard, Patient, Gender, BloodType
+from core.card_usage import CardUsageBuffer
+
+
+def create_cards():
+    with get_db() as db:
+        db.add(Patient(national_id="29501010000001", full_name="Usage Patient",
+                       date_of_birth=date(1990, 1, 1), age=34,
+                       gender=Gender.Female, blood_type=BloodType.A_POSITIVE))
+        db.add_all([
+            PatientCard(card_uid="PATIENT001", patient_national_id="29501010000001",
+                        full_name="Usage Patient", use_count=3),
+            PatientCard(card_uid="PATIENT002", patient_national_id="29501010000001",
+                        full_name="Usage Patient"),
+            NFCCard(card_uid="LEGACY0001", card_type="patient",
+                    owner_id="29501010000001", owner_name="Usage Patient"),
+        ])
+        db.commit()
+
+
+def card_usage(model, card_uid):
+    with get_db() as db:
+        card = db.query(model).filter_by(card_uid=card_uid).one()
+        return card.use_count, card.last_used
+
+
+def test_record_is_deferred_until_flush(sqlite_db):
+    create_cards()
+    buffer = CardUsageBuffer(flush_interval=3600, flush_events=1000)
+    sqlite_db.reset()
+
+    first, last = datetime(2024, 5, 1, 8, 0), datetime(2024, 5, 1, 9, 30)
+    buffer.record('patient_cards', "PATIENT001", first)
+    buffer.record('patient_cards', "PATIENT001", last)
+    buffer.record('patient_cards', "PATIENT002", first)
+    buffer.record('nfc_cards', "LEGACY0001", first)
+    assert sqlite_db.count == 0
+    assert buffer.stats()['pending_cards'] == 3
+
+    assert buffer.flush() == 3
+    assert card_usage(PatientCard, "PATIENT001") == (5, last)
+    assert card_usage(PatientCard, "PATIENT002") == (1, first)
+    assert card_usage(NFCCard, "LEGACY0001") == (1, first)
+    assert buffer.stats()['pending_events'] == 0
+    buffer.stop()
+
+
+def test_event_threshold_wakes_flusher(sqlite_db):
+    create_cards()
+    buffer = CardUsageBuffer(flush_interval=3600, flush_events=5)
+
+    for _ in range(5):
+        buffer.record('patient_cards', "PATIENT002")
+
+    deadline = time.monotonic() + 5
+    while buffer.stats()['flushes'] == 0 and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    assert card_usage(PatientCard, "PATIENT002")[0] == 5
+    buffer.stop()
+
+
+def test_failed_flush_keeps_scans(sqlite_db, monkeypatch):
+    create_cards()
+    buffer = CardUsageBuffer(flush_interval=3600, flush_events=1000)
+    buffer.record('patient_cards', "PATIENT002")
+
+    import core.card_usage
+    from sqlalchemy import text
+    working = core.card_usage._USAGE_UPDATES['patient_cards']
+    monkeypatch.setitem(core.card_usage._USAGE_UPDATES, 'patient_cards',
+                        text("UPDATE missing_table SET use_count = :n"))
+    assert buffer.flush() == 0
+    assert buffer.stats()['errors'] == 1
+    assert buffer.stats()['pending_events'] == 1
+
+    monkeypatch.setitem(core.card_usage._USAGE_UPDATES, 'patient_cards', working)
+    assert buffer.flush() == 1
+    assert card_usage(PatientCard, "PATIENT002")[0] == 1
+    buffer.stop()
@@ -0,0 +1,92 @@
+"""
+Tests for the shared engine registry
+One engine (pool) per URL, pool sizes from the deployment profile, and
+checkout/wait metrics
+
+Location: tests/test_engine_registry.py
+"""
+import threading
+import time
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+from core.engine_registry import EngineRegistry, database_url
+
+PROFILES = {
+    'tiny': {'pool_size': 1, 'max_overflow': 0, 'pool_timeout': 0.2},
+    'wide': {'pool_size': 4, 'max_overflow': 2, 'pool_timeout': 5},
+}
+
+
+def test_one_engine_per_url(tmp_path):
+    registry = EngineRegistry('wide', PROFILES)
+    url = f"sqlite:///{tmp_path / 'a.db'}"
+
+    engine = registry.get_engine(url)
+    assert registry.get_engine(url) is engine
+    assert registry.get_engine(f"sqlite:///{tmp_path / 'b.db'}") is not engine
+    assert engine.pool.size() == 4
+
+    # Raw DBAPI connections come from the same pool
+    raw = registry.raw_connection(url)
+    raw.cursor().execute("SELECT 1")
+    assert engine.pool.checkedout() == 1
+    raw.close()
+    assert engine.pool.checkedout() == 0
+    registry.dispose()
+
+
+def test_database_url_same_for_orm_and_importers():
+    config = {'host': 'db', 'user': 'medlink', 'password': 's3cret', 'database': 'medlink_db',
+              'charset': 'utf8mb4'}
+    assert database_url(config) == "mysql+mysqlconnector://medlink:s3cret@db/medlink_db?charset=utf8mb4"
+    assert database_url(config, use_database=False).endswith("@db/?charset=utf8mb4")
+    assert EngineRegistry._key(database_url(config)) == EngineRegistry._key(database_url(dict(config)))
+
+
+def test_wait_metrics(tmp_path):
+    registry = EngineRegistry('tiny', PROFILES)
+    url = f"sqlite:///{tmp_path / 'wait.db'}"
+    engine = registry.get_engine(url)
+
+    held = engine.connect()
+    released = threading.Event()
+
+    def release():
+        time.sleep(0.05)
+        held.close()
+        released.set()
+
+    threading.Thread(target=release).start()
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+    released.wait(1)
+
+    with engine.connect():
+        with pytest.raises(PoolTimeoutError):
+            engine.connect()
+
+    stats = next(iter(registry.stats().values()))
+    assert stats['profile'] == 'tiny'
+    assert stats['pool_size'] == 1
+    assert stats['checkouts'] == 3
+    assert stats['timeouts'] == 1
+    assert stats['wait_max_ms'] >= 150
+    assert stats['wait_p99_ms'] >= 30
+    registry.dispose()
+
+
+def test_memory_sqlite_shares_one_connection():
+    registry = EngineRegistry('wide', PROFILES)
+    engine = registry.get_engine('sqlite://')
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE t (x INTEGER)"))
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT COUNT(*) FROM t")).scalar() == 0
+
+
+def test_unknown_profile():
+    with pytest.raises(ValueError):
+        EngineRegistry('cluster', PROFILES)
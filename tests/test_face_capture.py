@@ -0,0 +1,155 @@
+"""
+Tests for the face login capture loop
+Recognition only starts once a steady face is detected, failed attempts
+cool down, and previews are dropped rather than queued for a busy UI
+
+Location: tests/test_face_capture.py
+"""
+import threading
+import time
+
+import numpy as np
+import pytest
+
+# The ai package imports FaceAuthManager (OpenCV) on import
+pytest.importorskip("cv2")
+
+from ai.face_capture import FaceCaptureLoop, FaceStabilityGate, FrameBuffer, render_preview
+
+
+FRAME = np.zeros((480, 640, 3), dtype=np.uint8)
+FACE = (200, 120, 200, 220)
+
+
+class FakeRecognizer:
+    def __init__(self, success=True):
+        self.success = success
+        self.frames = []
+        self.called = threading.Event()
+
+    def __call__(self, frame):
+        self.frames.append(frame)
+        self.called.set()
+        return {"success": self.success, "message": "result"}
+
+
+def make_loop(boxes, recognizer, **kwargs):
+    """Loop driven by step() with a detector that always returns boxes"""
+    kwargs.setdefault("detect_interval", 0.0)
+    return FaceCaptureLoop(capture=None, recognize=recognizer, detector=lambda frame: boxes,
+                           render=lambda frame, scanning, box: frame, **kwargs)
+
+
+def wait_for_result(loop, timeout=5):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        result = loop.take_result()
+        if result is not None:
+            return result
+        time.sleep(0.005)
+    return None
+
+
+def test_stability_gate():
+    gate = FaceStabilityGate(stable_detections=3)
+    for _ in range(2):
+        gate.update([FACE], 640)
+    assert not gate.stable
+
+    # Large jump restarts the streak, a small face is ignored
+    gate.update([(400, 120, 200, 220)], 640)
+    assert gate.streak == 1
+    assert gate.update([(10, 10, 20, 20)], 640) is None
+    assert gate.streak == 0
+
+    for _ in range(3):
+        gate.update([FACE, (10, 10, 20, 20)], 640)
+    assert gate.stable
+    assert gate.box == FACE
+
+
+def test_stable_face_triggers_recognition():
+    recognizer = FakeRecognizer()
+    loop = make_loop([FACE], recognizer, stable_detections=3)
+
+    loop.step(FRAME)
+    loop.step(FRAME)
+    assert not recognizer.frames
+
+    loop.step(FRAME)
+    assert wait_for_result(loop)["success"]
+    assert recognizer.frames[0] is FRAME
+
+    # Logged in - no further hands-free attempts
+    for _ in range(5):
+        loop.step(FRAME)
+    assert len(recognizer.frames) == 1
+
+
+def test_no_face_no_recognition_until_requested():
+    recognizer = FakeRecognizer()
+    loop = make_loop([], recognizer)
+
+    for _ in range(10):
+        loop.step(FRAME)
+    assert not recognizer.frames
+
+    loop.request_scan()
+    loop.step(FRAME)
+    assert wait_for_result(loop) is not None
+
+
+def test_failed_attempt_cools_down():
+    recognizer = FakeRecognizer(success=False)
+    loop = make_loop([FACE], recognizer, stable_detections=1, retry_cooldown=60)
+
+    loop.step(FRAME)
+    assert not wait_for_result(loop)["success"]
+    for _ in range(5):
+        loop.step(FRAME)
+    assert len(recognizer.frames) == 1
+
+
+def test_model_not_ready_blocks_recognition():
+    recognizer = FakeRecognizer()
+    loop = make_loop([FACE], recognizer, stable_detections=1, is_ready=lambda: False)
+    for _ in range(5):
+        loop.step(FRAME)
+    assert not recognizer.frames
+
+
+def test_previews_dropped_until_consumed():
+    loop = make_loop([], FakeRecognizer())
+    for _ in range(5):
+        loop.step(FRAME)
+    stats = loop.stats()
+    assert stats["rendered"] == 1
+    assert stats["render_skipped"] == 4
+
+    assert loop.take_preview() is FRAME
+    assert loop.take_preview() is None
+    loop.step(FRAME)
+    assert loop.stats()["rendered"] == 2
+
+
+def test_ui_frame_times_in_stats():
+    loop = make_loop([], FakeRecognizer())
+    assert loop.stats()["ui_frame_p50_ms"] is None
+    for ms in range(1, 101):
+        loop.record_ui_frame(ms / 1000)
+    stats = loop.stats()
+    assert (stats["ui_frame_p50_ms"], stats["ui_frame_p99_ms"]) == (51, 100)
+
+
+def test_frame_buffer_returns_newest():
+    buffer = FrameBuffer()
+    assert buffer.latest() == (0, None)
+    buffer.publish("a")
+    buffer.publish("b")
+    assert buffer.latest() == (2, "b")
+
+
+def test_render_preview_size():
+    image = render_preview(np.zeros((720, 1280, 3), dtype=np.uint8), scanning=True,
+                           face_box=(400, 200, 300, 300))
+    assert image.size == (640, 480)
@@ -0,0 +1,149 @@
+"""
+Tests for the persistent face embedding store
+Vectorized best-of-N matching over a memory-mapped matrix, updated
+through an append-only delta log as team members and photos are added
+or removed
+
+Location: tests/test_face_embedding_store.py
+"""
+import numpy as np
+import pytest
+
+import ai.face_embedding_store as face_embedding_store
+from ai.face_embedding_store import FaceEmbeddingStore
+
+
+DIM = 512
+
+
+@pytest.fixture
+def store(tmp_path):
+    return FaceEmbeddingStore(tmp_path, "Facenet512")
+
+
+def face(seed):
+    return np.random.default_rng(seed).normal(size=DIM).astype(np.float32)
+
+
+def near(vector, seed, noise=0.05):
+    return vector + np.random.default_rng(seed).normal(scale=noise, size=DIM)
+
+
+def test_best_photo_per_user_wins(store):
+    ahmed, sara = face(1), face(2)
+    store.add("ahmed", "ahmed_main.jpg", ahmed)
+    store.add("sara", "sara_main.jpg", sara)
+    store.add("ahmed", "ahmed_2.jpg", face(99))  # unrelated second photo
+
+    matches = store.match(near(ahmed, 10), top_k=2)
+
+    assert [m[0] for m in matches] == ["ahmed", "sara"]
+    assert matches[0][1] < 0.05
+    assert store.match(near(sara, 11))[0][0] == "sara"
+
+
+def test_euclidean_l2_agrees_with_cosine(store):
+    for i in range(5):
+        store.add(f"user{i}", "main.jpg", face(i))
+    query = near(face(3), 7)
+
+    cosine = store.match(query, 'cosine')[0]
+    l2 = store.match(query, 'euclidean_l2')[0]
+
+    assert cosine[0] == l2[0] == "user3"
+    assert l2[1] == pytest.approx(np.sqrt(2 * cosine[1]), abs=1e-4)
+
+
+def test_persisted_memory_mapped(store, tmp_path):
+    store.add("ahmed", "ahmed_main.jpg", face(1))
+    store.add("sara", "sara_main.jpg", face(2))
+    store.compact()
+    assert not store.delta_path.exists()
+
+    reopened = FaceEmbeddingStore(tmp_path, "Facenet512")
+
+    assert isinstance(reopened._matrix, np.memmap)
+    assert sorted(reopened.users()) == ["ahmed", "sara"]
+    assert reopened.match(face(2))[0][0] == "sara"
+    # Another model keeps its own matrix
+    assert len(FaceEmbeddingStore(tmp_path, "ArcFace")) == 0
+
+
+def test_incremental_updates(store):
+    store.add("ahmed", "ahmed_main.jpg", face(1))
+    store.add("sara", "sara_main.jpg", face(2))
+    store.add("ahmed", "ahmed_main.jpg", face(3))  # re-registered photo replaces row
+
+    assert len(store) == 2
+    assert store.match(face(3))[0] == ("ahmed", pytest.approx(0.0, abs=1e-5))
+
+    store.remove_user("ahmed")
+    assert store.users() == ["sara"]
+
+    store.remove_user("sara")
+    assert store.match(face(2)) == []
+
+
+def test_replace_all_groups_rows_by_user(store):
+    store.replace_all([
+        ("sara", "s1.jpg", face(2)),
+        ("ahmed", "a1.jpg", face(1)),
+        ("sara", "s2.jpg", face(4)),
+    ])
+
+    assert store.users() == ["ahmed", "sara"]
+    assert store.match(face(4))[0][0] == "sara"
+
+
+def test_unknown_metric_rejected(store):
+    store.add("ahmed", "ahmed_main.jpg", face(1))
+    with pytest.raises(ValueError):
+        store.match(face(1), 'manhattan')
+
+
+def test_updates_append_to_delta_log(store, tmp_path):
+    """Adds and removals never rewrite the matrix files"""
+    store.replace_all([("ahmed", "a1.jpg", face(1)), ("sara", "s1.jpg", face(2))])
+    matrix_mtime = store.matrix_path.stat().st_mtime_ns
+
+    store.add("omar", "o1.jpg", face(3))
+    store.add("ahmed", "a1.jpg", face(4))  # replaces a base row
+    store.remove_user("sara")
+
+    assert store.matrix_path.stat().st_mtime_ns == matrix_mtime
+    assert len(store.delta_path.read_text().splitlines()) == 3
+
+    reopened = FaceEmbeddingStore(tmp_path, "Facenet512")
+    for current in (store, reopened):
+        assert current.users() == ["ahmed", "omar"]
+        assert len(current) == 2
+        assert current.match(face(4))[0] == ("ahmed", pytest.approx(0.0, abs=1e-5))
+        assert "sara" not in [m[0] for m in current.match(face(2), top_k=5)]
+
+
+def test_delta_log_is_compacted(store, monkeypatch):
+    monkeypatch.setattr(face_embedding_store, 'COMPACT_MIN_OPS', 4)
+    for i in range(5):
+        store.add(f"user{i}", "main.jpg", face(i))
+
+    assert not store.delta_path.exists()
+    assert isinstance(store._matrix, np.memmap)
+    assert store.users() == [f"user{i}" for i in range(5)]
+    assert store.match(face(3))[0][0] == "user3"
+
+
+def test_replay_survives_interrupted_writes(store, tmp_path):
+    store.add("ahmed", "a1.jpg", face(1))
+    store.add("sara", "s1.jpg", face(2))
+    store.remove_user("ahmed")
+    saved_log = store.delta_path.read_text()
+
+    # Crash after the matrix was rewritten but before the log was removed
+    store.compact()
+    store.delta_path.write_text(saved_log)
+    assert FaceEmbeddingStore(tmp_path, "Facenet512").users() == ["sara"]
+
+    # Crash in the middle of an append: the torn line is ignored
+    with open(store.delta_path, 'a') as f:
+        f.write('{"op": "add", "user": "om')
+    assert FaceEmbeddingStore(tmp_path, "Facenet512").users() == ["sara"]
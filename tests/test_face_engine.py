@@ -0,0 +1,70 @@
+"""
+Tests for the resident face recognition engine
+Warm-up runs in the background, inference waits for it, and frames
+are passed to the model in memory
+
+Location: tests/test_face_engine.py
+"""
+import threading
+
+import numpy as np
+import pytest
+
+from ai.face_engine import FaceRecognitionEngine, STATE_COLD, STATE_READY, STATE_FAILED
+
+
+class FakeDeepFace:
+    """Records calls; build_model blocks until released"""
+
+    def __init__(self):
+        self.release = threading.Event()
+        self.inputs = []
+
+    def build_model(self, model_name):
+        self.release.wait(5)
+
+    def represent(self, img_path, model_name, detector_backend, enforce_detection):
+        self.inputs.append(img_path)
+        return [
+            {'embedding': [0.0, 1.0], 'facial_area': {'w': 10, 'h': 10}},
+            {'embedding': [1.0, 0.0], 'facial_area': {'w': 80, 'h': 90}},
+        ]
+
+
+def test_warm_up_in_background():
+    fake = FakeDeepFace()
+    engine = FaceRecognitionEngine(loader=lambda: fake)
+    assert engine.state == STATE_COLD
+
+    engine.warm_up()
+    assert not engine.is_ready
+
+    fake.release.set()
+    assert engine.wait_until_ready(timeout=5)
+    assert engine.state == STATE_READY
+    assert engine.load_seconds is not None
+
+
+def test_frame_embedded_in_memory():
+    fake = FakeDeepFace()
+    fake.release.set()
+    engine = FaceRecognitionEngine(loader=lambda: fake)
+    frame = np.zeros((480, 640, 3), dtype=np.uint8)
+
+    embedding = engine.embed(frame)
+
+    # Largest face wins, and the caller's array reaches the model as-is
+    assert embedding.tolist() == [1.0, 0.0]
+    assert fake.inputs[-1] is frame
+
+
+def test_failed_load_reports_error():
+    def broken():
+        raise ImportError("No module named 'deepface'")
+
+    engine = FaceRecognitionEngine(loader=broken)
+
+    assert not engine.wait_until_ready(timeout=5)
+    assert engine.state == STATE_FAILED
+    with pytest.raises(RuntimeError):
+        engine.embed(np.zeros((10, 10, 3), dtype=np.uint8))
@@ -0,0 +1,145 @@
+"""
+Tests for the out-of-process face recognition worker
+Frames travel over a local socket, concurrent requests are embedded in
+batches, and clients fall back to the in-process engine
+
+Location: tests/test_face_worker.py
+"""
+import threading
+import time
+
+import numpy as np
+import pytest
+
+# The ai package imports FaceAuthManager (OpenCV) on import
+pytest.importorskip("cv2")
+
+from ai.face_engine import FaceRecognitionEngine, face_engine, STATE_READY
+from ai.face_worker import FaceWorkerServer, FaceWorkerClient, get_face_engine
+
+
+class BatchingDeepFace:
+    """Batched represent(): one face list per input image; embeds the frame's mean"""
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.batch_sizes = []
+
+    def build_model(self, model_name):
+        pass
+
+    def _faces(self, img):
+        return [{'embedding': [float(np.mean(img)), 1.0], 'facial_area': {'w': 10, 'h': 10}}]
+
+    def represent(self, img_path, model_name, detector_backend, enforce_detection):
+        if isinstance(img_path, list):
+            self.batch_sizes.append(len(img_path))
+            time.sleep(self.delay)
+            return [self._faces(img) for img in img_path]
+        return self._faces(img_path)
+
+    def extract_faces(self, img_path, detector_backend, enforce_detection):
+        if enforce_detection and not np.any(img_path):
+            raise ValueError("Face could not be detected")
+        return [{'face': np.zeros((4, 4, 3)), 'facial_area': {'x': 1, 'y': 2, 'w': 3, 'h': 4},
+                 'confidence': np.float64(0.9)}]
+
+
+@pytest.fixture
+def worker(tmp_path):
+    fake = BatchingDeepFace(delay=0.05)
+    engine = FaceRecognitionEngine(loader=lambda: fake)
+    server = FaceWorkerServer(engine, address=str(tmp_path / "worker.sock"),
+                              max_batch=8, batch_window=0.01)
+    server.start()
+    assert engine.wait_until_ready(timeout=5)
+    yield server, fake
+    server.stop()
+
+
+def test_frame_round_trip(worker):
+    server, _ = worker
+    client = FaceWorkerClient(server.address)
+
+    assert client.wait_until_ready(timeout=5)
+    assert client.state == STATE_READY
+
+    frame = np.full((48, 64, 3), 7, dtype=np.uint8)
+    assert client.embed(frame).tolist() == [7.0, 1.0]
+
+    faces = client.extract_faces(frame)
+    assert faces == [{'facial_area': {'x': 1, 'y': 2, 'w': 3, 'h': 4}, 'confidence': 0.9}]
+    with pytest.raises(ValueError):
+        client.extract_faces(np.zeros((8, 8, 3), dtype=np.uint8))
+    client.close()
+
+
+def test_image_files_are_decoded_by_the_client(worker, tmp_path, monkeypatch):
+    import cv2
+    server, _ = worker
+    cv2.imwrite(str(tmp_path / "face.png"), np.full((16, 16, 3), 9, dtype=np.uint8))
+    client = FaceWorkerClient(server.address)
+
+    # The worker does not open paths, so a relative one resolves in the client's cwd
+    monkeypatch.chdir(tmp_path)
+    assert client.embed("face.png").tolist() == [9.0, 1.0]
+    with pytest.raises(ValueError):
+        client.embed("missing.png")
+    with pytest.raises(ValueError):
+        client._call({"op": "embed", "path": str(tmp_path / "face.png")})
+    client.close()
+
+
+def test_second_worker_does_not_take_a_live_socket(worker):
+    server, _ = worker
+    other = FaceWorkerServer(server.engine, address=server.address)
+    with pytest.raises(OSError):
+        other.start()
+
+    client = FaceWorkerClient(server.address)
+    assert client.embed(np.full((8, 8, 3), 3, dtype=np.uint8)).tolist() == [3.0, 1.0]
+    client.close()
+
+
+def test_stale_socket_file_is_replaced(tmp_path):
+    import socket
+    path = str(tmp_path / "worker.sock")
+    stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    stale.bind(path)
+    stale.close()  # the file stays behind, nobody listens
+
+    server = FaceWorkerServer(FaceRecognitionEngine(loader=BatchingDeepFace), address=path)
+    server.start()
+    client = FaceWorkerClient(path)
+    try:
+        assert client.wait_until_ready(timeout=5)
+    finally:
+        client.close()
+        server.stop()
+
+
+def test_concurrent_clients_are_batched(worker):
+    server, fake = worker
+    results = {}
+
+    def scan(value):
+        client = FaceWorkerClient(server.address)
+        results[value] = client.embed(np.full((32, 32, 3), value, dtype=np.uint8))[0]
+        client.close()
+
+    threads = [threading.Thread(target=scan, args=(value,)) for value in range(1, 13)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5)
+
+    # Every client gets its own frame's embedding back
+    assert results == {value: float(value) for value in range(1, 13)}
+    assert max(fake.batch_sizes) > 1
+    stats = server.stats()
+    assert stats['frames'] == 12
+    assert stats['batches'] < 12
+
+
+def test_unreachable_worker_falls_back(tmp_path):
+    assert get_face_engine(str(tmp_path / "missing.sock")) is face_engine
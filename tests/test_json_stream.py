@@ -0,0 +1,140 @@
+"""
+Tests for the streaming JSON reader
+Record-by-record parsing with a small buffer, bounded memory and
+resumable checkpoints
+
+Location: tests/test_json_stream.py
+"""
+import json
+import sqlite3
+import tracemalloc
+
+import pytest
+
+from utils.json_stream import ImportCheckpoint, iter_batches, iter_json_array
+
+
+def _patients(count):
+    return [
+        {
+            'national_id': f"3{n:013d}",
+            'full_name': f"Patient {n} مريض",
+            'notes': 'brackets ] } [ { and "quotes", \\ backslash',
+            'weight': 70.5 + n,
+            'visits': n * 1234567,
+            'active': n % 2 == 0,
+            'insurance': None,
+            'allergies': ['Penicillin'] * (n % 3),
+        }
+        for n in range(count)
+    ]
+
+
+@pytest.mark.parametrize('buffer_size', [7, 64, 1 << 16])
+def test_matches_json_load(tmp_path, buffer_size):
+    path = tmp_path / 'patients.json'
+    data = {'version': 2, 'meta': {'exported': '2024-05-01', 'list': [1, 2]},
+            'patients': _patients(50), 'after': True}
+    path.write_text(json.dumps(data, indent=2, ensure_ascii=False), encoding='utf-8')
+
+    streamed = list(iter_json_array(path, 'patients', buffer_size=buffer_size, use_ijson=False))
+    assert streamed == data['patients']
+
+    assert list(iter_json_array(path, 'missing', buffer_size=buffer_size, use_ijson=False)) == []
+
+    path.write_text(json.dumps([1, 22, 333, {'a': []}]), encoding='utf-8')
+    assert list(iter_json_array(path, None, buffer_size=buffer_size, use_ijson=False)) == [1, 22, 333, {'a': []}]
+
+
+def test_scalars_split_at_every_offset(tmp_path):
+    """Numbers cut at '.', 'e' or a sign by the block boundary decode whole"""
+    path = tmp_path / 'patients.json'
+    text = ('{"version":1.25,"scale":-3E+2,"patients":'
+            '[1.5,-0.75,2e-2,1E10,123456,true,null,"x",{"w":70.25}],"ratio":0.5}')
+    path.write_text(text, encoding='utf-8')
+    expected = json.loads(text)['patients']
+
+    for buffer_size in range(1, len(text) + 1):
+        streamed = list(iter_json_array(path, 'patients', buffer_size=buffer_size, use_ijson=False))
+        assert streamed == expected, buffer_size
+
+
+def test_truncated_file_raises(tmp_path):
+    path = tmp_path / 'patients.json'
+    path.write_text(json.dumps({'patients': _patients(3)})[:-40], encoding='utf-8')
+    with pytest.raises(ValueError):
+        list(iter_json_array(path, 'patients', buffer_size=16, use_ijson=False))
+
+
+def _peak_streaming(path):
+    tracemalloc.start()
+    count = sum(len(batch) for batch in iter_batches(iter_json_array(path, 'patients', use_ijson=False), 200))
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return count, peak
+
+
+def test_memory_does_not_grow_with_file(tmp_path):
+    small, large = tmp_path / 'small.json', tmp_path / 'large.json'
+    small.write_text(json.dumps({'patients': _patients(5000)}), encoding='utf-8')
+    large.write_text(json.dumps({'patients': _patients(40000)}), encoding='utf-8')
+
+    small_count, small_peak = _peak_streaming(small)
+    large_count, large_peak = _peak_streaming(large)
+    assert (small_count, large_count) == (5000, 40000)
+    assert large_peak < small_peak * 1.5
+    assert large_peak < large.stat().st_size / 10
+
+
+def test_checkpoint(tmp_path):
+    path = tmp_path / 'patients.json'
+    path.write_text(json.dumps({'patients': _patients(5)}), encoding='utf-8')
+
+    checkpoint = ImportCheckpoint(path)
+    assert checkpoint.load() == {'records': 0, 'in_flight': []}
+    checkpoint.save(3, ['30000000000003'])
+    assert ImportCheckpoint(path).load() == {'records': 3, 'in_flight': ['30000000000003']}
+    assert ImportCheckpoint(path, 'migrate').load()['records'] == 0
+
+    # Another export in the same place starts from scratch
+    path.write_text(json.dumps({'patients': _patients(6)}), encoding='utf-8')
+    assert checkpoint.load()['records'] == 0
+
+    checkpoint.clear()
+    assert not checkpoint.path.exists()
+
+
+
+def test_importer_resumes_interrupted_chunk(tmp_path):
+    pytest.importorskip('colorama')
+    from database.json_data_importer import JSONDataImporter, TABLE_COLUMNS
+
+    db_path = tmp_path / 'medlink.db'
+    conn = sqlite3.connect(db_path)
+    for table in ('patients', 'surgeries', 'hospitalizations', 'vaccinations', 'current_medications'):
+        columns = ', '.join(f"{c} TEXT" for c in TABLE_COLUMNS[table])
+        key = ', PRIMARY KEY (national_id)' if table == 'patients' else ''
+        conn.execute(f"CREATE TABLE {table} ({columns}{key})")
+    conn.commit()
+
+    patients = [dict(p, surgeries=[{'surgery_id': f"S{n}a"}, {'surgery_id': f"S{n}b"}])
+                for n, p in enumerate(_patients(10))]
+    (tmp_path / 'patients.json').write_text(json.dumps({'patients': patients}), encoding='utf-8')
+
+    importer = JSONDataImporter(tmp_path, chunk_size=4, url=f"sqlite:///{db_path}")
+    assert importer.connect()
+    assert importer.import_patients()
+
+    # Simulate a run that stopped while writing the second chunk
+    ids = [p['national_id'] for p in patients]
+    conn.execute("DELETE FROM surgeries WHERE surgery_id IN ('S4b', 'S5a', 'S5b', 'S8a', 'S8b', 'S9a', 'S9b')")
+    conn.execute("DELETE FROM patients WHERE national_id IN (?, ?)", ids[8:])
+    conn.commit()
+    ImportCheckpoint(tmp_path / 'patients.json').save(4, ids[4:8])
+
+    assert importer.import_patients()
+    importer.disconnect()
+    surgeries = [row[0] for row in conn.execute("SELECT surgery_id FROM surgeries ORDER BY surgery_id")]
+    assert surgeries == sorted(f"S{n}{s}" for n in range(10) for s in 'ab')
+    assert conn.execute("SELECT COUNT(*) FROM patients").fetchone()[0] == 10
+    conn.close()
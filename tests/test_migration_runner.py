@@ -0,0 +1,87 @@
+"""
+Tests for the dependency-aware migration runner
+Step ordering, parallel stages, error capture and set-based key prefetch
+
+Location: tests/test_migration_runner.py
+"""
+import threading
+import time
+from datetime import date
+
+import pytest
+
+from database.migrations.prefetch import existing_keys
+from database.migrations.run_migration import MIGRATION_STEPS, run_migration_graph
+
+
+def _fake_steps(log, delay=0.1, fail=None):
+    lock = threading.Lock()
+
+    def make(step):
+        def migration():
+            with lock:
+                log.append(('start', step, time.perf_counter()))
+            time.sleep(delay)
+            if step == fail:
+                raise RuntimeError("boom")
+            with lock:
+                log.append(('end', step, time.perf_counter()))
+            return True, "ok", 10
+        return migration
+
+    return {step: (label, make(step), requires) for step, (label, _, requires) in MIGRATION_STEPS.items()}
+
+
+def test_dependents_wait_and_run_in_parallel():
+    log = []
+    started = time.perf_counter()
+    results = run_migration_graph(_fake_steps(log), max_workers=4)
+    wall = time.perf_counter() - started
+
+    events = {(kind, step): at for kind, step, at in log}
+    for step in ('visits', 'lab_results', 'imaging', 'cards'):
+        assert events[('start', step)] >= events[('end', 'users')]
+        assert events[('start', step)] >= events[('end', 'patients')]
+
+    # Two stages of 0.1s each instead of six steps one after another
+    assert wall < 0.45
+    assert [r['step'] for r in results] == list(MIGRATION_STEPS)
+    assert all(r['success'] and r['count'] == 10 for r in results)
+    assert sum(r['seconds'] for r in results) > wall
+
+
+def test_failed_step_is_reported():
+    log = []
+    results = {r['step']: r for r in run_migration_graph(_fake_steps(log, 0.01, fail='patients'))}
+    assert not results['patients']['success']
+    assert results['patients']['message'] == "RuntimeError: boom"
+    assert results['visits']['success']
+
+
+def test_invalid_graph():
+    noop = lambda: (True, "", 0)
+    with pytest.raises(ValueError):
+        run_migration_graph({'a': ("A", noop, ('b',)), 'b': ("B", noop, ('a',))})
+    with pytest.raises(ValueError):
+        run_migration_graph({'a': ("A", noop, ('missing',))})
+
+
+def test_existing_keys_one_query_per_chunk(sqlite_db):
+    import core.database
+    from core.models import BloodType, Gender, Patient
+
+    with core.database.get_db() as db:
+        db.add_all(Patient(national_id=f"3{n:013d}", full_name=f"Patient {n}",
+                           date_of_birth=date(1990, 1, 1), gender=Gender.Male,
+                           blood_type=BloodType.O_POSITIVE) for n in range(5))
+        db.commit()
+
+        candidates = [f"3{n:013d}" for n in range(3, 10)] + [None, "30000000000003"]
+        sqlite_db.reset()
+        assert existing_keys(db, Patient.national_id, candidates) == {"30000000000003", "30000000000004"}
+        assert sqlite_db.count == 1
+
+        sqlite_db.reset()
+        assert existing_keys(db, Patient.national_id, candidates, chunk_size=3) == {"30000000000003", "30000000000004"}
+        assert sqlite_db.count == 3
+        assert existing_keys(db, Patient.national_id, []) == set()
@@ -0,0 +1,89 @@
+"""
+Tests for the background NFC serial reader
+Drives the real reader thread through a pty-based fake R20C device
+
+Location: tests/test_nfc_reader.py
+"""
+import sys
+
+import pytest
+
+from core.nfc_reader import NFCSerialReader, open_serial_port, STX, ETX
+
+pytestmark = pytest.mark.skipif(sys.platform == 'win32', reason="pty fake device needs POSIX")
+
+
+@pytest.fixture
+def device():
+    from tests.fake_nfc_device import FakeR20CDevice
+
+    with FakeR20CDevice() as fake:
+        yield fake
+
+
+@pytest.fixture
+def reader(device):
+    nfc = NFCSerialReader(device.slave_path, debounce_seconds=0.3,
+                          idle_frame_seconds=0.1, reconnect_seconds=0.05)
+    nfc.start()
+    yield nfc
+    nfc.stop()
+
+
+def test_scan_reaches_queue(device, reader):
+    tapped_at = device.tap("0725755100")
+
+    event = reader.get_event(timeout=2)
+
+    assert event['card_uid'] == "0725755100"
+    assert event['queued_at'] - tapped_at < 0.5
+    stats = reader.stats()
+    assert stats['events'] == 1
+    assert stats['scan_to_event_p50_ms'] is not None
+    assert stats['scan_to_consumer_p50_ms'] >= stats['scan_to_event_p50_ms']
+
+
+def test_held_card_is_debounced(device, reader):
+    for _ in range(3):
+        device.tap("0725755100")
+    device.tap("0724975956")
+
+    assert reader.get_event(timeout=2)['card_uid'] == "0725755100"
+    assert reader.get_event(timeout=2)['card_uid'] == "0724975956"
+    assert reader.get_event(timeout=0.2) is None
+    assert reader.stats()['debounced'] == 2
+
+
+def test_stx_etx_and_unterminated_frames(device, reader):
+    device.write(bytes([STX]) + b"AB12CD34" + bytes([ETX]))
+    assert reader.get_event(timeout=2)['card_uid'] == "AB12CD34"
+
+    # No terminator: completed after the idle gap
+    device.write(b"99887766")
+    assert reader.get_event(timeout=2)['card_uid'] == "99887766"
+
+
+def test_noise_is_ignored():
+    nfc = NFCSerialReader('unused', debounce_seconds=0)
+    nfc.feed(b"\r\n12\r\n", now=1.0)
+    assert nfc.get_event() is None
+    assert nfc.stats()['noise'] == 1
+
+
+def test_reconnects_after_open_failure(device):
+    attempts = []
+
+    def flaky_opener(port, baudrate, timeout):
+        attempts.append(port)
+        if len(attempts) == 1:
+            raise OSError("port busy")
+        return open_serial_port(port, baudrate, timeout)
+
+    nfc = NFCSerialReader(device.slave_path, reconnect_seconds=0.05, opener=flaky_opener)
+    nfc.start()
+    try:
+        device.tap("0725755100")
+        assert nfc.get_event(timeout=2)['card_uid'] == "0725755100"
+        assert nfc.stats()['port_errors'] == 1
+    finally:
+        nfc.stop()
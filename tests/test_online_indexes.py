@@ -0,0 +1,66 @@
+"""
+Tests for the online index migration
+Missing model indexes are found by name and built one at a time, and
+per-patient history queries use the composite indexes
+
+Location: tests/test_online_indexes.py
+"""
+from sqlalchemy import text
+from sqlalchemy.dialects import mysql
+
+import core.database
+from core.models import LabResult
+from database.migrations.online_indexes import index_ddl, migrate_indexes, missing_indexes
+
+PATIENT_INDEXES = ['ix_imaging_results_patient_date', 'ix_lab_results_patient_date',
+                   'ix_visits_patient_date']
+
+
+def plan(sql):
+    with core.database.engine.connect() as conn:
+        return ' '.join(row[-1] for row in conn.execute(text(f"EXPLAIN QUERY PLAN {sql}")))
+
+
+def test_builds_only_missing_indexes(sqlite_db):
+    engine = core.database.engine
+    assert missing_indexes(engine) == []
+    with engine.begin() as conn:
+        for name in PATIENT_INDEXES:
+            conn.execute(text(f"DROP INDEX {name}"))
+
+    assert [i.name for i in missing_indexes(engine)] == PATIENT_INDEXES
+    assert [i.name for i in missing_indexes(engine, tables=['visits'])] == ['ix_visits_patient_date']
+
+    # Dry run changes nothing
+    assert migrate_indexes(engine, dry_run=True) == []
+    assert len(missing_indexes(engine)) == 3
+
+    built = migrate_indexes(engine)
+    assert sorted(name for name, _ in built) == PATIENT_INDEXES
+    assert migrate_indexes(engine) == []
+
+
+def test_patient_history_uses_composite_index(sqlite_db):
+    lab_plan = plan("SELECT * FROM lab_results WHERE patient_national_id = '1' "
+                    "ORDER BY test_date DESC LIMIT 50")
+    assert 'ix_lab_results_patient_date' in lab_plan
+    assert 'TEMP B-TREE' not in lab_plan
+
+    visit_plan = plan("SELECT * FROM visits WHERE patient_national_id = '1' "
+                      "ORDER BY visit_date DESC, visit_time DESC LIMIT 50")
+    assert 'ix_visits_patient_date' in visit_plan
+    assert 'TEMP B-TREE' not in visit_plan
+
+
+def test_mysql_ddl_is_online():
+    index = next(i for i in LabResult.__table__.indexes if i.name == 'ix_lab_results_patient_date')
+    ddl = index_ddl(index, mysql.dialect())
+    assert ddl.startswith("CREATE INDEX ix_lab_results_patient_date ON lab_results")
+    assert ddl.endswith("ALGORITHM=INPLACE, LOCK=NONE")
+
+
+def test_recent_patients_use_created_at_index(sqlite_db):
+    recent_plan = plan("SELECT * FROM patients WHERE created_at >= '2025-01-01' "
+                       "ORDER BY created_at DESC, id DESC LIMIT 50")
+    assert 'ix_patients_created_at_id' in recent_plan
+    assert 'TEMP B-TREE' not in recent_plan
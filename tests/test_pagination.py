@@ -0,0 +1,74 @@
+"""
+Tests for keyset (cursor) pagination
+Walking next_cursor visits every row exactly once, including rows that
+share a sort key, and a cursor is rejected by other listings
+
+Location: tests/test_pagination.py
+"""
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from core.database import get_db
+from core.models import Patient, Gender
+from core.pagination import decode_cursor, encode_cursor
+from core.search_engine import SearchEngine
+
+
+def create_patients(count, created_at=None):
+    with get_db() as db:
+        for i in range(count):
+            db.add(Patient(
+                national_id=f"2950101{i:07d}", full_name=f"Patient {i % 3}",
+                date_of_birth=date(1995, 1, 1), gender=Gender.Male,
+                created_at=created_at
+            ))
+        db.commit()
+        return [p.id for p in db.query(Patient).order_by(Patient.id)]
+
+
+def walk(fetch, limit):
+    """Follow next_cursor to the end, returning each page's ids"""
+    pages, cursor = [], None
+    for _ in range(20):
+        page = fetch(limit=limit, cursor=cursor)
+        pages.append([p['id'] for p in page['items']])
+        cursor = page['next_cursor']
+        if not page['has_more']:
+            assert cursor is None
+            return pages
+    pytest.fail(f"cursor never reached the last page: {pages[:3]}")
+
+
+def test_recent_pages_advance(sqlite_db):
+    """Default created_at values round-trip through the cursor"""
+    ids = create_patients(10)
+    pages = walk(SearchEngine().get_recent_patients_page, limit=4)
+
+    assert pages == [ids[9:5:-1], ids[5:1:-1], ids[1::-1]]
+
+
+def test_recent_pages_break_ties_on_id(sqlite_db):
+    """Rows registered in the same second are ordered by id, none repeated"""
+    ids = create_patients(7, created_at=datetime.now().replace(microsecond=0) - timedelta(hours=1))
+    pages = walk(SearchEngine().get_recent_patients_page, limit=3)
+
+    assert pages == [ids[6:3:-1], ids[3:0:-1], ids[:1]]
+
+
+def test_all_pages_follow_name_then_id(sqlite_db):
+    ids = create_patients(8)
+    pages = walk(SearchEngine().get_all_patients_page, limit=3)
+
+    expected = sorted(ids, key=lambda pid: ((pid - ids[0]) % 3, pid))
+    assert [pid for page in pages for pid in page] == expected
+    assert [len(page) for page in pages] == [3, 3, 2]
+
+
+def test_cursor_is_scoped_to_its_listing():
+    token = encode_cursor('recent:30', [datetime(2025, 1, 1, 8, 30), 5])
+    assert decode_cursor(token, 'recent:30') == [datetime(2025, 1, 1, 8, 30), 5]
+    with pytest.raises(ValueError):
+        decode_cursor(token, 'all')
+    with pytest.raises(ValueError):
+        decode_cursor('not-a-cursor', 'all')
@@ -0,0 +1,98 @@
+"""
+Tests for SQL-side patient filtering and facet counts
+Every criterion (including allergy/chronic disease presence) is applied
+before LIMIT, and the facet query agrees with filter_patients()
+
+Location: tests/test_patient_filters.py
+"""
+from datetime import date
+
+from core.database import get_db
+from core.models import Patient, Gender, BloodType, Allergy, ChronicDisease
+from core.search_engine import SearchEngine
+
+# (name, gender, age, city, blood type, chronic disease, allergy)
+PATIENTS = [
+    ("Amal",   Gender.Female, 34, "Cairo",      BloodType.A_POSITIVE, True,  True),
+    ("Basma",  Gender.Female, 52, "Cairo",      BloodType.A_POSITIVE, True,  False),
+    ("Dalia",  Gender.Female, 28, "Giza",       BloodType.O_NEGATIVE, False, True),
+    ("Hany",   Gender.Male,   45, "New Cairo",  BloodType.A_POSITIVE, True,  False),
+    ("Karim",  Gender.Male,   61, "Alexandria", BloodType.B_POSITIVE, False, False),
+    ("Mona",   Gender.Female, 40, "Cairo",      BloodType.A_POSITIVE, False, False),
+]
+
+
+def create_patients():
+    with get_db() as db:
+        for i, (name, gender, age, city, blood_type, chronic, allergy) in enumerate(PATIENTS):
+            nid = f"2950101{i:07d}"
+            db.add(Patient(
+                national_id=nid, full_name=name, date_of_birth=date(1990, 1, 1),
+                age=age, gender=gender, city=city, blood_type=blood_type
+            ))
+            if chronic:
+                db.add(ChronicDisease(patient_national_id=nid, disease_name="Hypertension"))
+            if allergy:
+                db.add(Allergy(patient_national_id=nid, allergen_name="Penicillin"))
+        db.commit()
+
+
+def names(patients):
+    return [p['full_name'] for p in patients]
+
+
+def test_combined_criteria(sqlite_db):
+    create_patients()
+    engine = SearchEngine()
+
+    assert names(engine.filter_patients(gender='Female', city='cairo', blood_type='A+')) == \
+        ["Amal", "Basma", "Mona"]
+    assert names(engine.filter_patients(blood_type='A+', min_age=40, max_age=55,
+                                        has_chronic_diseases=True)) == ["Basma", "Hany"]
+    assert names(engine.filter_patients(has_chronic_diseases=False, has_allergies=False)) == \
+        ["Karim", "Mona"]
+    assert names(engine.filter_patients(gender='Female', has_allergies=True)) == ["Amal", "Dalia"]
+
+
+def test_limit_applies_after_relationship_criteria(sqlite_db):
+    """Presence filters run in SQL, so LIMIT counts matching patients only"""
+    create_patients()
+    engine = SearchEngine()
+
+    assert names(engine.filter_patients(has_chronic_diseases=True, limit=2)) == ["Amal", "Basma"]
+    assert engine.count_filtered_patients(has_chronic_diseases=True) == 3
+
+
+def test_unknown_values_are_ignored(sqlite_db):
+    create_patients()
+    engine = SearchEngine()
+
+    assert engine._filter_criteria(gender='Other', blood_type='Z+') == {}
+    assert set(engine._filter_criteria(blood_type='O-', min_age=0)) == {'blood_type', 'min_age'}
+    assert len(engine.filter_patients(gender='Other')) == len(PATIENTS)
+
+
+def test_facet_totals(sqlite_db):
+    create_patients()
+    engine = SearchEngine()
+    filters = dict(gender='Female', city='Cairo', has_chronic_diseases=True)
+
+    sqlite_db.reset()
+    facets = engine.filter_patients_facets(**filters)
+
+    assert sqlite_db.count == 1
+    assert facets == {
+        'total_patients': 6,
+        'matching_all': 2,
+        'criteria': {'gender': 4, 'city': 4, 'has_chronic_diseases': 3},
+    }
+    assert facets['matching_all'] == engine.count_filtered_patients(**filters) == \
+        len(engine.filter_patients(**filters))
+
+
+def test_facets_without_criteria(sqlite_db):
+    create_patients()
+
+    assert SearchEngine().filter_patients_facets() == {
+        'total_patients': 6, 'matching_all': 6, 'criteria': {}
+    }
@@ -0,0 +1,110 @@
+"""
+Tests for the batched patient profile loader
+Query-count regression: a full profile must cost PROFILE_QUERY_COUNT
+queries whether one patient or many are loaded
+
+Location: tests/test_patient_loader.py
+"""
+from datetime import date
+
+from core.database import get_db
+from core.models import (
+    Patient, Gender, BloodType, Allergy, ChronicDisease, CurrentMedication,
+    Surgery, Hospitalization, Vaccination, FamilyHistory, Disability,
+    EmergencyDirective, Lifestyle, Insurance
+)
+from core.patient_loader import (
+    PROFILE_QUERY_COUNT,
+    load_patient_with_relationships,
+    load_patients_with_relationships,
+    load_patient_list
+)
+
+
+def create_patients(count):
+    """Insert patients that each have a row in every profile relationship"""
+    national_ids = []
+    with get_db() as db:
+        for i in range(count):
+            nid = f"2950101{i:07d}"
+            national_ids.append(nid)
+            db.add(Patient(
+                national_id=nid, full_name=f"Patient {i}",
+                date_of_birth=date(1995, 1, 1), age=30,
+                gender=Gender.Male, blood_type=BloodType.O_POSITIVE
+            ))
+            db.add_all([
+                Allergy(patient_national_id=nid, allergen_name="Penicillin", severity="Severe"),
+                ChronicDisease(patient_national_id=nid, disease_name="Diabetes"),
+                CurrentMedication(patient_national_id=nid, medication_name="Metformin", is_active=True),
+                CurrentMedication(patient_national_id=nid, medication_name="Old drug", is_active=False),
+                Surgery(patient_national_id=nid, surgery_id=f"S{i}", procedure_name="Appendectomy",
+                        surgery_date=date(2020, 5, 1)),
+                Hospitalization(patient_national_id=nid, hospitalization_id=f"H{i}",
+                                admission_date=date(2021, 3, 1), hospital="Cairo University Hospital"),
+                Vaccination(patient_national_id=nid, vaccine_name="COVID-19",
+                            date_administered=date(2021, 6, 1)),
+                FamilyHistory(patient_national_id=nid, relation="Father"),
+                Disability(patient_national_id=nid, disability_type="Visual"),
+                EmergencyDirective(patient_national_id=nid, dnr_status=False, organ_donor=True,
+                                   power_of_attorney_name="Sara", power_of_attorney_phone="0100"),
+                Lifestyle(patient_national_id=nid, smoking_status="Never"),
+                Insurance(patient_national_id=nid, insurance_provider="Misr Insurance",
+                          coverage_end_date=date(2030, 1, 1)),
+            ])
+        db.commit()
+    return national_ids
+
+
+def test_single_profile_is_complete(sqlite_db):
+    """Every relationship is assembled into the profile dict"""
+    nid = create_patients(1)[0]
+
+    profile = load_patient_with_relationships(nid)
+
+    assert profile['full_name'] == "Patient 0"
+    assert profile['blood_type'] == "O+"
+    assert profile['allergies'][0]['allergen_name'] == "Penicillin"
+    assert profile['chronic_diseases'][0]['disease_name'] == "Diabetes"
+    assert [m['medication_name'] for m in profile['current_medications']] == ["Metformin"]
+    assert profile['surgeries'][0]['procedure_name'] == "Appendectomy"
+    assert profile['hospitalizations'][0]['hospital'] == "Cairo University Hospital"
+    assert profile['vaccinations'][0]['vaccine_name'] == "COVID-19"
+    assert profile['family_history'][0]['relation'] == "Father"
+    assert profile['disabilities'][0]['disability_type'] == "Visual"
+    assert profile['emergency_directives']['power_of_attorney_contact'] == "0100"
+    assert profile['lifestyle']['smoking_status'] == "Never"
+    assert profile['insurance']['expiry_date'] == date(2030, 1, 1)
+
+
+def test_missing_patient_returns_none(sqlite_db):
+    assert load_patient_with_relationships("00000000000000") is None
+
+
+def test_single_profile_query_count(sqlite_db):
+    nid = create_patients(1)[0]
+
+    sqlite_db.reset()
+    load_patient_with_relationships(nid)
+
+    assert sqlite_db.count == PROFILE_QUERY_COUNT
+
+
+def test_bulk_profile_query_count_is_constant(sqlite_db):
+    """Loading 40 profiles costs the same number of queries as loading 1"""
+    national_ids = create_patients(40)
+
+    sqlite_db.reset()
+    profiles = load_patients_with_relationships(national_ids)
+
+    assert len(profiles) == 40
+    assert sqlite_db.count == PROFILE_QUERY_COUNT
+
+
+def test_load_patient_list_keeps_order(sqlite_db):
+    national_ids = create_patients(5)
+    wanted = [national_ids[3], "00000000000000", national_ids[1]]
+
+    profiles = load_patient_list(wanted)
+
+    assert [p['national_id'] for p in profiles] == [national_ids[3], national_ids[1]]
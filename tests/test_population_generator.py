@@ -0,0 +1,140 @@
+"""
+Tests for the synthetic population generator
+Determinism, national ID validity/uniqueness, distributions and loading
+through the bulk loader into the model tables
+
+Location: tests/test_population_generator.py
+"""
+from collections import Counter
+
+import numpy as np
+
+from database.population_generator import (
+    GOVERNORATES, PopulationGenerator, check_digits, load_population
+)
+from utils.validators import validate_national_id
+
+
+def _column(table, name):
+    columns, rows = table
+    index = columns.index(name)
+    return [row[index] for row in rows]
+
+
+def test_same_seed_same_population():
+    first = list(PopulationGenerator(seed=7).chunks(3000, 1000, doctor_ids=[1, 2]))
+    second = list(PopulationGenerator(seed=7).chunks(3000, 1000, doctor_ids=[1, 2]))
+    other = list(PopulationGenerator(seed=8).chunks(3000, 1000, doctor_ids=[1, 2]))
+
+    assert first == second
+    assert first[0]['patients'] != other[0]['patients']
+    assert list(first[0]) == ['patients', 'chronic_diseases', 'visits', 'lab_results', 'vaccinations']
+
+
+def test_national_ids_valid_and_unique():
+    generator = PopulationGenerator(seed=1)
+    ids, genders, births = [], [], []
+    # Small chunks: IDs must stay unique across chunks
+    for tables in generator.chunks(20000, 2500):
+        ids += _column(tables['patients'], 'national_id')
+        genders += _column(tables['patients'], 'gender')
+        births += _column(tables['patients'], 'date_of_birth')
+
+    assert len(set(ids)) == len(ids) == 20000
+    for national_id, gender, birth in zip(ids[:2000], genders, births):
+        assert validate_national_id(national_id)[0]
+        assert national_id[1:7] == birth[2:4] + birth[5:7] + birth[8:10]
+        assert int(national_id[7:9]) in GOVERNORATES
+        assert int(national_id[12]) % 2 == (gender == 'Male')
+        assert int(national_id[13]) == check_digits(np.array([int(national_id[:13])]))[0]
+
+
+def test_doctor_ids_leave_patient_ids_unchanged():
+    """Doctors have their own serials, so creating them does not shift patients"""
+    with_doctors = PopulationGenerator(seed=4)
+    dob = np.full(50, with_doctors.as_of - np.timedelta64(40 * 365, 'D'))
+    doctor_ids = with_doctors.national_ids(dob, np.zeros(50, dtype=np.int64),
+                                           np.ones(50, dtype=np.int64), doctors=True)
+    patients = _column(with_doctors.generate(0, 5000, doctor_ids=[])['patients'], 'national_id')
+
+    assert patients == _column(PopulationGenerator(seed=4).generate(0, 5000, doctor_ids=[])['patients'],
+                               'national_id')
+    assert len(set(doctor_ids)) == 50 and not set(doctor_ids) & set(patients)
+    assert all(validate_national_id(nid)[0] for nid in doctor_ids)
+
+
+def test_reserved_ids_are_not_generated_again():
+    existing = _column(PopulationGenerator(seed=1).generate(0, 100000, doctor_ids=[])['patients'], 'national_id')
+    fresh = _column(PopulationGenerator(seed=2).generate(0, 100000, doctor_ids=[])['patients'], 'national_id')
+    # Counters start at zero, so two seeds collide
+    assert set(existing) & set(fresh)
+
+    generator = PopulationGenerator(seed=2)
+    assert generator.reserve(existing + ['', 'not-an-id', '29913450100012']) == len(existing)
+    ids = _column(generator.generate(0, 100000, doctor_ids=[])['patients'], 'national_id')
+    assert len(set(ids)) == len(ids) and not set(existing) & set(ids)
+
+
+def test_distributions():
+    tables = PopulationGenerator(seed=3).generate(0, 40000, doctor_ids=[1])
+    blood = Counter(_column(tables['patients'], 'blood_type'))
+    assert abs(blood['O_POSITIVE'] / 40000 - 0.34) < 0.02
+    assert abs(blood['AB_NEGATIVE'] / 40000 - 0.01) < 0.005
+    assert Counter(_column(tables['patients'], 'governorate')).most_common(1)[0][0] == 'Cairo'
+
+    ages = dict(zip(_column(tables['patients'], 'national_id'), _column(tables['patients'], 'age')))
+    hypertensive = [ages[nid] for nid, disease in zip(_column(tables['chronic_diseases'], 'patient_national_id'),
+                                                      _column(tables['chronic_diseases'], 'disease_name'))
+                    if disease == 'Hypertension']
+    old = sum(age >= 60 for age in ages.values())
+    young = sum(18 <= age < 40 for age in ages.values())
+    assert sum(a >= 60 for a in hypertensive) / old > 3 * sum(18 <= a < 40 for a in hypertensive) / young
+
+    # Records never predate the patient's birth
+    births = dict(zip(_column(tables['patients'], 'national_id'), _column(tables['patients'], 'date_of_birth')))
+    for nid, day in zip(_column(tables['vaccinations'], 'patient_national_id'),
+                        _column(tables['vaccinations'], 'date_administered')):
+        assert day >= births[nid]
+
+
+def test_load_population_into_models(sqlite_db):
+    import core.database
+    from core.models import Doctor, Patient, Visit, VisitType
+
+    connection = core.database.engine.raw_connection()
+    try:
+        stats = load_population(connection, 'sqlite', 1500, seed=5, chunk_size=500,
+                                insert_chunk=200, doctors=5)
+    finally:
+        connection.close()
+
+    assert stats['patients']['inserted'] == 1500
+    assert stats['visits']['inserted'] > 0
+    with core.database.get_db() as db:
+        assert db.query(Patient).count() == 1500
+        assert db.query(Doctor).count() == 5
+        visit = db.query(Visit).first()
+        assert isinstance(visit.visit_type, VisitType)
+        assert visit.patient is not None and visit.doctor is not None
+        assert db.query(Patient).first().gender.value in ('Male', 'Female')
+
+
+def test_second_load_adds_new_patients(sqlite_db):
+    """Re-running a seed continues after the existing IDs and visit numbers"""
+    import core.database
+    from core.models import ChronicDisease, Patient, Visit
+
+    connection = core.database.engine.raw_connection()
+    try:
+        first = load_population(connection, 'sqlite', 800, seed=5, chunk_size=400, doctors=3)
+        second = load_population(connection, 'sqlite', 800, seed=5, chunk_size=400, doctors=3)
+    finally:
+        connection.close()
+
+    for table in ('patients', 'chronic_diseases', 'visits'):
+        assert second[table]['inserted'] == second[table]['rows'] == first[table]['rows']
+    with core.database.get_db() as db:
+        assert db.query(Patient).count() == 1600
+        assert db.query(Visit).count() == first['visits']['rows'] * 2
+        pairs = db.query(ChronicDisease.patient_national_id, ChronicDisease.disease_name).all()
+        assert len(set(pairs)) == len(pairs)
@@ -0,0 +1,95 @@
+"""
+Tests for the versioned patient profile cache
+Hits must skip the profile rebuild, and both last_updated changes and
+explicit invalidation must force a reload
+
+Location: tests/test_profile_cache.py
+"""
+from datetime import date, datetime
+
+from core.database import get_db
+from core.models import Patient, Gender, BloodType
+from core.profile_cache import PatientProfileCache
+
+NATIONAL_ID = "29501010000001"
+
+
+def create_patient():
+    with get_db() as db:
+        db.add(Patient(
+            national_id=NATIONAL_ID, full_name="Cached Patient",
+            date_of_birth=date(1995, 1, 1), age=30,
+            gender=Gender.Male, blood_type=BloodType.O_POSITIVE,
+            last_updated=datetime(2024, 1, 1, 9, 0, 0)
+        ))
+        db.commit()
+
+
+class CountingLoader:
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, national_id):
+        self.calls += 1
+        return {'national_id': national_id, 'build': self.calls}
+
+
+def test_hit_skips_loader(sqlite_db):
+    create_patient()
+    cache, loader = PatientProfileCache(), CountingLoader()
+
+    first = cache.get_or_load(NATIONAL_ID, loader)
+    second = cache.get_or_load(NATIONAL_ID, loader)
+
+    assert first is second
+    assert loader.calls == 1
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses'], stats['size']) == (1, 1, 1)
+
+
+def test_last_updated_change_reloads(sqlite_db):
+    create_patient()
+    cache, loader = PatientProfileCache(), CountingLoader()
+    cache.get_or_load(NATIONAL_ID, loader)
+
+    with get_db() as db:
+        patient = db.query(Patient).filter_by(national_id=NATIONAL_ID).first()
+        patient.last_updated = datetime(2024, 1, 2, 9, 0, 0)
+        db.commit()
+
+    assert cache.get_or_load(NATIONAL_ID, loader)['build'] == 2
+    assert cache.stats()['stale'] == 1
+
+
+def test_invalidate_drops_every_namespace(sqlite_db):
+    create_patient()
+    cache, loader = PatientProfileCache(), CountingLoader()
+    cache.get_or_load(NATIONAL_ID, loader, namespace='card')
+    cache.get_or_load(NATIONAL_ID, loader, namespace='search')
+
+    cache.invalidate(NATIONAL_ID)
+
+    assert cache.stats()['size'] == 0
+    cache.get_or_load(NATIONAL_ID, loader, namespace='card')
+    assert loader.calls == 3
+
+
+def test_lru_eviction_and_ttl(sqlite_db):
+    create_patient()
+    loader = CountingLoader()
+
+    small = PatientProfileCache(max_entries=1)
+    small.get_or_load(NATIONAL_ID, loader, namespace='card')
+    small.get_or_load(NATIONAL_ID, loader, namespace='search')
+    assert small.stats()['evictions'] == 1
+
+    expired = PatientProfileCache(ttl_seconds=-1)
+    expired.get_or_load(NATIONAL_ID, loader)
+    expired.get_or_load(NATIONAL_ID, loader)
+    assert expired.stats()['expirations'] == 1
+
+
+def test_missing_patient_not_cached(sqlite_db):
+    cache, loader = PatientProfileCache(), CountingLoader()
+    assert cache.get_or_load("00000000000000", loader) is None
+    assert loader.calls == 0
@@ -0,0 +1,132 @@
+"""
+Tests for the patient trigram search index
+Ranking, ORM commit sync, and catching up with writes that bypass the
+ORM (bulk loader, other processes)
+
+Location: tests/test_search_index.py
+"""
+from datetime import date
+
+import pytest
+
+import core.database
+from core.database import get_db
+from core.models import Patient, Gender, BloodType
+from core.search_index import TrigramIndex, patient_search_index
+from database.bulk_loader import BulkInserter
+
+
+@pytest.fixture
+def index(sqlite_db, monkeypatch):
+    """The global index, empty, probing the table on every search"""
+    patient_search_index.clear()
+    monkeypatch.setattr(patient_search_index, 'check_interval', 0)
+    yield patient_search_index
+    patient_search_index.clear()
+
+
+def add_patient(national_id, full_name, phone=None):
+    with get_db() as db:
+        db.add(Patient(
+            national_id=national_id, full_name=full_name, phone=phone,
+            date_of_birth=date(1990, 1, 1), gender=Gender.Female,
+            blood_type=BloodType.A_POSITIVE
+        ))
+        db.commit()
+
+
+def raw_insert(rows):
+    """Insert (national_id, full_name) rows without the ORM"""
+    connection = core.database.engine.raw_connection()
+    try:
+        BulkInserter(connection, 'sqlite').insert(
+            'patients', ('national_id', 'full_name', 'date_of_birth', 'gender'),
+            [(nid, name, '1990-01-01', 'Female') for nid, name in rows]
+        )
+    finally:
+        connection.close()
+
+
+def raw_execute(sql, params=()):
+    connection = core.database.engine.raw_connection()
+    try:
+        connection.cursor().execute(sql, params)
+        connection.commit()
+    finally:
+        connection.close()
+
+
+def names(ids):
+    with get_db() as db:
+        by_id = dict(db.query(Patient.id, Patient.full_name).filter(Patient.id.in_(ids)).all())
+    return [by_id[i] for i in ids]
+
+
+def test_ranking_and_maintenance():
+    index = TrigramIndex()
+    index.build([
+        (1, 'Sara Hassan', '29001010000001', '010-1234-5678', 'sara@mail.com'),
+        (2, 'Hassan Ali', '29001010000002', None, None),
+        (3, 'Mona Elhassani', '29001010000003', None, None),
+    ])
+
+    assert index.search('hassan') == [2, 1, 3]  # prefix, word prefix, substring
+    assert index.search('01012345') == [1]  # phone formatting ignored
+    assert index.search('ha') is None  # too short for the index
+
+    index.upsert(2, {'full_name': 'Omar Ali'})
+    index.remove(3)
+    assert index.search('hassan') == [1]
+    assert len(index) == 2
+
+
+def test_orm_commits_update_index(index):
+    add_patient('29001010000001', 'Sara Hassan')
+    index.ensure_loaded()
+    assert names(index.search('hassan')) == ['Sara Hassan']
+
+    add_patient('29001010000002', 'Hassan Ali')
+    with get_db() as db:
+        db.add(Patient(national_id='29001010000003', full_name='Rolled Hassan',
+                       date_of_birth=date(1990, 1, 1), gender=Gender.Male))
+        db.flush()
+        db.rollback()
+
+    assert names(index.search('hassan')) == ['Hassan Ali', 'Sara Hassan']
+
+
+def test_writes_outside_the_orm_are_picked_up(index, sqlite_db):
+    add_patient('29001010000001', 'Sara Hassan')
+    index.ensure_loaded()
+
+    # Bulk loader insert: found after the next probe
+    raw_insert([('29001010000002', 'Hassan Bulk'), ('29001010000003', 'Nour Hassan')])
+    index.ensure_loaded()
+    assert sorted(names(index.search('hassan'))) == ['Hassan Bulk', 'Nour Hassan', 'Sara Hassan']
+
+    # Update from elsewhere bumps last_updated
+    raw_execute("UPDATE patients SET full_name = 'Sara Mansour', last_updated = '2099-01-01 00:00:00' "
+                "WHERE national_id = '29001010000001'")
+    index.ensure_loaded()
+    assert sorted(names(index.search('hassan'))) == ['Hassan Bulk', 'Nour Hassan']
+    assert names(index.search('mansour')) == ['Sara Mansour']
+
+    # Delete: the row count no longer matches, so the index is rebuilt
+    raw_execute("DELETE FROM patients WHERE national_id = '29001010000002'")
+    index.ensure_loaded()
+    assert names(index.search('hassan')) == ['Nour Hassan']
+
+    # Unchanged table: one probe, no reload
+    sqlite_db.reset()
+    assert index.refresh_if_stale() is False
+    assert sqlite_db.count == 1
+
+
+def test_probe_is_throttled(index, sqlite_db, monkeypatch):
+    add_patient('29001010000001', 'Sara Hassan')
+    index.ensure_loaded()
+    monkeypatch.setattr(index, 'check_interval', 3600)
+
+    sqlite_db.reset()
+    index.ensure_loaded()
+    assert sqlite_db.count == 0
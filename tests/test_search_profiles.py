@@ -0,0 +1,113 @@
+"""
+Tests for the SearchEngine loading profiles
+Query-count regression: a page costs the same number of queries however
+many patients it holds (one for summary, one per relationship for full)
+
+Location: tests/test_search_profiles.py
+"""
+from datetime import date
+
+from core.database import get_db
+from core.models import (
+    Patient, Gender, BloodType, Allergy, CurrentMedication, Surgery, Vaccination
+)
+from core.search_engine import (
+    PROFILE_SUMMARY, PROFILE_FULL, FULL_PROFILE_OPTIONS, SUMMARY_COLUMNS,
+    SearchEngine, apply_profile, convert_rows_to_dicts
+)
+
+FULL_QUERY_COUNT = 1 + len(FULL_PROFILE_OPTIONS)
+
+
+def create_patients(count):
+    """Insert patients with rows in a few profile relationships"""
+    with get_db() as db:
+        for i in range(count):
+            nid = f"2950101{i:07d}"
+            db.add(Patient(
+                national_id=nid, full_name=f"Patient {i}", city="Cairo",
+                date_of_birth=date(1995, 1, 1), age=30,
+                gender=Gender.Female, blood_type=BloodType.A_POSITIVE
+            ))
+            db.add_all([
+                Allergy(patient_national_id=nid, allergen_name="Penicillin", severity="Severe"),
+                CurrentMedication(patient_national_id=nid, medication_name="Metformin", is_active=True),
+                CurrentMedication(patient_national_id=nid, medication_name="Old drug", is_active=False),
+                Surgery(patient_national_id=nid, surgery_id=f"S{i}", procedure_name="Appendectomy",
+                        surgery_date=date(2020, 5, 1)),
+                Vaccination(patient_national_id=nid, vaccine_name="COVID-19",
+                            date_administered=date(2021, 6, 1)),
+            ])
+        db.commit()
+
+
+def test_summary_page_is_one_query(sqlite_db):
+    """Summary rows are a column projection with no relationship loads"""
+    create_patients(20)
+    sqlite_db.reset()
+
+    page = SearchEngine().get_all_patients(limit=20, profile=PROFILE_SUMMARY)
+
+    assert len(page) == 20
+    assert sqlite_db.count == 1
+    assert set(page[0]) == {column.key for column in SUMMARY_COLUMNS}
+    assert page[0]['gender'] == 'Female'
+    assert page[0]['blood_type'] == BloodType.A_POSITIVE.value
+
+
+def test_full_page_query_count_is_constant(sqlite_db):
+    """Full profile costs one IN query per relationship, not per patient"""
+    create_patients(20)
+    engine = SearchEngine()
+
+    sqlite_db.reset()
+    single = engine.get_all_patients(limit=1, profile=PROFILE_FULL)
+    single_count = sqlite_db.count
+
+    sqlite_db.reset()
+    page = engine.get_all_patients(limit=20, profile=PROFILE_FULL)
+
+    assert len(single) == 1 and len(page) == 20
+    assert single_count == sqlite_db.count == FULL_QUERY_COUNT
+
+
+def test_full_profile_dicts_include_relationships(sqlite_db):
+    """convert_rows_to_dicts assembles relationships without lazy loads"""
+    create_patients(3)
+
+    with get_db() as db:
+        rows = apply_profile(db.query(Patient).order_by(Patient.id), PROFILE_FULL).all()
+        sqlite_db.reset()
+        patients = convert_rows_to_dicts(rows, PROFILE_FULL)
+        assert sqlite_db.count == 0
+
+    first = patients[0]
+    assert first['national_id'] == "29501010000000"
+    assert [m['name'] for m in first['current_medications']] == ["Metformin"]
+    assert first['surgeries'][0]['procedure'] == "Appendectomy"
+    assert first['vaccinations'][0]['vaccine_name'] == "COVID-19"
+    assert len(first['allergies']) == 1
+
+
+def test_summary_rows_convert_to_dicts(sqlite_db):
+    """Summary rows become plain dicts with enum values unwrapped"""
+    create_patients(2)
+
+    with get_db() as db:
+        rows = apply_profile(db.query(Patient).order_by(Patient.id), PROFILE_SUMMARY).all()
+    patients = convert_rows_to_dicts(rows, PROFILE_SUMMARY)
+
+    assert [p['full_name'] for p in patients] == ["Patient 0", "Patient 1"]
+    assert patients[0]['gender'] == 'Female'
+    assert all(isinstance(p, dict) for p in patients)
+
+
+def test_search_methods_default_to_full_profile(sqlite_db):
+    """Callers that pass no profile keep getting complete records"""
+    create_patients(2)
+    engine = SearchEngine()
+
+    for patients in (engine.search_by_name("Patient"), engine.get_all_patients(),
+                     engine.search_by_city("Cairo"), engine.filter_patients(city="Cairo")):
+        assert len(patients) == 2
+        assert [a.allergen_name for a in patients[0]['allergies']] == ["Penicillin"]
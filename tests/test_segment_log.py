@@ -0,0 +1,102 @@
+"""
+Tests for the segmented append-only hardware audit log
+Appends only add a line, segments rotate with a sidecar index, and
+range/user/patient queries read only matching segments
+
+Location: tests/test_segment_log.py
+"""
+import json
+
+import utils.hardware_logger
+from utils.segment_log import SegmentedEventLog, INDEX_SUFFIX
+
+
+def event(n, **extra):
+    timestamp = f"2024-11-{1 + n // 100:02d} 09:{n % 100 // 60:02d}:{n % 60:02d}"
+    return dict({'event_id': f"HW{n:05d}", 'timestamp': timestamp, 'event_type': 'nfc_card_scan'}, **extra)
+
+
+def test_append_only_adds_one_line(tmp_path):
+    log = SegmentedEventLog(tmp_path)
+    log.append(event(0))
+    segment = log.segments()[0]
+    size = segment.stat().st_size
+
+    stored = log.append(event(1, user_id='D001'))
+    line = segment.read_bytes()[size:]
+    assert line.count(b'\n') == 1
+    assert json.loads(line) == stored
+    assert log.count() == 2
+
+
+def test_rotation_writes_sidecar_index(tmp_path):
+    log = SegmentedEventLog(tmp_path, max_segment_bytes=2000)
+    for n in range(100):
+        log.append(event(n, user_id=f"D{n % 3:03d}"))
+    log.close()
+
+    segments = log.segments()
+    assert len(segments) > 3
+    assert all(s.with_suffix(INDEX_SUFFIX).exists() for s in segments)
+
+    # A fresh reader uses the sidecars and sees every event
+    reader = SegmentedEventLog(tmp_path)
+    assert reader.count() == 100
+    assert len(reader.query(user_id='D001', limit=None)) == 33
+
+
+def test_query_filters_and_orders(tmp_path):
+    log = SegmentedEventLog(tmp_path, max_segment_bytes=1500)
+    for n in range(300):
+        extra = {'patient_national_id': '29501012345678'} if n % 10 == 0 else {}
+        log.append(event(n, user_id='D001' if n % 2 else 'D002', **extra))
+
+    newest = log.query(limit=5)
+    assert [e['event_id'] for e in newest] == ['HW00299', 'HW00298', 'HW00297', 'HW00296', 'HW00295']
+
+    patient = log.query(patient_national_id='29501012345678', user_id='D002', limit=None)
+    assert len(patient) == 30
+    assert all(e['patient_national_id'] == '29501012345678' for e in patient)
+
+    # Day-only end bound covers the whole day
+    day = log.query(start='2024-11-02', end='2024-11-02', limit=None)
+    assert len(day) == 100
+    assert {e['timestamp'][:10] for e in day} == {'2024-11-02'}
+
+    assert log.query(event_type='fingerprint_login') == []
+
+
+def test_unsealed_segment_scanned_and_torn_tail_skipped(tmp_path):
+    writer = SegmentedEventLog(tmp_path)
+    for n in range(10):
+        writer.append(event(n, user_id='D001'))
+    # Crash mid-write: no sidecar, half a line at the end
+    with open(writer.segments()[0], 'ab') as f:
+        f.write(b'{"event_id": "HW9')
+
+    reader = SegmentedEventLog(tmp_path)
+    assert reader.count() == 10
+    assert len(reader.query(user_id='D001', limit=None)) == 10
+    assert len(reader.query(start='2024-11-01', limit=None)) == 10
+
+
+def test_hardware_logger_uses_segment_log(tmp_path, monkeypatch):
+    legacy = tmp_path / 'hardware_audit_log.json'
+    legacy.write_text(json.dumps({'hardware_events': [
+        {'event_id': 'HW001', 'timestamp': '2024-11-27 09:15:23',
+         'event_type': 'fingerprint_login', 'user_id': 'D001'},
+    ]}), encoding='utf-8')
+
+    log = SegmentedEventLog(tmp_path / 'segments')
+    monkeypatch.setattr(utils.hardware_logger, 'hardware_log', log)
+    monkeypatch.setattr(utils.hardware_logger, 'LEGACY_LOG_FILE', legacy)
+    monkeypatch.setattr(utils.hardware_logger, 'get_local_ip', lambda: '127.0.0.1')
+    assert utils.hardware_logger.import_legacy_log(log, legacy) == 1
+    # Only an empty log is seeded
+    assert utils.hardware_logger.import_legacy_log(log, legacy) == 0
+
+    assert utils.hardware_logger.log_hardware_event('nfc_card_scan', user_id='D001',
+                                                    card_uid='04B5C6D7E8F9A0')
+    events = utils.hardware_logger.get_hardware_audit_log(user_id='D001')
+    assert [e['event_type'] for e in events] == ['nfc_card_scan', 'fingerprint_login']
+    assert utils.hardware_logger.get_hardware_audit_log(event_type='fingerprint_login')[0]['event_id'] == 'HW001'
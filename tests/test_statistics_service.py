@@ -0,0 +1,137 @@
+"""
+Tests for the statistics rollup
+Committed changes buffer their deltas outside the writer's transaction,
+a flush applies them in one short transaction, and age min/max stay
+correct after deletes
+
+Location: tests/test_statistics_service.py
+"""
+from datetime import date
+
+import pytest
+
+from core.database import get_db
+from core.models import Patient, Gender, BloodType, Allergy
+from core.statistics_service import statistics_service
+
+
+@pytest.fixture
+def stats(sqlite_db, monkeypatch):
+    """Global service with the background flusher parked"""
+    monkeypatch.setattr(statistics_service, 'flush_interval', 3600)
+    statistics_service.rebuild()
+    yield statistics_service
+    statistics_service.stop()
+    statistics_service.invalidate()
+
+
+def add_patient(db, nid, age, gender=Gender.Male):
+    db.add(Patient(national_id=nid, full_name=f"Patient {nid[-2:]}",
+                   date_of_birth=date(1990, 1, 1), age=age,
+                   gender=gender, blood_type=BloodType.O_POSITIVE))
+
+
+def rollup(stats):
+    stats.invalidate()
+    return stats.get_database_statistics()
+
+
+def test_rebuild_computes_from_tables(stats):
+    with get_db() as db:
+        add_patient(db, "29001010000001", 30)
+        add_patient(db, "29001010000002", 50, Gender.Female)
+        db.add(Allergy(patient_national_id="29001010000001", allergen_name="Penicillin"))
+        db.commit()
+
+    stats.rebuild()
+    report = stats.get_statistics_report()
+
+    assert report['patients'] == {'total': 2, 'male': 1, 'female': 1, 'with_nfc': 0}
+    assert report['health_data']['allergies'] == 1
+
+
+def test_commit_does_not_touch_rollup(stats, sqlite_db):
+    """Deltas are buffered on commit and written by flush()"""
+    sqlite_db.reset()
+    with get_db() as db:
+        add_patient(db, "29001010000001", 30)
+        add_patient(db, "29001010000002", 50, Gender.Female)
+        db.commit()
+
+    assert not any('statistics_rollup' in sql for sql in sqlite_db.statements)
+
+    sqlite_db.reset()
+    assert stats.flush() > 0
+    # age_count probe, one executemany increment, first min/max assignment
+    assert sum('statistics_rollup' in sql for sql in sqlite_db.statements) == 3
+    assert stats.flush() == 0
+
+    values = rollup(stats)
+    assert values['total_patients'] == 2
+    assert (values['min_patient_age'], values['max_patient_age']) == (30, 50)
+    assert values['avg_patient_age'] == 40
+
+
+def test_read_includes_own_commits(stats):
+    stats.get_metrics()
+    with get_db() as db:
+        add_patient(db, "29001010000001", 30)
+        db.commit()
+
+    # The commit invalidates the snapshot and the reload flushes first
+    assert stats.get_dashboard_stats()['total_patients'] == 1
+
+
+def test_rollback_discards_deltas(stats):
+    with get_db() as db:
+        add_patient(db, "29001010000001", 30)
+        db.flush()
+        db.rollback()
+
+    assert stats.flush() == 0
+    assert rollup(stats)['total_patients'] == 0
+
+
+def test_age_extremes_follow_deletes_and_updates(stats):
+    with get_db() as db:
+        for i, age in enumerate((20, 45, 80)):
+            add_patient(db, f"2900101000000{i}", age)
+        db.commit()
+    stats.flush()
+    assert (rollup(stats)['min_patient_age'], rollup(stats)['max_patient_age']) == (20, 80)
+
+    with get_db() as db:
+        db.delete(db.query(Patient).filter_by(age=80).one())
+        db.query(Patient).filter_by(age=20).one().age = 33
+        db.commit()
+    stats.flush()
+
+    values = rollup(stats)
+    assert values['total_patients'] == 2
+    assert (values['min_patient_age'], values['max_patient_age']) == (33, 45)
+
+    # Incremental values agree with a full recompute
+    stats.rebuild()
+    assert rollup(stats) == values
+
+
+def test_core_writes_are_caught_on_reload(stats, sqlite_db):
+    """Rows inserted around the ORM hooks trigger a rebuild on the next reload"""
+    import core.database
+    from database.bulk_loader import BulkInserter
+
+    assert stats.get_dashboard_stats()['total_patients'] == 0
+    connection = core.database.engine.raw_connection()
+    try:
+        BulkInserter(connection, 'sqlite').insert(
+            'patients', ('national_id', 'full_name', 'date_of_birth', 'age', 'gender'),
+            [("29001010000001", "Patient 01", "1990-01-01", 35, 'Male'),
+             ("29001010000002", "Patient 02", "1990-01-01", 41, 'Female')])
+    finally:
+        connection.close()
+
+    # Within max_staleness the snapshot is served as is
+    assert stats.get_dashboard_stats()['total_patients'] == 0
+    stats.invalidate()
+    assert stats.get_dashboard_stats()['total_patients'] == 2
+    assert rollup(stats)['max_patient_age'] == 41
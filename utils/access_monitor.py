@@ -0,0 +1,247 @@
+"""
+Access Monitor - Streaming sliding-window anomaly detection
+Watches the hardware audit event stream as it is logged and raises
+alerts on access bursts without querying the audit table
+
+Every rule keeps one sliding window per key (card, user, device or
+patient) and counts either events or distinct values of another field:
+    card_many_devices       one card scanned on many devices
+    user_many_patients      one user opening an unusual number of patient files
+    patient_many_users      one patient's record opened by many users
+    user_failed_burst       repeated failed logins of one user
+    device_failed_burst     repeated failed attempts on one reader/sensor
+
+- Each event costs O(1) amortized per rule: it is appended to its key's
+  window, expired entries are popped from the front, and keys idle for
+  a whole window are dropped from the front of an LRU order
+- Alerts go to subscribers synchronously, on the thread that logged
+  the event; one (rule, key) alerts at most once per window
+
+Location: utils/access_monitor.py
+"""
+
+import threading
+import time
+from collections import OrderedDict, deque
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+FAILED_EVENT_TYPES = ('failed_login',)
+
+
+def _value(value):
+    """Enum members are compared by value"""
+    return getattr(value, 'value', value)
+
+
+def _event_time(event: Dict) -> float:
+    timestamp = event.get('timestamp')
+    if isinstance(timestamp, datetime):
+        return timestamp.timestamp()
+    if isinstance(timestamp, str):
+        try:
+            return datetime.strptime(timestamp[:19], TIMESTAMP_FORMAT).timestamp()
+        except ValueError:
+            pass
+    return time.time()
+
+
+def _device(event: Dict):
+    return event.get('device_id') or event.get('device_name')
+
+
+def is_failure(event: Dict) -> bool:
+    return event.get('success') is False or _value(event.get('event_type')) in FAILED_EVENT_TYPES
+
+
+class SlidingWindow:
+    """Events (or distinct values) of one key within the last `window` seconds"""
+
+    __slots__ = ('entries', 'last_seen', 'alerted_at')
+
+    def __init__(self):
+        self.entries = deque()  # (time, value)
+        self.last_seen: Dict = {}  # value -> newest time (distinct counting)
+        self.alerted_at: Optional[float] = None
+
+    def add(self, now: float, value, window: float, distinct: bool) -> int:
+        """Record one event and return the current count"""
+        entries = self.entries
+        entries.append((now, value))
+        if distinct:
+            self.last_seen[value] = now
+
+        horizon = now - window
+        while entries and entries[0][0] <= horizon:
+            old_time, old_value = entries.popleft()
+            if distinct and self.last_seen.get(old_value) == old_time:
+                del self.last_seen[old_value]
+        return len(self.last_seen) if distinct else len(entries)
+
+
+class WindowRule:
+    """Alert when a key reaches `threshold` events / distinct values within `window` seconds"""
+
+    def __init__(self, name: str, key: Callable[[Dict], object], threshold: int,
+                 window: float, distinct: Optional[Callable[[Dict], object]] = None,
+                 when: Optional[Callable[[Dict], bool]] = None, description: str = ''):
+        """
+        Args:
+            name: Rule name (reported in alerts)
+            key: Event -> window key (None = event not counted)
+            threshold: Count that raises an alert
+            window: Window length in seconds
+            distinct: Event -> value counted distinctly (None = count events)
+            when: Event filter (None = every event)
+            description: Human readable summary
+        """
+        self.name = name
+        self.key = key
+        self.threshold = threshold
+        self.window = window
+        self.distinct = distinct
+        self.when = when
+        self.description = description
+        # key -> SlidingWindow, least recently updated first
+        self.windows: OrderedDict = OrderedDict()
+
+    def observe(self, event: Dict, now: float) -> Optional[Dict]:
+        """Count one event; returns an alert dict when the threshold is reached"""
+        windows = self.windows
+        # Keys idle for a whole window hold nothing countable any more
+        while windows:
+            oldest_key, oldest = next(iter(windows.items()))
+            if oldest.entries and oldest.entries[-1][0] > now - self.window:
+                break
+            del windows[oldest_key]
+
+        if self.when is not None and not self.when(event):
+            return None
+        key = self.key(event)
+        if key is None:
+            return None
+        value = None
+        if self.distinct is not None:
+            value = self.distinct(event)
+            if value is None:
+                return None
+
+        state = windows.get(key)
+        if state is None:
+            state = windows[key] = SlidingWindow()
+        else:
+            windows.move_to_end(key)
+        count = state.add(now, value, self.window, self.distinct is not None)
+
+        if count < self.threshold:
+            return None
+        if state.alerted_at is not None and now - state.alerted_at < self.window:
+            return None
+        state.alerted_at = now
+        return {
+            'rule': self.name,
+            'key': key,
+            'count': count,
+            'threshold': self.threshold,
+            'window': self.window,
+            'description': self.description,
+            'timestamp': datetime.fromtimestamp(now).strftime(TIMESTAMP_FORMAT),
+            'event': event,
+        }
+
+
+def default_rules() -> List[WindowRule]:
+    """Burst rules for card, fingerprint and patient-record access"""
+    return [
+        WindowRule('card_many_devices', key=lambda e: e.get('card_uid'), distinct=_device,
+                   threshold=3, window=300,
+                   description="card scanned on 3+ devices within 5 minutes"),
+        WindowRule('user_many_patients', key=lambda e: e.get('user_id'),
+                   distinct=lambda e: e.get('patient_national_id'),
+                   threshold=30, window=3600,
+                   description="user opened 30+ patient files within an hour"),
+        WindowRule('patient_many_users', key=lambda e: e.get('patient_national_id'),
+                   distinct=lambda e: e.get('user_id'),
+                   threshold=5, window=600,
+                   description="patient record opened by 5+ users within 10 minutes"),
+        WindowRule('user_failed_burst', key=lambda e: e.get('user_id'), when=is_failure,
+                   threshold=5, window=300,
+                   description="5+ failed attempts by one user within 5 minutes"),
+        WindowRule('device_failed_burst', key=_device, when=is_failure,
+                   threshold=10, window=300,
+                   description="10+ failed attempts on one device within 5 minutes"),
+    ]
+
+
+def print_alert(alert: Dict) -> None:
+    print(f"⚠️ ACCESS ALERT [{alert['rule']}] {alert['key']}: "
+          f"{alert['count']} in {alert['window']:.0f}s ({alert['description']})")
+
+
+class AccessMonitor:
+    """Feeds audit events through the window rules and dispatches alerts"""
+
+    def __init__(self, rules: Optional[List[WindowRule]] = None, max_alerts: int = 200):
+        """
+        Args:
+            rules: Window rules (default: default_rules())
+            max_alerts: Recent alerts kept for recent_alerts()
+        """
+        self.rules = rules if rules is not None else default_rules()
+        self._subscribers: List[Callable[[Dict], None]] = []
+        self._alerts = deque(maxlen=max_alerts)
+        self._lock = threading.Lock()
+        self._events = 0
+
+    def subscribe(self, callback: Callable[[Dict], None]) -> None:
+        """Call `callback(alert)` for every alert"""
+        self._subscribers.append(callback)
+
+    def unsubscribe(self, callback: Callable[[Dict], None]) -> None:
+        if callback in self._subscribers:
+            self._subscribers.remove(callback)
+
+    def observe(self, event: Dict) -> List[Dict]:
+        """
+        Feed one audit event (as logged) to every rule
+
+        Args:
+            event: Audit event dict (database row or hardware log event)
+
+        Returns:
+            list: Alerts raised by this event
+        """
+        now = _event_time(event)
+        with self._lock:
+            self._events += 1
+            alerts = [alert for alert in (rule.observe(event, now) for rule in self.rules)
+                      if alert is not None]
+            self._alerts.extend(alerts)
+
+        for alert in alerts:
+            for callback in list(self._subscribers):
+                try:
+                    callback(alert)
+                except Exception as e:
+                    print(f"Error in access alert handler: {e}")
+        return alerts
+
+    def recent_alerts(self, limit: int = 50) -> List[Dict]:
+        """Most recent alerts, newest first"""
+        with self._lock:
+            return list(self._alerts)[-limit:][::-1]
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                'events': self._events,
+                'alerts': len(self._alerts),
+                'tracked_keys': {rule.name: len(rule.windows) for rule in self.rules},
+            }
+
+
+# Global instance
+access_monitor = AccessMonitor()
+access_monitor.subscribe(print_alert)
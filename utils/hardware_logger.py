@@ -1,10 +1,66 @@
 """
 Hardware event logging system
+Events go to an append-only segmented JSONL log (utils/segment_log.py)
+under data/hardware_audit/ - one line per event, no whole-file rewrite
+and no truncation; queries use the per-segment sidecar indexes
 """
+import atexit
+import json
 from datetime import datetime
 from pathlib import Path
-from core.data_manager import data_manager
+from config.settings import (
+    DATA_DIR, HARDWARE_LOG_DIR, HARDWARE_LOG_SEGMENT_BYTES, HARDWARE_LOG_SEGMENT_SECONDS
+)
+from utils.segment_log import SegmentedEventLog
+from utils.access_monitor import access_monitor
 import socket
+import threading
+
+# Legacy whole-document log, imported once into the first segment
+LEGACY_LOG_FILE = DATA_DIR / "hardware_audit_log.json"
+
+hardware_log = SegmentedEventLog(
+    HARDWARE_LOG_DIR,
+    max_segment_bytes=HARDWARE_LOG_SEGMENT_BYTES,
+    max_segment_seconds=HARDWARE_LOG_SEGMENT_SECONDS
+)
+
+# Write the active segment's index on a normal shutdown
+atexit.register(hardware_log.close)
+
+_legacy_lock = threading.Lock()
+_legacy_checked = False
+
+
+def import_legacy_log(log: SegmentedEventLog, legacy_file: Path = LEGACY_LOG_FILE) -> int:
+    """
+    Seed an empty segment log with the events of the old JSON document
+    (the JSON file itself is left in place)
+
+    Returns:
+        Number of imported events
+    """
+    if log.segments() or not legacy_file.exists():
+        return 0
+    try:
+        with open(legacy_file, 'r', encoding='utf-8') as f:
+            events = json.load(f).get('hardware_events', [])
+    except (OSError, ValueError, AttributeError) as e:
+        print(f"Could not import legacy hardware audit log: {e}")
+        return 0
+    for event in sorted(events, key=lambda e: e.get('timestamp', '')):
+        log.append(event)
+    return len(events)
+
+
+def _ensure_legacy_imported():
+    global _legacy_checked
+    if _legacy_checked:
+        return
+    with _legacy_lock:
+        if not _legacy_checked:
+            import_legacy_log(hardware_log)
+            _legacy_checked = True
 
 
 def log_hardware_event(
@@ -31,8 +87,9 @@ def log_hardware_event(
         **kwargs: Additional event data
 
     Returns:
-        Success boolean
+        Success boolean (False only if the event could not be written)
     """
+    _ensure_legacy_imported()
     try:
         # Create event record
         event = {
@@ -61,18 +118,10 @@ def log_hardware_event(
         # Add extra kwargs
         event.update(kwargs)
 
-        # Save to audit log
-        log_data = data_manager.load_data('hardware_audit_log')
-        if 'hardware_events' not in log_data:
-            log_data['hardware_events'] = []
-
-        log_data['hardware_events'].append(event)
-
-        # Keep only last 10,000 events (prevent unlimited growth)
-        if len(log_data['hardware_events']) > 10000:
-            log_data['hardware_events'] = log_data['hardware_events'][-10000:]
-
-        return data_manager.save_data('hardware_audit_log', log_data)
+        # One appended line - cost does not depend on the log size
+        hardware_log.append(event)
+        access_monitor.observe(event)
+        return True
 
     except Exception as e:
         print(f"Failed to log hardware event: {e}")
@@ -117,32 +166,14 @@ def get_hardware_audit_log(
         limit: Max results
 
     Returns:
-        List of events
+        List of events (newest first)
     """
-    log_data = data_manager.load_data('hardware_audit_log')
-    events = log_data.get('hardware_events', [])
-
-    # Apply filters
-    filtered = events
-
-    if event_type:
-        filtered = [e for e in filtered if e.get('event_type') == event_type]
-
-    if user_id:
-        filtered = [e for e in filtered if e.get('user_id') == user_id]
-
-    if patient_national_id:
-        filtered = [e for e in filtered if e.get(
-            'patient_national_id') == patient_national_id]
-
-    if start_date:
-        filtered = [e for e in filtered if e.get(
-            'timestamp', '') >= start_date]
-
-    if end_date:
-        filtered = [e for e in filtered if e.get('timestamp', '') <= end_date]
-
-    # Sort by timestamp (newest first)
-    filtered.sort(key=lambda x: x.get('timestamp', ''), reverse=True)
-
-    return filtered[:limit]
+    _ensure_legacy_imported()
+    return hardware_log.query(
+        start=start_date,
+        end=end_date,
+        limit=limit,
+        event_type=event_type,
+        user_id=user_id,
+        patient_national_id=patient_national_id
+    )
@@ -0,0 +1,219 @@
+"""
+Streaming JSON reader for large data exports
+Yields the records of one top-level array (e.g. "patients" in
+data/patients.json) one at a time, so memory stays bounded by the
+largest single record instead of the whole file
+
+- Uses ijson when it is installed, otherwise a small incremental parser
+  on top of json.JSONDecoder.raw_decode that reads the file in
+  fixed-size blocks
+- Other top-level values before the array are decoded and discarded
+  (they are expected to be small: metadata, version, ...)
+- ImportCheckpoint records how many records were committed, so an
+  interrupted import resumes after the last committed batch; it is
+  ignored when the source file changed since it was written
+
+Location: utils/json_stream.py
+"""
+
+import json
+import os
+from itertools import islice
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional
+
+try:
+    import ijson
+    IJSON_AVAILABLE = True
+except ImportError:
+    IJSON_AVAILABLE = False
+
+# Characters read from the file at a time
+BUFFER_SIZE = 1 << 16
+
+_WHITESPACE = ' \t\n\r'
+
+# Characters that may continue a JSON number
+_NUMBER_CHARS = frozenset('0123456789+-.eE')
+
+
+class _BlockReader:
+    """Text buffer over a file with incremental JSON decoding"""
+
+    def __init__(self, handle, buffer_size: int):
+        self.handle = handle
+        self.buffer_size = buffer_size
+        self.decoder = json.JSONDecoder()
+        self.buf = ''
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self) -> bool:
+        """Append the next block; False at end of file"""
+        if self.eof:
+            return False
+        if self.pos > self.buffer_size:
+            # Drop what was already consumed so the buffer stays bounded
+            self.buf = self.buf[self.pos:]
+            self.pos = 0
+        block = self.handle.read(max(self.buffer_size, len(self.buf)))
+        if not block:
+            self.eof = True
+            return False
+        self.buf += block
+        return True
+
+    def peek(self) -> str:
+        """Next non-whitespace character ('' at end of file)"""
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                return ''
+
+    def expect(self, chars: str) -> str:
+        char = self.peek()
+        if not char or char not in chars:
+            raise ValueError(f"Expected one of {chars!r} in JSON stream, found {char or 'end of file'!r}")
+        self.pos += 1
+        return char
+
+    def value(self):
+        """Decode the next complete JSON value"""
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if self._fill():
+                    continue
+                raise
+            # A number cut by the block boundary decodes as a shorter number
+            # ("1." -> 1, "2e" -> 2): read on while only number characters follow
+            if (isinstance(value, (int, float)) and not isinstance(value, bool) and not self.eof
+                    and all(c in _NUMBER_CHARS for c in self.buf[end:]) and self._fill()):
+                continue
+            self.pos = end
+            return value
+
+
+def _stream_array(reader: _BlockReader) -> Iterator:
+    reader.expect('[')
+    if reader.peek() == ']':
+        reader.pos += 1
+        return
+    while True:
+        yield reader.value()
+        if reader.expect(',]') == ']':
+            return
+
+
+def _stream(path: Path, key: Optional[str], buffer_size: int) -> Iterator:
+    with open(path, 'r', encoding='utf-8') as f:
+        reader = _BlockReader(f, buffer_size)
+        if key is None:
+            yield from _stream_array(reader)
+            return
+
+        reader.expect('{')
+        if reader.peek() == '}':
+            return
+        while True:
+            name = reader.value()
+            reader.expect(':')
+            if name == key:
+                yield from _stream_array(reader)
+                return
+            reader.value()  # skip this member
+            if reader.expect(',}') == '}':
+                return
+
+
+def iter_json_array(path, key: Optional[str] = 'patients', buffer_size: int = BUFFER_SIZE,
+                    use_ijson: bool = IJSON_AVAILABLE) -> Iterator:
+    """
+    Stream the records of one top-level array
+
+    Args:
+        path: JSON file
+        key: Member of the top-level object holding the array
+            (None when the file itself is an array)
+        buffer_size: Characters read per block (stdlib parser)
+        use_ijson: Use ijson when installed
+
+    Returns:
+        Iterator over the array elements (nothing if the key is missing)
+    """
+    path = Path(path)
+    if use_ijson:
+        with open(path, 'rb') as f:
+            yield from ijson.items(f, 'item' if key is None else f'{key}.item', use_float=True)
+        return
+    yield from _stream(path, key, buffer_size)
+
+
+def iter_batches(records: Iterable, size: int) -> Iterator[List]:
+    """Consecutive lists of at most `size` records from any iterable"""
+    iterator = iter(records)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+class ImportCheckpoint:
+    """Progress of one streamed import, stored next to the source file"""
+
+    def __init__(self, source, name: str = 'import'):
+        """
+        Args:
+            source: JSON file being imported
+            name: Importer name (one checkpoint per source and importer)
+        """
+        self.source = Path(source)
+        self.path = self.source.with_name(f"{self.source.name}.{name}.checkpoint")
+
+    def _signature(self) -> Dict:
+        stat = self.source.stat()
+        return {'size': stat.st_size, 'mtime': int(stat.st_mtime)}
+
+    def load(self) -> Dict:
+        """
+        Saved progress for the current source file
+
+        Returns:
+            dict: records (committed so far) and in_flight (keys of the
+                batch that was being written); empty progress when there
+                is no checkpoint or the source changed
+        """
+        state = {'records': 0, 'in_flight': []}
+        if not self.path.exists():
+            return state
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                saved = json.load(f)
+        except (OSError, ValueError):
+            return state
+        if saved.get('source') != self._signature():
+            print(f"⚠️  {self.source.name} changed since the last checkpoint - starting over")
+            return state
+        state['records'] = saved.get('records', 0)
+        state['in_flight'] = saved.get('in_flight', [])
+        return state
+
+    def save(self, records: int, in_flight: Optional[List] = None) -> None:
+        """Atomically record committed progress"""
+        temp = self.path.with_suffix('.tmp')
+        with open(temp, 'w', encoding='utf-8') as f:
+            json.dump({'source': self._signature(), 'records': records,
+                       'in_flight': in_flight or []}, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp, self.path)
+
+    def clear(self) -> None:
+        """Forget progress (import finished)"""
+        self.path.unlink(missing_ok=True)
@@ -0,0 +1,322 @@
+"""
+Segmented append-only event log
+JSON-lines segments with size/time rotation and a sidecar index per
+segment, so appends cost the same no matter how much history exists
+and range queries only read the segments (and blocks) that can match
+
+Layout of the log directory:
+    20241127-091523-4242-0001.jsonl       events, one JSON object per line
+    20241127-091523-4242-0001.idx.json    sidecar index (written on rotation)
+
+- Segment names start with the creation time and carry the writer's pid,
+  so several processes can log into one directory without sharing a file
+- The index records first/last timestamp, event counts per type,
+  line offsets per user and per patient, and the timestamp range of
+  every block of BLOCK_EVENTS lines
+- A segment without a current index (active in another process, or
+  written before a crash) is indexed by scanning it once
+
+Location: utils/segment_log.py
+"""
+
+import json
+import os
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+SEGMENT_SUFFIX = '.jsonl'
+INDEX_SUFFIX = '.idx.json'
+
+# Lines per time block in the sidecar index
+BLOCK_EVENTS = 64
+
+# Index name -> event field with exact offsets
+INDEXED_FIELDS = {
+    'users': 'user_id',
+    'patients': 'patient_national_id',
+}
+
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+TIMESTAMP_LENGTH = 19
+
+
+def _new_index() -> Dict:
+    return {
+        'count': 0,
+        'size': 0,
+        'first_ts': None,
+        'last_ts': None,
+        'event_types': {},
+        'blocks': [],  # [offset, min_ts, max_ts]
+        **{name: {} for name in INDEXED_FIELDS},
+    }
+
+
+def _index_event(index: Dict, event: Dict, offset: int, length: int) -> None:
+    """Add one appended line to a segment index"""
+    ts = str(event.get('timestamp', ''))
+    if index['count'] % BLOCK_EVENTS == 0:
+        index['blocks'].append([offset, ts, ts])
+    else:
+        block = index['blocks'][-1]
+        block[1], block[2] = min(block[1], ts), max(block[2], ts)
+
+    index['first_ts'] = ts if index['first_ts'] is None else min(index['first_ts'], ts)
+    index['last_ts'] = ts if index['last_ts'] is None else max(index['last_ts'], ts)
+    event_type = str(event.get('event_type'))
+    index['event_types'][event_type] = index['event_types'].get(event_type, 0) + 1
+    for name, field in INDEXED_FIELDS.items():
+        value = event.get(field)
+        if value is not None:
+            index[name].setdefault(str(value), []).append(offset)
+
+    index['count'] += 1
+    index['size'] = offset + length
+
+
+def _matches(event: Dict, start, end, filters: Dict) -> bool:
+    ts = str(event.get('timestamp', ''))
+    if start is not None and ts < start:
+        return False
+    if end is not None and ts > end:
+        return False
+    return all(str(event.get(field)) == str(value) for field, value in filters.items())
+
+
+class SegmentedEventLog:
+    """Append-only JSONL event log split into rotated, indexed segments"""
+
+    def __init__(self, directory, max_segment_bytes: int = 4 * 1024 * 1024,
+                 max_segment_seconds: float = 24 * 3600):
+        """
+        Args:
+            directory: Log directory (created if missing)
+            max_segment_bytes: Rotate once the active segment reaches this size
+            max_segment_seconds: Rotate once the active segment is this old
+        """
+        self.directory = Path(directory)
+        self.max_segment_bytes = max_segment_bytes
+        self.max_segment_seconds = max_segment_seconds
+
+        self._lock = threading.Lock()
+        self._file = None
+        self._active: Optional[Path] = None
+        self._active_index: Optional[Dict] = None
+        self._active_opened = 0.0
+        self._sequence = 0
+        # path -> index of sealed segments (validated by file size)
+        self._index_cache: Dict[Path, Dict] = {}
+
+    # ==================== WRITING ====================
+
+    def append(self, event: Dict) -> Dict:
+        """
+        Append one event (O(1): one write to the active segment)
+
+        Args:
+            event: JSON-serializable dict; 'timestamp' is added if missing
+
+        Returns:
+            dict: The stored event
+
+        Raises:
+            OSError: The event could not be written
+        """
+        event = dict(event)
+        event.setdefault('timestamp', datetime.now().strftime(TIMESTAMP_FORMAT))
+        line = (json.dumps(event, ensure_ascii=False, default=str, separators=(',', ':')) + '\n').encode('utf-8')
+
+        with self._lock:
+            self._ensure_segment()
+            offset = self._active_index['size']
+            self._file.write(line)
+            self._file.flush()
+            _index_event(self._active_index, event, offset, len(line))
+        return event
+
+    def _ensure_segment(self) -> None:
+        """Open a segment, or rotate the active one when it is full or old"""
+        if self._file is not None:
+            too_big = self._active_index['size'] >= self.max_segment_bytes
+            too_old = time.time() - self._active_opened >= self.max_segment_seconds
+            if not (too_big or too_old):
+                return
+            self._seal()
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._sequence += 1
+        name = f"{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{self._sequence:04d}{SEGMENT_SUFFIX}"
+        self._active = self.directory / name
+        self._file = open(self._active, 'ab')
+        self._active_index = _new_index()
+        self._active_opened = time.time()
+
+    def _seal(self) -> None:
+        """Close the active segment and write its sidecar index"""
+        if self._file is None:
+            return
+        self._file.close()
+        self._write_index(self._active, self._active_index)
+        self._index_cache[self._active] = self._active_index
+        self._file = None
+        self._active = None
+        self._active_index = None
+
+    def _write_index(self, segment: Path, index: Dict) -> None:
+        path = segment.with_suffix(INDEX_SUFFIX)
+        temp = path.with_suffix('.tmp')
+        with open(temp, 'w', encoding='utf-8') as f:
+            json.dump(index, f, separators=(',', ':'))
+        os.replace(temp, path)
+
+    def rotate(self) -> None:
+        """Seal the active segment now (the next append starts a new one)"""
+        with self._lock:
+            self._seal()
+
+    def close(self) -> None:
+        self.rotate()
+
+    # ==================== INDEXES ====================
+
+    def segments(self) -> List[Path]:
+        """All segment files, oldest first"""
+        if not self.directory.exists():
+            return []
+        return sorted(self.directory.glob(f"*{SEGMENT_SUFFIX}"))
+
+    def segment_index(self, segment: Path) -> Dict:
+        """
+        Index of a segment (in memory, sidecar, or rebuilt by a scan)
+
+        Args:
+            segment: Segment path
+
+        Returns:
+            dict: Segment index
+        """
+        with self._lock:
+            if segment == self._active:
+                return self._active_index
+
+        size = segment.stat().st_size
+        cached = self._index_cache.get(segment)
+        if cached is not None and cached.get('scanned', cached['size']) == size:
+            return cached
+
+        index = None
+        sidecar = segment.with_suffix(INDEX_SUFFIX)
+        if sidecar.exists():
+            try:
+                with open(sidecar, 'r', encoding='utf-8') as f:
+                    index = json.load(f)
+            except (OSError, ValueError):
+                index = None
+        if index is None or index.get('size') != size:
+            index = self._scan(segment)
+        self._index_cache[segment] = index
+        return index
+
+    def _scan(self, segment: Path) -> Dict:
+        """Build an index by reading a segment once"""
+        index = _new_index()
+        offset = 0
+        with open(segment, 'rb') as f:
+            for line in f:
+                if line.endswith(b'\n'):
+                    try:
+                        _index_event(index, json.loads(line), offset, len(line))
+                    except ValueError:
+                        pass
+                offset += len(line)
+        # 'size' ends at the last complete line; a torn tail from a crash is skipped
+        index['scanned'] = offset
+        return index
+
+    # ==================== QUERIES ====================
+
+    def _read_offsets(self, segment: Path, offsets: Iterable[int]) -> List[Dict]:
+        events = []
+        with open(segment, 'rb') as f:
+            for offset in offsets:
+                f.seek(offset)
+                events.append(json.loads(f.readline()))
+        return events
+
+    def _read_blocks(self, segment: Path, index: Dict, start, end) -> List[Dict]:
+        events = []
+        blocks = index['blocks']
+        with open(segment, 'rb') as f:
+            for i, (offset, min_ts, max_ts) in enumerate(blocks):
+                if (start is not None and max_ts < start) or (end is not None and min_ts > end):
+                    continue
+                stop = blocks[i + 1][0] if i + 1 < len(blocks) else index['size']
+                f.seek(offset)
+                while f.tell() < stop:
+                    try:
+                        events.append(json.loads(f.readline()))
+                    except ValueError:
+                        continue
+        return events
+
+    def query(self, start: Optional[str] = None, end: Optional[str] = None,
+              limit: Optional[int] = 100, **filters) -> List[Dict]:
+        """
+        Events in a timestamp range matching exact field filters, newest first
+
+        Args:
+            start: Inclusive lower timestamp ('YYYY-MM-DD HH:MM:SS' or a prefix)
+            end: Inclusive upper timestamp
+            limit: Max results (None = all)
+            **filters: field=value (user_id and patient_national_id use the index)
+
+        Returns:
+            list: Matching events
+        """
+        filters = {field: value for field, value in filters.items() if value is not None}
+        if end is not None and len(end) < TIMESTAMP_LENGTH:
+            # '2024-11-27' as an end bound covers the whole day
+            end = end + '\uffff'
+
+        candidates = []
+        for segment in self.segments():
+            index = self.segment_index(segment)
+            if not index['count']:
+                continue
+            if start is not None and index['last_ts'] < start:
+                continue
+            if end is not None and index['first_ts'] > end:
+                continue
+            event_type = filters.get('event_type')
+            if event_type is not None and str(event_type) not in index['event_types']:
+                continue
+            candidates.append((segment, index))
+
+        # Newest segments first; stop once older segments cannot make the cut
+        candidates.sort(key=lambda item: item[1]['last_ts'], reverse=True)
+        results = []
+        for segment, index in candidates:
+            if limit is not None and len(results) >= limit:
+                results.sort(key=lambda e: str(e.get('timestamp', '')), reverse=True)
+                del results[limit:]
+                if index['last_ts'] < str(results[-1].get('timestamp', '')):
+                    break
+
+            offsets = None
+            for name, field in INDEXED_FIELDS.items():
+                if field in filters:
+                    found = set(index[name].get(str(filters[field]), ()))
+                    offsets = found if offsets is None else offsets & found
+            events = (self._read_offsets(segment, sorted(offsets)) if offsets is not None
+                      else self._read_blocks(segment, index, start, end))
+            results.extend(e for e in events if _matches(e, start, end, filters))
+
+        results.sort(key=lambda e: str(e.get('timestamp', '')), reverse=True)
+        return results if limit is None else results[:limit]
+
+    def count(self) -> int:
+        """Total number of events across all segments"""
+        return sum(self.segment_index(segment)['count'] for segment in self.segments())